@@ -1,19 +1,26 @@
 from __future__ import annotations
 
+import zipfile
 from pathlib import Path
 from typing import TYPE_CHECKING
-from typing import NoReturn
+
+from documents.utils import PRECOMPRESSED_SUFFIXES
 
 if TYPE_CHECKING:
     from collections.abc import Callable
-    from zipfile import ZipFile
+    from collections.abc import Iterable
+    from collections.abc import Iterator
 
     from documents.models import Document
 
+# Files are read and compressed in chunks of this size, each of which is sent on
+# as soon as the zip file has written it
+CHUNK_SIZE = 1024 * 1024
+
 
 class BulkArchiveStrategy:
-    def __init__(self, zipf: ZipFile, *, follow_formatting: bool = False) -> None:
-        self.zipf: ZipFile = zipf
+    def __init__(self, *, follow_formatting: bool = False) -> None:
+        self._names: set[str] = set()
         if follow_formatting:
             self.make_unique_filename: Callable[..., Path | str] = (
                 self._formatted_filepath
@@ -40,9 +47,10 @@ class BulkArchiveStrategy:
                 archive=archive,
                 counter=counter,
             )
-            if filename in self.zipf.namelist():
+            if filename in self._names:
                 counter += 1
             else:
+                self._names.add(filename)
                 return filename
 
     def _formatted_filepath(
@@ -69,39 +77,97 @@ class BulkArchiveStrategy:
 
         return in_archive_path
 
-    def add_document(self, doc: Document) -> NoReturn:
+    def files(self, doc: Document) -> list[tuple[Path, Path | str]]:
+        """
+        Returns the files to add to the zip file for the given document, as pairs
+        of file path and name in the zip file.
+        """
         raise NotImplementedError  # pragma: no cover
 
 
 class OriginalsOnlyStrategy(BulkArchiveStrategy):
-    def add_document(self, doc: Document) -> None:
-        self.zipf.write(doc.source_path, self.make_unique_filename(doc))
+    def files(self, doc: Document) -> list[tuple[Path, Path | str]]:
+        return [(doc.source_path, self.make_unique_filename(doc))]
 
 
 class ArchiveOnlyStrategy(BulkArchiveStrategy):
-    def add_document(self, doc: Document) -> None:
+    def files(self, doc: Document) -> list[tuple[Path, Path | str]]:
         if doc.has_archive_version:
             if TYPE_CHECKING:
                 assert doc.archive_path is not None
-            self.zipf.write(
-                doc.archive_path,
-                self.make_unique_filename(doc, archive=True),
-            )
-        else:
-            self.zipf.write(doc.source_path, self.make_unique_filename(doc))
+            return [
+                (doc.archive_path, self.make_unique_filename(doc, archive=True)),
+            ]
+        return [(doc.source_path, self.make_unique_filename(doc))]
 
 
 class OriginalAndArchiveStrategy(BulkArchiveStrategy):
-    def add_document(self, doc: Document) -> None:
+    def files(self, doc: Document) -> list[tuple[Path, Path | str]]:
+        files = []
         if doc.has_archive_version:
             if TYPE_CHECKING:
                 assert doc.archive_path is not None
-            self.zipf.write(
-                doc.archive_path,
-                self.make_unique_filename(doc, archive=True, folder="archive/"),
+            files.append(
+                (
+                    doc.archive_path,
+                    self.make_unique_filename(doc, archive=True, folder="archive/"),
+                ),
             )
-
-        self.zipf.write(
-            doc.source_path,
-            self.make_unique_filename(doc, folder="originals/"),
+        files.append(
+            (doc.source_path, self.make_unique_filename(doc, folder="originals/")),
         )
+        return files
+
+
+class _ZipBuffer:
+    """
+    Write-only file for ZipFile, holding what has been written until it is taken.
+
+    It cannot seek, so ZipFile writes sizes and checksums after each entry instead
+    of going back to the entry's header.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(
+    strategy: BulkArchiveStrategy,
+    documents: Iterable[Document],
+    *,
+    compression: int = zipfile.ZIP_STORED,
+) -> Iterator[bytes]:
+    """
+    Yields a zip file of the given documents while it is being written, so nothing
+    but the current chunk is held in memory or on disk.
+
+    Already compressed formats, such as PDF, are always stored.
+    """
+    buffer = _ZipBuffer()
+    with zipfile.ZipFile(buffer, "w", compression) as zipf:
+        for doc in documents:
+            for path, arcname in strategy.files(doc):
+                zinfo = zipfile.ZipInfo.from_file(path, arcname)
+                if path.suffix.lower() not in PRECOMPRESSED_SUFFIXES:
+                    zinfo.compress_type = compression
+                with path.open("rb") as src, zipf.open(zinfo, "w") as dest:
+                    while chunk := src.read(CHUNK_SIZE):
+                        dest.write(chunk)
+                        if data := buffer.take():
+                            yield data
+                if data := buffer.take():
+                    yield data
+    # The central directory, written when the zip file is closed
+    yield buffer.take()
@@ -15,6 +15,8 @@ from django.db import transaction
 from django.db.models import Q
 from django.utils import timezone
 
+from documents.caching import invalidate_selection_index
+from documents.caching import invalidate_statistics_cache
 from documents.data_models import ConsumableDocument
 from documents.data_models import DocumentMetadataOverrides
 from documents.data_models import DocumentSource
@@ -28,6 +30,8 @@ from documents.models import StoragePath
 from documents.models import Tag
 from documents.permissions import set_permissions_for_object
 from documents.plugins.helpers import DocumentsStatusManager
+from documents.tag_hierarchy import get_ancestor_ids
+from documents.tag_hierarchy import get_descendant_ids
 from documents.tasks import bulk_update_documents
 from documents.tasks import consume_file
 from documents.tasks import update_document_content_maybe_archive_file
@@ -54,6 +58,26 @@ class ResolvedDocPair(NamedTuple):
     source_doc: Document
 
 
+def _invalidate_statistics() -> None:
+    """
+    Bulk updates send no signals, so the statistics and the selection facet
+    index are invalidated here rather than once bulk_update_documents has run.
+    """
+    invalidate_statistics_cache()
+    invalidate_selection_index()
+    # Once more after commit, as for single documents
+    transaction.on_commit(invalidate_statistics_cache)
+    transaction.on_commit(invalidate_selection_index)
+
+
+def _mark_modified(doc_ids: list[int]) -> None:
+    """
+    Bulk updates bypass auto_now. Scheduled workflows only look again at
+    documents modified since their last check, so the edit must show there.
+    """
+    Document.objects.filter(id__in=doc_ids).update(modified=timezone.now())
+
+
 @shared_task(bind=True)
 def restore_archive_serial_numbers_task(
     self,
@@ -123,7 +147,8 @@ def set_correspondent(
         .only("pk", "correspondent__id")
     )
     affected_docs = list(qs.values_list("pk", flat=True))
-    qs.update(correspondent=correspondent)
+    qs.update(correspondent=correspondent, modified=timezone.now())
+    _invalidate_statistics()
 
     bulk_update_documents.apply_async(
         kwargs={"document_ids": affected_docs},
@@ -145,7 +170,8 @@ def set_storage_path(doc_ids: list[int], storage_path: StoragePath) -> Literal["
         .only("pk", "storage_path__id")
     )
     affected_docs = list(qs.values_list("pk", flat=True))
-    qs.update(storage_path=storage_path)
+    qs.update(storage_path=storage_path, modified=timezone.now())
+    _invalidate_statistics()
 
     bulk_update_documents.apply_async(
         kwargs={"document_ids": affected_docs},
@@ -165,7 +191,8 @@ def set_document_type(doc_ids: list[int], document_type: DocumentType) -> Litera
         .only("pk", "document_type__id")
     )
     affected_docs = list(qs.values_list("pk", flat=True))
-    qs.update(document_type=document_type)
+    qs.update(document_type=document_type, modified=timezone.now())
+    _invalidate_statistics()
 
     bulk_update_documents.apply_async(
         kwargs={"document_ids": affected_docs},
@@ -177,23 +204,27 @@ def set_document_type(doc_ids: list[int], document_type: DocumentType) -> Litera
 
 def add_tag(doc_ids: list[int], tag: int) -> Literal["OK"]:
     tag_obj = Tag.objects.get(pk=tag)
-    tags_to_add = [tag_obj, *tag_obj.get_ancestors()]
+    tag_ids_to_add = [tag_obj.id, *get_ancestor_ids([tag_obj.id])]
 
     DocumentTagRelationship = Document.tags.through
     to_create = []
     affected_docs: set[int] = set()
 
-    for t in tags_to_add:
-        qs = Document.objects.filter(Q(id__in=doc_ids) & ~Q(tags__id=t.id)).only("pk")
+    for tag_id in tag_ids_to_add:
+        qs = Document.objects.filter(Q(id__in=doc_ids) & ~Q(tags__id=tag_id)).only(
+            "pk",
+        )
         doc_ids_missing_tag = list(qs.values_list("pk", flat=True))
         affected_docs.update(doc_ids_missing_tag)
         to_create.extend(
-            DocumentTagRelationship(document_id=doc, tag_id=t.id)
+            DocumentTagRelationship(document_id=doc, tag_id=tag_id)
             for doc in doc_ids_missing_tag
         )
 
     if to_create:
         DocumentTagRelationship.objects.bulk_create(to_create)
+        _mark_modified(list(affected_docs))
+        _invalidate_statistics()
 
     if affected_docs:
         bulk_update_documents.apply_async(
@@ -206,7 +237,7 @@ def add_tag(doc_ids: list[int], tag: int) -> Literal["OK"]:
 
 def remove_tag(doc_ids: list[int], tag: int) -> Literal["OK"]:
     tag_obj = Tag.objects.get(pk=tag)
-    tag_ids = [tag_obj.id, *tag_obj.get_descendants_pks()]
+    tag_ids = [tag_obj.id, *get_descendant_ids([tag_obj.id])]
 
     DocumentTagRelationship = Document.tags.through
     qs = DocumentTagRelationship.objects.filter(
@@ -217,6 +248,8 @@ def remove_tag(doc_ids: list[int], tag: int) -> Literal["OK"]:
     qs.delete()
 
     if affected_docs:
+        _mark_modified(affected_docs)
+        _invalidate_statistics()
         bulk_update_documents.apply_async(
             kwargs={"document_ids": affected_docs},
             headers={"trigger_source": PaperlessTask.TriggerSource.SYSTEM},
@@ -235,18 +268,16 @@ def modify_tags(
     DocumentTagRelationship = Document.tags.through
 
     # add with all ancestors
-    expanded_add_tags: set[int] = set()
-    add_tag_objects = Tag.objects.filter(pk__in=add_tags)
-    for t in add_tag_objects:
-        expanded_add_tags.add(int(t.id))
-        expanded_add_tags.update(int(pk) for pk in t.get_ancestors_pks())
+    expanded_add_tags = set(
+        Tag.objects.filter(pk__in=add_tags).values_list("pk", flat=True),
+    )
+    expanded_add_tags.update(get_ancestor_ids(expanded_add_tags))
 
     # remove with all descendants
-    expanded_remove_tags: set[int] = set()
-    remove_tag_objects = Tag.objects.filter(pk__in=remove_tags)
-    for t in remove_tag_objects:
-        expanded_remove_tags.add(int(t.id))
-        expanded_remove_tags.update(int(pk) for pk in t.get_descendants_pks())
+    expanded_remove_tags = set(
+        Tag.objects.filter(pk__in=remove_tags).values_list("pk", flat=True),
+    )
+    expanded_remove_tags.update(get_descendant_ids(expanded_remove_tags))
 
     with transaction.atomic():
         if expanded_remove_tags:
@@ -278,6 +309,8 @@ def modify_tags(
                 )
 
     if affected_docs:
+        _mark_modified(affected_docs)
+        _invalidate_statistics()
         bulk_update_documents.apply_async(
             kwargs={"document_ids": affected_docs},
             headers={"trigger_source": PaperlessTask.TriggerSource.SYSTEM},
@@ -349,6 +382,8 @@ def modify_custom_fields(
         document_id__in=affected_docs,
         field_id__in=remove_custom_fields,
     ).hard_delete()
+    _mark_modified(affected_docs)
+    _invalidate_statistics()
 
     bulk_update_documents.apply_async(
         kwargs={"document_ids": affected_docs},
@@ -418,11 +453,13 @@ def set_permissions(
         qs.filter(owner__isnull=True).update(owner=owner)
     else:
         qs.update(owner=owner)
+    _invalidate_statistics()
 
     for doc in qs:
         set_permissions_for_object(permissions=set_permissions, object=doc, merge=merge)
 
     affected_docs = list(qs.values_list("pk", flat=True))
+    _mark_modified(affected_docs)
 
     bulk_update_documents.apply_async(
         kwargs={"document_ids": affected_docs},
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import hashlib
 import logging
 import pickle
+import uuid
+from array import array
 from binascii import hexlify
 from collections import OrderedDict
 from dataclasses import dataclass
@@ -16,6 +19,9 @@ from django.core.cache import caches
 from documents.models import Document
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from collections.abc import Sequence
+
     from django.core.cache.backends.base import BaseCache
 
     from documents.classifier import DocumentClassifier
@@ -42,6 +48,8 @@ CLASSIFIER_VERSION_KEY: Final[str] = "classifier_version"
 CLASSIFIER_HASH_KEY: Final[str] = "classifier_hash"
 CLASSIFIER_MODIFIED_KEY: Final[str] = "classifier_modified"
 LLM_CACHE_CLASSIFIER_VERSION: Final[int] = 1000  # Marker distinguishing LLM suggestions
+STATISTICS_GENERATION_KEY: Final[str] = "statistics_generation"
+SELECTION_GENERATION_KEY: Final[str] = "selection_generation"
 
 CACHE_1_MINUTE: Final[int] = 60
 CACHE_5_MINUTES: Final[int] = 5 * CACHE_1_MINUTE
@@ -326,6 +334,153 @@ def refresh_metadata_cache(
     cache.touch(doc_key, timeout)
 
 
+def get_search_result_ids_cache_key(
+    user_id: int | None,
+    params: Iterable[tuple[str, str]],
+    index_generation: str,
+) -> str:
+    """
+    Builds the key for a search's ordered result IDs.
+
+    ``params`` are the request parameters that influence which documents match
+    and in which order (query, filters, ordering), not the page being viewed.
+    """
+    raw = "\x00".join(
+        [index_generation, *(f"{name}={value}" for name, value in sorted(params))],
+    )
+    digest = hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+    return f"search_results_{user_id}_{digest}"
+
+
+def get_search_result_ids_cache(key: str) -> array[int] | None:
+    """
+    Returns the cached ordered result IDs for the given key, if any
+    """
+    return cache.get(key)
+
+
+def set_search_result_ids_cache(
+    key: str,
+    ordered_ids: Sequence[int],
+    *,
+    timeout: int = CACHE_5_MINUTES,
+) -> array[int] | None:
+    """
+    Caches the ordered result IDs of a search as a compact ``array('i')`` and
+    returns the array, or None if the IDs do not fit a C int.
+    """
+    try:
+        ids = array("i", ordered_ids)
+    except OverflowError:  # pragma: no cover
+        return None
+    cache.set(key, ids, timeout)
+    return ids
+
+
+def get_statistics_generation() -> str:
+    """
+    Returns the token identifying the current state of the dashboard statistics.
+
+    A random token rather than a counter, so an evicted key can never bring
+    back statistics cached under an earlier generation.
+    """
+    return cache.get_or_set(
+        STATISTICS_GENERATION_KEY,
+        lambda: uuid.uuid4().hex,
+        timeout=None,
+    )
+
+
+def invalidate_statistics_cache() -> None:
+    """
+    Starts a new statistics generation, orphaning all cached statistics
+    """
+    cache.set(STATISTICS_GENERATION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def get_selection_generation() -> str:
+    """
+    Returns the token identifying the current document to facet assignments
+    held by the selection facet index (see ``documents.selection``).
+    """
+    return cache.get_or_set(
+        SELECTION_GENERATION_KEY,
+        lambda: uuid.uuid4().hex,
+        timeout=None,
+    )
+
+
+def invalidate_selection_index() -> None:
+    """
+    Starts a new selection generation, making every process rebuild its
+    selection facet index
+    """
+    cache.set(SELECTION_GENERATION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def get_statistics_cache_key(user_id: int | None, generation: str) -> str:
+    """
+    Builds the key for the statistics of the given user, or the global
+    statistics if user_id is None
+    """
+    scope = "global" if user_id is None else f"user_{user_id}"
+    return f"statistics_{scope}_{generation}"
+
+
+def get_statistics_cache(key: str) -> dict | None:
+    """
+    Returns the cached statistics for the given key, if any
+    """
+    return cache.get(key)
+
+
+def set_statistics_cache(
+    key: str,
+    statistics: dict,
+    *,
+    timeout: int = CACHE_5_MINUTES,
+) -> None:
+    """
+    Caches the statistics under the given key
+    """
+    cache.set(key, statistics, timeout)
+
+
+def get_document_count_cache_key(
+    user_id: int | None,
+    params: Iterable[tuple[str, str]],
+    generation: str,
+) -> str:
+    """
+    Builds the key for the number of documents a user sees for a document list
+    request. ``params`` are the request parameters that filter the list.
+    """
+    raw = "\x00".join(
+        [generation, *(f"{name}={value}" for name, value in sorted(params))],
+    )
+    digest = hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+    return f"document_count_{user_id}_{digest}"
+
+
+def get_document_count_cache(key: str) -> int | None:
+    """
+    Returns the cached document count for the given key, if any
+    """
+    return cache.get(key)
+
+
+def set_document_count_cache(
+    key: str,
+    count: int,
+    *,
+    timeout: int = CACHE_5_MINUTES,
+) -> None:
+    """
+    Caches the document count under the given key
+    """
+    cache.set(key, count, timeout)
+
+
 def get_thumbnail_modified_key(document_id: int) -> str:
     """
     Builds the key to store a thumbnail's timestamp
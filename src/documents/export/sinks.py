@@ -1,14 +1,26 @@
 from __future__ import annotations
 
 import abc
+import fcntl
 import hashlib
 import json
+import logging
 import os
 import shutil
+import sys
 import tempfile
+import time
 import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
 from contextlib import AbstractContextManager
+from contextlib import ExitStack
 from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
 from pathlib import PurePosixPath
 from typing import TYPE_CHECKING
@@ -17,19 +29,170 @@ from django.conf import settings
 from django.core.serializers.json import DjangoJSONEncoder
 
 from documents.file_handling import delete_empty_directories
+from documents.utils import PRECOMPRESSED_SUFFIXES
 from documents.utils import compute_checksum
+from documents.utils import copy_basic_file_stats
 from documents.utils import copy_file_with_basic_stats
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
     from collections.abc import Iterator
     from typing import TextIO
 
+logger = logging.getLogger("paperless.export")
+
+# Written into the export directory by incremental exports, records what was
+# exported last time so unchanged files need neither reading nor copying
+EXPORT_STATE_NAME = ".export-state.json"
+
+# Linux ioctl to share the data blocks of one file with another (a reflink),
+# supported by btrfs, XFS and others
+_FICLONE = 0x40049409
+
+# Compressed entries larger than this are spooled to disk until they are written
+_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+# _write_deflated relies on ZipFile internals. The tests check they are there on
+# every Python version CI runs, so a release changing them fails the tests
+# instead of quietly compressing on one thread. Should one slip through anyway,
+# entries are compressed as they are written, through the public API.
+_CAN_WRITE_DEFLATED = hasattr(zipfile.ZipFile, "_writecheck")
+
 
 def _dumps(content: list | dict) -> str:
     """Serialize export JSON consistently across all sinks."""
     return json.dumps(content, cls=DjangoJSONEncoder, indent=2, ensure_ascii=False)
 
 
+def _stat_key(path: Path) -> list[int] | None:
+    """Size and modification time of ``path``, or None if it does not exist."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _reflink(source: Path, dest: Path) -> bool:
+    """Clone ``source`` to ``dest`` without copying data, if the filesystem can."""
+    if sys.platform != "linux":
+        return False
+    try:
+        with source.open("rb") as src, dest.open("wb") as dst:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+    except OSError:
+        dest.unlink(missing_ok=True)
+        return False
+    return True
+
+
+def link_or_copy_file(source: Path, dest: Path, *, mode: str = "copy") -> None:
+    """
+    Places a copy of ``source`` at ``dest``, preserving its modified time.
+
+    ``mode`` is one of:
+      * ``"copy"``: a regular copy.
+      * ``"reflink"``: a copy-on-write clone sharing the data blocks of
+        ``source``, on filesystems which support it (btrfs, XFS, ...).
+      * ``"hardlink"``: a hard link to ``source``, when both are on the same
+        filesystem.
+
+    Links fall back to a regular copy when they cannot be made. An existing
+    ``dest`` which is hard linked is removed first, so the file it is linked to
+    is never written through.
+    """
+    try:
+        if mode == "hardlink" or dest.stat().st_nlink > 1:
+            dest.unlink()
+    except FileNotFoundError:
+        pass
+    if mode == "hardlink":
+        try:
+            dest.hardlink_to(source)
+        except OSError:
+            pass
+        else:
+            return
+    elif mode == "reflink" and _reflink(source, dest):
+        copy_basic_file_stats(source, dest)
+        return
+    copy_file_with_basic_stats(source, dest)
+
+
+@dataclass(slots=True)
+class _DeflatedEntry:
+    crc: int
+    file_size: int
+    compress_size: int
+    data: tempfile.SpooledTemporaryFile
+
+
+def _read_chunks(source: Path | bytes) -> Iterator[bytes]:
+    if isinstance(source, bytes):
+        yield source
+        return
+    with source.open("rb") as f:
+        while chunk := f.read(1024 * 1024):
+            yield chunk
+
+
+def _deflate(source: Path | bytes) -> _DeflatedEntry:
+    """Raw deflate ``source`` as zipfile would, for writing to the archive later."""
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    crc = 0
+    file_size = 0
+    with ExitStack() as stack:
+        data = stack.enter_context(
+            tempfile.SpooledTemporaryFile(
+                max_size=_SPOOL_MAX_SIZE,
+                dir=settings.SCRATCH_DIR,
+            ),
+        )
+        for chunk in _read_chunks(source):
+            crc = zlib.crc32(chunk, crc)
+            file_size += len(chunk)
+            data.write(compressor.compress(chunk))
+        data.write(compressor.flush())
+        # Compressed: the caller writes and closes the data from here on
+        stack.pop_all()
+    compress_size = data.tell()
+    data.seek(0)
+    return _DeflatedEntry(crc, file_size, compress_size, data)
+
+
+def _write_deflated(
+    zf: zipfile.ZipFile,
+    zinfo: zipfile.ZipInfo,
+    entry: _DeflatedEntry,
+) -> None:
+    """
+    Appends an entry deflated by ``_deflate`` to ``zf``.
+
+    zipfile can only write data it compresses itself, so this follows what
+    ``ZipFile.open(zinfo, "w")`` does. The sizes and CRC are known up front, so the
+    local header is written once and never rewritten. Only used if
+    ``_CAN_WRITE_DEFLATED``.
+    """
+    zinfo.compress_type = zipfile.ZIP_DEFLATED
+    zinfo.flag_bits = 0
+    zinfo.file_size = entry.file_size
+    zinfo.compress_size = entry.compress_size
+    zinfo.CRC = entry.crc
+    if not zinfo.external_attr:
+        zinfo.external_attr = 0o600 << 16
+    zip64 = max(entry.file_size, entry.compress_size) > zipfile.ZIP64_LIMIT
+
+    zf.fp.seek(zf.start_dir)
+    zinfo.header_offset = zf.fp.tell()
+    zf._writecheck(zinfo)
+    zf._didModify = True
+    zf.fp.write(zinfo.FileHeader(zip64))
+    shutil.copyfileobj(entry.data, zf.fp, 1024 * 1024)
+    zf.start_dir = zf.fp.tell()
+    zf.filelist.append(zinfo)
+    zf.NameToInfo[zinfo.filename] = zinfo
+
+
 class StreamingManifestWriter:
     """Incrementally writes a JSON array to a text handle, one record at a time.
 
@@ -116,6 +279,14 @@ class DirectoryExportSink(ExportSink):
     Owns the snapshot/skip/compare/prune machinery that used to live in the
     command (``files_in_export_dir``, ``check_and_copy``, ``check_and_write_json``,
     and the ``--delete`` pass).
+
+    With ``incremental``, the sink also records the source and target of every
+    file and the digest of every JSON file in ``EXPORT_STATE_NAME``. On the next
+    run, a file whose source and target both still match that record is skipped
+    without reading either, even with ``compare_checksums`` or ``compare_json``.
+
+    With more than one thread, copies run on a thread pool and are waited for on
+    finalize. ``copy_mode`` selects how files are placed, see ``link_or_copy_file``.
     """
 
     def __init__(
@@ -125,18 +296,58 @@ class DirectoryExportSink(ExportSink):
         compare_checksums: bool,
         compare_json: bool,
         delete: bool,
+        incremental: bool = False,
+        threads: int = 1,
+        copy_mode: str = "copy",
     ) -> None:
         self._target = target.resolve()
         self._compare_checksums = compare_checksums
         self._compare_json = compare_json
         self._delete = delete
+        self._incremental = incremental
+        self._threads = threads
+        self._copy_mode = copy_mode
         self._snapshot: set[Path] = set()
         self._stream_open = False
+        self._state_path = self._target / EXPORT_STATE_NAME
+        self._previous_state: dict[str, dict] = {}
+        self._state: dict[str, dict] = {}
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending: set[Future] = set()
 
     def _open(self) -> None:
         for x in self._target.glob("**/*"):
             if x.is_file():
                 self._snapshot.add(x.resolve())
+        self._snapshot.discard(self._state_path)
+        if self._incremental:
+            self._previous_state = self._load_state()
+        if self._threads > 1:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._threads,
+                thread_name_prefix="export",
+            )
+
+    def _load_state(self) -> dict[str, dict]:
+        try:
+            state = json.loads(self._state_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable export state {self._state_path}: {e}")
+            return {}
+        return state if isinstance(state, dict) else {}
+
+    def _unchanged(self, arcname: str, target: Path, **record) -> bool:
+        """True if the previous export recorded the same ``record`` and target."""
+        previous = self._previous_state.get(arcname)
+        if previous is None or previous.get("target") != _stat_key(target):
+            return False
+        return all(previous.get(key) == value for key, value in record.items())
+
+    def _record(self, arcname: str, target: Path, **record) -> None:
+        if self._incremental:
+            self._state[arcname] = {**record, "target": _stat_key(target)}
 
     def add_file(
         self,
@@ -147,9 +358,16 @@ class DirectoryExportSink(ExportSink):
     ) -> None:
         target = (self._target / arcname).resolve()
         self._snapshot.discard(target)
+        source_stat = source.stat()
+        record = {
+            "source": [str(source), source_stat.st_size, source_stat.st_mtime_ns],
+            "checksum": checksum,
+        }
+        if self._incremental and self._unchanged(arcname, target, **record):
+            self._state[arcname] = self._previous_state[arcname]
+            return
         perform_copy = False
         if target.exists():
-            source_stat = source.stat()
             target_stat = target.stat()
             if self._compare_checksums and checksum:
                 perform_copy = compute_checksum(target) != checksum
@@ -161,8 +379,37 @@ class DirectoryExportSink(ExportSink):
         else:
             perform_copy = True
         if perform_copy:
-            target.parent.mkdir(parents=True, exist_ok=True)
-            copy_file_with_basic_stats(source, target)
+            self._submit(self._copy, source, target, arcname, record)
+        else:
+            self._record(arcname, target, **record)
+
+    def _copy(self, source: Path, target: Path, arcname: str, record: dict) -> None:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        link_or_copy_file(source, target, mode=self._copy_mode)
+        self._record(arcname, target, **record)
+
+    def _submit(self, fn: Callable[..., None], *args) -> None:
+        if self._executor is None:
+            fn(*args)
+            return
+        # Bound the queue, and surface a failed copy as soon as it is noticed
+        if len(self._pending) >= self._threads * 4:
+            done, self._pending = wait(self._pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                future.result()
+        self._pending.add(self._executor.submit(fn, *args))
+
+    def _drain(self) -> None:
+        done, _ = wait(self._pending)
+        self._pending = set()
+        for future in done:
+            future.result()
+
+    def _shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        self._pending = set()
 
     @staticmethod
     def _content_unchanged(target: Path, new_bytes: bytes) -> bool:
@@ -174,18 +421,19 @@ class DirectoryExportSink(ExportSink):
 
     def add_json(self, content: list | dict, arcname: str) -> None:
         target = (self._target / arcname).resolve()
-        json_str = _dumps(content)
+        json_bytes = _dumps(content).encode("utf-8")
+        digest = hashlib.sha256(json_bytes).hexdigest()
         perform_write = True
         if target in self._snapshot:
             self._snapshot.discard(target)
-            if self._compare_json and self._content_unchanged(
-                target,
-                json_str.encode("utf-8"),
-            ):
+            if (
+                self._incremental and self._unchanged(arcname, target, digest=digest)
+            ) or (self._compare_json and self._content_unchanged(target, json_bytes)):
                 perform_write = False
         if perform_write:
             target.parent.mkdir(parents=True, exist_ok=True)
-            target.write_text(json_str, encoding="utf-8")
+            target.write_bytes(json_bytes)
+        self._record(arcname, target, digest=digest)
 
     @contextmanager
     def stream(self, arcname: str) -> Iterator[TextIO]:
@@ -204,22 +452,32 @@ class DirectoryExportSink(ExportSink):
             raise
         else:
             handle.close()
-            self._commit_streamed_file(target, tmp)
+            self._commit_streamed_file(arcname, target, tmp)
         finally:
             self._stream_open = False
 
-    def _commit_streamed_file(self, target: Path, tmp: Path) -> None:
+    def _commit_streamed_file(self, arcname: str, target: Path, tmp: Path) -> None:
+        digest = None
+        if self._incremental:
+            digest = compute_checksum(tmp)
         if target in self._snapshot:
             self._snapshot.discard(target)
-            if self._compare_json and self._content_unchanged(
-                target,
-                tmp.read_bytes(),
+            if (
+                self._incremental and self._unchanged(arcname, target, digest=digest)
+            ) or (
+                self._compare_json and self._content_unchanged(target, tmp.read_bytes())
             ):
                 tmp.unlink()
+                self._record(arcname, target, digest=digest)
                 return
         tmp.rename(target)
+        self._record(arcname, target, digest=digest)
 
     def _finalize(self) -> None:
+        try:
+            self._drain()
+        finally:
+            self._shutdown()
         if self._delete:
             for f in self._snapshot:
                 if not f.is_relative_to(self._target):  # pragma: no cover
@@ -228,11 +486,20 @@ class DirectoryExportSink(ExportSink):
                     continue
                 f.unlink()
                 delete_empty_directories(f.parent, self._target)
+        if self._incremental:
+            self._write_state()
+
+    def _write_state(self) -> None:
+        tmp = self._state_path.with_name(self._state_path.name + ".tmp")
+        tmp.write_text(json.dumps(self._state), encoding="utf-8")
+        tmp.replace(self._state_path)
 
     def _abort(self) -> None:
         # Folder mode is in-place/incremental: streamed .tmp files are already
         # cleaned in stream(); leave everything else intact and skip the prune.
-        return None
+        # The state file is left as it was, so the next run compares against the
+        # last complete export.
+        self._shutdown()
 
 
 class ZipExportSink(ExportSink):
@@ -241,9 +508,21 @@ class ZipExportSink(ExportSink):
     Builds into ``<target>/<zip_name>.zip.tmp`` and renames to ``.zip`` on clean
     finalize. The manifest stream is spooled to a temp file in SCRATCH_DIR and
     added as an entry at finalize (a zip entry cannot be interleaved with others).
+
+    Already compressed formats such as PDF and WebP are stored, everything else is
+    deflated. With more than one thread, entries are deflated on a thread pool and
+    written to the archive in the order they were added, as pigz does. See
+    ``_CAN_WRITE_DEFLATED``.
     """
 
-    def __init__(self, target: Path, zip_name: str, *, delete: bool = False) -> None:
+    def __init__(
+        self,
+        target: Path,
+        zip_name: str,
+        *,
+        delete: bool = False,
+        threads: int = 1,
+    ) -> None:
         self._target = target.resolve()
         self._zip_path = (self._target / zip_name).with_suffix(".zip")
         self._tmp_path = self._zip_path.with_name(self._zip_path.name + ".tmp")
@@ -252,6 +531,12 @@ class ZipExportSink(ExportSink):
         self._dirs: set[str] = set()
         self._pending_manifest: tuple[Path, str] | None = None
         self._stream_open = False
+        self._threads = threads
+        self._executor: ThreadPoolExecutor | None = None
+        # Entries waiting to be written, in the order they were added
+        self._queue: deque[
+            tuple[zipfile.ZipInfo, Path | bytes, Future[_DeflatedEntry] | None]
+        ] = deque()
 
     def _open(self) -> None:
         settings.SCRATCH_DIR.mkdir(parents=True, exist_ok=True)
@@ -261,6 +546,57 @@ class ZipExportSink(ExportSink):
             compression=zipfile.ZIP_DEFLATED,
             allowZip64=True,
         )
+        if self._threads > 1:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._threads,
+                thread_name_prefix="export",
+            )
+
+    def _add(self, zinfo: zipfile.ZipInfo, source: Path | bytes) -> None:
+        stored = PurePosixPath(zinfo.filename).suffix.lower() in PRECOMPRESSED_SUFFIXES
+        zinfo.compress_type = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+        if self._executor is None:
+            self._write_entry(zinfo, source, None)
+            return
+        future = (
+            self._executor.submit(_deflate, source)
+            if _CAN_WRITE_DEFLATED and not stored
+            else None
+        )
+        self._queue.append((zinfo, source, future))
+        # Keep every thread busy, with only a few compressed entries held back
+        while len(self._queue) > self._threads * 2:
+            self._write_entry(*self._queue.popleft())
+
+    def _write_entry(
+        self,
+        zinfo: zipfile.ZipInfo,
+        source: Path | bytes,
+        future: Future[_DeflatedEntry] | None,
+    ) -> None:
+        assert self._zip is not None
+        if future is not None:
+            entry = future.result()
+            with entry.data:
+                _write_deflated(self._zip, zinfo, entry)
+        elif isinstance(source, bytes):
+            self._zip.writestr(zinfo, source)
+        else:
+            with source.open("rb") as src, self._zip.open(zinfo, "w") as dest:
+                shutil.copyfileobj(src, dest, 1024 * 1024)
+
+    def _drain(self) -> None:
+        while self._queue:
+            self._write_entry(*self._queue.popleft())
+
+    def _shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        for _, _, future in self._queue:
+            if future is not None and not future.cancelled() and not future.exception():
+                future.result().data.close()
+        self._queue.clear()
 
     def _ensure_dirs(self, arcname: str) -> None:
         assert self._zip is not None
@@ -280,12 +616,14 @@ class ZipExportSink(ExportSink):
     ) -> None:
         assert self._zip is not None
         self._ensure_dirs(arcname)
-        self._zip.write(source, arcname=arcname)
+        self._add(zipfile.ZipInfo.from_file(source, arcname), source)
 
     def add_json(self, content: list | dict, arcname: str) -> None:
         assert self._zip is not None
         self._ensure_dirs(arcname)
-        self._zip.writestr(arcname, _dumps(content))
+        zinfo = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+        zinfo.external_attr = 0o600 << 16
+        self._add(zinfo, _dumps(content).encode("utf-8"))
 
     @contextmanager
     def stream(self, arcname: str) -> Iterator[TextIO]:
@@ -314,11 +652,18 @@ class ZipExportSink(ExportSink):
 
     def _finalize(self) -> None:
         assert self._zip is not None
+        try:
+            if self._pending_manifest is not None:
+                tmp, arcname = self._pending_manifest
+                self._ensure_dirs(arcname)
+                self._add(zipfile.ZipInfo.from_file(tmp, arcname), tmp)
+            self._drain()
+        except BaseException:
+            self._abort()
+            raise
+        self._shutdown()
         if self._pending_manifest is not None:
-            tmp, arcname = self._pending_manifest
-            self._ensure_dirs(arcname)
-            self._zip.write(tmp, arcname=arcname)
-            tmp.unlink(missing_ok=True)
+            self._pending_manifest[0].unlink(missing_ok=True)
             self._pending_manifest = None
         self._zip.close()
         self._zip = None
@@ -337,6 +682,7 @@ class ZipExportSink(ExportSink):
                 item.unlink()
 
     def _abort(self) -> None:
+        self._shutdown()
         if self._zip is not None:
             self._zip.close()
             self._zip = None
@@ -1,4 +1,5 @@
 import os
+from collections.abc import Callable
 from pathlib import Path
 
 from django.conf import settings
@@ -41,7 +42,12 @@ def delete_empty_directories(directory: Path, root: Path) -> None:
         directory = directory.parent
 
 
-def generate_unique_filename(doc, *, archive_filename=False) -> Path:
+def generate_unique_filename(
+    doc,
+    *,
+    archive_filename=False,
+    is_taken: Callable[[Path], bool] = Path.exists,
+) -> Path:
     """
     Generates a unique filename for doc in settings.ORIGINALS_DIR.
 
@@ -52,6 +58,8 @@ def generate_unique_filename(doc, *, archive_filename=False) -> Path:
 
     If archive_filename is True, return a unique archive filename instead.
 
+    is_taken decides whether a path is already in use, by default whether a file
+    exists there.
     """
     if archive_filename:
         old_filename: Path | None = (
@@ -78,7 +86,7 @@ def generate_unique_filename(doc, *, archive_filename=False) -> Path:
             # No directory structure
             simple_pdf_name = Path(Path(doc.filename).stem + ".pdf")
 
-        if simple_pdf_name == old_filename or not (root / simple_pdf_name).exists():
+        if simple_pdf_name == old_filename or not is_taken(root / simple_pdf_name):
             return simple_pdf_name
 
     counter = 0
@@ -93,7 +101,7 @@ def generate_unique_filename(doc, *, archive_filename=False) -> Path:
             # still the same as before.
             return new_filename
 
-        if (root / new_filename).exists():
+        if is_taken(root / new_filename):
             counter += 1
         else:
             return new_filename
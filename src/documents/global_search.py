@@ -0,0 +1,237 @@
+"""
+Lookups behind the global search box.
+
+The sources searched (documents, tags, saved views, mail rules, ...) do not
+depend on each other, so with persistent or pooled database connections they
+are looked up concurrently on a small shared thread pool. A source which has
+not answered once the latency budget (``PAPERLESS_GLOBAL_SEARCH_TIMEOUT``) has
+passed is returned empty rather than holding up every other result.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import partial
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Final
+
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.contrib.auth.models import User
+from django.db import close_old_connections
+from django.db import connection
+
+from documents.models import Correspondent
+from documents.models import CustomField
+from documents.models import Document
+from documents.models import DocumentType
+from documents.models import SavedView
+from documents.models import StoragePath
+from documents.models import Tag
+from documents.models import Workflow
+from documents.permissions import permitted_document_ids
+from documents.permissions import permitted_object_ids
+from paperless_mail.models import MailAccount
+from paperless_mail.models import MailRule
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from concurrent.futures import Future
+
+    from django.db.models import Model
+
+logger = logging.getLogger("paperless.global_search")
+
+OBJECT_LIMIT: Final[int] = 3
+
+_MAX_WORKERS: Final[int] = 8
+
+# Lookups which overran the latency budget cannot be stopped and keep a worker
+# and its connection busy. Once this many lookups are queued or running, new
+# searches run in the request thread rather than piling up behind them.
+_MAX_PENDING: Final[int] = _MAX_WORKERS * 4
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+_pending = 0
+
+# Response key, global permission, model and the field matched against the
+# query. Owner-aware models are limited to the objects the user may view.
+_OBJECT_SOURCES: Final[tuple[tuple[str, str, type[Model], str, bool], ...]] = (
+    ("saved_views", "documents.view_savedview", SavedView, "name", True),
+    ("tags", "documents.view_tag", Tag, "name", True),
+    ("correspondents", "documents.view_correspondent", Correspondent, "name", True),
+    ("document_types", "documents.view_documenttype", DocumentType, "name", True),
+    ("storage_paths", "documents.view_storagepath", StoragePath, "name", True),
+    ("users", "auth.view_user", User, "username", False),
+    ("groups", "auth.view_group", Group, "name", False),
+    ("mail_rules", "paperless_mail.view_mailrule", MailRule, "name", True),
+    ("mail_accounts", "paperless_mail.view_mailaccount", MailAccount, "name", True),
+    ("workflows", "documents.view_workflow", Workflow, "name", False),
+    ("custom_fields", "documents.view_customfield", CustomField, "name", False),
+)
+
+SOURCES: Final[tuple[str, ...]] = (
+    "documents",
+    *(key for key, *_ in _OBJECT_SOURCES),
+)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_MAX_WORKERS,
+                thread_name_prefix="global-search",
+            )
+        return _executor
+
+
+def _reserve(count: int) -> bool:
+    global _pending
+
+    with _executor_lock:
+        if _pending + count > _MAX_PENDING:
+            return False
+        _pending += count
+        return True
+
+
+def _release(_future: Future[list[Any]]) -> None:
+    global _pending
+
+    with _executor_lock:
+        _pending -= 1
+
+
+def _parallel_lookups_enabled() -> bool:
+    # Other threads use their own connections and would not see anything this
+    # one has not committed yet, so stay on it inside a transaction.
+    if connection.in_atomic_block:
+        return False
+    # Without persistent connections or a pool, every lookup in a worker would
+    # open a new connection, which costs more than the concurrency saves
+    db = connection.settings_dict
+    return db.get("CONN_MAX_AGE") != 0 or bool(db.get("OPTIONS", {}).get("pool"))
+
+
+def _search_documents(user: User, query: str, *, db_only: bool) -> list[Document]:
+    from documents.search import SearchMode
+    from documents.search import get_backend
+
+    permitted = Document.objects.filter(id__in=permitted_document_ids(user))
+    if db_only:
+        return list(permitted.filter(title__icontains=query)[:OBJECT_LIMIT])
+
+    matching_ids = get_backend().search_ids(
+        query,
+        user=None if user.is_superuser else user,
+        search_mode=SearchMode.TEXT,
+        limit=OBJECT_LIMIT * 3,
+    )
+    docs_by_id = permitted.in_bulk(matching_ids)
+    return [docs_by_id[doc_id] for doc_id in matching_ids if doc_id in docs_by_id][
+        :OBJECT_LIMIT
+    ]
+
+
+def _search_objects(
+    user: User,
+    query: str,
+    model: type[Model],
+    field: str,
+    *,
+    owner_aware: bool,
+) -> list[Model]:
+    queryset = model.objects.filter(**{f"{field}__icontains": query})
+    if owner_aware:
+        codename = f"view_{model._meta.model_name}"
+        queryset = queryset.filter(
+            id__in=permitted_object_ids(user, model, codename),
+        )
+    return list(queryset[:OBJECT_LIMIT])
+
+
+def _in_worker(
+    lookup: Callable[[], list[Any]],
+    deadline: float | None,
+) -> list[Any]:
+    if deadline is not None and time.monotonic() > deadline:
+        # Nobody is waiting for the result anymore
+        return []
+    # Worker threads never see Django's request signals, which is where
+    # connections are normally released
+    close_old_connections()
+    try:
+        return lookup()
+    finally:
+        close_old_connections()
+
+
+def _run_lookups(
+    lookups: dict[str, Callable[[], list[Any]]],
+    timeout: float | None,
+) -> dict[str, list[Any]]:
+    if (
+        len(lookups) < 2
+        or not _parallel_lookups_enabled()
+        or not _reserve(len(lookups))
+    ):
+        return {key: lookup() for key, lookup in lookups.items()}
+
+    executor = _get_executor()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    futures = {}
+    for key, lookup in lookups.items():
+        futures[key] = executor.submit(_in_worker, lookup, deadline)
+        futures[key].add_done_callback(_release)
+
+    results: dict[str, list[Any]] = {}
+    for key, future in futures.items():
+        remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+        try:
+            results[key] = future.result(timeout=remaining)
+        except FutureTimeoutError:
+            future.cancel()
+            logger.warning(
+                f"Global search for {key} exceeded {timeout}s, returning no results",
+            )
+            results[key] = []
+    return results
+
+
+def global_search(
+    user: User,
+    query: str,
+    *,
+    db_only: bool = False,
+) -> dict[str, list[Any]]:
+    """
+    Return up to ``OBJECT_LIMIT`` objects matching ``query`` for every source
+    in ``SOURCES``. Sources the user has no global view permission for are
+    not queried at all and are returned empty.
+    """
+    lookups: dict[str, Callable[[], list[Any]]] = {}
+    if user.has_perm("documents.view_document"):
+        lookups["documents"] = partial(_search_documents, user, query, db_only=db_only)
+    for key, perm, model, field, owner_aware in _OBJECT_SOURCES:
+        if user.has_perm(perm):
+            lookups[key] = partial(
+                _search_objects,
+                user,
+                query,
+                model,
+                field,
+                owner_aware=owner_aware,
+            )
+
+    timeout = settings.GLOBAL_SEARCH_TIMEOUT or None
+    results = _run_lookups(lookups, timeout)
+    return {key: results.get(key, []) for key in SOURCES}
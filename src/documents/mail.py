@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from dataclasses import replace
 from email import message_from_bytes
 from pathlib import Path
 
@@ -14,6 +15,15 @@ class EmailAttachment:
     path: Path
     mime_type: str
     friendly_name: str
+    # Read up front for emails sent later, when the file may have moved
+    content: bytes | None = None
+
+    def read(self) -> EmailAttachment:
+        """
+        Return a copy of the attachment holding the content of its file.
+        """
+        with self.path.open("rb") as f:
+            return replace(self, content=f.read())
 
 
 def send_email(
@@ -56,17 +66,18 @@ def send_email(
             )
             used_filenames.add(filename)
 
-            with attachment.path.open("rb") as f:
-                content = f.read()
-                if attachment.mime_type == "message/rfc822":
-                    # See https://forum.djangoproject.com/t/using-emailmessage-with-an-attached-email-file-crashes-due-to-non-ascii/37981
-                    content = message_from_bytes(content)
-
-                email.attach(
-                    filename=filename,
-                    content=content,
-                    mimetype=attachment.mime_type,
-                )
+            content = attachment.content
+            if content is None:
+                content = attachment.read().content
+            if attachment.mime_type == "message/rfc822":
+                # See https://forum.djangoproject.com/t/using-emailmessage-with-an-attached-email-file-crashes-due-to-non-ascii/37981
+                content = message_from_bytes(content)
+
+            email.attach(
+                filename=filename,
+                content=content,
+                mimetype=attachment.mime_type,
+            )
 
     return email.send()
 
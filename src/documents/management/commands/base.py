@@ -150,6 +150,7 @@ class PaperlessCommand(RichCommand):
     Features are opt-in via class attributes:
         supports_progress_bar: Adds --no-progress-bar argument (default: True)
         supports_multiprocessing: Adds --processes argument (default: False)
+        supports_threads: Adds --threads argument (default: False)
 
     Example usage:
 
@@ -191,10 +192,12 @@ class PaperlessCommand(RichCommand):
 
     supports_progress_bar: ClassVar[bool] = True
     supports_multiprocessing: ClassVar[bool] = False
+    supports_threads: ClassVar[bool] = False
 
     # Instance attributes set by execute() before handle() runs
     no_progress_bar: bool
     process_count: int
+    thread_count: int
 
     def add_arguments(self, parser: CommandParser) -> None:
         """Add arguments based on supported features."""
@@ -217,6 +220,15 @@ class PaperlessCommand(RichCommand):
                 help=f"Number of processes to use (default: {default_processes})",
             )
 
+        if self.supports_threads:
+            default_threads = min(4, os.cpu_count() or 1)
+            parser.add_argument(
+                "--threads",
+                default=default_threads,
+                type=int,
+                help=f"Number of threads to use (default: {default_threads})",
+            )
+
     def execute(self, *args: Any, **options: Any) -> str | None:
         """
         Set up instance state before handle() is called.
@@ -236,6 +248,13 @@ class PaperlessCommand(RichCommand):
         else:
             self.process_count = 1
 
+        if self.supports_threads:
+            self.thread_count = options.get("threads", 1)
+            if self.thread_count < 1:
+                raise CommandError("--threads must be at least 1")
+        else:
+            self.thread_count = 1
+
         return super().execute(*args, **options)
 
     @contextmanager
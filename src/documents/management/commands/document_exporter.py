@@ -90,6 +90,7 @@ class Command(CryptMixin, PaperlessCommand):
 
     supports_progress_bar = True
     supports_multiprocessing = False
+    supports_threads = True
 
     def add_arguments(self, parser) -> None:
         super().add_arguments(parser)
@@ -204,6 +205,28 @@ class Command(CryptMixin, PaperlessCommand):
             help="If provided, is used to encrypt sensitive data in the export",
         )
 
+        parser.add_argument(
+            "--incremental",
+            default=False,
+            action="store_true",
+            help=(
+                "Record the exported files in the export directory and skip "
+                "those unchanged since the previous incremental export without "
+                "reading them, even with --compare-checksums or --compare-json."
+            ),
+        )
+
+        parser.add_argument(
+            "--copy-mode",
+            default="copy",
+            choices=["copy", "reflink", "hardlink"],
+            help=(
+                "How files are placed in the export directory. reflink and "
+                "hardlink share data with the media directory where the "
+                "filesystem supports it, and fall back to copying. Default: copy."
+            ),
+        )
+
         parser.add_argument(
             "--batch-size",
             type=int,
@@ -229,6 +252,8 @@ class Command(CryptMixin, PaperlessCommand):
         self.data_only: bool = options["data_only"]
         self.passphrase: str | None = options.get("passphrase")
         self.batch_size: int = options["batch_size"]
+        self.incremental: bool = options["incremental"]
+        self.copy_mode: str = options["copy_mode"]
 
         self.exported_files: set[str] = set()
 
@@ -238,6 +263,11 @@ class Command(CryptMixin, PaperlessCommand):
                 "used with --zip",
             )
 
+        if self.zip_export and (self.incremental or self.copy_mode != "copy"):
+            raise CommandError(
+                "--incremental and --copy-mode have no effect when used with --zip",
+            )
+
         if not self.target.exists():
             raise CommandError("That path doesn't exist")
 
@@ -253,6 +283,7 @@ class Command(CryptMixin, PaperlessCommand):
                 self.target,
                 options["zip_name"],
                 delete=self.delete,
+                threads=self.thread_count,
             )
         else:
             sink = DirectoryExportSink(
@@ -260,6 +291,9 @@ class Command(CryptMixin, PaperlessCommand):
                 compare_checksums=self.compare_checksums,
                 compare_json=self.compare_json,
                 delete=self.delete,
+                incremental=self.incremental,
+                threads=self.thread_count,
+                copy_mode=self.copy_mode,
             )
 
         # Prevent any ongoing changes in the documents while exporting
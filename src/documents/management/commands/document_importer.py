@@ -2,9 +2,12 @@ import json
 import logging
 import os
 import tempfile
+import time
 from collections import defaultdict
 from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+from itertools import islice
 from pathlib import Path
 from typing import TypeAlias
 from zipfile import ZipFile
@@ -32,6 +35,7 @@ from django.db.models.signals import post_save
 from filelock import FileLock
 from guardian.shortcuts import clear_ct_cache
 
+from documents.export.sinks import link_or_copy_file
 from documents.file_handling import create_source_path_directory
 from documents.management.commands.base import PaperlessCommand
 from documents.management.commands.mixins import CryptMixin
@@ -43,6 +47,8 @@ from documents.models import DocumentType
 from documents.models import Note
 from documents.models import ShareLinkBundle
 from documents.models import Tag
+from documents.permissions import diff_document_permission_grants
+from documents.permissions import repair_document_permission_grants
 from documents.settings import EXPORTER_ARCHIVE_NAME
 from documents.settings import EXPORTER_CRYPTO_SETTINGS_NAME
 from documents.settings import EXPORTER_FILE_NAME
@@ -50,6 +56,8 @@ from documents.settings import EXPORTER_SHARE_LINK_BUNDLE_NAME
 from documents.settings import EXPORTER_THUMBNAIL_NAME
 from documents.signals.handlers import check_paths_and_prune_custom_fields
 from documents.signals.handlers import update_filename_and_move_files
+from documents.tag_hierarchy import rebuild_tag_closure
+from documents.utils import compute_checksum
 from documents.utils import copy_file_with_basic_stats
 from paperless import version
 
@@ -188,6 +196,7 @@ class Command(CryptMixin, PaperlessCommand):
 
     supports_progress_bar = True
     supports_multiprocessing = False
+    supports_threads = True
 
     def add_arguments(self, parser) -> None:
         super().add_arguments(parser)
@@ -213,6 +222,30 @@ class Command(CryptMixin, PaperlessCommand):
             "Lower values reduce peak memory usage.",
         )
 
+        parser.add_argument(
+            "--copy-mode",
+            default="copy",
+            # No hardlink: the media directory would share files with the
+            # export, and rewriting one would change the other
+            choices=["copy", "reflink"],
+            help=(
+                "How thumbnails and archive files are placed in the media "
+                "directory. reflink shares data with the export copy-on-write "
+                "where the filesystem supports it, and falls back to copying. "
+                "Originals are always copied. Default: copy."
+            ),
+        )
+
+        parser.add_argument(
+            "--verify-checksums",
+            default=False,
+            action="store_true",
+            help=(
+                "Verify the checksums of the imported originals and archive "
+                "files against the manifest."
+            ),
+        )
+
     def pre_check(self) -> None:
         """
         Runs some initial checks against the state of the install and source, including:
@@ -369,6 +402,8 @@ class Command(CryptMixin, PaperlessCommand):
         )
         # All model classes inserted (needed for sequence reset after the load)
         loaded_models: set[type[Model]] = set()
+        loaded_records = 0
+        started = time.perf_counter()
 
         def flush_model(model: type[Model]) -> None:
             """bulk_create the pending batch for model, then apply M2M."""
@@ -427,6 +462,7 @@ class Command(CryptMixin, PaperlessCommand):
                         for record in iter_manifest_records(manifest_path):
                             model, instance, m2m_data = _deserialize_record(record)
                             pending[model].append((instance, m2m_data))
+                            loaded_records += 1
                             if len(pending[model]) >= self.batch_size:
                                 flush_model(model)
 
@@ -445,6 +481,12 @@ class Command(CryptMixin, PaperlessCommand):
         ContentType.objects.clear_cache()
         clear_ct_cache()
 
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Loaded {loaded_records} records in {elapsed:.1f}s "
+            f"({loaded_records / max(elapsed, 1e-6):.0f} records/s)",
+        )
+
     def handle(self, *args, **options) -> None:
         logging.getLogger().handlers[0].level = logging.ERROR
 
@@ -452,6 +494,8 @@ class Command(CryptMixin, PaperlessCommand):
         self.data_only: bool = options["data_only"]
         self.passphrase: str | None = options.get("passphrase")
         self.batch_size: int = options["batch_size"]
+        self.copy_mode: str = options["copy_mode"]
+        self.verify_checksums: bool = options["verify_checksums"]
         self.version: str | None = None
         self.salt: str | None = None
         self.manifest_paths = []
@@ -508,6 +552,11 @@ class Command(CryptMixin, PaperlessCommand):
 
             # Fill up the database with whatever is in the manifest
             self.load_data_to_database()
+            # Guardian's permission rows are bulk inserted without signals, so
+            # their materialized copies are rebuilt in one pass afterwards.
+            repair_document_permission_grants(diff_document_permission_grants())
+            # Tags are loaded as raw saves, so their closure is rebuilt as well.
+            rebuild_tag_closure()
 
             if not self.data_only:
                 self._import_files_from_manifest()
@@ -607,47 +656,45 @@ class Command(CryptMixin, PaperlessCommand):
 
         self.stdout.write("Copy files into paperless...")
 
-        for record in self.track(
-            _iter_document_copy_records(self.manifest_paths),
-            description="Copying files...",
-        ):
-            document = Document.global_objects.get(pk=record["pk"])
-
-            doc_file = record[EXPORTER_FILE_NAME]
-            document_path = self.source / doc_file
-
-            if record[EXPORTER_THUMBNAIL_NAME]:
-                thumb_file = record[EXPORTER_THUMBNAIL_NAME]
-                thumbnail_path = (self.source / thumb_file).resolve()
-            else:
-                thumbnail_path = None
-
-            if record[EXPORTER_ARCHIVE_NAME]:
-                archive_file = record[EXPORTER_ARCHIVE_NAME]
-                archive_path = self.source / archive_file
-            else:
-                archive_path = None
-
-            with FileLock(settings.MEDIA_LOCK):
-                if Path(document.source_path).is_file():
-                    raise FileExistsError(document.source_path)
-
-                create_source_path_directory(document.source_path)
-
-                copy_file_with_basic_stats(document_path, document.source_path)
-
-                if thumbnail_path:
-                    copy_file_with_basic_stats(
-                        thumbnail_path,
-                        document.thumbnail_path,
-                    )
-
-                if archive_path:
-                    create_source_path_directory(document.archive_path)
-                    # TODO: this assumes that the export is valid and
-                    #  archive_filename is present on all documents with
-                    #  archived files
-                    copy_file_with_basic_stats(archive_path, document.archive_path)
+        copied_files = 0
+        copied_bytes = 0
+        started = time.perf_counter()
+        records = iter(
+            self.track(
+                _iter_document_copy_records(self.manifest_paths),
+                description="Copying files...",
+            ),
+        )
+        with ThreadPoolExecutor(
+            max_workers=self.thread_count,
+            thread_name_prefix="import",
+        ) as executor:
+            while batch := list(islice(records, self.batch_size)):
+                documents = Document.global_objects.in_bulk(
+                    [record["pk"] for record in batch],
+                )
+                with FileLock(settings.MEDIA_LOCK):
+                    # Collect every result, so a failed copy is raised only
+                    # once the rest of the batch has finished
+                    futures = [
+                        executor.submit(
+                            self._copy_document_files,
+                            documents[record["pk"]],
+                            record,
+                        )
+                        for record in batch
+                    ]
+                    for future in futures:
+                        files, size = future.result()
+                        copied_files += files
+                        copied_bytes += size
+
+        elapsed = time.perf_counter() - started
+        copied_mib = copied_bytes / 1024**2
+        self.stdout.write(
+            f"Copied {copied_files} files ({copied_mib:.1f} MiB) in {elapsed:.1f}s "
+            f"({copied_mib / max(elapsed, 1e-6):.1f} MiB/s)",
+        )
 
         for record in self.track(
             _iter_share_link_bundle_copy_records(self.manifest_paths),
@@ -669,6 +716,69 @@ class Command(CryptMixin, PaperlessCommand):
                     bundle_target_path,
                 )
 
+    def _copy_document_files(
+        self,
+        document: Document,
+        record: dict,
+    ) -> tuple[int, int]:
+        """
+        Places the files of one document in the media directory, returning the
+        number of files and bytes. Runs on the copy thread pool, so it must not
+        query the database.
+        """
+        document_path = self.source / record[EXPORTER_FILE_NAME]
+
+        if record[EXPORTER_THUMBNAIL_NAME]:
+            thumb_file = record[EXPORTER_THUMBNAIL_NAME]
+            thumbnail_path = (self.source / thumb_file).resolve()
+        else:
+            thumbnail_path = None
+
+        if record[EXPORTER_ARCHIVE_NAME]:
+            archive_file = record[EXPORTER_ARCHIVE_NAME]
+            archive_path = self.source / archive_file
+        else:
+            archive_path = None
+
+        if Path(document.source_path).is_file():
+            raise FileExistsError(document.source_path)
+
+        create_source_path_directory(document.source_path)
+
+        copy_file_with_basic_stats(document_path, document.source_path)
+        self._verify_checksum(document.source_path, document.checksum)
+        files = 1
+        size = document_path.stat().st_size
+
+        if thumbnail_path:
+            link_or_copy_file(
+                thumbnail_path,
+                document.thumbnail_path,
+                mode=self.copy_mode,
+            )
+            files += 1
+            size += thumbnail_path.stat().st_size
+
+        if archive_path:
+            create_source_path_directory(document.archive_path)
+            # TODO: this assumes that the export is valid and
+            #  archive_filename is present on all documents with
+            #  archived files
+            link_or_copy_file(archive_path, document.archive_path, mode=self.copy_mode)
+            self._verify_checksum(document.archive_path, document.archive_checksum)
+            files += 1
+            size += archive_path.stat().st_size
+
+        return files, size
+
+    def _verify_checksum(self, path: Path, expected: str | None) -> None:
+        if not self.verify_checksums or expected is None:
+            return
+        if compute_checksum(path) != expected:
+            raise CommandError(
+                f"Checksum mismatch for {path}, the export may be damaged",
+            )
+
     def _decrypt_record_if_needed(self, record: dict) -> dict:
         fields = self.CRYPT_FIELDS_BY_MODEL.get(record.get("model", ""))
         if fields:
@@ -96,7 +96,7 @@ class Command(PaperlessCommand):
                 reset_backend()
 
             elif options["command"] == "optimize":
-                logger.info(
-                    "document_index optimize is a no-op — Tantivy manages "
-                    "segment merging automatically.",
+                refreshed = get_backend().refresh_similarity_signatures()
+                self.stdout.write(
+                    f"Refreshed {refreshed} similar-document signatures.",
                 )
@@ -0,0 +1,46 @@
+from django.core.management.base import CommandError
+
+from documents.management.commands.base import PaperlessCommand
+from documents.permissions import diff_document_permission_grants
+from documents.permissions import repair_document_permission_grants
+
+
+class Command(PaperlessCommand):
+    """
+    Check or repair the materialized document permission grants.
+
+    DocumentPermissionGrant mirrors guardian's object permissions on documents
+    and is normally kept in sync by signals. ``check`` reports differences and
+    fails if there are any; ``repair`` brings the table back in line.
+    """
+
+    help = "Checks or repairs the materialized document permission grants."
+
+    supports_progress_bar = False
+    supports_multiprocessing = False
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("command", choices=["check", "repair"])
+
+    def handle(self, *args, **options):
+        diff = diff_document_permission_grants()
+
+        if diff.is_consistent:
+            self.console.print(
+                "Document permission grants are consistent.",
+                style="green",
+            )
+            return
+
+        summary = (
+            f"{len(diff.missing)} missing and {len(diff.stale)} stale "
+            "document permission grants"
+        )
+        if options["command"] == "check":
+            raise CommandError(
+                f"Found {summary}. Run 'document_permissions repair' to fix them.",
+            )
+
+        repair_document_permission_grants(diff)
+        self.console.print(f"Repaired {summary}.", style="yellow")
@@ -1,7 +1,9 @@
-from django.db.models.signals import post_save
-
 from documents.management.commands.base import PaperlessCommand
 from documents.models import Document
+from documents.relocation import BATCH_SIZE
+from documents.relocation import apply_relocations
+from documents.relocation import filename_templates_use_content
+from documents.relocation import plan_relocations
 
 
 class Command(PaperlessCommand):
@@ -9,7 +11,36 @@ class Command(PaperlessCommand):
 
     supports_progress_bar = True
     supports_multiprocessing = False
+    supports_threads = True
 
     def handle(self, *args, **options):
-        for document in self.track(Document.objects.all(), description="Renaming..."):
-            post_save.send(Document, instance=document, created=False)
+        documents = Document.objects.select_related(
+            "correspondent",
+            "document_type",
+            "storage_path",
+            "owner",
+            "root_document__correspondent",
+            "root_document__document_type",
+            "root_document__storage_path",
+            "root_document__owner",
+        ).order_by("pk")
+        if not filename_templates_use_content():
+            # Only read to render filenames, the content is not needed
+            documents = documents.defer("content", "root_document__content")
+        plan = plan_relocations(
+            self.track(documents, description="Planning..."),
+        )
+
+        batches = [
+            plan.relocations[start : start + BATCH_SIZE]
+            for start in range(0, len(plan.relocations), BATCH_SIZE)
+        ]
+        relocated = 0
+        for batch in self.track(batches, description="Renaming..."):
+            relocated += apply_relocations(batch, threads=self.thread_count)
+
+        failed = plan.failed + len(plan.relocations) - relocated
+        self.stdout.write(
+            f"Renamed {relocated} documents, {plan.unchanged} unchanged, "
+            f"{failed} failed",
+        )
@@ -2,9 +2,15 @@
 
 from __future__ import annotations
 
+import argparse
+import datetime
 import logging
+from typing import TYPE_CHECKING
 from typing import Any
 
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.dateparse import parse_datetime
 from rich.panel import Panel
 from rich.table import Table
 from rich.text import Text
@@ -14,6 +20,9 @@ from documents.models import Document
 from documents.sanity_checker import SanityCheckMessages
 from documents.sanity_checker import check_sanity
 
+if TYPE_CHECKING:
+    from django.core.management import CommandParser
+
 _LEVEL_STYLE: dict[int, tuple[str, str]] = {
     logging.ERROR: ("bold red", "ERROR"),
     logging.WARNING: ("yellow", "WARN"),
@@ -21,11 +30,23 @@ _LEVEL_STYLE: dict[int, tuple[str, str]] = {
 }
 
 
+def _parse_since(value: str) -> datetime.datetime:
+    since = parse_datetime(value)
+    if since is None and (date := parse_date(value)) is not None:
+        since = datetime.datetime.combine(date, datetime.time.min)
+    if since is None:
+        raise argparse.ArgumentTypeError(f"Invalid date or time: {value}")
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
 class Command(PaperlessCommand):
     help = "This command checks your document archive for issues."
 
     supports_progress_bar = True
     supports_multiprocessing = False
+    supports_threads = True
 
     def _render_results(self, messages: SanityCheckMessages) -> None:
         """Render sanity check results as a Rich table."""
@@ -109,11 +130,32 @@ class Command(PaperlessCommand):
         else:
             self.console.print("\nNo issues found.")
 
+    def add_arguments(self, parser: CommandParser) -> None:
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--since",
+            type=_parse_since,
+            default=None,
+            help=(
+                "Only check documents modified at or after this date or time, "
+                "e.g. 2026-01-31 or 2026-01-31T08:00"
+            ),
+        )
+        parser.add_argument(
+            "--full",
+            default=False,
+            action="store_true",
+            help="Hash every file, ignoring checksums cached by earlier checks",
+        )
+
     def handle(self, *args: Any, **options: Any) -> None:
         messages = check_sanity(
             iter_wrapper=lambda docs: self.track(
                 docs,
                 description="Checking documents...",
             ),
+            since=options["since"],
+            full=options["full"],
+            threads=self.thread_count,
         )
         self._render_results(messages)
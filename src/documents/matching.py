@@ -2,9 +2,12 @@ from __future__ import annotations
 
 import logging
 import re
+from dataclasses import dataclass
 from fnmatch import fnmatch
 from fnmatch import translate as fnmatch_translate
 from typing import TYPE_CHECKING
+from typing import Any
+from typing import Literal
 
 from rest_framework import serializers
 
@@ -23,6 +26,12 @@ from documents.permissions import permitted_object_ids
 from documents.regex import safe_regex_search
 
 if TYPE_CHECKING:
+    from collections.abc import Container
+    from collections.abc import Iterable
+
+    from django.db.models import Manager
+    from django.db.models import Model
+    from django.db.models import Q
     from django.db.models import QuerySet
 
     from documents.classifier import DocumentClassifier
@@ -351,201 +360,255 @@ def consumable_document_matches_workflow(
     return (trigger_matched, reason)
 
 
-def existing_document_matches_workflow(
-    document: Document,
-    trigger: WorkflowTrigger,
-) -> tuple[bool, str | None]:
+@dataclass(frozen=True, slots=True)
+class _ObjectSet:
+    objects: tuple[Model, ...]
+    ids: frozenset[int]
+
+    @classmethod
+    def of(cls, manager: Manager) -> _ObjectSet:
+        objects = tuple(manager.all())
+        return cls(objects, frozenset(obj.pk for obj in objects))
+
+    def __bool__(self) -> bool:
+        return bool(self.objects)
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledWorkflowTrigger:
     """
-    Returns True if the Document matches all filters from the workflow trigger,
-    False otherwise. Includes a reason if doesn't match
+    The filters of a document added, updated or scheduled trigger, resolved
+    once into plain values. Documents are then checked against it in memory;
+    only a custom field query still needs the database, and only for documents
+    which passed every other filter.
     """
 
-    # Check content matching algorithm
-    if trigger.matching_algorithm > MatchingModel.MATCH_NONE and not matches(
-        trigger,
-        document,
-    ):
-        return (
-            False,
-            f"Document content matching settings for algorithm '{trigger.matching_algorithm}' did not match",
+    trigger: WorkflowTrigger
+    has_tags: _ObjectSet
+    has_all_tags: _ObjectSet
+    has_not_tags: _ObjectSet
+    any_correspondents: _ObjectSet
+    not_correspondents: _ObjectSet
+    any_document_types: _ObjectSet
+    not_document_types: _ObjectSet
+    any_storage_paths: _ObjectSet
+    not_storage_paths: _ObjectSet
+    # None without a query, False if the query cannot be parsed
+    custom_field_query: tuple[Q, dict[str, Any]] | Literal[False] | None
+    filename_pattern: str | None
+
+    @classmethod
+    def compile(cls, trigger: WorkflowTrigger) -> CompiledWorkflowTrigger:
+        custom_field_query = None
+        if trigger.filter_custom_field_query:
+            parser = CustomFieldQueryParser("filter_custom_field_query")
+            try:
+                custom_field_query = parser.parse(trigger.filter_custom_field_query)
+            except serializers.ValidationError:
+                custom_field_query = False
+
+        return cls(
+            trigger=trigger,
+            # Served from the prefetch cache when the trigger came from
+            # get_workflows_for_trigger
+            has_tags=_ObjectSet.of(trigger.filter_has_tags),
+            has_all_tags=_ObjectSet.of(trigger.filter_has_all_tags),
+            has_not_tags=_ObjectSet.of(trigger.filter_has_not_tags),
+            any_correspondents=_ObjectSet.of(trigger.filter_has_any_correspondents),
+            not_correspondents=_ObjectSet.of(trigger.filter_has_not_correspondents),
+            any_document_types=_ObjectSet.of(trigger.filter_has_any_document_types),
+            not_document_types=_ObjectSet.of(trigger.filter_has_not_document_types),
+            any_storage_paths=_ObjectSet.of(trigger.filter_has_any_storage_paths),
+            not_storage_paths=_ObjectSet.of(trigger.filter_has_not_storage_paths),
+            custom_field_query=custom_field_query,
+            filename_pattern=(
+                trigger.filter_filename.lower() if trigger.filter_filename else None
+            ),
         )
 
-    # Check if any tag filters exist to determine if we need to load document tags
-    trigger_has_tags_qs = trigger.filter_has_tags.all()
-    trigger_has_all_tags_qs = trigger.filter_has_all_tags.all()
-    trigger_has_not_tags_qs = trigger.filter_has_not_tags.all()
-
-    has_tags_filter = trigger_has_tags_qs.exists()
-    has_all_tags_filter = trigger_has_all_tags_qs.exists()
-    has_not_tags_filter = trigger_has_not_tags_qs.exists()
-
-    # Load document tags once if any tag filters exist
-    document_tag_ids = None
-    if has_tags_filter or has_all_tags_filter or has_not_tags_filter:
-        document_tag_ids = set(document.tags.values_list("id", flat=True))
-
-    # Document tags vs trigger has_tags (any of)
-    if has_tags_filter:
-        trigger_has_tag_ids = set(trigger_has_tags_qs.values_list("id", flat=True))
-        if not (document_tag_ids & trigger_has_tag_ids):
-            # For error message, load the actual tag objects
+    @property
+    def needs_tags(self) -> bool:
+        return bool(self.has_tags or self.has_all_tags or self.has_not_tags)
+
+    def matches(
+        self,
+        document: Document,
+        document_tags: list[Tag] | None = None,
+        *,
+        custom_field_matches: Container[int] | None = None,
+    ) -> tuple[bool, str | None]:
+        """
+        Returns True if the Document matches all filters of the trigger, False
+        otherwise. Includes a reason if doesn't match. ``document_tags`` are
+        loaded from the database if needed and not given, and so is whether
+        the custom field query matches unless ``custom_field_matches`` holds
+        the ids of the documents already known to match it.
+        """
+        trigger = self.trigger
+
+        # Check content matching algorithm
+        if trigger.matching_algorithm > MatchingModel.MATCH_NONE and not matches(
+            trigger,
+            document,
+        ):
             return (
                 False,
-                f"Document tags {list(document.tags.all())} do not include {list(trigger_has_tags_qs)}",
+                f"Document content matching settings for algorithm '{trigger.matching_algorithm}' did not match",
             )
 
-    # Document tags vs trigger has_all_tags (all of)
-    if has_all_tags_filter:
-        required_tag_ids = set(trigger_has_all_tags_qs.values_list("id", flat=True))
-        if not required_tag_ids.issubset(document_tag_ids):
+        if self.needs_tags:
+            if document_tags is None:
+                document_tags = list(document.tags.all())
+            document_tag_ids = {tag.pk for tag in document_tags}
+
+            # Document tags vs trigger has_tags (any of)
+            if self.has_tags and document_tag_ids.isdisjoint(self.has_tags.ids):
+                return (
+                    False,
+                    f"Document tags {document_tags} do not include {list(self.has_tags.objects)}",
+                )
+
+            # Document tags vs trigger has_all_tags (all of)
+            if self.has_all_tags and not self.has_all_tags.ids <= document_tag_ids:
+                return (
+                    False,
+                    f"Document tags {document_tags} do not contain all of {list(self.has_all_tags.objects)}",
+                )
+
+            # Document tags vs trigger has_not_tags (none of)
+            if not document_tag_ids.isdisjoint(self.has_not_tags.ids):
+                return (
+                    False,
+                    f"Document tags {document_tags} include excluded tags {list(self.has_not_tags.objects)}",
+                )
+
+        if (
+            self.any_correspondents
+            and document.correspondent_id not in self.any_correspondents.ids
+        ):
             return (
                 False,
-                f"Document tags {list(document.tags.all())} do not contain all of {list(trigger_has_all_tags_qs)}",
+                f"Document correspondent {document.correspondent} is not one of {list(self.any_correspondents.objects)}",
             )
 
-    # Document tags vs trigger has_not_tags (none of)
-    if has_not_tags_filter:
-        excluded_tag_ids = set(trigger_has_not_tags_qs.values_list("id", flat=True))
-        if document_tag_ids & excluded_tag_ids:
+        # Document correspondent vs trigger has_correspondent
+        if (
+            trigger.filter_has_correspondent_id is not None
+            and document.correspondent_id != trigger.filter_has_correspondent_id
+        ):
             return (
                 False,
-                f"Document tags {list(document.tags.all())} include excluded tags {list(trigger_has_not_tags_qs)}",
+                f"Document correspondent {document.correspondent} does not match {trigger.filter_has_correspondent}",
             )
 
-    allowed_correspondent_ids = set(
-        trigger.filter_has_any_correspondents.values_list("id", flat=True),
-    )
-    if (
-        allowed_correspondent_ids
-        and document.correspondent_id not in allowed_correspondent_ids
-    ):
-        return (
-            False,
-            f"Document correspondent {document.correspondent} is not one of {list(trigger.filter_has_any_correspondents.all())}",
-        )
-
-    # Document correspondent vs trigger has_correspondent
-    if (
-        trigger.filter_has_correspondent_id is not None
-        and document.correspondent_id != trigger.filter_has_correspondent_id
-    ):
-        return (
-            False,
-            f"Document correspondent {document.correspondent} does not match {trigger.filter_has_correspondent}",
-        )
-
-    if (
-        document.correspondent_id
-        and trigger.filter_has_not_correspondents.filter(
-            id=document.correspondent_id,
-        ).exists()
-    ):
-        return (
-            False,
-            f"Document correspondent {document.correspondent} is excluded by {list(trigger.filter_has_not_correspondents.all())}",
-        )
-
-    allowed_document_type_ids = set(
-        trigger.filter_has_any_document_types.values_list("id", flat=True),
-    )
-    if allowed_document_type_ids and (
-        document.document_type_id not in allowed_document_type_ids
-    ):
-        return (
-            False,
-            f"Document doc type {document.document_type} is not one of {list(trigger.filter_has_any_document_types.all())}",
-        )
+        if document.correspondent_id in self.not_correspondents.ids:
+            return (
+                False,
+                f"Document correspondent {document.correspondent} is excluded by {list(self.not_correspondents.objects)}",
+            )
 
-    # Document document_type vs trigger has_document_type
-    if (
-        trigger.filter_has_document_type_id is not None
-        and document.document_type_id != trigger.filter_has_document_type_id
-    ):
-        return (
-            False,
-            f"Document doc type {document.document_type} does not match {trigger.filter_has_document_type}",
-        )
+        if (
+            self.any_document_types
+            and document.document_type_id not in self.any_document_types.ids
+        ):
+            return (
+                False,
+                f"Document doc type {document.document_type} is not one of {list(self.any_document_types.objects)}",
+            )
 
-    if (
-        document.document_type_id
-        and trigger.filter_has_not_document_types.filter(
-            id=document.document_type_id,
-        ).exists()
-    ):
-        return (
-            False,
-            f"Document doc type {document.document_type} is excluded by {list(trigger.filter_has_not_document_types.all())}",
-        )
+        # Document document_type vs trigger has_document_type
+        if (
+            trigger.filter_has_document_type_id is not None
+            and document.document_type_id != trigger.filter_has_document_type_id
+        ):
+            return (
+                False,
+                f"Document doc type {document.document_type} does not match {trigger.filter_has_document_type}",
+            )
 
-    allowed_storage_path_ids = set(
-        trigger.filter_has_any_storage_paths.values_list("id", flat=True),
-    )
-    if allowed_storage_path_ids and (
-        document.storage_path_id not in allowed_storage_path_ids
-    ):
-        return (
-            False,
-            f"Document storage path {document.storage_path} is not one of {list(trigger.filter_has_any_storage_paths.all())}",
-        )
+        if document.document_type_id in self.not_document_types.ids:
+            return (
+                False,
+                f"Document doc type {document.document_type} is excluded by {list(self.not_document_types.objects)}",
+            )
 
-    # Document storage_path vs trigger has_storage_path
-    if (
-        trigger.filter_has_storage_path_id is not None
-        and document.storage_path_id != trigger.filter_has_storage_path_id
-    ):
-        return (
-            False,
-            f"Document storage path {document.storage_path} does not match {trigger.filter_has_storage_path}",
-        )
+        if (
+            self.any_storage_paths
+            and document.storage_path_id not in self.any_storage_paths.ids
+        ):
+            return (
+                False,
+                f"Document storage path {document.storage_path} is not one of {list(self.any_storage_paths.objects)}",
+            )
 
-    if (
-        document.storage_path_id
-        and trigger.filter_has_not_storage_paths.filter(
-            id=document.storage_path_id,
-        ).exists()
-    ):
-        return (
-            False,
-            f"Document storage path {document.storage_path} is excluded by {list(trigger.filter_has_not_storage_paths.all())}",
-        )
+        # Document storage_path vs trigger has_storage_path
+        if (
+            trigger.filter_has_storage_path_id is not None
+            and document.storage_path_id != trigger.filter_has_storage_path_id
+        ):
+            return (
+                False,
+                f"Document storage path {document.storage_path} does not match {trigger.filter_has_storage_path}",
+            )
 
-    # Custom field query check
-    if trigger.filter_custom_field_query:
-        parser = CustomFieldQueryParser("filter_custom_field_query")
-        try:
-            custom_field_q, annotations = parser.parse(
-                trigger.filter_custom_field_query,
+        if document.storage_path_id in self.not_storage_paths.ids:
+            return (
+                False,
+                f"Document storage path {document.storage_path} is excluded by {list(self.not_storage_paths.objects)}",
             )
-        except serializers.ValidationError:
-            return (False, "Invalid custom field query configuration")
 
-        qs = (
-            Document.objects.filter(id=document.id)
-            .annotate(**annotations)
-            .filter(custom_field_q)
-        )
-        if not qs.exists():
+        # Custom field query check
+        if self.custom_field_query is False:
+            return (False, "Invalid custom field query configuration")
+        if self.custom_field_query is not None and custom_field_matches is None:
+            custom_field_matches = self.custom_field_query_matches([document.pk])
+        if (
+            self.custom_field_query is not None
+            and document.pk not in custom_field_matches
+        ):
             return (
                 False,
                 "Document custom fields do not match the configured custom field query",
             )
 
-    # Document original_filename vs trigger filename
-    if (
-        trigger.filter_filename is not None
-        and len(trigger.filter_filename) > 0
-        and document.original_filename is not None
-        and not fnmatch(
-            document.original_filename.lower(),
-            trigger.filter_filename.lower(),
-        )
-    ):
-        return (
-            False,
-            f"Document filename {document.original_filename} does not match {trigger.filter_filename.lower()}",
+        # Document original_filename vs trigger filename
+        if (
+            self.filename_pattern is not None
+            and document.original_filename is not None
+            and not fnmatch(document.original_filename.lower(), self.filename_pattern)
+        ):
+            return (
+                False,
+                f"Document filename {document.original_filename} does not match {self.filename_pattern}",
+            )
+
+        return (True, None)
+
+    def custom_field_query_matches(self, document_ids: Iterable[int]) -> set[int]:
+        """
+        Return which of ``document_ids`` match the custom field query of the
+        trigger, with one query however many documents are checked.
+        """
+        if not self.custom_field_query:
+            return set()
+        custom_field_q, annotations = self.custom_field_query
+        return set(
+            Document.objects.filter(id__in=document_ids)
+            .annotate(**annotations)
+            .filter(custom_field_q)
+            .values_list("id", flat=True),
         )
 
-    return (True, None)
+
+def existing_document_matches_workflow(
+    document: Document,
+    trigger: WorkflowTrigger,
+) -> tuple[bool, str | None]:
+    """
+    Returns True if the Document matches all filters from the workflow trigger,
+    False otherwise. Includes a reason if doesn't match
+    """
+    return CompiledWorkflowTrigger.compile(trigger).matches(document)
 
 
 def prefilter_documents_by_workflowtrigger(
@@ -634,64 +697,117 @@ def prefilter_documents_by_workflowtrigger(
     return documents
 
 
-def document_matches_workflow(
-    document: ConsumableDocument | Document,
-    workflow: Workflow,
-    trigger_type: WorkflowTrigger.WorkflowTriggerType,
-) -> bool:
+def get_workflow_triggers_queryset() -> QuerySet[WorkflowTrigger]:
     """
-    Returns True if the ConsumableDocument or Document matches all filters and
-    settings from the workflow trigger, False otherwise
+    Workflow triggers with everything needed to match documents against them
+    loaded up front.
     """
-
-    triggers_queryset = (
-        workflow.triggers.filter(
-            type=trigger_type,
-        )
-        .select_related(
-            "filter_mailrule",
-            "filter_has_document_type",
-            "filter_has_correspondent",
-            "filter_has_storage_path",
-            "schedule_date_custom_field",
-        )
-        .prefetch_related(
-            "filter_has_tags",
-            "filter_has_all_tags",
-            "filter_has_not_tags",
-            "filter_has_any_document_types",
-            "filter_has_not_document_types",
-            "filter_has_any_correspondents",
-            "filter_has_not_correspondents",
-            "filter_has_any_storage_paths",
-            "filter_has_not_storage_paths",
-        )
+    return WorkflowTrigger.objects.select_related(
+        "filter_mailrule",
+        "filter_has_document_type",
+        "filter_has_correspondent",
+        "filter_has_storage_path",
+        "schedule_date_custom_field",
+    ).prefetch_related(
+        "filter_has_tags",
+        "filter_has_all_tags",
+        "filter_has_not_tags",
+        "filter_has_any_document_types",
+        "filter_has_not_document_types",
+        "filter_has_any_correspondents",
+        "filter_has_not_correspondents",
+        "filter_has_any_storage_paths",
+        "filter_has_not_storage_paths",
     )
 
-    trigger_matched = True
-    if not triggers_queryset.exists():
-        trigger_matched = False
-        logger.info(f"Document did not match {workflow}")
-        logger.debug(f"No matching triggers with type {trigger_type} found")
-    else:
-        for trigger in triggers_queryset:
-            if trigger_type == WorkflowTrigger.WorkflowTriggerType.CONSUMPTION:
-                trigger_matched, reason = consumable_document_matches_workflow(
+
+class WorkflowTriggerEvaluator:
+    """
+    Matches documents against the triggers of one type of any number of
+    workflows. The triggers of each workflow are compiled the first time it is
+    checked and reused for every further document, and the tags of a document
+    are loaded at most once until ``forget`` is called for it.
+    """
+
+    def __init__(self, trigger_type: WorkflowTrigger.WorkflowTriggerType) -> None:
+        self.trigger_type = trigger_type
+        self._triggers: dict[int, list[Any]] = {}
+        self._document_tags: dict[int, list[Tag]] = {}
+
+    def _compile(self, workflow: Workflow) -> list[Any]:
+        if "triggers" in getattr(workflow, "_prefetched_objects_cache", {}):
+            triggers = [
+                trigger
+                for trigger in workflow.triggers.all()
+                if trigger.type == self.trigger_type
+            ]
+        else:
+            triggers = list(
+                get_workflow_triggers_queryset().filter(
+                    workflows=workflow,
+                    type=self.trigger_type,
+                ),
+            )
+
+        if not triggers or (
+            self.trigger_type == WorkflowTrigger.WorkflowTriggerType.CONSUMPTION
+        ):
+            return triggers
+        if self.trigger_type in (
+            WorkflowTrigger.WorkflowTriggerType.DOCUMENT_ADDED,
+            WorkflowTrigger.WorkflowTriggerType.DOCUMENT_UPDATED,
+            WorkflowTrigger.WorkflowTriggerType.SCHEDULED,
+        ):
+            return [CompiledWorkflowTrigger.compile(trigger) for trigger in triggers]
+        # New trigger types need to be explicitly checked above
+        raise Exception(f"Trigger type {self.trigger_type} not yet supported")
+
+    def _get_document_tags(self, document: Document) -> list[Tag]:
+        if document.pk not in self._document_tags:
+            self._document_tags[document.pk] = list(document.tags.all())
+        return self._document_tags[document.pk]
+
+    def forget(self, document: Document) -> None:
+        """Drop what is cached about ``document`` after it has been changed."""
+        self._document_tags.pop(document.pk, None)
+
+    def get_triggers(self, workflow: Workflow) -> list[Any]:
+        """
+        The triggers of the workflow with the type of this evaluator, compiled
+        unless they are consumption triggers.
+        """
+        if workflow.pk not in self._triggers:
+            self._triggers[workflow.pk] = self._compile(workflow)
+        return self._triggers[workflow.pk]
+
+    def matches(
+        self,
+        document: ConsumableDocument | Document,
+        workflow: Workflow,
+    ) -> bool:
+        """
+        Returns True if the ConsumableDocument or Document matches all filters
+        and settings of any trigger of the workflow, False otherwise
+        """
+        triggers = self.get_triggers(workflow)
+
+        if not triggers:
+            logger.info(f"Document did not match {workflow}")
+            logger.debug(f"No matching triggers with type {self.trigger_type} found")
+            return False
+
+        for trigger in triggers:
+            if isinstance(trigger, CompiledWorkflowTrigger):
+                trigger_matched, reason = trigger.matches(
                     document,
-                    trigger,
+                    self._get_document_tags(document) if trigger.needs_tags else None,
                 )
-            elif (
-                trigger_type == WorkflowTrigger.WorkflowTriggerType.DOCUMENT_ADDED
-                or trigger_type == WorkflowTrigger.WorkflowTriggerType.DOCUMENT_UPDATED
-                or trigger_type == WorkflowTrigger.WorkflowTriggerType.SCHEDULED
-            ):
-                trigger_matched, reason = existing_document_matches_workflow(
+                trigger = trigger.trigger
+            else:
+                trigger_matched, reason = consumable_document_matches_workflow(
                     document,
                     trigger,
                 )
-            else:
-                # New trigger types need to be explicitly checked above
-                raise Exception(f"Trigger type {trigger_type} not yet supported")
 
             if trigger_matched:
                 logger.info(f"Document matched {trigger} from {workflow}")
@@ -701,4 +817,16 @@ def document_matches_workflow(
                 logger.info(f"Document did not match {workflow}")
                 logger.debug(reason)
 
-    return trigger_matched
+        return False
+
+
+def document_matches_workflow(
+    document: ConsumableDocument | Document,
+    workflow: Workflow,
+    trigger_type: WorkflowTrigger.WorkflowTriggerType,
+) -> bool:
+    """
+    Returns True if the ConsumableDocument or Document matches all filters and
+    settings from the workflow trigger, False otherwise
+    """
+    return WorkflowTriggerEvaluator(trigger_type).matches(document, workflow)
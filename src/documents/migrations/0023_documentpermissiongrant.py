@@ -0,0 +1,144 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations
+from django.db import models
+
+BATCH_SIZE = 1000
+
+
+def populate_permission_grants(apps, schema_editor):
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    Document = apps.get_model("documents", "Document")
+    DocumentPermissionGrant = apps.get_model("documents", "DocumentPermissionGrant")
+    UserObjectPermission = apps.get_model("guardian", "UserObjectPermission")
+    GroupObjectPermission = apps.get_model("guardian", "GroupObjectPermission")
+
+    try:
+        content_type = ContentType.objects.get(app_label="documents", model="document")
+    except ContentType.DoesNotExist:
+        # Fresh database: content types are created after migrating, so no
+        # object permissions can exist yet either.
+        return
+
+    document_ids = set(Document.objects.values_list("pk", flat=True))
+    grants = []
+    for model, principal in (
+        (UserObjectPermission, "user_id"),
+        (GroupObjectPermission, "group_id"),
+    ):
+        for object_pk, permission_id, principal_id in (
+            model.objects.filter(content_type=content_type)
+            .values_list("object_pk", "permission_id", principal)
+            .iterator(chunk_size=BATCH_SIZE)
+        ):
+            if not object_pk.isdigit() or int(object_pk) not in document_ids:
+                continue
+            grants.append(
+                DocumentPermissionGrant(
+                    document_id=int(object_pk),
+                    permission_id=permission_id,
+                    **{principal: principal_id},
+                ),
+            )
+            if len(grants) >= BATCH_SIZE:
+                DocumentPermissionGrant.objects.bulk_create(grants)
+                grants = []
+    DocumentPermissionGrant.objects.bulk_create(grants)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        (
+            "guardian",
+            "0003_remove_groupobjectpermission_guardian_gr_content_ae6aec_idx_and_more",
+        ),
+        ("documents", "0022_add_perf_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DocumentPermissionGrant",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "document",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="documents.document",
+                        verbose_name="document",
+                    ),
+                ),
+                (
+                    "group",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="auth.group",
+                        verbose_name="group",
+                    ),
+                ),
+                (
+                    "permission",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="auth.permission",
+                        verbose_name="permission",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="user",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "document permission grant",
+                "verbose_name_plural": "document permission grants",
+                "indexes": [
+                    models.Index(
+                        fields=["user", "permission", "document"],
+                        name="documents_d_user_id_18b67b_idx",
+                    ),
+                    models.Index(
+                        fields=["group", "permission", "document"],
+                        name="documents_d_group_i_23a0f2_idx",
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("document", "permission", "user"),
+                        name="documents_permissiongrant_user_uniq",
+                    ),
+                    models.UniqueConstraint(
+                        fields=("document", "permission", "group"),
+                        name="documents_permissiongrant_group_uniq",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(
+            populate_permission_grants,
+            migrations.RunPython.noop,
+        ),
+    ]
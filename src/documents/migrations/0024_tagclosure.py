@@ -0,0 +1,81 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:42
+
+import django.db.models.deletion
+from django.db import migrations
+from django.db import models
+
+BATCH_SIZE = 1000
+
+
+def populate_tag_closure(apps, schema_editor):
+    Tag = apps.get_model("documents", "Tag")
+    TagClosure = apps.get_model("documents", "TagClosure")
+
+    parents = dict(Tag.objects.values_list("pk", "tn_parent_id"))
+    rows = []
+    for tag_id in parents:
+        ancestor_id = tag_id
+        depth = 0
+        while ancestor_id is not None and depth <= len(parents):
+            rows.append(
+                TagClosure(ancestor_id=ancestor_id, descendant_id=tag_id, depth=depth),
+            )
+            ancestor_id = parents.get(ancestor_id)
+            depth += 1
+    TagClosure.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("documents", "0023_documentpermissiongrant"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TagClosure",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("depth", models.PositiveSmallIntegerField(verbose_name="depth")),
+                (
+                    "ancestor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="documents.tag",
+                        verbose_name="ancestor",
+                    ),
+                ),
+                (
+                    "descendant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="documents.tag",
+                        verbose_name="descendant",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "tag closure",
+                "verbose_name_plural": "tag closures",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("ancestor", "descendant"),
+                        name="documents_tagclosure_unique",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(
+            populate_tag_closure,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:05
+
+import logging
+
+from django.db import DatabaseError
+from django.db import migrations
+from django.db import transaction
+
+logger = logging.getLogger("paperless.migrations")
+
+# Model and column for every name/title that is filtered with icontains or
+# istartswith. The indexed expression is exactly what Django generates for
+# these lookups on PostgreSQL, UPPER("column"::text), otherwise the planner
+# will not consider the index.
+TRIGRAM_INDEXES = [
+    ("document", "title", "documents_document_title_trgm"),
+    ("tag", "name", "documents_tag_name_trgm"),
+    ("correspondent", "name", "documents_correspondent_name_trgm"),
+    ("documenttype", "name", "documents_documenttype_name_trgm"),
+    ("storagepath", "name", "documents_storagepath_name_trgm"),
+    ("savedview", "name", "documents_savedview_name_trgm"),
+    ("customfield", "name", "documents_customfield_name_trgm"),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except DatabaseError as e:
+        logger.warning(
+            f"Could not enable the pg_trgm extension, name and title filters "
+            f"will not be indexed: {e}",
+        )
+        return
+
+    quote_name = schema_editor.quote_name
+    for model_name, column, index_name in TRIGRAM_INDEXES:
+        table = apps.get_model("documents", model_name)._meta.db_table
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {quote_name(index_name)} "
+            f"ON {quote_name(table)} "
+            f"USING gin ((UPPER({quote_name(column)}::text)) gin_trgm_ops)",
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for _, _, index_name in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f"DROP INDEX IF EXISTS {schema_editor.quote_name(index_name)}",
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("documents", "0024_tagclosure"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            create_trigram_indexes,
+            drop_trigram_indexes,
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:19
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("documents", "0025_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="workflowtrigger",
+            name="schedule_last_checked",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                help_text="When documents were last checked against the schedule trigger.",
+                null=True,
+                verbose_name="schedule last checked",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="workflowrun",
+            index=models.Index(
+                fields=["workflow", "type", "document", "run_at"],
+                name="documents_w_workflo_81e705_idx",
+            ),
+        ),
+    ]
@@ -5,6 +5,7 @@ from typing import Final
 import pathvalidate
 from django.conf import settings
 from django.contrib.auth.models import Group
+from django.contrib.auth.models import Permission
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator
@@ -138,6 +139,46 @@ class Tag(MatchingModel, TreeNodeModel):
         return super().clean()
 
 
+class TagClosure(models.Model):
+    """
+    Closure table of the tag hierarchy: one row for every tag and each of its
+    ancestors, plus one row linking every tag to itself at depth 0.
+
+    Lets ancestors and descendants of any number of tags be looked up with a
+    single indexed query. Rows are maintained by signal handlers when tags are
+    created or moved; moving a tag only rewrites the rows of its subtree.
+    """
+
+    ancestor = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name=_("ancestor"),
+    )
+
+    descendant = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name=_("descendant"),
+    )
+
+    depth = models.PositiveSmallIntegerField(_("depth"))
+
+    class Meta:
+        verbose_name = _("tag closure")
+        verbose_name_plural = _("tag closures")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["ancestor", "descendant"],
+                name="documents_tagclosure_unique",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.ancestor_id} -> {self.descendant_id} ({self.depth})"
+
+
 class DocumentType(MatchingModel):
     class Meta(MatchingModel.Meta):
         verbose_name = _("document type")
@@ -518,6 +559,72 @@ class Document(SoftDeleteModel, ModelWithOwner):  # type: ignore[django-manager-
         )
 
 
+class DocumentPermissionGrant(models.Model):
+    """
+    Denormalized copy of guardian's object permissions on documents.
+
+    Guardian keys object permissions by a text ``object_pk``, so permission
+    checks must cast it to an integer, which defeats the index. This table
+    mirrors the same grants with a real document foreign key. Rows are kept
+    in sync by signal handlers on guardian's permission models and can be
+    checked or repaired with the ``document_permissions`` command.
+    """
+
+    document = models.ForeignKey(
+        Document,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name=_("document"),
+    )
+
+    permission = models.ForeignKey(
+        Permission,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name=_("permission"),
+    )
+
+    user = models.ForeignKey(
+        User,
+        null=True,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name=_("user"),
+    )
+
+    group = models.ForeignKey(
+        Group,
+        null=True,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name=_("group"),
+    )
+
+    class Meta:
+        verbose_name = _("document permission grant")
+        verbose_name_plural = _("document permission grants")
+        indexes = [
+            models.Index(fields=["user", "permission", "document"]),
+            models.Index(fields=["group", "permission", "document"]),
+        ]
+        # Unconditional, as MariaDB ignores conditions on constraints. Rows of
+        # the other principal never collide, since NULLs are distinct.
+        constraints = [
+            models.UniqueConstraint(
+                fields=["document", "permission", "user"],
+                name="documents_permissiongrant_user_uniq",
+            ),
+            models.UniqueConstraint(
+                fields=["document", "permission", "group"],
+                name="documents_permissiongrant_group_uniq",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        principal = f"user {self.user_id}" if self.user_id else f"group {self.group_id}"
+        return f"{principal}: {self.permission_id} on document {self.document_id}"
+
+
 class SavedView(ModelWithOwner):
     class DisplayMode(models.TextChoices):
         TABLE = ("table", _("Table"))
@@ -1478,6 +1585,16 @@ class WorkflowTrigger(models.Model):
         verbose_name=_("schedule date custom field"),
     )
 
+    schedule_last_checked = models.DateTimeField(
+        _("schedule last checked"),
+        null=True,
+        blank=True,
+        editable=False,
+        help_text=_(
+            "When documents were last checked against the schedule trigger.",
+        ),
+    )
+
     class Meta:
         verbose_name = _("workflow trigger")
         verbose_name_plural = _("workflow triggers")
@@ -1485,6 +1602,13 @@ class WorkflowTrigger(models.Model):
     def __str__(self):
         return f"WorkflowTrigger {self.pk}"
 
+    def save(self, *args, **kwargs):
+        # Documents the scheduler has passed over may match the changed
+        # trigger, so all documents are checked again on the next run
+        if kwargs.get("update_fields") is None:
+            self.schedule_last_checked = None
+        super().save(*args, **kwargs)
+
 
 class WorkflowActionEmail(models.Model):
     subject = models.CharField(
@@ -1901,6 +2025,9 @@ class WorkflowRun(SoftDeleteModel):
     class Meta:
         verbose_name = _("workflow run")
         verbose_name_plural = _("workflow runs")
+        indexes = [
+            models.Index(fields=["workflow", "type", "document", "run_at"]),
+        ]
 
     def __str__(self) -> str:
         return f"WorkflowRun of {self.workflow} at {self.run_at} on {self.document}"
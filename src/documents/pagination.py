@@ -0,0 +1,279 @@
+"""
+Keyset (cursor) pagination for the documents list.
+
+Offset pagination makes the database produce and throw away every row before
+the requested page, so reading a whole library page by page is quadratic.
+Here the cursor instead holds the ordering values of the last document of a
+page, and the next page starts right after them with a plain WHERE clause.
+
+The ordering is the one the filters left on the queryset, with the document
+id appended as a tie-breaker. Empty values sort as the smallest ones on every
+database.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import datetime
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Final
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.db.models import JSONField
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param
+from rest_framework.utils.urls import replace_query_param
+
+from documents.caching import get_document_count_cache
+from documents.caching import get_document_count_cache_key
+from documents.caching import get_statistics_generation
+from documents.caching import set_document_count_cache
+
+if TYPE_CHECKING:
+    from django.db.models import QuerySet
+    from rest_framework.request import Request
+
+# Request parameters that only shape the response, not which documents match
+_NON_FILTER_PARAMS: Final[frozenset[str]] = frozenset(
+    {
+        "cursor",
+        "page",
+        "page_size",
+        "pagination",
+        "fields",
+        "truncate_content",
+        "full_perms",
+        "include_selection_data",
+    },
+)
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    """
+    Keeps the microseconds of datetimes, which DjangoJSONEncoder drops. A
+    truncated value would make the next page skip or repeat rows.
+    """
+
+    def default(self, o: Any) -> Any:
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+@dataclass(frozen=True, slots=True)
+class CursorPage:
+    object_list: list
+
+
+class DocumentCursorPagination(BasePagination):
+    """
+    Cursor pagination, used instead of StandardPagination when a request asks
+    for it with ``pagination=cursor``.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = 25
+    page_size_query_param = "page_size"
+    max_page_size = 100000
+    invalid_cursor_message = _("Invalid cursor")
+
+    @classmethod
+    def is_requested(cls, request: Request | None) -> bool:
+        if request is None:
+            return False
+        return (
+            request.query_params.get("pagination") == "cursor"
+            or cls.cursor_query_param in request.query_params
+        )
+
+    def get_page_size(self, request: Request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def paginate_queryset(
+        self,
+        queryset: QuerySet,
+        request: Request,
+        view: Any = None,
+    ) -> list:
+        self.request = request
+        self.count = self._get_count(queryset, request)
+        page_size = self.get_page_size(request)
+
+        self.ordering = self._get_ordering(queryset)
+        aliases = [f"cursor_{i}" for i in range(len(self.ordering))]
+        queryset = queryset.annotate(
+            **{alias: F(name) for alias, (name, _desc) in zip(aliases, self.ordering)},
+        )
+        for alias in aliases:
+            if isinstance(queryset.query.annotations[alias].output_field, JSONField):
+                raise ValidationError(
+                    {"ordering": [_("This ordering does not support cursors.")]},
+                )
+        queryset = queryset.order_by(
+            *(
+                F(alias).desc(nulls_last=True)
+                if descending
+                else F(alias).asc(nulls_first=True)
+                for alias, (_name, descending) in zip(aliases, self.ordering)
+            ),
+        )
+
+        cursor = self._decode_cursor(request)
+        if cursor is not None:
+            condition = self._after(
+                [
+                    (alias, descending)
+                    for alias, (_name, descending) in zip(aliases, self.ordering)
+                ],
+                cursor,
+            )
+            queryset = (
+                queryset.filter(condition) if condition is not None else queryset.none()
+            )
+
+        results = list(queryset[: page_size + 1])
+        self.next_values = None
+        if len(results) > page_size:
+            results = results[:page_size]
+            self.next_values = [getattr(results[-1], alias) for alias in aliases]
+        self.page = CursorPage(results)
+        return results
+
+    def get_paginated_response(self, data: Any) -> Response:
+        return Response(
+            OrderedDict(
+                [
+                    ("count", self.count),
+                    ("next", self.get_next_link()),
+                    ("previous", None),
+                    ("results", data),
+                ],
+            ),
+        )
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            "type": "object",
+            "required": ["count", "results"],
+            "properties": {
+                "count": {"type": "integer", "example": 123},
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_next_link(self) -> str | None:
+        if self.next_values is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), "page")
+        url = replace_query_param(url, "pagination", "cursor")
+        return replace_query_param(
+            url,
+            self.cursor_query_param,
+            self._encode_cursor(self.next_values),
+        )
+
+    def _get_count(self, queryset: QuerySet, request: Request) -> int:
+        # Recounting on every page would be a full scan per page again; the
+        # count is instead cached until documents or their permissions change.
+        key = get_document_count_cache_key(
+            request.user.pk,
+            (
+                (name, value)
+                for name, values in request.query_params.lists()
+                if name not in _NON_FILTER_PARAMS
+                for value in values
+            ),
+            get_statistics_generation(),
+        )
+        count = get_document_count_cache(key)
+        if count is None:
+            count = queryset.count()
+            set_document_count_cache(key, count)
+        return count
+
+    def _get_ordering(self, queryset: QuerySet) -> list[tuple[str, bool]]:
+        ordering = []
+        for term in queryset.query.order_by or queryset.model._meta.ordering:
+            if not isinstance(term, str) or term == "?":
+                raise ValidationError(
+                    {"ordering": [_("This ordering does not support cursors.")]},
+                )
+            name = term.lstrip("-")
+            ordering.append(("id" if name == "pk" else name, term.startswith("-")))
+        if not any(name == "id" for name, _desc in ordering):
+            descending = ordering[0][1] if ordering else False
+            ordering.append(("id", descending))
+        return ordering
+
+    def _after(
+        self,
+        ordering: list[tuple[str, bool]],
+        values: list[Any],
+    ) -> Q | None:
+        """
+        Builds the condition selecting the rows after the row with the given
+        ordering values, or None if there are none.
+        """
+        condition = None
+        for (alias, descending), value in reversed(list(zip(ordering, values))):
+            if value is None:
+                beyond = None if descending else Q(**{f"{alias}__isnull": False})
+                equal = Q(**{f"{alias}__isnull": True})
+            elif descending:
+                beyond = Q(**{f"{alias}__lt": value}) | Q(**{f"{alias}__isnull": True})
+                equal = Q(**{alias: value})
+            else:
+                beyond = Q(**{f"{alias}__gt": value})
+                equal = Q(**{alias: value})
+
+            if condition is None:
+                condition = beyond
+            elif beyond is None:
+                condition = equal & condition
+            else:
+                condition = beyond | (equal & condition)
+        return condition
+
+    def _encode_cursor(self, values: list[Any]) -> str:
+        payload = {
+            "o": [f"-{name}" if desc else name for name, desc in self.ordering],
+            "v": values,
+        }
+        raw = json.dumps(payload, cls=_CursorEncoder, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def _decode_cursor(self, request: Request) -> list[Any] | None:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            ordering = payload["o"]
+            values = payload["v"]
+        except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        expected = [f"-{name}" if desc else name for name, desc in self.ordering]
+        if ordering != expected or not isinstance(values, list):
+            raise NotFound(self.invalid_cursor_message)
+        if len(values) != len(expected):
+            raise NotFound(self.invalid_cursor_message)
+        return values
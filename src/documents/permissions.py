@@ -1,9 +1,13 @@
+from collections.abc import Iterable
 from typing import Any
+from typing import NamedTuple
 
+from django.conf import settings
 from django.contrib.auth.models import Group
 from django.contrib.auth.models import Permission
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
 from django.db.models import Case
 from django.db.models import Count
 from django.db.models import IntegerField
@@ -20,10 +24,18 @@ from guardian.shortcuts import assign_perm
 from guardian.shortcuts import get_objects_for_user
 from guardian.shortcuts import get_users_with_perms
 from guardian.shortcuts import remove_perm
+from guardian.utils import get_group_obj_perms_model
+from guardian.utils import get_user_obj_perms_model
 from rest_framework.permissions import BasePermission
 from rest_framework.permissions import DjangoObjectPermissions
 
 from documents.models import Document
+from documents.models import DocumentPermissionGrant
+
+# (document_id, permission_id, user_id, group_id); exactly one of user/group is set
+GrantKey = tuple[int, int, int | None, int | None]
+
+_GRANT_BATCH_SIZE = 1000
 
 
 class PaperlessObjectPermissions(DjangoObjectPermissions):
@@ -91,6 +103,45 @@ def get_groups_with_only_permission(obj, codename):
     return Group.objects.filter(id__in=group_object_perm_group_ids).distinct()
 
 
+def get_object_permissions_context(
+    model: type[Model],
+    objects: Iterable[Model],
+) -> dict[str, Any]:
+    """
+    Load the object permissions of a list of objects with one query for users
+    and one for groups, in the form OwnedObjectSerializer reads them from its
+    context: the ids of the users and groups with view and change permission
+    per object, and the primary keys of the objects shared with anyone.
+    """
+    object_pks = [obj.pk for obj in objects]
+    ctype = ContentType.objects.get_for_model(model)
+    context: dict[str, Any] = {
+        f"{target}_{codename}_perms": {pk: [] for pk in object_pks}
+        for target in ("users", "groups")
+        for codename in ("view", "change")
+    }
+    shared_object_pks = set()
+
+    for target, obj_perm_model, id_field in (
+        ("users", get_user_obj_perms_model(model), "user_id"),
+        ("groups", get_group_obj_perms_model(model), "group_id"),
+    ):
+        rows = obj_perm_model.objects.filter(
+            content_type=ctype,
+            object_pk__in=object_pks,
+        ).values_list("object_pk", id_field, "permission__codename")
+        for object_pk, actor_id, codename in rows:
+            pk = int(object_pk)
+            shared_object_pks.add(pk)
+            # e.g. "view_document" -> "view"
+            perms = context.get(f"{target}_{codename.split('_', 1)[0]}_perms")
+            if perms is not None:
+                perms[pk].append(actor_id)
+
+    context["shared_object_pks"] = shared_object_pks
+    return context
+
+
 def set_permissions_for_object(
     permissions: dict,
     object,
@@ -203,16 +254,25 @@ def permitted_object_ids(
         "permission__content_type": content_type,
     }
 
-    user_perm_ids = (
-        UserObjectPermission.objects.filter(user=user, **perm_filter)
-        .annotate(object_pk_int=Cast("object_pk", IntegerField()))
-        .values_list("object_pk_int", flat=True)
-    )
-    group_perm_ids = (
-        GroupObjectPermission.objects.filter(group__user=user, **perm_filter)
-        .annotate(object_pk_int=Cast("object_pk", IntegerField()))
-        .values_list("object_pk_int", flat=True)
-    )
+    if model is Document and settings.MATERIALIZED_DOCUMENT_PERMISSIONS:
+        # Same grants, but keyed by an integer foreign key the database can
+        # index instead of guardian's text object_pk.
+        grants = DocumentPermissionGrant.objects.filter(**perm_filter)
+        user_perm_ids = grants.filter(user=user).values_list("document_id", flat=True)
+        group_perm_ids = grants.filter(
+            group_id__in=user.groups.values("pk"),
+        ).values_list("document_id", flat=True)
+    else:
+        user_perm_ids = (
+            UserObjectPermission.objects.filter(user=user, **perm_filter)
+            .annotate(object_pk_int=Cast("object_pk", IntegerField()))
+            .values_list("object_pk_int", flat=True)
+        )
+        group_perm_ids = (
+            GroupObjectPermission.objects.filter(group__user=user, **perm_filter)
+            .annotate(object_pk_int=Cast("object_pk", IntegerField()))
+            .values_list("object_pk_int", flat=True)
+        )
     permitted_ids = user_perm_ids.union(group_perm_ids)
 
     return base_qs.filter(
@@ -237,6 +297,136 @@ def permitted_document_ids(
     return permitted_object_ids(user, Document, perm, include_deleted=include_deleted)
 
 
+class PermissionGrantDiff(NamedTuple):
+    """Differences between guardian's document permissions and their materialized copy."""
+
+    # Guardian grants without a DocumentPermissionGrant row
+    missing: set[GrantKey]
+    # DocumentPermissionGrant rows (by primary key) without a guardian grant
+    stale: dict[GrantKey, int]
+
+    @property
+    def is_consistent(self) -> bool:
+        return not self.missing and not self.stale
+
+
+def _document_grant_key(
+    obj_perm: UserObjectPermission | GroupObjectPermission,
+) -> GrantKey | None:
+    """Return the materialized key for a guardian row, or None if it is not about a document."""
+    content_type = ContentType.objects.get_for_model(Document)
+    if obj_perm.content_type_id != content_type.pk:
+        return None
+    object_pk = str(obj_perm.object_pk)
+    if not object_pk.isdigit():
+        return None
+    return (
+        int(object_pk),
+        obj_perm.permission_id,
+        getattr(obj_perm, "user_id", None),
+        getattr(obj_perm, "group_id", None),
+    )
+
+
+def add_document_permission_grant(
+    obj_perm: UserObjectPermission | GroupObjectPermission,
+) -> None:
+    """Mirror a newly saved guardian row into DocumentPermissionGrant."""
+    key = _document_grant_key(obj_perm)
+    if key is None or not Document.global_objects.filter(pk=key[0]).exists():
+        return
+    document_id, permission_id, user_id, group_id = key
+    DocumentPermissionGrant.objects.get_or_create(
+        document_id=document_id,
+        permission_id=permission_id,
+        user_id=user_id,
+        group_id=group_id,
+    )
+
+
+def remove_document_permission_grant(
+    obj_perm: UserObjectPermission | GroupObjectPermission,
+) -> None:
+    """Drop the materialized copy of a deleted guardian row."""
+    key = _document_grant_key(obj_perm)
+    if key is None:
+        return
+    document_id, permission_id, user_id, group_id = key
+    DocumentPermissionGrant.objects.filter(
+        document_id=document_id,
+        permission_id=permission_id,
+        user_id=user_id,
+        group_id=group_id,
+    ).delete()
+
+
+def diff_document_permission_grants() -> PermissionGrantDiff:
+    """
+    Compare guardian's document permissions with DocumentPermissionGrant.
+
+    Grants on documents that no longer exist are ignored, as they can never
+    make a document visible.
+    """
+    content_type = ContentType.objects.get_for_model(Document)
+    document_ids = set(Document.global_objects.values_list("pk", flat=True))
+
+    expected: set[GrantKey] = set()
+    for object_pk, permission_id, user_id in (
+        UserObjectPermission.objects.filter(content_type=content_type)
+        .values_list("object_pk", "permission_id", "user_id")
+        .iterator(chunk_size=_GRANT_BATCH_SIZE)
+    ):
+        if object_pk.isdigit() and int(object_pk) in document_ids:
+            expected.add((int(object_pk), permission_id, user_id, None))
+    for object_pk, permission_id, group_id in (
+        GroupObjectPermission.objects.filter(content_type=content_type)
+        .values_list("object_pk", "permission_id", "group_id")
+        .iterator(chunk_size=_GRANT_BATCH_SIZE)
+    ):
+        if object_pk.isdigit() and int(object_pk) in document_ids:
+            expected.add((int(object_pk), permission_id, None, group_id))
+
+    actual: dict[GrantKey, int] = {
+        (document_id, permission_id, user_id, group_id): pk
+        for pk, document_id, permission_id, user_id, group_id in (
+            DocumentPermissionGrant.objects.values_list(
+                "pk",
+                "document_id",
+                "permission_id",
+                "user_id",
+                "group_id",
+            ).iterator(chunk_size=_GRANT_BATCH_SIZE)
+        )
+    }
+
+    return PermissionGrantDiff(
+        missing=expected - actual.keys(),
+        stale={key: pk for key, pk in actual.items() if key not in expected},
+    )
+
+
+def repair_document_permission_grants(diff: PermissionGrantDiff) -> None:
+    """Apply a diff from ``diff_document_permission_grants``."""
+    with transaction.atomic():
+        stale_pks = list(diff.stale.values())
+        for start in range(0, len(stale_pks), _GRANT_BATCH_SIZE):
+            DocumentPermissionGrant.objects.filter(
+                pk__in=stale_pks[start : start + _GRANT_BATCH_SIZE],
+            ).delete()
+        DocumentPermissionGrant.objects.bulk_create(
+            (
+                DocumentPermissionGrant(
+                    document_id=document_id,
+                    permission_id=permission_id,
+                    user_id=user_id,
+                    group_id=group_id,
+                )
+                for document_id, permission_id, user_id, group_id in diff.missing
+            ),
+            batch_size=_GRANT_BATCH_SIZE,
+        )
+
+
 def get_document_count_filter_for_user(user, related_name: str = "documents"):
     """
     Return the Q object used to filter document counts for the given user.
@@ -0,0 +1,365 @@
+"""
+Moves the files of many documents to where their filename format puts them.
+
+The new paths of all documents are rendered and checked for collisions before
+anything is moved. The moves are then applied in batches: each batch holds the
+media lock once instead of once per document, moves its files on a thread pool
+and stores the new filenames in a single update.
+"""
+
+from __future__ import annotations
+
+import logging
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db import transaction
+from django.utils import timezone
+from filelock import FileLock
+
+from documents.caching import clear_document_caches
+from documents.file_handling import create_source_path_directory
+from documents.file_handling import delete_empty_directories
+from documents.file_handling import generate_filename
+from documents.file_handling import generate_unique_filename
+from documents.models import Document
+from documents.models import StoragePath
+from documents.signals.handlers import CannotMoveFilesException
+from documents.templating.utils import convert_format_str_to_template_format
+from documents.utils import compute_checksum
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from collections.abc import Sequence
+
+logger = logging.getLogger("paperless.relocation")
+
+# Number of documents moved while holding the media lock once
+BATCH_SIZE = 500
+
+
+@dataclass(frozen=True, slots=True)
+class FileMove:
+    source: Path
+    target: Path
+    root: Path
+
+
+@dataclass(slots=True)
+class Relocation:
+    """
+    The new filenames of a document and the files to move to get there.
+
+    moves may be empty, when only the stored filename changes, or when the files
+    are already at their new location.
+    """
+
+    document: Document
+    old_filename: str
+    old_archive_filename: str | None
+    filename: str
+    archive_filename: str | None
+    moves: list[FileMove] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class RelocationPlan:
+    relocations: list[Relocation] = field(default_factory=list)
+    unchanged: int = 0
+    failed: int = 0
+
+
+class _Planner:
+    """
+    Renders new filenames, treating a path as taken if a file exists there or
+    another document of the plan is already moving there.
+    """
+
+    def __init__(self) -> None:
+        self._claimed: set[Path] = set()
+
+    def _is_taken(self, path: Path) -> bool:
+        return path.resolve() in self._claimed or path.exists()
+
+    def plan(self, doc: Document) -> Relocation | None:
+        relocation = Relocation(
+            document=doc,
+            old_filename=doc.filename,
+            old_archive_filename=doc.archive_filename,
+            filename=doc.filename,
+            archive_filename=doc.archive_filename,
+        )
+        filename, move = self._plan_file(
+            doc,
+            old_filename=doc.filename,
+            old_path=doc.source_path,
+            checksum=doc.checksum,
+            root=settings.ORIGINALS_DIR,
+        )
+        relocation.filename = str(filename)
+        if move is not None:
+            relocation.moves.append(move)
+
+        if doc.has_archive_version:
+            if TYPE_CHECKING:
+                assert doc.archive_filename is not None
+                assert doc.archive_path is not None
+            # The archive filename may be derived from the new original filename
+            doc.filename = relocation.filename
+            try:
+                archive_filename, move = self._plan_file(
+                    doc,
+                    old_filename=doc.archive_filename,
+                    old_path=doc.archive_path,
+                    checksum=doc.archive_checksum,
+                    root=settings.ARCHIVE_DIR,
+                    archive=True,
+                )
+            finally:
+                doc.filename = relocation.old_filename
+            relocation.archive_filename = str(archive_filename)
+            if move is not None:
+                relocation.moves.append(move)
+
+        if (
+            relocation.filename == relocation.old_filename
+            and relocation.archive_filename == relocation.old_archive_filename
+        ):
+            return None
+        return relocation
+
+    def _plan_file(
+        self,
+        doc: Document,
+        *,
+        old_filename: str,
+        old_path: Path,
+        checksum: str | None,
+        root: Path,
+        archive: bool = False,
+    ) -> tuple[Path, FileMove | None]:
+        candidate = generate_filename(doc, archive_filename=archive)
+        if len(str(candidate)) > Document.MAX_STORED_FILENAME_LENGTH:
+            msg = (
+                f"Document {doc!s}: Generated filename exceeds db path limit "
+                f"({len(str(candidate))} > {Document.MAX_STORED_FILENAME_LENGTH}): "
+                f"{candidate!s}"
+            )
+            raise CannotMoveFilesException(msg)
+
+        if candidate == Path(old_filename):
+            return candidate, None
+
+        target = (root / candidate).resolve()
+        if target != old_path and self._is_taken(target):
+            if (
+                target not in self._claimed
+                and not old_path.is_file()
+                and checksum is not None
+                and target.is_file()
+                and compute_checksum(target) == checksum
+            ):
+                # Moved there before, but the new filename was never stored
+                self._claimed.add(target)
+                return candidate, None
+            candidate = generate_unique_filename(
+                doc,
+                archive_filename=archive,
+                is_taken=self._is_taken,
+            )
+            if candidate == Path(old_filename):
+                return candidate, None
+            target = (root / candidate).resolve()
+
+        if target == old_path:
+            return candidate, None
+
+        if not target.is_relative_to(root):
+            msg = (
+                f"Document {doc!s}: Refusing to move file outside root {root}: "
+                f"{target}."
+            )
+            raise CannotMoveFilesException(msg)
+
+        if not old_path.is_file():
+            msg = f"Document {doc!s}: File {old_path} doesn't exist."
+            raise CannotMoveFilesException(msg)
+
+        self._claimed.add(target)
+        return candidate, FileMove(source=old_path, target=target, root=root)
+
+
+def plan_relocations(documents: Iterable[Document]) -> RelocationPlan:
+    """
+    Renders the new filenames of the given documents in one pass and decides
+    which files to move.
+
+    Two documents never get the same new path, and no document gets a path
+    where a file already exists, so the moves can be applied in any order.
+    """
+    plan = RelocationPlan()
+    planner = _Planner()
+    for doc in documents:
+        if not doc.filename:
+            # Still being consumed, the consumer moves the file once it is done
+            continue
+        try:
+            relocation = planner.plan(doc)
+        except CannotMoveFilesException as e:
+            logger.warning(str(e))
+            plan.failed += 1
+            continue
+        if relocation is None:
+            plan.unchanged += 1
+        else:
+            plan.relocations.append(relocation)
+    return plan
+
+
+def filename_templates_use_content() -> bool:
+    """
+    Whether the filename format or any storage path refers to the content of
+    documents, which otherwise need not be loaded to plan their relocation.
+    """
+    templates = list(StoragePath.objects.values_list("path", flat=True))
+    if settings.FILENAME_FORMAT is not None:
+        templates.append(
+            convert_format_str_to_template_format(settings.FILENAME_FORMAT),
+        )
+    return any("content" in template for template in templates)
+
+
+def _move_files(relocation: Relocation) -> None:
+    """
+    Moves the files of one document, putting back what was already moved if one
+    of them cannot be moved.
+    """
+    moved: list[FileMove] = []
+    try:
+        for move in relocation.moves:
+            if not move.source.is_file():
+                msg = (
+                    f"Document {relocation.document!s}: File {move.source} "
+                    f"doesn't exist."
+                )
+                raise CannotMoveFilesException(msg)
+            if move.target.exists():
+                msg = (
+                    f"Document {relocation.document!s}: Cannot rename file since "
+                    f"target path {move.target} already exists."
+                )
+                raise CannotMoveFilesException(msg)
+            create_source_path_directory(move.target)
+            shutil.move(move.source, move.target)
+            moved.append(move)
+    except Exception:
+        _restore_files(moved)
+        raise
+
+
+def _restore_files(moves: Iterable[FileMove]) -> None:
+    for move in moves:
+        try:
+            shutil.move(move.target, move.source)
+        except OSError as e:
+            # The file is still at its new location and will never be
+            # overwritten, the sanity checker reports it
+            logger.error(f"Could not restore {move.source}: {e}")
+
+
+def apply_relocations(
+    relocations: Sequence[Relocation],
+    *,
+    threads: int = 1,
+) -> int:
+    """
+    Moves the files of the given documents and stores their new filenames.
+
+    Documents whose filenames were changed since the plan was made are skipped.
+    Returns the number of documents relocated, failures are logged.
+    """
+    if not relocations:
+        return 0
+
+    with FileLock(settings.MEDIA_LOCK):
+        current = {
+            pk: (filename, archive_filename)
+            for pk, filename, archive_filename in Document.global_objects.filter(
+                pk__in=[relocation.document.pk for relocation in relocations],
+            ).values_list("pk", "filename", "archive_filename")
+        }
+        pending = []
+        for relocation in relocations:
+            if current.get(relocation.document.pk) != (
+                relocation.old_filename,
+                relocation.old_archive_filename,
+            ):
+                logger.info(
+                    f"Document {relocation.document!s}: Skipped, its files were "
+                    f"moved since the relocation was planned.",
+                )
+            else:
+                pending.append(relocation)
+
+        relocated = []
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            futures = [
+                (relocation, executor.submit(_move_files, relocation))
+                for relocation in pending
+            ]
+            for relocation, future in futures:
+                try:
+                    future.result()
+                except (OSError, CannotMoveFilesException) as e:
+                    logger.warning(f"Exception during file handling: {e}")
+                else:
+                    relocated.append(relocation)
+
+        moves = [move for relocation in relocated for move in relocation.moves]
+        modified = timezone.now()
+        for relocation in relocated:
+            relocation.document.filename = relocation.filename
+            relocation.document.archive_filename = relocation.archive_filename
+            relocation.document.modified = modified
+        try:
+            with transaction.atomic():
+                Document.global_objects.bulk_update(
+                    [relocation.document for relocation in relocated],
+                    ["filename", "archive_filename", "modified"],
+                )
+        except DatabaseError as e:
+            logger.warning(f"Exception during file handling: {e}")
+            _restore_files(moves)
+            for relocation in relocated:
+                relocation.document.filename = relocation.old_filename
+                relocation.document.archive_filename = relocation.old_archive_filename
+            return 0
+
+        for relocation in relocated:
+            clear_document_caches(relocation.document.pk)
+
+        # Only once all moves are done, so no directory is removed while a file
+        # is being moved into it
+        for directory, root in {(move.source.parent, move.root) for move in moves}:
+            delete_empty_directories(directory, root=root)
+
+    return len(relocated)
+
+
+def relocate_documents(documents: Iterable[Document], *, threads: int = 1) -> int:
+    """
+    Plans the relocation of the given documents and applies it in batches.
+
+    Returns the number of documents relocated.
+    """
+    relocations = plan_relocations(documents).relocations
+    return sum(
+        apply_relocations(relocations[start : start + BATCH_SIZE], threads=threads)
+        for start in range(0, len(relocations), BATCH_SIZE)
+    )
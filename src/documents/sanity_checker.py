@@ -7,11 +7,23 @@ and consistent metadata. Reports orphaned files in the media directory.
 Progress display is the caller's responsibility -- pass an ``iter_wrapper``
 to wrap the document queryset (e.g., with a progress bar). The default
 is an identity function that adds no overhead.
+
+Files are hashed on a thread pool, and checksums are cached by path, size
+and modification time in ``SANITY_CHECKER_CACHE``, so unchanged files are
+not hashed again. A full check hashes every file regardless of the cache.
 """
 
+import datetime
 import logging
+import os
+import sqlite3
+import uuid
 from collections import defaultdict
+from collections.abc import Iterable
 from collections.abc import Iterator
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
 from typing import TYPE_CHECKING
 from typing import Final
@@ -27,6 +39,8 @@ from paperless.config import GeneralConfig
 
 logger = logging.getLogger("paperless.sanity_checker")
 
+_BATCH_SIZE: Final[int] = 500
+
 
 class MessageEntry(TypedDict):
     """A single sanity check message with its severity level."""
@@ -175,11 +189,14 @@ class SanityCheckFailedException(Exception):
 
 def _build_present_files() -> set[Path]:
     """Collect all files in MEDIA_ROOT, excluding directories and ignorable files."""
-    present_files = {
-        x.resolve()
-        for x in Path(settings.MEDIA_ROOT).glob("**/*")
-        if not x.is_dir() and x.name not in settings.IGNORABLE_FILES
-    }
+    present_files: set[Path] = set()
+    # Resolve the root once; below it, only symlinked files need resolving
+    for dirpath, _, filenames in os.walk(Path(settings.MEDIA_ROOT).resolve()):
+        for name in filenames:
+            if name in settings.IGNORABLE_FILES:
+                continue
+            path = Path(dirpath, name)
+            present_files.add(path.resolve() if path.is_symlink() else path)
 
     lockfile = Path(settings.MEDIA_LOCK).resolve()
     present_files.discard(lockfile)
@@ -193,6 +210,119 @@ def _build_present_files() -> set[Path]:
     return present_files
 
 
+class ChecksumCache:
+    """Checksums of files by path, size and modification time.
+
+    A file whose size and modification time have not changed since it was
+    hashed is taken to be unchanged. Entries of files not seen during a
+    complete check are pruned afterwards.
+    """
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS checksums ("
+            "path TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+            "mtime_ns INTEGER NOT NULL, checksum TEXT NOT NULL, run TEXT)",
+        )
+        self._run = uuid.uuid4().hex
+
+    def __enter__(self) -> "ChecksumCache":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            self._db.commit()
+        self._db.close()
+
+    def get(self, path: Path, stat: os.stat_result) -> str | None:
+        row = self._db.execute(
+            "SELECT checksum FROM checksums "
+            "WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (str(path), stat.st_size, stat.st_mtime_ns),
+        ).fetchone()
+        return row[0] if row else None
+
+    def mark_seen(self, paths: Iterable[Path]) -> None:
+        self._db.executemany(
+            "UPDATE checksums SET run = ? WHERE path = ?",
+            ((self._run, str(path)) for path in paths),
+        )
+
+    def update(self, entries: Iterable[tuple[Path, os.stat_result, str]]) -> None:
+        self._db.executemany(
+            "INSERT OR REPLACE INTO checksums "
+            "(path, size, mtime_ns, checksum, run) VALUES (?, ?, ?, ?, ?)",
+            (
+                (str(path), stat.st_size, stat.st_mtime_ns, checksum, self._run)
+                for path, stat, checksum in entries
+            ),
+        )
+        self._db.commit()
+
+    def prune(self) -> None:
+        self._db.execute("DELETE FROM checksums WHERE run IS NOT ?", (self._run,))
+
+
+def _hash_file(path: Path) -> str | OSError:
+    """Return the checksum of a file, or the error reading it."""
+    try:
+        return compute_checksum(path)
+    except OSError as e:
+        return e
+
+
+def _compute_checksums(
+    paths: Iterable[Path],
+    cache: ChecksumCache,
+    executor: ThreadPoolExecutor,
+    *,
+    full: bool,
+) -> dict[Path, str | OSError]:
+    """Checksum each file, from the cache where possible, or the error reading it."""
+    checksums: dict[Path, str | OSError] = {}
+    cached: list[Path] = []
+    to_hash: dict[Path, os.stat_result] = {}
+    for path in paths:
+        try:
+            stat = path.stat()
+            if not full and (checksum := cache.get(path, stat)) is not None:
+                # The file is not read, but it still has to be readable
+                path.open("rb").close()
+                checksums[path] = checksum
+                cached.append(path)
+            else:
+                to_hash[path] = stat
+        except OSError as e:
+            checksums[path] = e
+
+    # hashlib releases the GIL while hashing, so threads hash in parallel
+    hashed = dict(zip(to_hash, executor.map(_hash_file, to_hash)))
+    checksums.update(hashed)
+    cache.mark_seen(cached)
+    cache.update(
+        (path, to_hash[path], checksum)
+        for path, checksum in hashed.items()
+        if isinstance(checksum, str)
+    )
+    return checksums
+
+
+def _checksum_paths(doc: Document) -> list[Path]:
+    """The files of a document whose checksums are verified."""
+    paths = [doc.source_path]
+    if doc.archive_checksum is not None and doc.has_archive_version:
+        paths.append(doc.archive_path)
+    return paths
+
+
+def _batched(iterable: Iterable[Document], size: int) -> Iterator[list[Document]]:
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
 def _check_thumbnail(
     doc: Document,
     messages: SanityCheckMessages,
@@ -216,6 +346,7 @@ def _check_original(
     doc: Document,
     messages: SanityCheckMessages,
     present_files: set[Path],
+    checksums: Mapping[Path, str | OSError],
 ) -> None:
     """Verify the original file exists, is readable, and has matching checksum."""
     # doc.source_path already returns a resolved Path; no need to re-resolve.
@@ -225,22 +356,21 @@ def _check_original(
         return
 
     present_files.discard(source_path)
-    try:
-        checksum = compute_checksum(source_path)
-    except OSError as e:
-        messages.error(doc.pk, f"Cannot read original file of document: {e}")
-    else:
-        if checksum != doc.checksum:
-            messages.error(
-                doc.pk,
-                f"Checksum mismatch. Stored: {doc.checksum}, actual: {checksum}.",
-            )
+    checksum = checksums[source_path]
+    if isinstance(checksum, OSError):
+        messages.error(doc.pk, f"Cannot read original file of document: {checksum}")
+    elif checksum != doc.checksum:
+        messages.error(
+            doc.pk,
+            f"Checksum mismatch. Stored: {doc.checksum}, actual: {checksum}.",
+        )
 
 
 def _check_archive(
     doc: Document,
     messages: SanityCheckMessages,
     present_files: set[Path],
+    checksums: Mapping[Path, str | OSError],
 ) -> None:
     """Verify archive file consistency: checksum/filename pairing and file integrity."""
     if doc.archive_checksum is not None and doc.archive_filename is None:
@@ -263,20 +393,18 @@ def _check_archive(
             return
 
         present_files.discard(archive_path)
-        try:
-            checksum = compute_checksum(archive_path)
-        except OSError as e:
+        checksum = checksums[archive_path]
+        if isinstance(checksum, OSError):
             messages.error(
                 doc.pk,
-                f"Cannot read archive file of document: {e}",
+                f"Cannot read archive file of document: {checksum}",
+            )
+        elif checksum != doc.archive_checksum:
+            messages.error(
+                doc.pk,
+                "Checksum mismatch of archived document. "
+                f"Stored: {doc.archive_checksum}, actual: {checksum}.",
             )
-        else:
-            if checksum != doc.archive_checksum:
-                messages.error(
-                    doc.pk,
-                    "Checksum mismatch of archived document. "
-                    f"Stored: {doc.archive_checksum}, actual: {checksum}.",
-                )
 
 
 def _check_content(doc: Document, messages: SanityCheckMessages) -> None:
@@ -289,14 +417,23 @@ def _check_document(
     doc: Document,
     messages: SanityCheckMessages,
     present_files: set[Path],
+    checksums: Mapping[Path, str | OSError],
 ) -> None:
     """Run all checks for a single document."""
     _check_thumbnail(doc, messages, present_files)
-    _check_original(doc, messages, present_files)
-    _check_archive(doc, messages, present_files)
+    _check_original(doc, messages, present_files, checksums)
+    _check_archive(doc, messages, present_files, checksums)
     _check_content(doc, messages)
 
 
+def _skip_document(doc: Document, present_files: set[Path]) -> None:
+    """Account for the files of a document which is not checked."""
+    present_files.discard(doc.thumbnail_path)
+    present_files.discard(doc.source_path)
+    if doc.has_archive_version:
+        present_files.discard(doc.archive_path)
+
+
 # ---------------------------------------------------------------------------
 # Public entry point
 # ---------------------------------------------------------------------------
@@ -305,12 +442,20 @@ def _check_document(
 def check_sanity(
     *,
     iter_wrapper: IterWrapper[Document] = identity,
+    since: datetime.datetime | None = None,
+    full: bool = False,
+    threads: int = 1,
 ) -> SanityCheckMessages:
-    """Run a full sanity check on the document archive.
+    """Run a sanity check on the document archive.
 
     Args:
         iter_wrapper: A callable that wraps the document iterable, e.g.,
             for progress bar display. Defaults to identity (no wrapping).
+        since: Only check documents modified at or after this time. The
+            files of other documents still count as referenced.
+        full: Hash every file, rather than trusting cached checksums of
+            files whose size and modification time have not changed.
+        threads: Number of threads hashing files.
 
     Returns:
         A SanityCheckMessages instance containing all detected issues.
@@ -326,9 +471,37 @@ def check_sanity(
         "archive_checksum",
         "archive_filename",
         "content",
-    ).iterator(chunk_size=500)
-    for doc in iter_wrapper(documents):
-        _check_document(doc, messages, present_files)
+    )
+    if since is not None:
+        for doc in (
+            documents.filter(modified__lt=since)
+            .defer("checksum", "archive_checksum", "content")
+            .iterator(chunk_size=_BATCH_SIZE)
+        ):
+            _skip_document(doc, present_files)
+        documents = documents.filter(modified__gte=since)
+
+    with (
+        ChecksumCache(settings.SANITY_CHECKER_CACHE) as cache,
+        ThreadPoolExecutor(
+            max_workers=max(1, threads),
+            thread_name_prefix="sanity-checker",
+        ) as executor,
+    ):
+        for batch in _batched(
+            iter_wrapper(documents.iterator(chunk_size=_BATCH_SIZE)),
+            _BATCH_SIZE,
+        ):
+            checksums = _compute_checksums(
+                (path for doc in batch for path in _checksum_paths(doc)),
+                cache,
+                executor,
+                full=full,
+            )
+            for doc in batch:
+                _check_document(doc, messages, present_files, checksums)
+        if since is None:
+            cache.prune()
 
     for extra_file in present_files:
         messages.warning(None, f"Orphaned file in media dir: {extra_file}")
@@ -6,12 +6,15 @@ from documents.search._backend import TantivyRelevanceList
 from documents.search._backend import WriteBatch
 from documents.search._backend import get_backend
 from documents.search._backend import reset_backend
+from documents.search._metrics import IndexWriterStats
+from documents.search._metrics import get_index_writer_stats
 from documents.search._schema import needs_rebuild
 from documents.search._schema import wipe_index
 from documents.search._translate import InvalidDateQuery
 from documents.search._translate import SearchQueryError
 
 __all__ = [
+    "IndexWriterStats",
     "InvalidDateQuery",
     "SearchHit",
     "SearchIndexLockError",
@@ -21,6 +24,7 @@ __all__ = [
     "TantivyRelevanceList",
     "WriteBatch",
     "get_backend",
+    "get_index_writer_stats",
     "needs_rebuild",
     "reset_backend",
     "wipe_index",
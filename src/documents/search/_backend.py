@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import hashlib
 import logging
+import math
 import random
 import re
 import threading
 import time
+import uuid
+from collections import Counter
 from datetime import UTC
 from datetime import datetime
 from enum import StrEnum
@@ -21,10 +25,15 @@ import filelock
 import tantivy
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.utils.timezone import get_current_timezone
 from guardian.shortcuts import get_groups_with_perms
 from guardian.shortcuts import get_users_with_perms
 
+from documents.caching import CACHE_5_MINUTES
+from documents.caching import LRUCache
+from documents.search._metrics import record_commit
+from documents.search._metrics import record_lock_wait
 from documents.search._query import build_permission_filter
 from documents.search._query import extract_cjk_text
 from documents.search._query import parse_simple_text_highlight_query
@@ -37,7 +46,9 @@ from documents.search._schema import open_or_rebuild_index
 from documents.search._schema import wipe_index
 from documents.search._tokenizer import ascii_fold
 from documents.search._tokenizer import autocomplete_tokens
+from documents.search._tokenizer import content_tokens
 from documents.search._tokenizer import register_tokenizers
+from documents.search._translate import depends_on_current_time
 from documents.utils import IterWrapper
 from documents.utils import QuerySetStream
 from documents.utils import identity
@@ -61,6 +72,21 @@ _LOCK_RETRY_ATTEMPTS: Final[int] = 4  # total attempts (1 initial + 3 retries)
 _LOCK_BACKOFF_BASE: Final[float] = 1.0  # seconds
 _LOCK_BACKOFF_CAP: Final[float] = 10.0  # seconds
 
+_FIELD_PREFIX_RE: Final[re.Pattern[str]] = re.compile(r"\w[\w.]*:")
+
+# More Like This signatures: the top terms kept per document, how many of the
+# most frequent terms are ranked by tf-idf to pick them, and the shortest term
+# considered (shorter tokens are mostly articles and OCR noise).
+_SIMILARITY_TERMS: Final[int] = 12
+_SIMILARITY_CANDIDATES: Final[int] = 48
+_SIMILARITY_MIN_TERM_LENGTH: Final[int] = 3
+_SIMILARITY_FIELDS: Final[tuple[str, ...]] = ("content", "title")
+_SIMILARITY_REFRESH_CHUNK_SIZE: Final[int] = 500
+
+# Distinct parsed queries kept per backend. Saved views and dashboard widgets
+# repeat the same handful of queries, so a small cache covers most requests.
+_PARSED_QUERY_CACHE_SIZE: Final[int] = 256
+
 T = TypeVar("T")
 
 
@@ -98,6 +124,13 @@ def _extract_autocomplete_words(text_sources: list[str]) -> set[str]:
     return words
 
 
+class _CachedHighlight(NamedTuple):
+    """Score and highlights for one document, as stored in the highlight cache."""
+
+    score: float
+    highlights: dict[str, str]
+
+
 class SearchHit(TypedDict):
     """Type definition for search result hits."""
 
@@ -118,14 +151,15 @@ class TantivyRelevanceList:
     slice the displayed page.
 
     Args:
-        ordered_ids: All matching document IDs in display order.
+        ordered_ids: All matching document IDs in display order (any sequence,
+            e.g. a compact cached ``array('i')``).
         page_hits: Rich SearchHit dicts for the requested DRF page only.
         page_offset: Index into *ordered_ids* where *page_hits* starts.
     """
 
     def __init__(
         self,
-        ordered_ids: list[int],
+        ordered_ids: Sequence[int],
         page_hits: list[SearchHit],
         page_offset: int = 0,
     ) -> None:
@@ -163,7 +197,7 @@ class TantivyRelevanceList:
 
     def get_all_ids(self) -> list[int]:
         """Return all matching document IDs in display order."""
-        return self._ordered_ids
+        return list(self._ordered_ids)
 
 
 class SearchIndexLockError(Exception):
@@ -188,7 +222,9 @@ class WriteBatch:
         self._backend = backend
         self._lock_timeout = lock_timeout
         self._raw_writer: tantivy.IndexWriter | None = None
+        self._searcher: tantivy.Searcher | None = None
         self._lock = None
+        self._operations = 0
 
     @property
     def _writer(self) -> tantivy.IndexWriter:
@@ -197,39 +233,58 @@ class WriteBatch:
         )
         return self._raw_writer
 
+    @property
+    def searcher(self) -> tantivy.Searcher:
+        """Searcher over the index as of the start of the batch, shared by all
+        documents built for it."""
+        if self._searcher is None:
+            self._searcher = self._backend._index.searcher()
+        return self._searcher
+
     def __enter__(self) -> Self:
         if self._backend._path is not None:
             lock_path = self._backend._path / ".tantivy.lock"
             self._lock = filelock.FileLock(str(lock_path))
-            for attempt in range(_LOCK_RETRY_ATTEMPTS):
-                try:
-                    self._lock.acquire(timeout=self._lock_timeout)
-                    break
-                except filelock.Timeout:
-                    if attempt == _LOCK_RETRY_ATTEMPTS - 1:
-                        raise SearchIndexLockError(
-                            f"Could not acquire index lock after {_LOCK_RETRY_ATTEMPTS} "
-                            f"attempts (timeout={self._lock_timeout}s each)",
-                        )
-                    sleep_s = random.uniform(
-                        0,
-                        min(_LOCK_BACKOFF_CAP, _LOCK_BACKOFF_BASE * (2**attempt)),
-                    )
-                    logger.debug(
-                        "Index lock contention; retrying in %.2fs (attempt %d/%d)",
-                        sleep_s,
-                        attempt + 1,
-                        _LOCK_RETRY_ATTEMPTS,
-                    )
-                    time.sleep(sleep_s)
+            started = time.monotonic()
+            try:
+                self._acquire_lock(self._lock)
+            finally:
+                record_lock_wait(time.monotonic() - started)
 
         self._raw_writer = self._backend._index.writer()
         return self
 
+    def _acquire_lock(self, lock: filelock.FileLock) -> None:
+        """Acquire the index file lock, retrying with backoff and full jitter."""
+        for attempt in range(_LOCK_RETRY_ATTEMPTS):
+            try:
+                lock.acquire(timeout=self._lock_timeout)
+                return
+            except filelock.Timeout:
+                if attempt == _LOCK_RETRY_ATTEMPTS - 1:
+                    raise SearchIndexLockError(
+                        f"Could not acquire index lock after {_LOCK_RETRY_ATTEMPTS} "
+                        f"attempts (timeout={self._lock_timeout}s each)",
+                    )
+                sleep_s = random.uniform(
+                    0,
+                    min(_LOCK_BACKOFF_CAP, _LOCK_BACKOFF_BASE * (2**attempt)),
+                )
+                logger.debug(
+                    "Index lock contention; retrying in %.2fs (attempt %d/%d)",
+                    sleep_s,
+                    attempt + 1,
+                    _LOCK_RETRY_ATTEMPTS,
+                )
+                time.sleep(sleep_s)
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         try:
             if exc_type is None:
                 self._writer.commit()
+                record_commit(self._operations)
+                self._backend._local_generation += 1
+                self._on_commit()
                 # Wait for background merge threads to finish before releasing
                 # the file lock so the next writer doesn't race against an
                 # in-progress merge on the same index files.
@@ -246,6 +301,9 @@ class WriteBatch:
             if self._lock is not None:
                 self._lock.release()
 
+    def _on_commit(self) -> None:
+        """Hook run once the batch is committed, while the lock is still held."""
+
     def add_or_update(
         self,
         document: Document,
@@ -263,8 +321,16 @@ class WriteBatch:
             effective_content: Override document.content for indexing (used when
                 re-indexing with newer OCR text from document versions)
         """
-        self.remove(document.pk)
-        doc = self._backend._build_tantivy_doc(document, effective_content)
+        doc = self._backend._build_tantivy_doc(
+            document,
+            effective_content,
+            searcher=self.searcher,
+        )
+        self.add_or_update_built(document.pk, doc)
+
+    def add_or_update_built(self, doc_id: int, doc: tantivy.Document) -> None:
+        """Upsert an already-built Tantivy document (see add_or_update)."""
+        self.remove(doc_id)
         self._writer.add_document(doc)
 
     def remove(self, doc_id: int) -> None:
@@ -272,6 +338,7 @@ class WriteBatch:
         self._writer.delete_documents_by_query(
             tantivy.Query.term_query(self._backend._schema, "id", doc_id),
         )
+        self._operations += 1
 
 
 class TantivyBackend:
@@ -321,6 +388,13 @@ class TantivyBackend:
         self._path = path
         self._raw_index: tantivy.Index | None = None
         self._raw_schema: tantivy.Schema | None = None
+        # Identify in-memory index contents for index_generation().
+        self._instance_token = uuid.uuid4().hex
+        self._local_generation = 0
+        # Parsed queries reference the index's schema and tokenizers, so the
+        # cache is cleared whenever a different index is opened.
+        self._parsed_queries = LRUCache(capacity=_PARSED_QUERY_CACHE_SIZE)
+        self._parsed_queries_lock = threading.Lock()
 
     @property
     def _index(self) -> tantivy.Index:
@@ -348,6 +422,7 @@ class TantivyBackend:
             self._raw_index = tantivy.Index(build_schema())
         register_tokenizers(self._raw_index, settings.SEARCH_LANGUAGE)
         self._raw_schema = self._raw_index.schema
+        self._clear_parsed_queries()
 
     def close(self) -> None:
         """
@@ -357,6 +432,7 @@ class TantivyBackend:
         """
         self._raw_index = None
         self._raw_schema = None
+        self._clear_parsed_queries()
 
     def _ensure_open(self) -> None:
         """Ensure the index is open before operations."""
@@ -368,14 +444,45 @@ class TantivyBackend:
         query: str,
         search_mode: SearchMode,
     ) -> tantivy.Query:
-        """Parse a user query string into a Tantivy Query object."""
+        """
+        Parse a user query string into a Tantivy Query object.
+
+        Results are kept in a per-backend LRU cache keyed by the raw query,
+        search mode, timezone and the current day in that timezone, so date
+        keywords like "today" roll over at local midnight. Queries whose
+        translation depends on the current instant ("now", "-1 hour") are
+        never cached.
+        """
         tz = get_current_timezone()
+        cache_key = None
+        if not depends_on_current_time(query):
+            cache_key = (
+                query,
+                search_mode,
+                str(tz),
+                datetime.now(tz).date(),
+                settings.ADVANCED_FUZZY_SEARCH_THRESHOLD,
+            )
+            with self._parsed_queries_lock:
+                cached = self._parsed_queries.get(cache_key)
+            if cached is not None:
+                return cached
+
         if search_mode is SearchMode.TEXT:
-            return parse_simple_text_query(self._index, query)
+            parsed = parse_simple_text_query(self._index, query)
         elif search_mode is SearchMode.TITLE:
-            return parse_simple_title_query(self._index, query)
+            parsed = parse_simple_title_query(self._index, query)
         else:
-            return parse_user_query(self._index, query, tz)
+            parsed = parse_user_query(self._index, query, tz)
+
+        if cache_key is not None:
+            with self._parsed_queries_lock:
+                self._parsed_queries.set(cache_key, parsed)
+        return parsed
+
+    def _clear_parsed_queries(self) -> None:
+        with self._parsed_queries_lock:
+            self._parsed_queries = LRUCache(capacity=_PARSED_QUERY_CACHE_SIZE)
 
     def _apply_permission_filter(
         self,
@@ -408,11 +515,14 @@ class TantivyBackend:
         effective_content: str | None = None,
         viewer_ids: list[int] | None = None,
         viewer_group_ids: list[int] | None = None,
+        searcher: tantivy.Searcher | None = None,
     ) -> tantivy.Document:
         """Build a tantivy Document from a Django Document instance.
 
         ``effective_content`` overrides ``document.content`` for indexing —
         used when re-indexing a root document with a newer version's OCR text.
+        ``searcher`` is used to weigh the similarity signature; pass one in when
+        building many documents so they share it.
         """
         content = (
             effective_content if effective_content is not None else document.content
@@ -428,6 +538,14 @@ class TantivyBackend:
         doc.add_text("simple_title", document.title)
         doc.add_text("content", content)
         doc.add_text("simple_content", content)
+        similarity_terms, similarity_basis = self._similarity_signature(
+            document.title,
+            content,
+            searcher,
+        )
+        if similarity_terms:
+            doc.add_bytes("similarity_terms", " ".join(similarity_terms).encode())
+        doc.add_unsigned("similarity_basis", similarity_basis)
         # Bigram (character-ngram) fields exist for CJK substring search,
         # no need to bloat the bigram index with latin characters.
         if cjk_title := extract_cjk_text(document.title):
@@ -564,6 +682,43 @@ class TantivyBackend:
 
         return doc
 
+    def _similarity_signature(
+        self,
+        title: str,
+        content: str | None,
+        searcher: tantivy.Searcher | None = None,
+    ) -> tuple[list[str], int]:
+        """
+        Pick the top-weighted terms of a document for More Like This lookups.
+
+        The most frequent title/content terms are ranked by tf-idf against the
+        index as it is right now, so the cost per document is a bounded number
+        of doc_freq lookups rather than a scan of the term dictionary.
+
+        Returns:
+            The selected terms (highest weight first) and the number of indexed
+            documents the idf weights were computed against.
+        """
+        tokens = content_tokens(f"{title}\n{content or ''}", settings.SEARCH_LANGUAGE)
+        counts = Counter(
+            token for token in tokens if len(token) >= _SIMILARITY_MIN_TERM_LENGTH
+        )
+        if searcher is None:
+            searcher = self._index.searcher()
+        num_docs = searcher.num_docs
+
+        def tf_idf(candidate: tuple[str, int]) -> float:
+            term, tf = candidate
+            doc_freq = searcher.doc_freq("content", term)
+            return tf * (math.log((num_docs + 1) / (doc_freq + 1)) + 1)
+
+        ranked = sorted(
+            counts.most_common(_SIMILARITY_CANDIDATES),
+            key=tf_idf,
+            reverse=True,
+        )
+        return [term for term, _tf in ranked[:_SIMILARITY_TERMS]], num_docs
+
     def add_or_update(
         self,
         document: Document,
@@ -573,7 +728,9 @@ class TantivyBackend:
         Add or update a single document with file locking.
 
         Convenience method for single-document updates. For bulk operations,
-        use batch_update() context manager for better performance.
+        use batch_update() context manager for better performance. On-disk
+        indexes route the write through ``IndexUpdateQueue``, so concurrent
+        single-document writes from any worker are coalesced into one commit.
 
         On lock exhaustion after all retry attempts, schedules a deferred
         index_document Celery task and returns normally. Callers will NOT
@@ -585,8 +742,14 @@ class TantivyBackend:
         """
         self._ensure_open()
         try:
-            with self.batch_update(lock_timeout=_LOCK_TIMEOUT_SECONDS) as batch:
-                batch.add_or_update(document, effective_content)
+            if self._path is None:
+                with self.batch_update(lock_timeout=_LOCK_TIMEOUT_SECONDS) as batch:
+                    batch.add_or_update(document, effective_content)
+            else:
+                self._submit_to_queue(
+                    document.pk,
+                    self._build_tantivy_doc(document, effective_content),
+                )
         except SearchIndexLockError:
             logger.error(
                 "Search index lock exhausted for document %d after %d attempts; "
@@ -603,7 +766,8 @@ class TantivyBackend:
         Remove a single document from the index with file locking.
 
         Convenience method for single-document removal. For bulk operations,
-        use batch_update() context manager for better performance.
+        use batch_update() context manager for better performance. Coalesced
+        with other single-document writes like add_or_update().
 
         On lock exhaustion after all retry attempts, schedules a deferred
         remove_document_from_index Celery task and returns normally.
@@ -614,8 +778,11 @@ class TantivyBackend:
         """
         self._ensure_open()
         try:
-            with self.batch_update(lock_timeout=_LOCK_TIMEOUT_SECONDS) as batch:
-                batch.remove(doc_id)
+            if self._path is None:
+                with self.batch_update(lock_timeout=_LOCK_TIMEOUT_SECONDS) as batch:
+                    batch.remove(doc_id)
+            else:
+                self._submit_to_queue(doc_id, None)
         except SearchIndexLockError:
             logger.error(
                 "Search index lock exhausted for doc_id %d after %d attempts; "
@@ -627,6 +794,21 @@ class TantivyBackend:
 
             remove_document_from_index.apply_async(args=[doc_id], countdown=60)
 
+    def _submit_to_queue(
+        self,
+        doc_id: int,
+        document: tantivy.Document | None,
+    ) -> None:
+        """Route a single-document write through the coalescing index queue."""
+        from documents.search._queue import IndexUpdateQueue
+        from documents.search._queue import PendingIndexOp
+
+        assert self._path is not None
+        IndexUpdateQueue(self, self._path).submit(
+            PendingIndexOp(doc_id=doc_id, document=document),
+            lock_timeout=_LOCK_TIMEOUT_SECONDS,
+        )
+
     def highlight_hits(
         self,
         query: str,
@@ -643,6 +825,11 @@ class TantivyBackend:
         Use this when you already know which documents to display (from
         search_ids + ORM filtering) and just need highlight data.
 
+        Scores and highlights are cached per (query, document, index
+        generation), so paging back and forth or re-sorting a result set only
+        generates snippets for documents not seen before. Any index commit
+        changes the generation and so invalidates all cached highlights.
+
         Args:
             query: The search query (used for snippet generation)
             doc_ids: Ordered list of document IDs to generate hits for
@@ -657,27 +844,78 @@ class TantivyBackend:
             return []
 
         self._ensure_open()
+        key_prefix = self._highlight_cache_key_prefix(query, search_mode)
+        keys = {doc_id: f"{key_prefix}_{doc_id}" for doc_id in doc_ids}
+        cached = cache.get_many(keys.values())
+        found: dict[int, _CachedHighlight] = {
+            doc_id: cached[key] for doc_id, key in keys.items() if key in cached
+        }
+
+        missing_ids = [doc_id for doc_id in doc_ids if doc_id not in found]
+        if missing_ids:
+            generated = self._generate_highlights(query, missing_ids, search_mode)
+            cache.set_many(
+                {keys[doc_id]: value for doc_id, value in generated.items()},
+                CACHE_5_MINUTES,
+            )
+            found.update(generated)
+
+        return [
+            SearchHit(
+                id=doc_id,
+                score=found[doc_id].score,
+                rank=rank,
+                highlights=dict(found[doc_id].highlights),
+            )
+            for rank, doc_id in enumerate(doc_ids, start=rank_start)
+            if doc_id in found
+        ]
+
+    def index_generation(self) -> str:
+        """
+        Return an opaque token that changes whenever the index contents change.
+
+        For on-disk indexes this is a digest of Tantivy's ``meta.json``, which
+        is rewritten on every commit by any process and includes the (random)
+        segment ids, so tokens never repeat across rebuilds. In-memory indexes
+        combine a per-instance id with a local commit counter.
+        """
+        if self._path is not None:
+            try:
+                meta = (self._path / "meta.json").read_bytes()
+            except FileNotFoundError:  # pragma: no cover
+                meta = b""
+            return hashlib.blake2b(meta, digest_size=8).hexdigest()
+        return f"{self._instance_token}-{self._local_generation}"
+
+    def _highlight_cache_key_prefix(self, query: str, search_mode: SearchMode) -> str:
+        # The timezone and current date are part of the key because relative
+        # date queries (created:today) resolve differently across them.
+        tz = get_current_timezone()
+        raw = "\x00".join(
+            (
+                search_mode.value,
+                query,
+                str(tz),
+                datetime.now(tz).date().isoformat(),
+                self.index_generation(),
+            ),
+        )
+        digest = hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+        return f"search_highlights_{digest}"
+
+    def _generate_highlights(
+        self,
+        query: str,
+        doc_ids: list[int],
+        search_mode: SearchMode,
+    ) -> dict[int, _CachedHighlight]:
+        """Fetch scores and build snippets for ``doc_ids`` in a single search."""
         user_query = self._parse_query(query, search_mode)
         highlight_query = user_query
         if search_mode is SearchMode.TEXT:
             highlight_query = parse_simple_text_highlight_query(self._index, query)
 
-        # For notes_text snippet generation, we need a query that targets the
-        # notes_text field directly. user_query may contain JSON-field terms
-        # (e.g. notes.note:urgent) that the SnippetGenerator cannot resolve
-        # against a text field. Strip field:value prefixes so bare terms like
-        # "urgent" are re-parsed against notes_text, producing highlights even
-        # when the original query used structured syntax.
-        bare_query = re.sub(r"\w[\w.]*:", "", query).strip()
-        try:
-            notes_text_query = (
-                self._index.parse_query(bare_query, ["notes_text"])
-                if bare_query
-                else user_query
-            )
-        except Exception:
-            notes_text_query = user_query
-
         searcher = self._index.searcher()
 
         # Fetch all requested docs in a single search: user_query MUST match
@@ -701,22 +939,15 @@ class TantivyBackend:
 
         result_addrs = [addr for _score, addr in batch_results.hits]
         result_ids = cast("list[int]", searcher.fast_field_values("id", result_addrs))
-        addr_by_id: dict[int, tuple[float, tantivy.DocAddress]] = {
-            doc_id: (score, addr)
-            for (score, addr), doc_id in zip(batch_results.hits, result_ids)
-        }
 
+        # Both generators are created at most once and reused for every
+        # document on the page.
         snippet_generator = None
         notes_snippet_generator = None
-        hits: list[SearchHit] = []
-
-        for rank, doc_id in enumerate(doc_ids, start=rank_start):
-            if doc_id not in addr_by_id:
-                continue
+        generated: dict[int, _CachedHighlight] = {}
 
-            score, doc_address = addr_by_id[doc_id]
+        for (score, doc_address), doc_id in zip(batch_results.hits, result_ids):
             actual_doc = searcher.doc(doc_address)
-            doc_dict = actual_doc.to_dict()
 
             highlights: dict[str, str] = {}
             try:
@@ -732,13 +963,16 @@ class TantivyBackend:
                 if content_html:
                     highlights["content"] = content_html
 
-                if search_mode is SearchMode.QUERY and "notes_text" in doc_dict:
+                if (
+                    search_mode is SearchMode.QUERY
+                    and actual_doc.get_first("notes_text") is not None
+                ):
                     # Use notes_text (plain text) for snippet generation — tantivy's
                     # SnippetGenerator does not support JSON fields.
                     if notes_snippet_generator is None:
                         notes_snippet_generator = tantivy.SnippetGenerator.create(
                             searcher,
-                            notes_text_query,
+                            self._notes_text_query(query, user_query),
                             self._schema,
                             "notes_text",
                         )
@@ -751,16 +985,31 @@ class TantivyBackend:
             except Exception:  # pragma: no cover
                 logger.debug("Failed to generate highlights for doc %s", doc_id)
 
-            hits.append(
-                SearchHit(
-                    id=doc_id,
-                    score=score,
-                    rank=rank,
-                    highlights=highlights,
-                ),
-            )
+            generated[doc_id] = _CachedHighlight(score=score, highlights=highlights)
+
+        return generated
 
-        return hits
+    def _notes_text_query(
+        self,
+        query: str,
+        user_query: tantivy.Query,
+    ) -> tantivy.Query:
+        """
+        Build a query targeting ``notes_text`` for note snippet generation.
+
+        user_query may contain JSON-field terms (e.g. notes.note:urgent) that
+        the SnippetGenerator cannot resolve against a text field. Strip
+        field:value prefixes so bare terms like "urgent" are re-parsed against
+        notes_text, producing highlights even when the original query used
+        structured syntax.
+        """
+        bare_query = _FIELD_PREFIX_RE.sub("", query).strip()
+        if not bare_query:
+            return user_query
+        try:
+            return self._index.parse_query(bare_query, ["notes_text"])
+        except Exception:
+            return user_query
 
     def search_ids(
         self,
@@ -883,8 +1132,11 @@ class TantivyBackend:
         """
         Return IDs of documents similar to the given document — no highlights.
 
-        Lightweight companion to more_like_this(). The original document is
-        excluded from results.
+        Similarity is based on the signature stored with the reference
+        document at index time (see _similarity_signature): its top-weighted
+        terms become a single boolean query, so lookups cost one stored-field
+        read plus one search regardless of document length. The original
+        document is excluded from results.
 
         Args:
             doc_id: Primary key of the reference document
@@ -903,44 +1155,92 @@ class TantivyBackend:
         if not results.hits:
             return []
 
-        doc_address = results.hits[0][1]
-        mlt_query = tantivy.Query.more_like_this_query(
-            doc_address,
-            min_doc_frequency=1,
-            max_doc_frequency=None,
-            min_term_frequency=1,
-            max_query_terms=12,
-            min_word_length=None,
-            max_word_length=None,
-            boost_factor=None,
-        )
+        signature = searcher.doc(results.hits[0][1]).get_first("similarity_terms")
+        if not signature:
+            return []
 
-        final_query = self._apply_permission_filter(mlt_query, user)
+        subqueries: list[tuple[tantivy.Occur, tantivy.Query]] = [
+            (tantivy.Occur.Should, tantivy.Query.term_query(self._schema, field, term))
+            for term in signature.decode().split()
+            for field in _SIMILARITY_FIELDS
+        ]
+        subqueries.append((tantivy.Occur.MustNot, id_query))
+        similar_query = tantivy.Query.boolean_query(subqueries)
 
-        effective_limit = limit if limit is not None else searcher.num_docs
-        try:
-            # Fetch one extra to account for excluding the original document
-            results = searcher.search(final_query, limit=effective_limit + 1)
-        except BaseException:  # pragma: no cover
-            # Tantivy 0.26 panics in BM25 idf scoring when the index holds
-            # soft-deleted documents (doc_freq can exceed the alive doc count),
-            # which only surfaces for the More Like This query. The panic crosses
-            # the pyo3 boundary as a `pyo3_runtime.PanicException` — a
-            # BaseException, not an Exception — so catch BaseException and degrade
-            # to "no similar documents" instead of bubbling a 500 to the client.
-            # Fixed upstream: https://github.com/quickwit-oss/tantivy/pull/2964
-            # Remove once the bundled tantivy includes that fix.
-            logger.warning(
-                "More Like This scoring panicked (likely stale tantivy segment "
-                "stats after deletions); returning no results. A search index "
-                "reindex will rebuild consistent statistics.",
-            )
-            return []
+        final_query = self._apply_permission_filter(similar_query, user)
 
+        effective_limit = limit if limit is not None else searcher.num_docs
+        results = searcher.search(final_query, limit=effective_limit)
         addrs = [addr for _score, addr in results.hits]
-        all_ids = cast("list[int]", searcher.fast_field_values("id", addrs))
-        ids = [rid for rid in all_ids if rid != doc_id]
-        return ids[:limit] if limit is not None else ids
+        return cast("list[int]", searcher.fast_field_values("id", addrs))
+
+    def refresh_similarity_signatures(self) -> int:
+        """
+        Re-index documents whose More Like This signature has gone stale.
+
+        Signature weights are relative to the corpus size at the time they were
+        computed (stored as ``similarity_basis``). Documents indexed while the
+        corpus was less than half its current size are rebuilt so their terms
+        are re-ranked against current statistics. This includes every document
+        after a full rebuild, which starts from an empty index. Because the
+        threshold is relative, a document is refreshed only a logarithmic
+        number of times as the corpus grows.
+
+        Returns:
+            Number of documents refreshed
+        """
+        from documents.models import Document
+
+        self._ensure_open()
+        searcher = self._index.searcher()
+        num_docs = searcher.num_docs
+        if num_docs < 2:
+            return 0
+
+        stale_query = tantivy.Query.range_query(
+            self._schema,
+            "similarity_basis",
+            tantivy.FieldType.Unsigned,
+            0,
+            (num_docs - 1) // 2,
+        )
+        results = searcher.search(stale_query, limit=num_docs)
+        stale_ids = cast(
+            "list[int]",
+            searcher.fast_field_values("id", [addr for _score, addr in results.hits]),
+        )
+
+        documents = Document.objects.select_related(
+            "correspondent",
+            "document_type",
+            "storage_path",
+            "owner",
+        ).prefetch_related(
+            "tags",
+            "notes__user",
+            "custom_fields__field",
+            "versions",
+        )
+        refreshed = 0
+        # One writer transaction per chunk keeps the index lock free for
+        # consumption between chunks.
+        for id_chunk in chunked(sorted(stale_ids), _SIMILARITY_REFRESH_CHUNK_SIZE):
+            grants_by_pk = _bulk_get_viewer_permissions(id_chunk)
+            with self.batch_update() as batch:
+                for document in documents.filter(pk__in=id_chunk):
+                    grant = grants_by_pk.get(document.pk, _EMPTY_VIEWER_GRANT)
+                    batch.add_or_update_built(
+                        document.pk,
+                        self._build_tantivy_doc(
+                            document,
+                            document.get_effective_content(),
+                            viewer_ids=grant.viewer_ids,
+                            viewer_group_ids=grant.viewer_group_ids,
+                            searcher=batch.searcher,
+                        ),
+                    )
+                    refreshed += 1
+        return refreshed
 
     def batch_update(self, lock_timeout: float = 30.0) -> WriteBatch:
         """
@@ -996,12 +1296,14 @@ class TantivyBackend:
         old_index, old_schema = self._raw_index, self._raw_schema
         self._raw_index = new_index
         self._raw_schema = new_index.schema
+        self._clear_parsed_queries()
         # Stream documents one-by-one (so the progress bar advances per
         # document) while fetching viewer permissions one SQL query per chunk.
         # The stream is Sized, so iter_wrapper can still discover the total.
         documents_stream = _DocumentViewerStream(documents, chunk_size=1000)
         try:
             writer = new_index.writer(heap_size=writer_heap_bytes)
+            searcher = new_index.searcher()
             for document, (viewer_ids, viewer_group_ids) in iter_wrapper(
                 documents_stream,
             ):
@@ -1010,6 +1312,7 @@ class TantivyBackend:
                     document.get_effective_content(),
                     viewer_ids=viewer_ids,
                     viewer_group_ids=viewer_group_ids,
+                    searcher=searcher,
                 )
                 writer.add_document(doc)
             writer.commit()
@@ -1017,10 +1320,12 @@ class TantivyBackend:
             # fully merged and persisted before the index is considered rebuilt.
             writer.wait_merging_threads()
             new_index.reload()
+            self._local_generation += 1
         except BaseException:  # pragma: no cover
             # Restore old index on failure so the backend remains usable
             self._raw_index = old_index
             self._raw_schema = old_schema
+            self._clear_parsed_queries()
             raise
 
 
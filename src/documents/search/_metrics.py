@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import logging
+from typing import Final
+from typing import TypedDict
+
+from django.core.cache import cache
+
+logger = logging.getLogger("paperless.search")
+
+# Counters live in the default (Redis) cache so every web and Celery worker
+# contributes to the same totals. They never expire; they reset when the cache
+# is flushed, which is fine for monitoring purposes.
+INDEX_COMMITS_KEY: Final[str] = "search_index_commits"
+INDEX_COMMITTED_OPERATIONS_KEY: Final[str] = "search_index_committed_operations"
+INDEX_LOCK_ACQUISITIONS_KEY: Final[str] = "search_index_lock_acquisitions"
+INDEX_LOCK_WAIT_MS_KEY: Final[str] = "search_index_lock_wait_ms"
+
+
+class IndexWriterStats(TypedDict):
+    """Cumulative search index writer counters, shared across workers."""
+
+    commits: int
+    committed_operations: int
+    lock_acquisitions: int
+    lock_wait_seconds: float
+
+
+def _incr(key: str, delta: int) -> None:
+    # Metrics must never break an index write, so cache errors are swallowed.
+    try:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key, delta)
+    except Exception:  # pragma: no cover
+        logger.debug("Could not update search index metric %s", key)
+
+
+def record_commit(operations: int) -> None:
+    """Count one index writer commit covering ``operations`` adds/removes."""
+    _incr(INDEX_COMMITS_KEY, 1)
+    if operations:
+        _incr(INDEX_COMMITTED_OPERATIONS_KEY, operations)
+
+
+def record_lock_wait(seconds: float) -> None:
+    """Count one index lock acquisition attempt and the time spent waiting."""
+    _incr(INDEX_LOCK_ACQUISITIONS_KEY, 1)
+    _incr(INDEX_LOCK_WAIT_MS_KEY, round(seconds * 1000))
+
+
+def get_index_writer_stats() -> IndexWriterStats:
+    """Return the cumulative index writer counters."""
+    values = cache.get_many(
+        [
+            INDEX_COMMITS_KEY,
+            INDEX_COMMITTED_OPERATIONS_KEY,
+            INDEX_LOCK_ACQUISITIONS_KEY,
+            INDEX_LOCK_WAIT_MS_KEY,
+        ],
+    )
+    return IndexWriterStats(
+        commits=values.get(INDEX_COMMITS_KEY, 0),
+        committed_operations=values.get(INDEX_COMMITTED_OPERATIONS_KEY, 0),
+        lock_acquisitions=values.get(INDEX_LOCK_ACQUISITIONS_KEY, 0),
+        lock_wait_seconds=values.get(INDEX_LOCK_WAIT_MS_KEY, 0) / 1000,
+    )
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import logging
+import math
+import pickle
+import time
+import uuid
+from typing import TYPE_CHECKING
+from typing import Final
+from typing import NamedTuple
+
+import filelock
+from django.conf import settings
+
+from documents.search._backend import _LOCK_RETRY_ATTEMPTS
+from documents.search._backend import SearchIndexLockError
+from documents.search._backend import WriteBatch
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import tantivy
+
+    from documents.search._backend import TantivyBackend
+
+logger = logging.getLogger("paperless.search")
+
+SPOOL_DIR_NAME: Final[str] = ".pending"
+_ENTRY_SUFFIX: Final[str] = ".pending"
+_POLL_INTERVAL_SECONDS: Final[float] = 0.05
+
+
+class PendingIndexOp(NamedTuple):
+    """A single queued index write: an upsert, or a removal when ``document`` is None."""
+
+    doc_id: int
+    document: tantivy.Document | None
+
+
+class _AlreadyCommitted(Exception):
+    """Internal signal: another writer committed our entry, nothing left to do."""
+
+
+class _CoalescingWriteBatch(WriteBatch):
+    """
+    WriteBatch that stops waiting for the index lock once its ticket is gone.
+
+    Instead of sleeping through long backoff intervals, the lock is polled in
+    short slices. Between slices the ticket file is checked: if it has been
+    removed, the current lock holder already drained and committed it.
+
+    The tickets drained into the batch are deleted once it is committed, before
+    the lock is released, so no other writer commits them again. A failed
+    commit leaves them for the next writer.
+    """
+
+    def __init__(
+        self,
+        backend: TantivyBackend,
+        lock_timeout: float,
+        ticket: Path,
+    ) -> None:
+        super().__init__(backend, lock_timeout)
+        self._ticket = ticket
+        self.drained: list[Path] = []
+
+    def _on_commit(self) -> None:
+        for path in self.drained:
+            path.unlink(missing_ok=True)
+
+    def _acquire_lock(self, lock: filelock.FileLock) -> None:
+        total_timeout = self._lock_timeout * _LOCK_RETRY_ATTEMPTS
+        for _ in range(math.ceil(total_timeout / _POLL_INTERVAL_SECONDS)):
+            if not self._ticket.exists():
+                raise _AlreadyCommitted
+            try:
+                lock.acquire(timeout=_POLL_INTERVAL_SECONDS)
+                return
+            except filelock.Timeout:
+                continue
+        raise SearchIndexLockError(
+            f"Could not acquire index lock within {total_timeout}s",
+        )
+
+
+class IndexUpdateQueue:
+    """
+    Group commit for single-document index writes.
+
+    Every caller spools its already-built Tantivy document (or removal) as a
+    ticket file under ``INDEX_DIR/.pending`` and then competes for the index
+    lock. Whoever wins drains *all* spooled tickets, keeps the newest op per
+    document and commits them in one writer transaction. Callers still waiting
+    notice that their ticket was drained and return without opening a writer,
+    so a burst of N saves across any number of workers costs far fewer than
+    N commits and lock hand-offs.
+
+    Tickets carry the fully built document rather than just an ID because the
+    saving worker may still be inside a database transaction that other
+    workers cannot see yet.
+
+    ``settings.SEARCH_INDEX_COALESCE_WINDOW`` adds an optional delay between
+    spooling and competing for the lock, trading write latency for larger
+    batches.
+    """
+
+    def __init__(self, backend: TantivyBackend, index_dir: Path) -> None:
+        self._backend = backend
+        self._spool_dir = index_dir / SPOOL_DIR_NAME
+
+    def submit(
+        self,
+        op: PendingIndexOp,
+        lock_timeout: float,
+    ) -> None:
+        """
+        Spool ``op`` and return once it has been committed by some writer.
+
+        Raises:
+            SearchIndexLockError: If the lock could not be acquired and no
+                other writer committed the op in the meantime. The ticket is
+                withdrawn so a deferred retry cannot be overtaken by it.
+        """
+        ticket = self._write_ticket(op)
+
+        window = settings.SEARCH_INDEX_COALESCE_WINDOW
+        if window > 0:
+            time.sleep(window)
+
+        try:
+            with _CoalescingWriteBatch(self._backend, lock_timeout, ticket) as batch:
+                batch.drained = self._drain_into(batch)
+        except _AlreadyCommitted:
+            return
+        except SearchIndexLockError:
+            ticket.unlink(missing_ok=True)
+            raise
+
+    def pending_count(self) -> int:
+        """Number of spooled tickets not yet committed."""
+        if not self._spool_dir.is_dir():
+            return 0
+        return sum(1 for _ in self._spool_dir.glob(f"*{_ENTRY_SUFFIX}"))
+
+    def _write_ticket(self, op: PendingIndexOp) -> Path:
+        self._spool_dir.mkdir(parents=True, exist_ok=True)
+        # Nanosecond timestamp prefix keeps tickets in submission order when
+        # sorted by name; the uuid keeps concurrent submitters apart.
+        name = f"{time.time_ns():020d}-{uuid.uuid4().hex}"
+        tmp_path = self._spool_dir / f"{name}.tmp"
+        ticket = self._spool_dir / f"{name}{_ENTRY_SUFFIX}"
+        tmp_path.write_bytes(pickle.dumps(op))
+        # Atomic rename: a writer never observes a half-written ticket.
+        tmp_path.replace(ticket)
+        return ticket
+
+    def _drain_into(self, batch: WriteBatch) -> list[Path]:
+        """Apply every spooled ticket to ``batch``; return the ticket paths used."""
+        tickets = sorted(self._spool_dir.glob(f"*{_ENTRY_SUFFIX}"))
+        latest: dict[int, PendingIndexOp] = {}
+        for path in tickets:
+            try:
+                op: PendingIndexOp = pickle.loads(path.read_bytes())
+            except FileNotFoundError:  # pragma: no cover
+                continue
+            except Exception:  # pragma: no cover
+                logger.warning("Discarding unreadable index queue entry %s", path)
+                continue
+            # Later tickets supersede earlier ones for the same document.
+            latest[op.doc_id] = op
+
+        if not latest:
+            raise _AlreadyCommitted
+
+        for op in latest.values():
+            if op.document is None:
+                batch.remove(op.doc_id)
+            else:
+                batch.add_or_update_built(op.doc_id, op.document)
+
+        if len(tickets) > 1:
+            logger.debug(
+                "Coalesced %d queued index writes into one commit (%d documents)",
+                len(tickets),
+                len(latest),
+            )
+        return tickets
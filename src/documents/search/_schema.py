@@ -16,7 +16,8 @@ if TYPE_CHECKING:
 logger = logging.getLogger("paperless.search")
 
 # v1 - Initial tantivy schema format
-SCHEMA_VERSION: Final[int] = 1
+# v2 - Precomputed similarity signature (similarity_terms, similarity_basis)
+SCHEMA_VERSION: Final[int] = 2
 
 
 def build_schema() -> tantivy.Schema:
@@ -106,6 +107,13 @@ def build_schema() -> tantivy.Schema:
     ):
         sb.add_unsigned_field(field, stored=False, indexed=True, fast=True)
 
+    # More Like This signature: the document's top-weighted terms, computed at
+    # index time and read back (stored, never searched) to build the lookup.
+    # similarity_basis records the corpus size the weights were computed
+    # against, so stale signatures can be found with a range query.
+    sb.add_bytes_field("similarity_terms", stored=True)
+    sb.add_unsigned_field("similarity_basis", stored=False, indexed=True, fast=True)
+
     for field in ("created", "modified", "added"):
         sb.add_date_field(field, stored=True, indexed=True, fast=True)
 
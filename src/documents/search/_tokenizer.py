@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import logging
 from typing import Final
 
@@ -100,6 +101,16 @@ def _paperless_text(language: str | None) -> tantivy.TextAnalyzer:
     return builder.build()
 
 
+@functools.cache
+def _content_analyzer(language: str | None) -> tantivy.TextAnalyzer:
+    return _paperless_text(language)
+
+
+def content_tokens(text: str, language: str | None) -> list[str]:
+    """Tokenize text exactly as the content field is indexed (stemmed, folded)."""
+    return _content_analyzer(language).analyze(text)
+
+
 def _simple_analyzer() -> tantivy.TextAnalyzer:
     """Tokenizer for shadow sort fields (title_sort, correspondent_sort, type_sort): simple -> lowercase -> ascii_fold."""
     return (
@@ -426,6 +426,21 @@ _UNIT_ALIASES: dict[str, str] = {
 }
 
 
+# Conservative pre-check for queries whose translation depends on the current
+# instant ("now", "now-7d", "-1 week", ...), as opposed to only the current day
+# (keywords like "today" or "previous month"). May match plain words too; a
+# false positive only means the translation is not reused.
+_CURRENT_TIME_RE = regex.compile(
+    r"\bnow\b|(?:^|[\s\[{:])[+-]\d",
+    regex.IGNORECASE,
+)
+
+
+def depends_on_current_time(raw: str) -> bool:
+    """Return True if translating ``raw`` may resolve a bound to the current instant."""
+    return bool(_CURRENT_TIME_RE.search(raw))
+
+
 def _resolve_relative_bound(token: str) -> datetime | None:
     """
     Resolve a relative bound token to an exact UTC instant, or return None.
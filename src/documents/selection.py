@@ -0,0 +1,184 @@
+"""
+In-memory facet index for the bulk editor's selection data.
+
+For every correspondent, document type, storage path, tag and custom field
+the index holds the set of document ids using it, either as a bitmap (a
+Python int with bit ``n`` set for document ``n``) or, for facets used by
+only a few documents, as a sorted array of ids. Counting the documents of a
+selection per facet then becomes a bitwise AND plus a popcount instead of
+five queries carrying the whole selection as an ``IN`` list.
+
+The index is built once per process and rebuilt whenever the selection
+generation (see ``documents.caching``) changes. Unlike the statistics
+generation it only changes when a document gains or loses one of these
+facets, so edits to titles, content, notes or permissions keep the index.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from array import array
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from typing import Final
+
+from documents.caching import get_selection_generation
+from documents.models import CustomFieldInstance
+from documents.models import Document
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from collections.abc import Sequence
+
+logger = logging.getLogger("paperless.selection")
+
+# Smaller selections are counted by the database; building or refreshing the
+# index would cost more than it saves.
+MIN_INDEXED_SELECTION: Final[int] = 5_000
+
+# A facet is stored as an id array instead of a bitmap when a bitmap would
+# spend more than this many bits per document it contains.
+_SPARSE_BITS_PER_DOCUMENT: Final[int] = 64
+
+FacetMembers = int | array
+
+_index: SelectionIndex | None = None
+_index_generation: str | None = None
+_index_lock = threading.Lock()
+
+
+def _bitmap(ids: Iterable[int]) -> int:
+    ids = list(ids)
+    if not ids:
+        return 0
+    bits = bytearray((max(ids) >> 3) + 1)
+    for doc_id in ids:
+        bits[doc_id >> 3] |= 1 << (doc_id & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _facet_members(ids: list[int]) -> FacetMembers:
+    if max(ids) > len(ids) * _SPARSE_BITS_PER_DOCUMENT:
+        return array("l", sorted(set(ids)))
+    return _bitmap(ids)
+
+
+@dataclass(frozen=True, slots=True)
+class Selection:
+    """A set of selected document ids, in the two forms facets are counted with."""
+
+    bitmap: int
+    bits: bytes
+
+    @classmethod
+    def from_ids(cls, document_ids: Sequence[int]) -> Selection:
+        bitmap = _bitmap(document_ids)
+        return cls(bitmap, bitmap.to_bytes((bitmap.bit_length() + 7) >> 3, "little"))
+
+    def count(self, members: FacetMembers) -> int:
+        if isinstance(members, int):
+            return (members & self.bitmap).bit_count()
+        bits = self.bits
+        size = len(bits)
+        return sum(
+            1
+            for doc_id in members
+            if (doc_id >> 3) < size and bits[doc_id >> 3] >> (doc_id & 7) & 1
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class SelectionIndex:
+    correspondents: dict[int, FacetMembers]
+    document_types: dict[int, FacetMembers]
+    storage_paths: dict[int, FacetMembers]
+    tags: dict[int, FacetMembers]
+    custom_fields: dict[int, FacetMembers]
+
+    @classmethod
+    def build(cls) -> SelectionIndex:
+        correspondents: defaultdict[int, list[int]] = defaultdict(list)
+        document_types: defaultdict[int, list[int]] = defaultdict(list)
+        storage_paths: defaultdict[int, list[int]] = defaultdict(list)
+        for doc_id, correspondent_id, document_type_id, storage_path_id in (
+            Document.global_objects.order_by()
+            .values_list(
+                "id",
+                "correspondent_id",
+                "document_type_id",
+                "storage_path_id",
+            )
+            .iterator(chunk_size=10_000)
+        ):
+            if correspondent_id is not None:
+                correspondents[correspondent_id].append(doc_id)
+            if document_type_id is not None:
+                document_types[document_type_id].append(doc_id)
+            if storage_path_id is not None:
+                storage_paths[storage_path_id].append(doc_id)
+
+        tags: defaultdict[int, list[int]] = defaultdict(list)
+        for doc_id, tag_id in (
+            Document.tags.through.objects.order_by()
+            .values_list("document_id", "tag_id")
+            .iterator(chunk_size=10_000)
+        ):
+            tags[tag_id].append(doc_id)
+
+        custom_fields: defaultdict[int, list[int]] = defaultdict(list)
+        for doc_id, field_id in (
+            CustomFieldInstance.objects.order_by()
+            .values_list("document_id", "field_id")
+            .iterator(chunk_size=10_000)
+        ):
+            custom_fields[field_id].append(doc_id)
+
+        return cls(
+            *(
+                {pk: _facet_members(ids) for pk, ids in facet.items()}
+                for facet in (
+                    correspondents,
+                    document_types,
+                    storage_paths,
+                    tags,
+                    custom_fields,
+                )
+            ),
+        )
+
+    def count(self, document_ids: Sequence[int]) -> dict[str, dict[int, int]]:
+        """
+        Return the number of selected documents per facet, keyed by the
+        facet's name and primary key. Facets without selected documents are
+        left out.
+        """
+        selection = Selection.from_ids(document_ids)
+        result = {}
+        for name in (
+            "correspondents",
+            "document_types",
+            "storage_paths",
+            "tags",
+            "custom_fields",
+        ):
+            counts = {}
+            for pk, members in getattr(self, name).items():
+                if count := selection.count(members):
+                    counts[pk] = count
+            result[name] = counts
+        return result
+
+
+def get_selection_index() -> SelectionIndex:
+    """Return the facet index for the current selection generation."""
+    global _index, _index_generation
+
+    generation = get_selection_generation()
+    with _index_lock:
+        if _index is None or _index_generation != generation:
+            logger.debug("Building selection facet index")
+            _index = SelectionIndex.build()
+            _index_generation = generation
+        return _index
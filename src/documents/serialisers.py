@@ -79,10 +79,13 @@ from documents.models import WorkflowTrigger
 from documents.parsers import is_mime_type_supported
 from documents.permissions import get_document_count_filter_for_user
 from documents.permissions import get_groups_with_only_permission
+from documents.permissions import get_object_permissions_context
 from documents.permissions import has_perms_owner_aware
 from documents.permissions import permitted_document_ids
 from documents.permissions import set_permissions_for_object
 from documents.regex import validate_regex_pattern
+from documents.tag_hierarchy import get_ancestor_ids
+from documents.tag_hierarchy import get_descendant_ids
 from documents.templating.filepath import validate_filepath_template_and_render
 from documents.templating.utils import convert_format_str_to_template_format
 from documents.validators import uri_validator
@@ -391,7 +394,7 @@ class OwnedObjectSerializer(
         }
 
     def get_user_can_change(self, obj) -> bool:
-        if obj.owner is None or obj.owner == self.user:
+        if obj.owner_id is None or obj.owner_id == getattr(self.user, "pk", None):
             return True
         if self.user is None:
             return False
@@ -458,7 +461,9 @@ class OwnedObjectSerializer(
         # If not just check if the current object is shared.
         if shared_object_pks is None:
             shared_object_pks = self.get_shared_object_pks([obj])
-        return obj.owner == self.user and obj.id in shared_object_pks
+        return obj.owner_id == getattr(self.user, "pk", None) and (
+            obj.id in shared_object_pks
+        )
 
     permissions = SerializerMethodField(read_only=True, required=False)
     user_can_change = SerializerMethodField(read_only=True, required=False)
@@ -529,9 +534,15 @@ class OwnedObjectSerializer(
 
 class OwnedObjectListSerializer(serializers.ListSerializer[Any]):
     def to_representation(self, documents):
-        self.child.context["shared_object_pks"] = self.child.get_shared_object_pks(
-            documents,
-        )
+        # BulkPermissionMixin usually loaded the sharing state of the page
+        # along with its permissions already
+        loaded_pks = self.child.context.get("users_view_perms", {})
+        if "shared_object_pks" not in self.child.context or any(
+            obj.pk not in loaded_pks for obj in documents
+        ):
+            self.child.context["shared_object_pks"] = self.child.get_shared_object_pks(
+                documents,
+            )
         return super().to_representation(documents)
 
 
@@ -760,6 +771,25 @@ class StoragePathField(serializers.PrimaryKeyRelatedField[StoragePath]):
         return StoragePath.objects.all()
 
 
+# Length of the content of documents in responses with truncate_content set
+TRUNCATED_CONTENT_LENGTH = 550
+
+
+class DocumentContentField(serializers.CharField):
+    """
+    Document content, read from the ``truncated_content`` or
+    ``effective_content`` annotation when the queryset has one. List querysets
+    can then leave out the ``content`` column.
+    """
+
+    def get_attribute(self, instance):
+        if hasattr(instance, "truncated_content"):
+            return getattr(instance, "truncated_content") or ""
+        if hasattr(instance, "effective_content"):
+            return getattr(instance, "effective_content") or ""
+        return super().get_attribute(instance)
+
+
 class CustomFieldSerializer(serializers.ModelSerializer[CustomField]):
     data_type = serializers.ChoiceField(
         choices=CustomField.FieldDataType,
@@ -1048,6 +1078,12 @@ class DocumentSerializer(
     tags = TagsField(many=True)
     document_type = DocumentTypeField(allow_null=True)
     storage_path = StoragePathField(allow_null=True)
+    content = DocumentContentField(
+        required=False,
+        allow_blank=True,
+        help_text=Document._meta.get_field("content").help_text,
+        style={"base_template": "textarea.html"},
+    )
 
     original_file_name = SerializerMethodField()
     archived_file_name = SerializerMethodField()
@@ -1142,10 +1178,8 @@ class DocumentSerializer(
 
     def to_representation(self, instance):
         doc = super().to_representation(instance)
-        if "content" in self.fields and hasattr(instance, "effective_content"):
-            doc["content"] = getattr(instance, "effective_content") or ""
         if self.truncate_content and "content" in self.fields:
-            doc["content"] = doc.get("content")[0:550]
+            doc["content"] = doc.get("content")[0:TRUNCATED_CONTENT_LENGTH]
         return doc
 
     def to_internal_value(self, data):
@@ -1210,24 +1244,20 @@ class DocumentSerializer(
             # Respect tag hierarchy on updates:
             # - Adding a child adds its ancestors
             # - Removing a parent removes all its descendants
-            prev_tags = set(instance.tags.all())
-            requested_tags = set(validated_data["tags"])
+            prev_tag_ids = set(instance.tags.values_list("pk", flat=True))
+            requested_tag_ids = {t.pk for t in validated_data["tags"]}
 
             # Tags being removed in this update and all descendants
-            removed_tags = prev_tags - requested_tags
-            blocked_tags = set(removed_tags)
-            for t in removed_tags:
-                blocked_tags.update(t.get_descendants())
+            removed_tag_ids = prev_tag_ids - requested_tag_ids
+            blocked_tag_ids = removed_tag_ids | get_descendant_ids(removed_tag_ids)
 
             # Add all parent tags
-            final_tags = set(requested_tags)
-            for t in requested_tags:
-                final_tags.update(t.get_ancestors())
+            final_tag_ids = requested_tag_ids | get_ancestor_ids(requested_tag_ids)
 
             # Drop removed parents and their descendants
-            final_tags.difference_update(blocked_tags)
+            final_tag_ids.difference_update(blocked_tag_ids)
 
-            validated_data["tags"] = list(final_tags)
+            validated_data["tags"] = list(Tag.objects.filter(pk__in=final_tag_ids))
         if validated_data.get("remove_inbox_tags"):
             tag_ids_being_added = (
                 [
@@ -1318,9 +1348,10 @@ class SearchResultListSerializer(serializers.ListSerializer[Document]):
         # Fetch all Document objects in the list in one SQL query.
         documents = self.child.fetch_documents(document_ids)
         self.child.context["documents"] = documents
-        # Also check if they are shared with other users / groups.
-        self.child.context["shared_object_pks"] = self.child.get_shared_object_pks(
-            documents.values(),
+        # Also load their permissions and whether they are shared with other
+        # users / groups.
+        self.child.context.update(
+            get_object_permissions_context(Document, documents.values()),
         )
 
         return super().to_representation(hits)
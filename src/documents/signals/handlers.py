@@ -23,15 +23,20 @@ from django.db import DatabaseError
 from django.db import close_old_connections
 from django.db import connections
 from django.db import models
+from django.db import transaction
 from django.db.models import Q
 from django.dispatch import receiver
 from django.utils import timezone
 from filelock import FileLock
+from guardian.models import GroupObjectPermission
+from guardian.models import UserObjectPermission
 from rest_framework import serializers
 
 from documents import matching
 from documents.caching import clear_document_caches
 from documents.caching import invalidate_llm_suggestions_cache
+from documents.caching import invalidate_selection_index
+from documents.caching import invalidate_statistics_cache
 from documents.data_models import ConsumableDocument
 from documents.file_handling import create_source_path_directory
 from documents.file_handling import delete_empty_directories
@@ -51,8 +56,11 @@ from documents.models import Workflow
 from documents.models import WorkflowAction
 from documents.models import WorkflowRun
 from documents.models import WorkflowTrigger
+from documents.permissions import add_document_permission_grant
 from documents.permissions import get_objects_for_user_owner_aware
+from documents.permissions import remove_document_permission_grant
 from documents.plugins.helpers import DocumentsStatusManager
+from documents.tag_hierarchy import sync_tag_closure
 from documents.templating.utils import convert_format_str_to_template_format
 from documents.utils import compute_checksum
 from documents.workflows.actions import build_workflow_action_context
@@ -76,6 +84,16 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger("paperless.handlers")
 DRF_DATETIME_FIELD = serializers.DateTimeField()
+SELECTION_FACET_FIELDS = frozenset(
+    (
+        "correspondent",
+        "correspondent_id",
+        "document_type",
+        "document_type_id",
+        "storage_path",
+        "storage_path_id",
+    ),
+)
 
 
 def add_inbox_tags(sender, document: Document, logging_group=None, **kwargs) -> None:
@@ -436,6 +454,10 @@ def update_filename_and_move_files(
     instance: Document | CustomFieldInstance,
     **kwargs,
 ) -> None:
+    if kwargs.get("skip_file_move"):
+        # Moved already, together with the other documents of a bulk update
+        return
+
     if isinstance(instance, CustomFieldInstance):
         if not _filename_template_uses_custom_fields(instance.document):
             return
@@ -791,6 +813,138 @@ def cleanup_user_deletion(sender, instance: User | Group, **kwargs) -> None:
             )
 
 
+# Loaded fixtures (raw saves) are skipped; document_importer repairs the
+# materialized grants once all data is in place.
+@receiver(models.signals.post_save, sender=UserObjectPermission)
+@receiver(models.signals.post_save, sender=GroupObjectPermission)
+def materialize_document_permission(
+    sender,
+    instance: UserObjectPermission | GroupObjectPermission,
+    *,
+    raw: bool = False,
+    **kwargs,
+) -> None:
+    """
+    Keep DocumentPermissionGrant in sync when guardian grants a permission.
+    """
+    if raw:
+        return
+    add_document_permission_grant(instance)
+
+
+@receiver(models.signals.post_delete, sender=UserObjectPermission)
+@receiver(models.signals.post_delete, sender=GroupObjectPermission)
+def dematerialize_document_permission(
+    sender,
+    instance: UserObjectPermission | GroupObjectPermission,
+    **kwargs,
+) -> None:
+    """
+    Keep DocumentPermissionGrant in sync when guardian revokes a permission.
+    """
+    remove_document_permission_grant(instance)
+
+
+# Loaded fixtures (raw saves) are skipped; document_importer rebuilds the
+# closure once all tags are in place.
+@receiver(models.signals.post_save, sender=Tag)
+def update_tag_closure(sender, instance: Tag, *, raw: bool = False, **kwargs) -> None:
+    """
+    Keep TagClosure in sync when a tag is created or moved in the hierarchy.
+    """
+    if raw:
+        return
+    sync_tag_closure(instance)
+
+
+@receiver(models.signals.post_save, sender=Document)
+@receiver(models.signals.post_delete, sender=Document)
+@receiver(models.signals.m2m_changed, sender=Document.tags.through)
+@receiver(models.signals.post_save, sender=Tag)
+@receiver(models.signals.post_delete, sender=Tag)
+@receiver(models.signals.post_save, sender=Correspondent)
+@receiver(models.signals.post_delete, sender=Correspondent)
+@receiver(models.signals.post_save, sender=DocumentType)
+@receiver(models.signals.post_delete, sender=DocumentType)
+@receiver(models.signals.post_save, sender=StoragePath)
+@receiver(models.signals.post_delete, sender=StoragePath)
+@receiver(models.signals.post_save, sender=CustomFieldInstance)
+@receiver(models.signals.post_delete, sender=CustomFieldInstance)
+@receiver(models.signals.post_delete, sender=CustomField)
+@receiver(models.signals.post_save, sender=UserObjectPermission)
+@receiver(models.signals.post_delete, sender=UserObjectPermission)
+@receiver(models.signals.post_save, sender=GroupObjectPermission)
+@receiver(models.signals.post_delete, sender=GroupObjectPermission)
+@receiver(models.signals.m2m_changed, sender=User.groups.through)
+def invalidate_statistics(sender, **kwargs) -> None:
+    """
+    Discard the cached dashboard statistics whenever something they count, or
+    the permissions deciding who sees it, changes.
+    """
+    invalidate_statistics_cache()
+    # Once more after commit: a reader may have cached the not yet committed
+    # state under the new generation in between.
+    transaction.on_commit(invalidate_statistics_cache)
+
+
+@receiver(models.signals.pre_save, sender=Document)
+def detect_selection_facet_change(
+    sender,
+    instance: Document,
+    *,
+    raw: bool = False,
+    update_fields: frozenset[str] | None = None,
+    **kwargs,
+) -> None:
+    """
+    Note on the document whether this save changes its correspondent, document
+    type or storage path, the document fields the selection facet index holds.
+    """
+    if update_fields is not None:
+        changed = not update_fields.isdisjoint(SELECTION_FACET_FIELDS)
+    elif raw or instance.pk is None:
+        changed = True
+    else:
+        attnames = ("correspondent_id", "document_type_id", "storage_path_id")
+        saved = (
+            Document.global_objects.values_list(*attnames)
+            .filter(pk=instance.pk)
+            .first()
+        )
+        changed = saved != tuple(getattr(instance, attname) for attname in attnames)
+    instance._selection_facets_changed = changed
+
+
+@receiver(models.signals.post_save, sender=Document)
+@receiver(models.signals.post_delete, sender=Document)
+@receiver(models.signals.m2m_changed, sender=Document.tags.through)
+@receiver(models.signals.post_delete, sender=Tag)
+@receiver(models.signals.post_delete, sender=Correspondent)
+@receiver(models.signals.post_delete, sender=DocumentType)
+@receiver(models.signals.post_delete, sender=StoragePath)
+@receiver(models.signals.post_save, sender=CustomFieldInstance)
+@receiver(models.signals.post_delete, sender=CustomFieldInstance)
+def invalidate_selection(sender, instance=None, **kwargs) -> None:
+    """
+    Discard the selection facet index whenever a document gains or loses a
+    correspondent, document type, storage path, tag or custom field. Deleting
+    one of those objects detaches it from its documents without signals of
+    their own.
+    """
+    if kwargs.get("action", "").startswith("pre_"):
+        return
+    if kwargs.get("created") is False and not getattr(
+        instance,
+        "_selection_facets_changed",
+        False,
+    ):
+        # Updated custom field values, or a document save that kept its facets
+        return
+    invalidate_selection_index()
+    # Once more after commit, as for the statistics
+    transaction.on_commit(invalidate_selection_index)
+
+
 def add_to_index(sender, document, **kwargs) -> None:
     from documents.search import get_backend
 
@@ -822,6 +976,8 @@ def run_workflows_updated(
     logging_group: uuid.UUID | None = None,
     **kwargs,
 ) -> None:
+    if kwargs.get("skip_workflows"):
+        return
     run_workflows(
         trigger_type=WorkflowTrigger.WorkflowTriggerType.DOCUMENT_UPDATED,
         document=document,
@@ -834,6 +990,8 @@ def send_websocket_document_updated(
     document: Document,
     **kwargs,
 ) -> None:
+    if kwargs.get("skip_websocket"):
+        return
     # At this point, workflows may already have applied additional changes.
     document.refresh_from_db()
 
@@ -891,23 +1049,29 @@ def run_workflows(
     messages = []
 
     workflows = get_workflows_for_trigger(trigger_type, workflow_to_run)
+    evaluator = matching.WorkflowTriggerEvaluator(trigger_type)
+    needs_refresh = True
 
     for workflow in workflows:
         if not use_overrides:
             if TYPE_CHECKING:
                 assert isinstance(document, Document)
-            try:
-                # This can be called from bulk_update_documents, which may be running multiple times
-                # Refresh this so the matching data is fresh and instance fields are re-freshed
-                # Otherwise, this instance might be behind and overwrite the work another process did
-                document.refresh_from_db()
-            except Document.DoesNotExist:
-                # Document was hard deleted by a previous workflow or another process
-                logger.info(
-                    "Document no longer exists, skipping remaining workflows",
-                    extra={"group": logging_group},
-                )
-                break
+            if needs_refresh:
+                try:
+                    # This can be called from bulk_update_documents, which may be running multiple times
+                    # Refresh this so the matching data is fresh and instance fields are re-freshed
+                    # Otherwise, this instance might be behind and overwrite the work another process did
+                    # Only needed again once the actions of a matching workflow have run
+                    document.refresh_from_db()
+                except Document.DoesNotExist:
+                    # Document was hard deleted by a previous workflow or another process
+                    logger.info(
+                        "Document no longer exists, skipping remaining workflows",
+                        extra={"group": logging_group},
+                    )
+                    break
+                evaluator.forget(document)
+                needs_refresh = False
 
             # Check if document was soft deleted (moved to trash)
             if document.is_deleted:
@@ -917,7 +1081,8 @@ def run_workflows(
                 )
                 break
 
-        if matching.document_matches_workflow(document, workflow, trigger_type):
+        if evaluator.matches(document, workflow):
+            needs_refresh = True
             action: WorkflowAction
             has_move_to_trash_action = False
             for action in workflow.actions.order_by("order", "pk"):
@@ -0,0 +1,124 @@
+"""
+Ancestor and descendant lookups for the tag hierarchy, backed by TagClosure.
+
+The tree itself is owned by django-treenode (``Tag.tn_parent``); TagClosure
+mirrors it so that hierarchy questions about many tags at once can be
+answered with one indexed query instead of per-tag lookups.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+from django.db import transaction
+
+from documents.models import Tag
+from documents.models import TagClosure
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+logger = logging.getLogger("paperless.tags")
+
+_BATCH_SIZE = 1000
+
+
+def get_ancestor_ids(tag_ids: Iterable[int]) -> set[int]:
+    """Return the ids of all ancestors of the given tags, excluding the tags themselves."""
+    tag_ids = set(tag_ids)
+    if not tag_ids:
+        return set()
+    return set(
+        TagClosure.objects.filter(descendant_id__in=tag_ids, depth__gt=0).values_list(
+            "ancestor_id",
+            flat=True,
+        ),
+    )
+
+
+def get_descendant_ids(tag_ids: Iterable[int]) -> set[int]:
+    """Return the ids of all descendants of the given tags, excluding the tags themselves."""
+    tag_ids = set(tag_ids)
+    if not tag_ids:
+        return set()
+    return set(
+        TagClosure.objects.filter(ancestor_id__in=tag_ids, depth__gt=0).values_list(
+            "descendant_id",
+            flat=True,
+        ),
+    )
+
+
+def sync_tag_closure(tag: Tag) -> None:
+    """
+    Bring TagClosure up to date after ``tag`` was saved.
+
+    A new tag gets its own rows; a tag whose parent changed has the rows of its
+    subtree rewritten. Other saves, which do not touch the hierarchy, cost a
+    single query.
+    """
+    own_rows = dict(
+        TagClosure.objects.filter(descendant=tag, depth__lte=1).values_list(
+            "depth",
+            "ancestor_id",
+        ),
+    )
+    if 0 in own_rows and own_rows.get(1) == tag.tn_parent_id:
+        return
+
+    with transaction.atomic():
+        if 0 in own_rows:
+            subtree = list(
+                TagClosure.objects.filter(ancestor=tag).values_list(
+                    "descendant_id",
+                    "depth",
+                ),
+            )
+            subtree_ids = [descendant_id for descendant_id, _depth in subtree]
+            # Detach the subtree from its old ancestors, keep its inner rows
+            TagClosure.objects.filter(descendant_id__in=subtree_ids).exclude(
+                ancestor_id__in=subtree_ids,
+            ).delete()
+        else:
+            subtree = [(tag.pk, 0)]
+            TagClosure.objects.create(ancestor=tag, descendant=tag, depth=0)
+
+        if tag.tn_parent_id is None:
+            return
+        new_ancestors = TagClosure.objects.filter(
+            descendant_id=tag.tn_parent_id,
+        ).values_list("ancestor_id", "depth")
+        TagClosure.objects.bulk_create(
+            (
+                TagClosure(
+                    ancestor_id=ancestor_id,
+                    descendant_id=descendant_id,
+                    depth=ancestor_depth + descendant_depth + 1,
+                )
+                for ancestor_id, ancestor_depth in new_ancestors
+                for descendant_id, descendant_depth in subtree
+            ),
+            batch_size=_BATCH_SIZE,
+        )
+
+
+def rebuild_tag_closure() -> None:
+    """Recreate TagClosure from scratch, e.g. after tags were bulk loaded."""
+    parents = dict(Tag.objects.values_list("pk", "tn_parent_id"))
+    rows = []
+    for tag_id in parents:
+        ancestor_id: int | None = tag_id
+        depth = 0
+        # The depth bound guards against a cyclic tree in a damaged database
+        while ancestor_id is not None and depth <= len(parents):
+            rows.append(
+                TagClosure(ancestor_id=ancestor_id, descendant_id=tag_id, depth=depth),
+            )
+            ancestor_id = parents.get(ancestor_id)
+            depth += 1
+
+    with transaction.atomic():
+        TagClosure.objects.all().delete()
+        TagClosure.objects.bulk_create(rows, batch_size=_BATCH_SIZE)
+    logger.debug("Rebuilt tag closure with %d rows", len(rows))
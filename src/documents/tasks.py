@@ -14,6 +14,11 @@ from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
 from django.db import transaction
+from django.db.models import Exists
+from django.db.models import Max
+from django.db.models import OuterRef
+from django.db.models import Q
+from django.db.models import QuerySet
 from django.db.models.signals import post_save
 from django.utils import timezone
 from filelock import FileLock
@@ -22,6 +27,7 @@ from documents import sanity_checker
 from documents.barcodes import BarcodePlugin
 from documents.bulk_download import ArchiveOnlyStrategy
 from documents.bulk_download import OriginalsOnlyStrategy
+from documents.bulk_download import stream_zip
 from documents.caching import clear_document_caches
 from documents.classifier import DocumentClassifier
 from documents.classifier import load_classifier
@@ -49,21 +55,28 @@ from documents.models import ShareLink
 from documents.models import ShareLinkBundle
 from documents.models import StoragePath
 from documents.models import Tag
+from documents.models import Workflow
 from documents.models import WorkflowRun
 from documents.models import WorkflowTrigger
+from documents.permissions import get_object_permissions_context
 from documents.plugins.base import ConsumeTaskPlugin
 from documents.plugins.base import StopConsumeTaskError
+from documents.plugins.helpers import DocumentsStatusManager
 from documents.plugins.helpers import ProgressManager
 from documents.plugins.helpers import ProgressStatusOptions
+from documents.relocation import relocate_documents
 from documents.sanity_checker import SanityCheckFailedException
 from documents.search._backend import SearchIndexLockError
 from documents.signals import document_updated
+from documents.signals.handlers import DRF_DATETIME_FIELD
 from documents.signals.handlers import cleanup_document_deletion
 from documents.signals.handlers import run_workflows
 from documents.signals.handlers import send_websocket_document_updated
+from documents.tag_hierarchy import get_ancestor_ids
 from documents.utils import IterWrapper
 from documents.utils import compute_checksum
 from documents.utils import identity
+from documents.workflows.bulk import run_document_updated_workflows
 from documents.workflows.utils import get_workflows_for_trigger
 from paperless.config import AIConfig
 from paperless.logging import consume_task_id
@@ -80,9 +93,17 @@ logger = logging.getLogger("paperless.tasks")
 
 @shared_task
 def index_optimize() -> None:
-    logger.info(
-        "index_optimize is a no-op — Tantivy manages segment merging automatically.",
-    )
+    """
+    Scheduled search index maintenance.
+
+    Tantivy merges segments on its own, so the remaining work is refreshing
+    More Like This signatures whose term weights have gone stale as the
+    corpus grew.
+    """
+    from documents.search import get_backend
+
+    refreshed = get_backend().refresh_similarity_signatures()
+    logger.info("Refreshed %d similar-document signatures.", refreshed)
 
 
 @shared_task(
@@ -280,7 +301,9 @@ def consume_file(
 
 @shared_task
 def sanity_check(*, raise_on_error: bool = True) -> str:
-    messages = sanity_checker.check_sanity()
+    # Scheduled checks hash every file, so corruption that kept a file's size
+    # and modification time is still caught
+    messages = sanity_checker.check_sanity(full=True)
     messages.log_messages()
 
     if not messages.has_error and not messages.has_warning and not messages.has_info:
@@ -312,17 +335,42 @@ def bulk_update_documents(document_ids) -> None:
     from documents.search import get_backend
 
     document_ids = list(document_ids)
+    logging_group = uuid.uuid4()
+
+    # Workflows are applied to all documents at once, before the documents
+    # are loaded below, so the handlers and the index see their changes
+    run_document_updated_workflows(document_ids, logging_group=logging_group)
+
     documents = Document.objects.filter(id__in=document_ids)
+    # The files of all documents are moved together, holding the media lock
+    # once per batch, rather than one by one by the post_save handler below
+    relocate_documents(documents)
+    permissions = get_object_permissions_context(Document, documents)
 
-    for doc in documents:
-        clear_document_caches(doc.pk)
-        document_updated.send(
-            sender=None,
-            document=doc,
-            logging_group=uuid.uuid4(),
-            skip_ai_index=True,  # bulk path calls update_llm_index once below
-        )
-        post_save.send(Document, instance=doc, created=False)
+    with DocumentsStatusManager() as status_mgr:
+        for doc in documents:
+            clear_document_caches(doc.pk)
+            document_updated.send(
+                sender=None,
+                document=doc,
+                logging_group=logging_group,
+                skip_ai_index=True,  # bulk path calls update_llm_index once below
+                skip_workflows=True,
+                skip_websocket=True,
+            )
+            post_save.send(
+                Document,
+                instance=doc,
+                created=False,
+                skip_file_move=True,
+            )
+            status_mgr.send_document_updated(
+                document_id=doc.pk,
+                modified=DRF_DATETIME_FIELD.to_representation(doc.modified),
+                owner_id=doc.owner_id,
+                users_can_view=permissions["users_view_perms"][doc.pk],
+                groups_can_view=permissions["groups_view_perms"][doc.pk],
+            )
 
     with get_backend().batch_update() as batch:
         for doc in documents:
@@ -493,6 +541,117 @@ def empty_trash(doc_ids=None) -> None:
         )
 
 
+def _scheduled_date_filter(
+    trigger: WorkflowTrigger,
+    now: datetime.datetime,
+    **bounds: datetime.datetime,
+) -> Q:
+    """
+    Filter documents on the date field of a scheduled trigger, e.g.
+    ``lte=threshold`` for the documents whose date is at or before it.
+    """
+    match trigger.schedule_date_field:
+        case WorkflowTrigger.ScheduleDateField.ADDED:
+            return Q(
+                **{f"added__{lookup}": value for lookup, value in bounds.items()},
+            )
+        case WorkflowTrigger.ScheduleDateField.CREATED:
+            return Q(
+                **{f"created__{lookup}": value for lookup, value in bounds.items()},
+            )
+        case WorkflowTrigger.ScheduleDateField.MODIFIED:
+            return Q(
+                **{f"modified__{lookup}": value for lookup, value in bounds.items()},
+            )
+        case WorkflowTrigger.ScheduleDateField.CUSTOM_FIELD:
+            # cap earliest date to avoid massive scans
+            earliest_date = now - datetime.timedelta(days=365)
+            return Q(
+                id__in=CustomFieldInstance.objects.filter(
+                    field=trigger.schedule_date_custom_field,
+                    value_date__isnull=False,
+                    value_date__gte=earliest_date,
+                    **{
+                        f"value_date__{lookup}": value
+                        for lookup, value in bounds.items()
+                    },
+                ).values("document_id"),
+            )
+    return Q(pk__in=[])
+
+
+def _get_scheduled_documents(
+    trigger: WorkflowTrigger,
+    workflow: Workflow,
+    now: datetime.datetime,
+) -> QuerySet[Document]:
+    """
+    Return the documents a scheduled trigger of a workflow is due for now.
+
+    Once a trigger has been checked, only the documents whose date passed the
+    threshold since, the documents modified since and, for recurring triggers,
+    the documents whose last run is more than the interval ago are looked at,
+    so checking does not get slower as the library grows.
+    """
+    offset_td = datetime.timedelta(days=trigger.schedule_offset_days)
+    threshold = now - offset_td
+    last_checked = trigger.schedule_last_checked
+    logger.debug(
+        f"Trigger {trigger.id}: checking if (date + {offset_td}) <= now ({now})",
+    )
+    if (
+        trigger.schedule_date_field == WorkflowTrigger.ScheduleDateField.CUSTOM_FIELD
+        and offset_td.days < -365
+    ):
+        logger.warning(
+            f"Trigger {trigger.id} has large negative offset ({offset_td.days}), "
+            f"limiting earliest scan date to {now - datetime.timedelta(days=365)}",
+        )
+
+    documents = Document.objects.filter(
+        _scheduled_date_filter(trigger, now, lte=threshold),
+        root_document__isnull=True,
+    )
+    runs = WorkflowRun.objects.filter(
+        workflow=workflow,
+        type=WorkflowTrigger.WorkflowTriggerType.SCHEDULED,
+    )
+
+    due = documents
+    if last_checked is not None:
+        due = documents.filter(
+            _scheduled_date_filter(
+                trigger,
+                now,
+                lte=threshold,
+                gt=last_checked - offset_td,
+            )
+            | Q(modified__gt=last_checked),
+        )
+
+    document_runs = runs.filter(document=OuterRef("pk"))
+    if trigger.schedule_is_recurring:
+        interval_start = now - datetime.timedelta(
+            days=trigger.schedule_recurring_interval_days,
+        )
+        if last_checked is not None:
+            due |= documents.filter(
+                id__in=runs.values("document_id")
+                .annotate(last_run=Max("run_at"))
+                .filter(last_run__lte=interval_start)
+                .values("document_id"),
+            )
+        skip = Exists(document_runs.filter(run_at__gt=interval_start))
+        reason = f"recurring workflow {workflow} as the last run was within the recurring interval"
+    else:
+        skip = Exists(document_runs)
+        reason = f"non-recurring workflow {workflow} as it has already been run"
+
+    if logger.isEnabledFor(logging.DEBUG) and (skipped := due.filter(skip).count()):
+        logger.debug(f"Skipping {skipped} documents for {reason}")
+    return due.exclude(skip)
+
+
 @shared_task
 def check_scheduled_workflows() -> None:
     """
@@ -504,6 +663,7 @@ def check_scheduled_workflows() -> None:
         - Negative offsets mean the workflow should trigger BEFORE the specified date (e.g., offset = -7 → trigger 7 days before)
 
     Once a document satisfies this condition, and recurring/non-recurring constraints are met, the workflow is run.
+    Each trigger records when it was checked, so the next check only looks at what changed since.
     """
     scheduled_workflows = get_workflows_for_trigger(
         WorkflowTrigger.WorkflowTriggerType.SCHEDULED,
@@ -511,127 +671,41 @@ def check_scheduled_workflows() -> None:
     if scheduled_workflows.count() > 0:
         logger.debug(f"Checking {len(scheduled_workflows)} scheduled workflows")
         now = timezone.now()
+        checked_trigger_ids = set()
         for workflow in scheduled_workflows:
             schedule_triggers = workflow.triggers.filter(
                 type=WorkflowTrigger.WorkflowTriggerType.SCHEDULED,
             )
             trigger: WorkflowTrigger
             for trigger in schedule_triggers:
-                documents = Document.objects.none()
-                offset_td = datetime.timedelta(days=trigger.schedule_offset_days)
-                threshold = now - offset_td
-                logger.debug(
-                    f"Trigger {trigger.id}: checking if (date + {offset_td}) <= now ({now})",
-                )
-
-                match trigger.schedule_date_field:
-                    case WorkflowTrigger.ScheduleDateField.ADDED:
-                        documents = Document.objects.filter(
-                            root_document__isnull=True,
-                            added__lte=threshold,
-                        )
-
-                    case WorkflowTrigger.ScheduleDateField.CREATED:
-                        documents = Document.objects.filter(
-                            root_document__isnull=True,
-                            created__lte=threshold,
-                        )
-
-                    case WorkflowTrigger.ScheduleDateField.MODIFIED:
-                        documents = Document.objects.filter(
-                            root_document__isnull=True,
-                            modified__lte=threshold,
-                        )
-
-                    case WorkflowTrigger.ScheduleDateField.CUSTOM_FIELD:
-                        # cap earliest date to avoid massive scans
-                        earliest_date = now - datetime.timedelta(days=365)
-                        if offset_td.days < -365:
-                            logger.warning(
-                                f"Trigger {trigger.id} has large negative offset ({offset_td.days}), "
-                                f"limiting earliest scan date to {earliest_date}",
-                            )
-
-                        cf_filter_kwargs = {
-                            "field": trigger.schedule_date_custom_field,
-                            "value_date__isnull": False,
-                            "value_date__lte": threshold,
-                            "value_date__gte": earliest_date,
-                        }
-
-                        recent_cf_instances = CustomFieldInstance.objects.filter(
-                            **cf_filter_kwargs,
-                        )
-
-                        matched_ids = [
-                            cfi.document_id
-                            for cfi in recent_cf_instances
-                            if cfi.value_date
-                            and (
-                                timezone.make_aware(
-                                    datetime.datetime.combine(
-                                        cfi.value_date,
-                                        datetime.time.min,
-                                    ),
-                                )
-                                + offset_td
-                                <= now
-                            )
-                        ]
-
-                        documents = Document.objects.filter(
-                            root_document__isnull=True,
-                            id__in=matched_ids,
-                        )
-
-                if documents.exists():
-                    documents = prefilter_documents_by_workflowtrigger(
-                        documents,
+                documents = list(
+                    prefilter_documents_by_workflowtrigger(
+                        _get_scheduled_documents(trigger, workflow, now),
                         trigger,
-                    )
-
-                if documents.exists():
+                    ),
+                )
+                if documents:
                     logger.debug(
-                        f"Found {documents.count()} documents for trigger {trigger}",
+                        f"Found {len(documents)} documents for trigger {trigger}",
                     )
-                    for document in documents:
-                        workflow_runs = WorkflowRun.objects.filter(
-                            document=document,
-                            type=WorkflowTrigger.WorkflowTriggerType.SCHEDULED,
-                            workflow=workflow,
-                        ).order_by("-run_at")
-                        if not trigger.schedule_is_recurring and workflow_runs.exists():
-                            logger.debug(
-                                f"Skipping document {document} for non-recurring workflow {workflow} as it has already been run",
-                            )
-                            continue
-
-                        if (
-                            trigger.schedule_is_recurring
-                            and workflow_runs.exists()
-                            and (
-                                workflow_runs.first().run_at
-                                > now
-                                - datetime.timedelta(
-                                    days=trigger.schedule_recurring_interval_days,
-                                )
-                            )
-                        ):
-                            # schedule is recurring but the last run was within the number of recurring interval days
-                            logger.debug(
-                                f"Skipping document {document} for recurring workflow {workflow} as the last run was within the recurring interval",
-                            )
-                            continue
-                        run_workflows(
-                            trigger_type=WorkflowTrigger.WorkflowTriggerType.SCHEDULED,
-                            workflow_to_run=workflow,
-                            document=document,
-                        )
-                        # Scheduled workflows dont send document_updated signal, so send a websocket update here to ensure clients are updated
-                        send_websocket_document_updated(
-                            sender=None,
-                            document=document,
-                        )
+                for document in documents:
+                    run_workflows(
+                        trigger_type=WorkflowTrigger.WorkflowTriggerType.SCHEDULED,
+                        workflow_to_run=workflow,
+                        document=document,
+                    )
+                    # Scheduled workflows dont send document_updated signal, so send a websocket update here to ensure clients are updated
+                    send_websocket_document_updated(
+                        sender=None,
+                        document=document,
+                    )
+                checked_trigger_ids.add(trigger.pk)
+
+        # Only once all workflows are done, as a trigger may belong to more
+        # than one of them
+        WorkflowTrigger.objects.filter(pk__in=checked_trigger_ids).update(
+            schedule_last_checked=now,
+        )
 
 
 def update_document_parent_tags(tag: Tag, new_parent: Tag) -> None:
@@ -648,9 +722,7 @@ def update_document_parent_tags(tag: Tag, new_parent: Tag) -> None:
     if not doc_ids:
         return
 
-    parent_ids = [new_parent.id, *new_parent.get_ancestors_pks()]
-
-    parent_ids = list(dict.fromkeys(parent_ids))
+    parent_ids = [new_parent.id, *get_ancestor_ids([new_parent.id])]
 
     existing_pairs = set(
         doc_tag_relationship.objects.filter(
@@ -753,10 +825,13 @@ def build_share_link_bundle(bundle_id: int) -> None:
             if bundle.file_version == ShareLink.FileVersion.ARCHIVE
             else OriginalsOnlyStrategy
         )
-        with zipfile.ZipFile(temp_zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-            strategy = strategy_class(zipf)
-            for document in documents:
-                strategy.add_document(document)
+        with temp_zip_path.open("wb") as output:
+            for chunk in stream_zip(
+                strategy_class(),
+                documents,
+                compression=zipfile.ZIP_DEFLATED,
+            ):
+                output.write(chunk)
 
         output_dir = settings.SHARE_LINK_BUNDLE_DIR
         output_dir.mkdir(parents=True, exist_ok=True)
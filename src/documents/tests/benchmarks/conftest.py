@@ -0,0 +1,78 @@
+"""
+Opt-in performance benchmarks.
+
+Benchmarks are collected with the rest of the suite but skipped unless
+``PAPERLESS_RUN_BENCHMARKS`` is set, so they never slow down CI. Their timings
+are listed in the terminal summary::
+
+    PAPERLESS_RUN_BENCHMARKS=1 pytest -p no:xdist src/documents/tests/benchmarks
+"""
+
+from __future__ import annotations
+
+import os
+import statistics
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+def pytest_collection_modifyitems(
+    config: pytest.Config,
+    items: list[pytest.Item],
+) -> None:
+    if os.environ.get("PAPERLESS_RUN_BENCHMARKS"):
+        return
+    skip = pytest.mark.skip(reason="set PAPERLESS_RUN_BENCHMARKS=1 to run")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+def pytest_terminal_summary(terminalreporter: pytest.TerminalReporter) -> None:
+    lines = [
+        value
+        for report in terminalreporter.getreports("passed")
+        for name, value in report.user_properties
+        if name == "benchmark"
+    ]
+    if not lines:
+        return
+    terminalreporter.section("benchmarks")
+    for line in lines:
+        terminalreporter.write_line(line)
+
+
+@pytest.fixture
+def measure(
+    request: pytest.FixtureRequest,
+) -> Callable[..., float]:
+    """Time ``fn`` over several rounds, report the median and return it (seconds)."""
+
+    def _measure(
+        label: str,
+        fn: Callable[[], object],
+        *,
+        rounds: int = 5,
+        setup: Callable[[], object] | None = None,
+    ) -> float:
+        timings = []
+        for _ in range(rounds):
+            if setup is not None:
+                setup()
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        median = statistics.median(timings)
+        summary = (
+            f"{label}: median {median * 1000:.1f} ms "
+            f"(min {min(timings) * 1000:.1f} ms, {rounds} rounds)"
+        )
+        request.node.user_properties.append(("benchmark", summary))
+        return median
+
+    return _measure
@@ -0,0 +1,119 @@
+"""Benchmark document_importer on a synthetic export, with and without threads."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import shutil
+from typing import TYPE_CHECKING
+
+import pytest
+from django.core.management import call_command
+
+from documents.models import Document
+from documents.settings import EXPORTER_FILE_NAME
+from documents.settings import EXPORTER_THUMBNAIL_NAME
+from documents.tests.utils import restore_auditlog_registry
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+    from pytest_django.fixtures import SettingsWrapper
+    from pytest_mock import MockerFixture
+
+    from documents.tests.conftest import PaperlessDirs
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("_media_settings"),
+]
+
+_NUM_DOCUMENTS = 100_000
+_THREADS = 4
+
+
+@pytest.fixture
+def synthetic_export(tmp_path: Path) -> Path:
+    export = tmp_path / "export"
+    (export / "originals").mkdir(parents=True)
+    (export / "thumbnails").mkdir()
+    records = []
+    for i in range(_NUM_DOCUMENTS):
+        original = f"originals/{i:07}.pdf"
+        thumbnail = f"thumbnails/{i:07}-thumbnail.webp"
+        content = f"%PDF-1.4 synthetic document {i}\n".encode() * 64
+        (export / original).write_bytes(content)
+        (export / thumbnail).write_bytes(b"RIFF" + content[:512])
+        records.append(
+            {
+                "model": "documents.document",
+                "pk": i + 1,
+                "fields": {
+                    "title": f"Synthetic {i}",
+                    "content": f"synthetic document {i}",
+                    "checksum": hashlib.sha256(content).hexdigest(),
+                    "filename": f"{i:07}.pdf",
+                    "mime_type": "application/pdf",
+                    "added": "2024-01-01T00:00:00Z",
+                    "modified": "2024-01-01T00:00:00Z",
+                },
+                EXPORTER_FILE_NAME: original,
+                EXPORTER_THUMBNAIL_NAME: thumbnail,
+            },
+        )
+    (export / "manifest.json").write_text(json.dumps(records))
+    (export / "metadata.json").write_text(json.dumps({"version": "bench"}))
+    return export
+
+
+def test_import(
+    synthetic_export: Path,
+    paperless_dirs: PaperlessDirs,
+    settings: SettingsWrapper,
+    tmp_path: Path,
+    mocker: MockerFixture,
+    measure: Callable[..., float],
+) -> None:
+    settings.SHARE_LINK_BUNDLE_DIR = tmp_path / "share_link_bundles"
+    # Rebuilding the search index is not part of what is measured
+    mocker.patch("documents.management.commands.document_importer.call_command")
+
+    def clear_media() -> None:
+        for directory in (paperless_dirs.originals, paperless_dirs.thumbnails):
+            shutil.rmtree(directory)
+            directory.mkdir()
+
+    def import_with(threads: int) -> Callable[[], None]:
+        def run() -> None:
+            with restore_auditlog_registry():
+                call_command(
+                    "document_importer",
+                    "--no-progress-bar",
+                    "--threads",
+                    str(threads),
+                    str(synthetic_export),
+                    skip_checks=True,
+                )
+
+        return run
+
+    single = measure(
+        f"import {_NUM_DOCUMENTS} documents, 1 thread",
+        import_with(1),
+        rounds=1,
+        setup=clear_media,
+    )
+    threaded = measure(
+        f"import {_NUM_DOCUMENTS} documents, {_THREADS} threads",
+        import_with(_THREADS),
+        rounds=1,
+        setup=clear_media,
+    )
+
+    assert Document.objects.count() == _NUM_DOCUMENTS
+    assert sum(1 for _ in paperless_dirs.originals.iterdir()) == _NUM_DOCUMENTS
+    # Loading the database is the same work either way, and small files on a
+    # fast disk leave little for the threads to overlap
+    assert threaded < single * 1.5
@@ -0,0 +1,94 @@
+"""Benchmark common document list requests with and without the list projection."""
+
+from __future__ import annotations
+
+import random
+from typing import TYPE_CHECKING
+
+import pytest
+from rest_framework.test import APIClient
+
+from documents.models import Document
+from documents.models import Note
+from documents.models import Tag
+from documents.views import DocumentViewSet
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from django.contrib.auth.models import User
+    from pytest_mock import MockerFixture
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+_NUM_DOCUMENTS = 2_000
+_CONTENT_SIZE = 50_000
+_PAGE_SIZE = 100
+
+
+@pytest.fixture
+def library(admin_user: User) -> None:
+    rng = random.Random(42)
+    tags = Tag.objects.bulk_create(Tag(name=f"Tag {i}") for i in range(50))
+    words = [f"word{i}" for i in range(1_000)]
+    docs = Document.objects.bulk_create(
+        Document(
+            title=f"Scan {i}",
+            checksum=f"bench-{i}",
+            content=" ".join(rng.choices(words, k=_CONTENT_SIZE // 8)),
+        )
+        for i in range(_NUM_DOCUMENTS)
+    )
+    Document.tags.through.objects.bulk_create(
+        Document.tags.through(document_id=doc.pk, tag_id=tag.pk)
+        for doc in docs
+        for tag in rng.sample(tags, 3)
+    )
+    Note.objects.bulk_create(
+        Note(document=doc, note="Checked", user=admin_user) for doc in docs[::10]
+    )
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        pytest.param("", id="all fields"),
+        pytest.param("&truncate_content=true", id="document list"),
+        pytest.param("&fields=id&truncate_content=true", id="saved view ids"),
+        pytest.param("&fields=id,title,created,tags", id="document link"),
+    ],
+)
+def test_document_list(
+    library: None,
+    admin_user: User,
+    mocker: MockerFixture,
+    measure: Callable[..., float],
+    params: str,
+) -> None:
+    client = APIClient()
+    client.force_authenticate(user=admin_user)
+    url = f"/api/documents/?page_size={_PAGE_SIZE}{params}"
+
+    def list_documents() -> list[dict]:
+        response = client.get(url)
+        assert response.status_code == 200
+        return response.data["results"]
+
+    expected = list_documents()
+    projected = measure(f"projected {params or 'all fields'}", list_documents)
+
+    # The queryset every request used before, whatever the response contains
+    get_queryset = DocumentViewSet.get_queryset
+
+    def full_queryset(view: DocumentViewSet):
+        action, view.action = view.action, "retrieve"
+        try:
+            return get_queryset(view)
+        finally:
+            view.action = action
+
+    mocker.patch.object(DocumentViewSet, "get_queryset", full_queryset)
+    assert list_documents() == expected
+    full = measure(f"full queryset {params or 'all fields'}", list_documents)
+
+    assert projected < full * 1.1
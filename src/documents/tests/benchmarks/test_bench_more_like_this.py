@@ -0,0 +1,87 @@
+"""Benchmark signature-based More Like This against Tantivy's more_like_this_query."""
+
+from __future__ import annotations
+
+import random
+from typing import TYPE_CHECKING
+
+import pytest
+import tantivy
+
+from documents.models import Document
+from documents.search._backend import TantivyBackend
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from collections.abc import Generator
+    from pathlib import Path
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.search, pytest.mark.django_db]
+
+_NUM_DOCUMENTS = 2_000
+_WORDS_PER_DOCUMENT = 2_000
+
+
+@pytest.fixture
+def corpus_backend(tmp_path: Path) -> Generator[TantivyBackend, None, None]:
+    rng = random.Random(42)
+    vocabulary = [f"word{n}" for n in range(20_000)]
+    Document.objects.bulk_create(
+        Document(
+            title=f"Scan {i}",
+            checksum=f"bench-{i}",
+            content=" ".join(rng.choices(vocabulary, k=_WORDS_PER_DOCUMENT)),
+        )
+        for i in range(_NUM_DOCUMENTS)
+    )
+    backend = TantivyBackend(path=tmp_path)
+    backend.open()
+    backend.rebuild(Document.objects.all())
+    backend.refresh_similarity_signatures()
+    try:
+        yield backend
+    finally:
+        backend.close()
+
+
+def _more_like_this_query_ids(backend: TantivyBackend, doc_id: int) -> list[int]:
+    """The previous implementation: Tantivy's MLT query over the whole document."""
+    searcher = backend._index.searcher()
+    hits = searcher.search(
+        tantivy.Query.term_query(backend._schema, "id", doc_id),
+        limit=1,
+    ).hits
+    query = tantivy.Query.more_like_this_query(
+        hits[0][1],
+        min_doc_frequency=1,
+        max_doc_frequency=None,
+        min_term_frequency=1,
+        max_query_terms=12,
+        min_word_length=None,
+        max_word_length=None,
+        boost_factor=None,
+    )
+    results = searcher.search(query, limit=searcher.num_docs + 1)
+    return searcher.fast_field_values("id", [addr for _score, addr in results.hits])
+
+
+def test_more_like_this(
+    corpus_backend: TantivyBackend,
+    measure: Callable[..., float],
+) -> None:
+    seed_ids = list(
+        Document.objects.order_by("?").values_list("pk", flat=True)[:20],
+    )
+
+    def mlt_query() -> None:
+        for doc_id in seed_ids:
+            _more_like_this_query_ids(corpus_backend, doc_id)
+
+    def signature() -> None:
+        for doc_id in seed_ids:
+            corpus_backend.more_like_this_ids(doc_id, user=None)
+
+    baseline = measure("more_like_this_query x20", mlt_query)
+    precomputed = measure("similarity signature x20", signature)
+
+    assert precomputed < baseline
@@ -0,0 +1,91 @@
+"""Benchmark permitted_document_ids against guardian and the materialized grants."""
+
+from __future__ import annotations
+
+import random
+from typing import TYPE_CHECKING
+
+import pytest
+from django.contrib.auth.models import Group
+from django.contrib.auth.models import Permission
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.test import override_settings
+from guardian.models import GroupObjectPermission
+from guardian.models import UserObjectPermission
+
+from documents.models import Document
+from documents.permissions import diff_document_permission_grants
+from documents.permissions import permitted_document_ids
+from documents.permissions import repair_document_permission_grants
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+_NUM_DOCUMENTS = 20_000
+_NUM_USERS = 50
+_GRANTS_PER_USER = 1_000
+
+
+@pytest.fixture
+def viewer() -> User:
+    rng = random.Random(42)
+    users = User.objects.bulk_create(
+        User(username=f"bench-{i}") for i in range(_NUM_USERS)
+    )
+    group = Group.objects.create(name="bench")
+    users[0].groups.add(group)
+    docs = Document.objects.bulk_create(
+        Document(
+            title=f"Scan {i}",
+            checksum=f"bench-{i}",
+            owner=rng.choice(users[1:]),
+        )
+        for i in range(_NUM_DOCUMENTS)
+    )
+    content_type = ContentType.objects.get_for_model(Document)
+    view = Permission.objects.get(codename="view_document")
+    # bulk_create skips the signals, the grants are materialized below
+    UserObjectPermission.objects.bulk_create(
+        UserObjectPermission(
+            user=user,
+            permission=view,
+            content_type=content_type,
+            object_pk=str(doc.pk),
+        )
+        for user in users
+        for doc in rng.sample(docs, _GRANTS_PER_USER)
+    )
+    GroupObjectPermission.objects.bulk_create(
+        GroupObjectPermission(
+            group=group,
+            permission=view,
+            content_type=content_type,
+            object_pk=str(doc.pk),
+        )
+        for doc in rng.sample(docs, _GRANTS_PER_USER)
+    )
+    repair_document_permission_grants(diff_document_permission_grants())
+    return users[0]
+
+
+def test_permitted_document_ids(
+    viewer: User,
+    measure: Callable[..., float],
+) -> None:
+    def count_visible() -> int:
+        return Document.objects.filter(pk__in=permitted_document_ids(viewer)).count()
+
+    with override_settings(MATERIALIZED_DOCUMENT_PERMISSIONS=False):
+        expected = count_visible()
+        guardian = measure("guardian object permissions", count_visible)
+    with override_settings(MATERIALIZED_DOCUMENT_PERMISSIONS=True):
+        assert count_visible() == expected
+        materialized = measure("materialized grants", count_visible)
+
+    # SQLite can use guardian's (permission, user, object_pk) index as a
+    # covering index, so the gap is small there; on PostgreSQL and MariaDB the
+    # cast of object_pk keeps the planner from joining on the document id.
+    assert materialized < guardian * 1.5
@@ -0,0 +1,69 @@
+"""Benchmark highlight generation for result pages over long OCR'd documents."""
+
+from __future__ import annotations
+
+import random
+from typing import TYPE_CHECKING
+
+import pytest
+from django.core.cache import cache
+
+from documents.models import Document
+from documents.search._backend import TantivyBackend
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from collections.abc import Generator
+    from pathlib import Path
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.search, pytest.mark.django_db]
+
+_NUM_DOCUMENTS = 200
+_WORDS_PER_DOCUMENT = 20_000  # roughly a 40 page OCR'd scan
+
+
+@pytest.fixture
+def long_document_backend(tmp_path: Path) -> Generator[TantivyBackend, None, None]:
+    rng = random.Random(42)
+    vocabulary = [f"word{n}" for n in range(5_000)]
+    docs = [
+        Document.objects.create(
+            title=f"Scan {i}",
+            checksum=f"bench-{i}",
+            content=" ".join(
+                [*rng.choices(vocabulary, k=_WORDS_PER_DOCUMENT), "invoice"],
+            ),
+        )
+        for i in range(_NUM_DOCUMENTS)
+    ]
+    backend = TantivyBackend(path=tmp_path)
+    backend.open()
+    with backend.batch_update() as batch:
+        for doc in docs:
+            batch.add_or_update(doc)
+    try:
+        yield backend
+    finally:
+        backend.close()
+
+
+@pytest.mark.parametrize("page_size", [25, 100])
+def test_highlight_page(
+    long_document_backend: TantivyBackend,
+    measure: Callable[..., float],
+    page_size: int,
+) -> None:
+    ids = long_document_backend.search_ids("invoice word42", user=None)
+    page_ids = ids[:page_size]
+
+    def highlight() -> None:
+        long_document_backend.highlight_hits("invoice word42", page_ids)
+
+    cold = measure(
+        f"highlight_hits page_size={page_size} cold",
+        highlight,
+        setup=cache.clear,
+    )
+    warm = measure(f"highlight_hits page_size={page_size} cached", highlight)
+
+    assert warm < cold
@@ -0,0 +1,85 @@
+"""Benchmark select-all selection data: database counts vs the facet index."""
+
+from __future__ import annotations
+
+import random
+from typing import TYPE_CHECKING
+
+import pytest
+from rest_framework.test import APIClient
+
+from documents.models import Correspondent
+from documents.models import Document
+from documents.models import DocumentType
+from documents.models import Tag
+from documents.selection import get_selection_index
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from django.contrib.auth.models import User
+    from pytest_mock import MockerFixture
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+_NUM_DOCUMENTS = 50_000
+_NUM_TAGS = 200
+_TAGS_PER_DOCUMENT = 3
+
+
+@pytest.fixture
+def library() -> list[int]:
+    rng = random.Random(42)
+    correspondents = Correspondent.objects.bulk_create(
+        Correspondent(name=f"Correspondent {i}") for i in range(50)
+    )
+    document_types = DocumentType.objects.bulk_create(
+        DocumentType(name=f"Type {i}") for i in range(20)
+    )
+    tags = Tag.objects.bulk_create(Tag(name=f"Tag {i}") for i in range(_NUM_TAGS))
+    docs = Document.objects.bulk_create(
+        Document(
+            title=f"Scan {i}",
+            checksum=f"bench-{i}",
+            correspondent=rng.choice(correspondents),
+            document_type=rng.choice(document_types),
+        )
+        for i in range(_NUM_DOCUMENTS)
+    )
+    Document.tags.through.objects.bulk_create(
+        Document.tags.through(document_id=doc.pk, tag_id=tag.pk)
+        for doc in docs
+        for tag in rng.sample(tags, _TAGS_PER_DOCUMENT)
+    )
+    return [doc.pk for doc in docs]
+
+
+def test_selection_data(
+    library: list[int],
+    admin_user: User,
+    mocker: MockerFixture,
+    measure: Callable[..., float],
+) -> None:
+    client = APIClient()
+    client.force_authenticate(user=admin_user)
+
+    def selection_data() -> dict:
+        response = client.get(
+            "/api/documents/?page_size=25&include_selection_data=true",
+        )
+        assert response.status_code == 200
+        return {
+            name: sorted(counts, key=lambda item: item["id"])
+            for name, counts in response.data["selection_data"].items()
+        }
+
+    mocker.patch("documents.views.MIN_INDEXED_SELECTION", len(library) + 1)
+    expected = selection_data()
+    database = measure("database counts", selection_data)
+
+    mocker.patch("documents.views.MIN_INDEXED_SELECTION", 1)
+    assert selection_data() == expected
+    measure("facet index build", get_selection_index().build, rounds=1)
+    indexed = measure("facet index", selection_data)
+
+    assert indexed < database
@@ -60,6 +60,7 @@ def _media_settings(paperless_dirs: PaperlessDirs, settings) -> None:
     settings.ARCHIVE_DIR = paperless_dirs.archive
     settings.THUMBNAIL_DIR = paperless_dirs.thumbnails
     settings.MEDIA_LOCK = paperless_dirs.media / "media.lock"
+    settings.SANITY_CHECKER_CACHE = paperless_dirs.media.parent / "sanity_cache.db"
     settings.IGNORABLE_FILES = {".DS_Store", "Thumbs.db", "desktop.ini"}
     settings.APP_LOGO = ""
 
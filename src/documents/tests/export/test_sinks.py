@@ -1,17 +1,22 @@
 import io
 import json
 import os
+import struct
 import zipfile
 from pathlib import Path
 
 import pytest
 from pytest_django.fixtures import SettingsWrapper
+from pytest_mock import MockerFixture
 
+from documents.export import sinks
+from documents.export.sinks import EXPORT_STATE_NAME
 from documents.export.sinks import DirectoryExportSink
 from documents.export.sinks import ExportSink
 from documents.export.sinks import StreamingManifestWriter
 from documents.export.sinks import ZipExportSink
 from documents.export.sinks import _dumps
+from documents.export.sinks import link_or_copy_file
 
 
 @pytest.fixture()
@@ -175,6 +180,156 @@ class TestDirectoryExportSink:
         assert stale.exists()
 
 
+class TestIncrementalDirectoryExportSink:
+    @staticmethod
+    def _export(target: Path, source_file: Path, **kwargs) -> None:
+        with DirectoryExportSink(
+            target,
+            compare_checksums=True,
+            compare_json=True,
+            delete=True,
+            incremental=True,
+            **kwargs,
+        ) as sink:
+            sink.add_file(source_file, "originals/doc.pdf", checksum="abc")
+            sink.add_json({"version": "x"}, "metadata.json")
+            with sink.stream("manifest.json") as handle:
+                writer = StreamingManifestWriter(handle)
+                writer.write_record({"pk": 1})
+                writer.close()
+
+    def test_unchanged_files_are_not_read(
+        self,
+        tmp_path: Path,
+        source_file: Path,
+        mocker: MockerFixture,
+    ) -> None:
+        target: Path = tmp_path / "out"
+        target.mkdir()
+        self._export(target, source_file)
+        assert (target / EXPORT_STATE_NAME).exists()
+
+        copy = mocker.patch("documents.export.sinks.copy_file_with_basic_stats")
+        compare = mocker.spy(DirectoryExportSink, "_content_unchanged")
+        unchanged = mocker.spy(DirectoryExportSink, "_unchanged")
+        self._export(target, source_file)
+
+        copy.assert_not_called()
+        compare.assert_not_called()
+        assert unchanged.spy_return_list == [True, True, True]
+        # The state file itself is never pruned by --delete
+        assert (target / EXPORT_STATE_NAME).exists()
+
+    def test_changed_target_is_recopied(
+        self,
+        tmp_path: Path,
+        source_file: Path,
+    ) -> None:
+        target: Path = tmp_path / "out"
+        target.mkdir()
+        self._export(target, source_file)
+        (target / "originals" / "doc.pdf").write_bytes(b"TAMPERED")
+
+        self._export(target, source_file)
+
+        assert (target / "originals" / "doc.pdf").read_bytes() == b"PDF-CONTENT"
+
+    def test_changed_source_is_recopied(
+        self,
+        tmp_path: Path,
+        source_file: Path,
+    ) -> None:
+        target: Path = tmp_path / "out"
+        target.mkdir()
+        self._export(target, source_file)
+        source_file.write_bytes(b"NEW-PDF-CONTENT")
+
+        self._export(target, source_file)
+
+        assert (target / "originals" / "doc.pdf").read_bytes() == b"NEW-PDF-CONTENT"
+
+    def test_unreadable_state_is_ignored(
+        self,
+        tmp_path: Path,
+        source_file: Path,
+    ) -> None:
+        target: Path = tmp_path / "out"
+        target.mkdir()
+        (target / EXPORT_STATE_NAME).write_text("{not json")
+
+        self._export(target, source_file)
+
+        state = json.loads((target / EXPORT_STATE_NAME).read_text())
+        assert set(state) == {"originals/doc.pdf", "metadata.json", "manifest.json"}
+
+    def test_threaded_copies(self, tmp_path: Path, source_file: Path) -> None:
+        target: Path = tmp_path / "out"
+        target.mkdir()
+        with DirectoryExportSink(
+            target,
+            compare_checksums=False,
+            compare_json=False,
+            delete=False,
+            threads=4,
+        ) as sink:
+            for i in range(50):
+                sink.add_file(source_file, f"originals/{i}.pdf")
+        assert len(list((target / "originals").iterdir())) == 50
+
+    def test_threaded_copy_failure_is_raised(
+        self,
+        tmp_path: Path,
+        source_file: Path,
+        mocker: MockerFixture,
+    ) -> None:
+        target: Path = tmp_path / "out"
+        target.mkdir()
+        mocker.patch(
+            "documents.export.sinks.copy_file_with_basic_stats",
+            side_effect=OSError("disk full"),
+        )
+        with pytest.raises(OSError, match="disk full"):
+            with DirectoryExportSink(
+                target,
+                compare_checksums=False,
+                compare_json=False,
+                delete=False,
+                threads=2,
+            ) as sink:
+                sink.add_file(source_file, "originals/doc.pdf")
+
+
+class TestLinkOrCopyFile:
+    def test_hardlink(self, tmp_path: Path, source_file: Path) -> None:
+        dest: Path = tmp_path / "doc.pdf"
+        link_or_copy_file(source_file, dest, mode="hardlink")
+        assert dest.samefile(source_file)
+
+    def test_copy_replaces_hardlink(self, tmp_path: Path, source_file: Path) -> None:
+        other: Path = tmp_path / "other.pdf"
+        other.write_bytes(b"OTHER")
+        dest: Path = tmp_path / "doc.pdf"
+        link_or_copy_file(source_file, dest, mode="hardlink")
+
+        link_or_copy_file(other, dest)
+
+        assert dest.read_bytes() == b"OTHER"
+        assert source_file.read_bytes() == b"PDF-CONTENT"
+
+    def test_reflink_falls_back_to_copy(
+        self,
+        tmp_path: Path,
+        source_file: Path,
+        mocker: MockerFixture,
+    ) -> None:
+        mocker.patch("documents.export.sinks._reflink", return_value=False)
+        dest: Path = tmp_path / "doc.pdf"
+        link_or_copy_file(source_file, dest, mode="reflink")
+        assert dest.read_bytes() == b"PDF-CONTENT"
+        assert not dest.samefile(source_file)
+        assert dest.stat().st_mtime == source_file.stat().st_mtime
+
+
 class TestZipExportSink:
     def test_round_trip_files_json_and_stream(
         self,
@@ -305,6 +460,165 @@ class TestZipExportSink:
         assert not (target / "export.zip").exists()
 
 
+class TestParallelZipExportSink:
+    def test_round_trip_in_order(
+        self,
+        tmp_path: Path,
+        settings: SettingsWrapper,
+        mocker: MockerFixture,
+    ) -> None:
+        settings.SCRATCH_DIR = tmp_path / "scratch"
+        # Spool every compressed entry to disk
+        mocker.patch("documents.export.sinks._SPOOL_MAX_SIZE", 16)
+        sources: dict[str, bytes] = {}
+        for i in range(20):
+            suffix = ".pdf" if i % 2 else ".txt"
+            source = tmp_path / "src" / f"{i}{suffix}"
+            source.parent.mkdir(exist_ok=True)
+            source.write_bytes(f"document {i} ".encode() * 1000)
+            sources[f"originals/{source.name}"] = source.read_bytes()
+        target: Path = tmp_path / "out"
+        target.mkdir()
+
+        with ZipExportSink(target, "export", threads=4) as sink:
+            for arcname in sources:
+                sink.add_file(tmp_path / "src" / Path(arcname).name, arcname)
+            sink.add_json({"version": "x"}, "metadata.json")
+            with sink.stream("manifest.json") as handle:
+                writer = StreamingManifestWriter(handle)
+                writer.write_record({"pk": 1})
+                writer.close()
+
+        with zipfile.ZipFile(target / "export.zip") as zf:
+            assert zf.testzip() is None
+            files = [info for info in zf.infolist() if not info.is_dir()]
+            assert [info.filename for info in files] == [
+                *sources,
+                "metadata.json",
+                "manifest.json",
+            ]
+            for info in files[:-2]:
+                assert zf.read(info) == sources[info.filename]
+                assert info.compress_type == (
+                    zipfile.ZIP_STORED
+                    if info.filename.endswith(".pdf")
+                    else zipfile.ZIP_DEFLATED
+                )
+            assert json.loads(zf.read("metadata.json")) == {"version": "x"}
+            assert json.loads(zf.read("manifest.json")) == [{"pk": 1}]
+        assert list(settings.SCRATCH_DIR.iterdir()) == []
+
+    def test_precompressed_stored_without_threads(
+        self,
+        tmp_path: Path,
+        source_file: Path,
+    ) -> None:
+        target: Path = tmp_path / "out"
+        target.mkdir()
+        with ZipExportSink(target, "export") as sink:
+            sink.add_file(source_file, "originals/doc.pdf")
+            sink.add_json({"version": "x"}, "metadata.json")
+        with zipfile.ZipFile(target / "export.zip") as zf:
+            assert zf.getinfo("originals/doc.pdf").compress_type == zipfile.ZIP_STORED
+            assert zf.getinfo("metadata.json").compress_type == zipfile.ZIP_DEFLATED
+
+    def test_large_zip64_entry(
+        self,
+        tmp_path: Path,
+        settings: SettingsWrapper,
+        mocker: MockerFixture,
+    ) -> None:
+        settings.SCRATCH_DIR = tmp_path / "scratch"
+        # Every entry larger than this gets ZIP64 headers
+        mocker.patch("zipfile.ZIP64_LIMIT", 1024 * 1024)
+        deflate = mocker.spy(sinks, "_deflate")
+        # Does not compress, so it is spooled to disk before it is written
+        content = os.urandom(9 * 1024 * 1024)
+        source: Path = tmp_path / "large.txt"
+        source.write_bytes(content)
+        target: Path = tmp_path / "out"
+        target.mkdir()
+
+        with ZipExportSink(target, "export", threads=2) as sink:
+            sink.add_file(source, "large.txt")
+            sink.add_json({"version": "x"}, "metadata.json")
+
+        assert deflate.call_count == 2
+        assert (
+            max(entry.compress_size for entry in deflate.spy_return_list)
+            > sinks._SPOOL_MAX_SIZE
+        )
+        with zipfile.ZipFile(target / "export.zip") as zf:
+            assert zf.testzip() is None
+            info = zf.getinfo("large.txt")
+            assert info.compress_type == zipfile.ZIP_DEFLATED
+            assert zf.read(info) == content
+            assert json.loads(zf.read("metadata.json")) == {"version": "x"}
+        with (target / "export.zip").open("rb") as f:
+            f.seek(info.header_offset)
+            header = f.read(zipfile.sizeFileHeader)
+            name_length, extra_length = struct.unpack("<HH", header[-4:])
+            f.seek(name_length, os.SEEK_CUR)
+            extra = f.read(extra_length)
+        # The local header holds the ZIP64 extra field with both sizes
+        assert struct.unpack("<HHQQ", extra[:20]) == (
+            1,
+            16,
+            len(content),
+            info.compress_size,
+        )
+
+    def test_zipfile_internals_available(self, tmp_path: Path) -> None:
+        """
+        The ZipFile internals _write_deflated relies on exist on this Python.
+        Fails loudly on a release changing them, rather than letting exports
+        silently compress on one thread.
+        """
+        assert sinks._CAN_WRITE_DEFLATED
+        with zipfile.ZipFile(tmp_path / "export.zip", "w") as zf:
+            for name in ("fp", "start_dir", "_didModify", "filelist", "NameToInfo"):
+                assert hasattr(zf, name), name
+
+    def test_without_deflated_writes(
+        self,
+        tmp_path: Path,
+        settings: SettingsWrapper,
+        mocker: MockerFixture,
+    ) -> None:
+        settings.SCRATCH_DIR = tmp_path / "scratch"
+        mocker.patch("documents.export.sinks._CAN_WRITE_DEFLATED", new=False)
+        deflate = mocker.spy(sinks, "_deflate")
+        source: Path = tmp_path / "doc.txt"
+        source.write_text("text " * 1000)
+        target: Path = tmp_path / "out"
+        target.mkdir()
+
+        with ZipExportSink(target, "export", threads=2) as sink:
+            sink.add_file(source, "doc.txt")
+
+        deflate.assert_not_called()
+        with zipfile.ZipFile(target / "export.zip") as zf:
+            assert zf.testzip() is None
+            assert zf.getinfo("doc.txt").compress_type == zipfile.ZIP_DEFLATED
+            assert zf.read("doc.txt") == source.read_bytes()
+
+    def test_compression_failure_leaves_no_zip(
+        self,
+        tmp_path: Path,
+        mocker: MockerFixture,
+    ) -> None:
+        source: Path = tmp_path / "doc.txt"
+        source.write_text("text")
+        mocker.patch("documents.export.sinks._deflate", side_effect=OSError("boom"))
+        target: Path = tmp_path / "out"
+        target.mkdir()
+        with pytest.raises(OSError, match="boom"):
+            with ZipExportSink(target, "export", threads=2) as sink:
+                sink.add_file(source, "doc.txt")
+        assert not (target / "export.zip").exists()
+        assert not (target / "export.zip.tmp").exists()
+
+
 class TestStreamContract:
     @pytest.fixture(params=["dir", "zip"])
     def sink(self, request: pytest.FixtureRequest, tmp_path: Path) -> ExportSink:
@@ -68,6 +68,16 @@ class MultiprocessCommand(PaperlessCommand):
         self.stdout.write(f"Successes: {successes}")
 
 
+class ThreadedCommand(PaperlessCommand):
+    """Command with thread support."""
+
+    help = "Threaded test command"
+    supports_threads = True
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Threads: {self.thread_count}")
+
+
 # --- Helper Functions for Multiprocessing ---
 # Must be at module level to be picklable
 
@@ -204,6 +214,23 @@ class TestPaperlessCommandArguments:
         options = parser.parse_args([])
         assert not hasattr(options, "processes")
 
+    def test_threads_argument_added_when_threads_enabled(self) -> None:
+        command = ThreadedCommand()
+        parser = command.create_parser("manage.py", "threaded")
+
+        options = parser.parse_args(["--threads", "3"])
+        assert options.threads == 3
+
+        options = parser.parse_args([])
+        assert 1 <= options.threads <= 4
+
+    def test_threads_argument_not_added_when_threads_disabled(self) -> None:
+        command = SimpleCommand()
+        parser = command.create_parser("manage.py", "simple")
+
+        options = parser.parse_args([])
+        assert not hasattr(options, "threads")
+
 
 @pytest.mark.management
 class TestPaperlessCommandExecute:
@@ -310,6 +337,42 @@ class TestPaperlessCommandExecute:
 
         assert command.process_count == 1
 
+    def test_thread_count_set(self, base_options: dict) -> None:
+        command = ThreadedCommand()
+        command.stdout = io.StringIO()
+        command.stderr = io.StringIO()
+
+        options = {**base_options, "threads": 3, "no_progress_bar": True}
+        command.execute(**options)
+
+        assert command.thread_count == 3
+
+    def test_thread_count_validation_rejects_invalid(
+        self,
+        base_options: dict,
+    ) -> None:
+        command = ThreadedCommand()
+        command.stdout = io.StringIO()
+        command.stderr = io.StringIO()
+
+        options = {**base_options, "threads": 0, "no_progress_bar": True}
+
+        with pytest.raises(CommandError, match="--threads must be at least 1"):
+            command.execute(**options)
+
+    def test_thread_count_defaults_to_one_when_not_supported(
+        self,
+        base_options: dict,
+    ) -> None:
+        command = SimpleCommand()
+        command.stdout = io.StringIO()
+        command.stderr = io.StringIO()
+
+        options = {**base_options, "no_progress_bar": True}
+        command.execute(**options)
+
+        assert command.thread_count == 1
+
 
 @pytest.mark.management
 class TestGetIterableLength:
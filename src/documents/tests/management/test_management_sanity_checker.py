@@ -10,6 +10,7 @@ from pathlib import Path
 from typing import TYPE_CHECKING
 
 import pytest
+from django.core.management import CommandError
 from django.core.management import call_command
 from rich.console import Console
 
@@ -18,6 +19,8 @@ from documents.sanity_checker import SanityCheckMessages
 from documents.tests.factories import DocumentFactory
 
 if TYPE_CHECKING:
+    from pytest_mock import MockerFixture
+
     from documents.models import Document
     from documents.tests.conftest import PaperlessDirs
 
@@ -206,3 +209,43 @@ class TestDocumentSanityCheckerCommand:
         output = out.getvalue()
         assert "ERROR" in output
         assert "Checksum mismatch. Stored: abc, actual:" in output
+
+    def test_since(self, sample_doc: Document) -> None:
+        Path(sample_doc.source_path).unlink()
+        out = StringIO()
+        call_command(
+            "document_sanity_checker",
+            "--no-progress-bar",
+            "--since",
+            "2999-01-01",
+            stdout=out,
+            skip_checks=True,
+        )
+        assert "No issues detected" in out.getvalue()
+
+    def test_invalid_since(self) -> None:
+        with pytest.raises(CommandError, match="Invalid date or time"):
+            call_command(
+                "document_sanity_checker",
+                "--no-progress-bar",
+                "--since",
+                "yesterday",
+                skip_checks=True,
+            )
+
+    def test_full(self, sample_doc: Document, mocker: MockerFixture) -> None:
+        check_sanity = mocker.patch(
+            "documents.management.commands.document_sanity_checker.check_sanity",
+            return_value=SanityCheckMessages(),
+        )
+        call_command(
+            "document_sanity_checker",
+            "--no-progress-bar",
+            "--full",
+            "--threads",
+            "2",
+            stdout=StringIO(),
+            skip_checks=True,
+        )
+        assert check_sanity.call_args.kwargs["full"] is True
+        assert check_sanity.call_args.kwargs["threads"] == 2
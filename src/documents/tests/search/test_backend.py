@@ -1,4 +1,8 @@
+from datetime import UTC
+from datetime import datetime
+
 import pytest
+import time_machine
 from django.contrib.auth.models import Group
 from django.contrib.auth.models import User
 from guardian.shortcuts import assign_perm
@@ -8,6 +12,7 @@ from documents.models import CustomField
 from documents.models import CustomFieldInstance
 from documents.models import Document
 from documents.models import Note
+from documents.search import _backend as _backend_module
 from documents.search._backend import SearchMode
 from documents.search._backend import TantivyBackend
 from documents.search._backend import WriteBatch
@@ -736,6 +741,190 @@ class TestMoreLikeThis:
         assert 150 not in ids
         assert 151 in ids
 
+    def test_more_like_this_ignores_metadata_only_matches(
+        self,
+        backend: TantivyBackend,
+    ) -> None:
+        """Similarity uses the stored title/content signature, so documents
+        sharing only a date or correspondent are not considered similar."""
+        correspondent = CorrespondentFactory(name="Shared Bank")
+        seed = DocumentFactory(
+            title="statement",
+            content="overdraft interest charged",
+            correspondent=correspondent,
+        )
+        similar = DocumentFactory(
+            title="statement",
+            content="overdraft interest refunded",
+        )
+        unrelated = DocumentFactory(
+            title="recipe",
+            content="pancakes flour eggs",
+            correspondent=correspondent,
+        )
+        for doc in (seed, similar, unrelated):
+            backend.add_or_update(doc)
+
+        ids = backend.more_like_this_ids(doc_id=seed.pk, user=None)
+
+        assert ids == [similar.pk]
+
+    def test_more_like_this_respects_limit_and_permissions(
+        self,
+        backend: TantivyBackend,
+    ) -> None:
+        owner = UserFactory()
+        other = UserFactory()
+        seed = DocumentFactory(content="warranty claim repair", owner=owner)
+        visible = DocumentFactory(content="warranty claim repair", owner=owner)
+        hidden = DocumentFactory(content="warranty claim repair", owner=other)
+        for doc in (seed, visible, hidden):
+            backend.add_or_update(doc)
+
+        assert backend.more_like_this_ids(doc_id=seed.pk, user=owner) == [
+            visible.pk,
+        ]
+        assert len(backend.more_like_this_ids(doc_id=seed.pk, user=None, limit=1)) == 1
+
+    def test_more_like_this_without_terms_returns_empty(
+        self,
+        backend: TantivyBackend,
+    ) -> None:
+        seed = DocumentFactory(title="a", content="")
+        backend.add_or_update(seed)
+        backend.add_or_update(DocumentFactory(title="a", content=""))
+
+        assert backend.more_like_this_ids(doc_id=seed.pk, user=None) == []
+
+
+class TestSimilaritySignatures:
+    """Test the precomputed More Like This signatures and their refresh."""
+
+    def test_signature_prefers_distinctive_terms(
+        self,
+        backend: TantivyBackend,
+    ) -> None:
+        """Once the corpus is indexed, terms present in every document lose
+        out to rarer ones even when they are more frequent."""
+        for _ in range(5):
+            backend.add_or_update(DocumentFactory(title="scan", content="page page"))
+        seed = DocumentFactory(title="scan", content="page page pension")
+        backend.add_or_update(seed)
+
+        terms, basis = backend._similarity_signature(seed.title, seed.content)
+
+        assert basis == 6
+        assert terms.index("pension") < terms.index("page")
+
+    def test_batch_shares_one_searcher(
+        self,
+        backend: TantivyBackend,
+        mocker: MockerFixture,
+    ) -> None:
+        """Signatures of all documents in a batch are weighed with one searcher."""
+        docs = DocumentFactory.create_batch(3, content="quarterly statement")
+        index = mocker.Mock(wraps=backend._raw_index)
+        backend._raw_index = index
+
+        with backend.batch_update() as batch:
+            for doc in docs:
+                batch.add_or_update(doc)
+
+        assert index.searcher.call_count == 1
+
+    def test_refresh_rebuilds_stale_signatures(
+        self,
+        backend: TantivyBackend,
+    ) -> None:
+        """After a rebuild every signature was computed against an empty
+        index; the refresh re-ranks them and is then a no-op."""
+        docs = [DocumentFactory(content=f"tenancy agreement {i}") for i in range(4)]
+        backend.rebuild(Document.objects.all())
+
+        assert backend.refresh_similarity_signatures() == len(docs)
+        assert backend.refresh_similarity_signatures() == 0
+        assert sorted(backend.more_like_this_ids(docs[0].pk, user=None)) == sorted(
+            d.pk for d in docs[1:]
+        )
+
+    def test_refresh_skips_documents_missing_from_database(
+        self,
+        backend: TantivyBackend,
+    ) -> None:
+        docs = DocumentFactory.create_batch(3, content="lease renewal")
+        backend.rebuild(Document.objects.all())
+        Document.objects.filter(pk=docs[0].pk).delete()
+
+        assert backend.refresh_similarity_signatures() == 2
+
+
+class TestParsedQueryCache:
+    """Test reuse of parsed queries across searches."""
+
+    def test_repeated_query_is_parsed_once(
+        self,
+        backend: TantivyBackend,
+        mocker: MockerFixture,
+    ) -> None:
+        parse = mocker.spy(_backend_module, "parse_user_query")
+        doc = DocumentFactory(content="quarterly tax return")
+        backend.add_or_update(doc)
+
+        for _ in range(3):
+            assert backend.search_ids("created:2000", user=None) == []
+            assert backend.search_ids("tax", user=None) == [doc.pk]
+
+        assert parse.call_count == 2
+
+    def test_search_modes_are_cached_separately(
+        self,
+        backend: TantivyBackend,
+    ) -> None:
+        doc = DocumentFactory(title="Lease", content="invoice")
+        backend.add_or_update(doc)
+
+        assert backend.search_ids("invoi", user=None, search_mode=SearchMode.TEXT) == [
+            doc.pk,
+        ]
+        assert backend.search_ids("invoi", user=None) == []
+
+    def test_current_time_queries_are_not_cached(
+        self,
+        backend: TantivyBackend,
+        mocker: MockerFixture,
+    ) -> None:
+        parse = mocker.spy(_backend_module, "parse_user_query")
+
+        backend.search_ids("added:[-1 hour TO now]", user=None)
+        backend.search_ids("added:[-1 hour TO now]", user=None)
+
+        assert parse.call_count == 2
+
+    def test_day_keywords_roll_over_at_midnight(
+        self,
+        backend: TantivyBackend,
+    ) -> None:
+        with time_machine.travel(datetime(2024, 3, 1, 12, tzinfo=UTC), tick=False):
+            doc = DocumentFactory()
+            backend.add_or_update(doc)
+            assert backend.search_ids("added:today", user=None) == [doc.pk]
+
+        with time_machine.travel(datetime(2024, 3, 2, 12, tzinfo=UTC), tick=False):
+            assert backend.search_ids("added:today", user=None) == []
+
+    def test_rebuild_clears_cache(
+        self,
+        backend: TantivyBackend,
+        mocker: MockerFixture,
+    ) -> None:
+        parse = mocker.spy(_backend_module, "parse_user_query")
+        backend.search_ids("pension", user=None)
+
+        backend.rebuild(Document.objects.none())
+        backend.search_ids("pension", user=None)
+
+        assert parse.call_count == 2
+
 
 class TestSingleton:
     """Test get_backend() and reset_backend() singleton lifecycle."""
@@ -1014,3 +1203,60 @@ class TestHighlightHits:
         hits = backend.highlight_hits("quick", [doc.pk])
 
         assert len(hits) == 0
+
+    def test_highlights_are_cached_per_index_generation(
+        self,
+        backend: TantivyBackend,
+        mocker: MockerFixture,
+    ) -> None:
+        """Repeated calls reuse cached highlights until the index changes."""
+        doc = Document.objects.create(
+            title="Cached",
+            content="The quick brown fox",
+            checksum="HH4",
+            pk=93,
+        )
+        backend.add_or_update(doc)
+        generate = mocker.spy(backend, "_generate_highlights")
+
+        first = backend.highlight_hits("quick", [doc.pk])
+        second = backend.highlight_hits("quick", [doc.pk], rank_start=26)
+
+        assert generate.call_count == 1
+        assert second[0]["highlights"] == first[0]["highlights"]
+        assert second[0]["rank"] == 26
+
+        doc.content = "The quick red fox"
+        doc.save()
+        backend.add_or_update(doc)
+        third = backend.highlight_hits("quick", [doc.pk])
+
+        assert generate.call_count == 2
+        assert "red" in third[0]["highlights"]["content"]
+
+    def test_only_uncached_documents_are_generated(
+        self,
+        backend: TantivyBackend,
+        mocker: MockerFixture,
+    ) -> None:
+        """A page overlapping a cached page only generates snippets for new docs."""
+        docs = [
+            Document.objects.create(
+                title=f"Overlap {i}",
+                content="quarterly report",
+                checksum=f"HH5{i}",
+                pk=94 + i,
+            )
+            for i in range(3)
+        ]
+        with backend.batch_update() as batch:
+            for doc in docs:
+                batch.add_or_update(doc)
+        backend.highlight_hits("report", [docs[0].pk, docs[1].pk])
+        generate = mocker.spy(backend, "_generate_highlights")
+
+        hits = backend.highlight_hits("report", [d.pk for d in docs])
+
+        generate.assert_called_once_with("report", [docs[2].pk], SearchMode.QUERY)
+        assert [hit["id"] for hit in hits] == [d.pk for d in docs]
+        assert [hit["rank"] for hit in hits] == [1, 2, 3]
@@ -0,0 +1,227 @@
+"""Tests for the coalescing single-document index queue and writer metrics."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import filelock
+import pytest
+from django.core.cache import cache
+
+from documents.search import get_index_writer_stats
+from documents.search._backend import SearchIndexLockError
+from documents.search._backend import TantivyBackend
+from documents.search._queue import IndexUpdateQueue
+from documents.search._queue import PendingIndexOp
+from documents.tests.factories import DocumentFactory
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+    from pathlib import Path
+
+    from pytest_django.fixtures import SettingsWrapper
+    from pytest_mock import MockerFixture
+
+pytestmark = [pytest.mark.search, pytest.mark.django_db]
+
+
+@pytest.fixture
+def disk_backend(tmp_path: Path) -> Generator[TantivyBackend, None, None]:
+    b = TantivyBackend(path=tmp_path)
+    b.open()
+    try:
+        yield b
+    finally:
+        b.close()
+
+
+@pytest.fixture(autouse=True)
+def _clear_metrics() -> None:
+    cache.clear()
+
+
+class TestIndexUpdateQueue:
+    def test_add_or_update_goes_through_queue(
+        self,
+        disk_backend: TantivyBackend,
+        tmp_path: Path,
+    ) -> None:
+        """Single-document writes on a disk index are committed and leave no tickets."""
+        doc = DocumentFactory(content="queued invoice")
+
+        disk_backend.add_or_update(doc)
+
+        assert disk_backend.search_ids("invoice", user=None) == [doc.pk]
+        assert IndexUpdateQueue(disk_backend, tmp_path).pending_count() == 0
+
+        disk_backend.remove(doc.pk)
+
+        assert disk_backend.search_ids("invoice", user=None) == []
+        assert IndexUpdateQueue(disk_backend, tmp_path).pending_count() == 0
+
+    def test_pending_tickets_are_committed_together(
+        self,
+        disk_backend: TantivyBackend,
+        tmp_path: Path,
+    ) -> None:
+        """Tickets spooled by other workers are drained into the winner's commit."""
+        queue = IndexUpdateQueue(disk_backend, tmp_path)
+        others = [DocumentFactory(content="coalesced receipt") for _ in range(3)]
+        for other in others:
+            queue._write_ticket(
+                PendingIndexOp(other.pk, disk_backend._build_tantivy_doc(other)),
+            )
+        doc = DocumentFactory(content="coalesced receipt")
+
+        disk_backend.add_or_update(doc)
+
+        assert sorted(disk_backend.search_ids("receipt", user=None)) == sorted(
+            [d.pk for d in [*others, doc]],
+        )
+        stats = get_index_writer_stats()
+        assert stats["commits"] == 1
+        assert stats["committed_operations"] == 4
+        assert queue.pending_count() == 0
+
+    def test_latest_ticket_wins_per_document(
+        self,
+        disk_backend: TantivyBackend,
+        tmp_path: Path,
+    ) -> None:
+        """A removal queued after an upsert of the same document takes precedence."""
+        queue = IndexUpdateQueue(disk_backend, tmp_path)
+        doc = DocumentFactory(content="superseded statement")
+        queue._write_ticket(
+            PendingIndexOp(doc.pk, disk_backend._build_tantivy_doc(doc)),
+        )
+
+        disk_backend.remove(doc.pk)
+
+        assert disk_backend.search_ids("statement", user=None) == []
+        assert get_index_writer_stats()["commits"] == 1
+
+    def test_returns_when_another_writer_commits_ticket(
+        self,
+        disk_backend: TantivyBackend,
+        tmp_path: Path,
+        mocker: MockerFixture,
+    ) -> None:
+        """A waiting submitter stops polling once its ticket has been drained."""
+        queue = IndexUpdateQueue(disk_backend, tmp_path)
+
+        def other_writer_drains(timeout: float) -> None:
+            for ticket in (tmp_path / ".pending").glob("*.pending"):
+                ticket.unlink()
+            raise filelock.Timeout("")
+
+        mock_acquire = mocker.patch(
+            "documents.search._queue.filelock.FileLock.acquire",
+            side_effect=other_writer_drains,
+        )
+
+        queue.submit(PendingIndexOp(1, None), lock_timeout=1.0)
+
+        mock_acquire.assert_called_once()
+        assert get_index_writer_stats()["commits"] == 0
+
+    def test_tickets_deleted_before_lock_release(
+        self,
+        disk_backend: TantivyBackend,
+        tmp_path: Path,
+        mocker: MockerFixture,
+    ) -> None:
+        """No writer taking the lock next can see tickets already committed."""
+        queue = IndexUpdateQueue(disk_backend, tmp_path)
+        queue._write_ticket(PendingIndexOp(1, None))
+        pending_on_release = []
+        release = filelock.FileLock.release
+
+        def record_pending(lock: filelock.FileLock, *args, **kwargs) -> None:
+            pending_on_release.append(queue.pending_count())
+            release(lock, *args, **kwargs)
+
+        mocker.patch.object(filelock.FileLock, "release", record_pending)
+
+        queue.submit(PendingIndexOp(2, None), lock_timeout=1.0)
+
+        assert pending_on_release[0] == 0
+
+    def test_failed_commit_keeps_tickets(
+        self,
+        disk_backend: TantivyBackend,
+        tmp_path: Path,
+        mocker: MockerFixture,
+    ) -> None:
+        """Tickets of a batch whose commit failed are left for the next writer."""
+        queue = IndexUpdateQueue(disk_backend, tmp_path)
+        mocker.patch(
+            "documents.search._queue.IndexUpdateQueue._drain_into",
+            side_effect=RuntimeError,
+        )
+
+        with pytest.raises(RuntimeError):
+            queue.submit(PendingIndexOp(1, None), lock_timeout=1.0)
+
+        assert queue.pending_count() == 1
+
+    def test_lock_exhaustion_withdraws_ticket(
+        self,
+        disk_backend: TantivyBackend,
+        tmp_path: Path,
+        mocker: MockerFixture,
+    ) -> None:
+        """On lock exhaustion the ticket is removed so a deferred retry is authoritative."""
+        queue = IndexUpdateQueue(disk_backend, tmp_path)
+        mocker.patch(
+            "documents.search._queue.filelock.FileLock.acquire",
+            side_effect=filelock.Timeout(""),
+        )
+
+        with pytest.raises(SearchIndexLockError):
+            queue.submit(PendingIndexOp(1, None), lock_timeout=0.1)
+
+        assert queue.pending_count() == 0
+
+    def test_coalesce_window_delays_lock_attempt(
+        self,
+        disk_backend: TantivyBackend,
+        settings: SettingsWrapper,
+        mocker: MockerFixture,
+    ) -> None:
+        settings.SEARCH_INDEX_COALESCE_WINDOW = 0.5
+        mock_sleep = mocker.patch("documents.search._queue.time.sleep")
+        doc = DocumentFactory(content="windowed")
+
+        disk_backend.add_or_update(doc)
+
+        mock_sleep.assert_called_once_with(0.5)
+        assert disk_backend.search_ids("windowed", user=None) == [doc.pk]
+
+
+class TestIndexWriterStats:
+    def test_batch_update_records_commit_and_lock_wait(
+        self,
+        disk_backend: TantivyBackend,
+    ) -> None:
+        docs = DocumentFactory.create_batch(2)
+
+        with disk_backend.batch_update() as batch:
+            for doc in docs:
+                batch.add_or_update(doc)
+
+        stats = get_index_writer_stats()
+        assert stats["commits"] == 1
+        assert stats["committed_operations"] == 2
+        assert stats["lock_acquisitions"] == 1
+        assert stats["lock_wait_seconds"] >= 0
+
+    def test_failed_batch_records_no_commit(
+        self,
+        disk_backend: TantivyBackend,
+    ) -> None:
+        with pytest.raises(RuntimeError):
+            with disk_backend.batch_update() as batch:
+                batch.remove(1)
+                raise RuntimeError
+
+        assert get_index_writer_stats()["commits"] == 0
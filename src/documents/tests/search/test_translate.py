@@ -22,6 +22,7 @@ from documents.search._translate import FieldValue
 from documents.search._translate import FieldValueList
 from documents.search._translate import InvalidDateQuery
 from documents.search._translate import Passthrough
+from documents.search._translate import depends_on_current_time
 from documents.search._translate import resolve_commas
 from documents.search._translate import scan
 from documents.search._translate import translate_query
@@ -376,6 +377,34 @@ class TestTranslateQuery:
         index.parse_query(translated, DEFAULT_SEARCH_FIELDS, field_boosts=_FIELD_BOOSTS)
 
 
+@pytest.mark.search
+class TestDependsOnCurrentTime:
+    @pytest.mark.parametrize(
+        "raw",
+        [
+            "added:[now-7d TO now]",
+            "created:[-1 week to]",
+            "added:-2 hours",
+            "modified:[2020 TO NOW]",
+        ],
+    )
+    def test_instant_relative_queries(self, raw: str) -> None:
+        assert depends_on_current_time(raw)
+
+    @pytest.mark.parametrize(
+        "raw",
+        [
+            "bank statement",
+            "created:today",
+            "added:previous month,tag:invoice",
+            "created:[2020-01-01 TO 2020-12-31]",
+            "invoice-2024",
+        ],
+    )
+    def test_day_or_fixed_queries(self, raw: str) -> None:
+        assert not depends_on_current_time(raw)
+
+
 @pytest.mark.search
 class TestFieldAliasing:
     """Whoosh->Tantivy field-name aliasing (type/path -> document_type/storage_path)."""
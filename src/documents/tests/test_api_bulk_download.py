@@ -3,8 +3,11 @@ import io
 import json
 import shutil
 import zipfile
+from unittest import mock
 
+from asgiref.sync import async_to_sync
 from django.contrib.auth.models import User
+from django.test import AsyncClient
 from django.test import override_settings
 from django.utils import timezone
 from rest_framework import status
@@ -167,6 +170,121 @@ class TestBulkDownload(DirectoriesMixin, SampleDirMixin, APITestCase):
         )
         response.close()
 
+    def test_compression_skips_compressed_formats(self) -> None:
+        """
+        GIVEN:
+            - A PDF and a plain text document
+        WHEN:
+            - Downloading both with deflate compression
+        THEN:
+            - The text is deflated, the PDF is stored
+        """
+        text_doc = Document.objects.create(
+            title="notes",
+            filename="notes.txt",
+            mime_type="text/plain",
+            checksum="E",
+            created=timezone.make_aware(datetime.datetime(2022, 2, 2)),
+        )
+        text_doc.source_path.write_text("some notes " * 100)
+
+        response = self.client.post(
+            self.ENDPOINT,
+            json.dumps(
+                {
+                    "documents": [self.doc2.id, text_doc.id],
+                    "compression": "deflated",
+                },
+            ),
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with zipfile.ZipFile(io.BytesIO(read_streaming_response(response))) as zipf:
+            self.assertIsNone(zipf.testzip())
+            self.assertEqual(
+                zipf.getinfo("2021-01-01 document A.pdf").compress_type,
+                zipfile.ZIP_STORED,
+            )
+            self.assertEqual(
+                zipf.getinfo("2022-02-02 notes.txt").compress_type,
+                zipfile.ZIP_DEFLATED,
+            )
+            self.assertEqual(
+                zipf.read("2022-02-02 notes.txt"),
+                text_doc.source_path.read_bytes(),
+            )
+
+    def test_download_is_streamed(self) -> None:
+        """
+        GIVEN:
+            - Documents to download
+        WHEN:
+            - The download is requested
+        THEN:
+            - The zip file is streamed, starting with the first entry
+            - Nothing is written to the scratch directory
+        """
+        response = self.client.post(
+            self.ENDPOINT,
+            json.dumps({"documents": [self.doc2.id, self.doc3.id], "content": "both"}),
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            response["Content-Disposition"],
+            'attachment; filename="documents.zip"',
+        )
+        chunks = iter(response.streaming_content)
+        self.assertTrue(next(chunks).startswith(b"PK\x03\x04"))
+        self.assertEqual(list(self.dirs.scratch_dir.iterdir()), [])
+        content = b"".join(chunks)
+        response.close()
+        self.assertTrue(content.endswith(b"\x00"))
+
+    def test_download_is_streamed_under_asgi(self) -> None:
+        """
+        GIVEN:
+            - Documents to download
+        WHEN:
+            - The download is requested through the async client
+        THEN:
+            - The first chunk arrives before the later files are added
+        """
+
+        async def download() -> tuple[list[bytes], list[int]]:
+            client = AsyncClient()
+            await client.aforce_login(self.user)
+            response = await client.post(
+                self.ENDPOINT,
+                json.dumps(
+                    {"documents": [self.doc2.id, self.doc3.id], "content": "both"},
+                ),
+                content_type="application/json",
+            )
+            parts = []
+            added = []
+            async for part in response:
+                parts.append(part)
+                added.append(from_file.call_count)
+            response.close()
+            return parts, added
+
+        with mock.patch.object(
+            zipfile.ZipInfo,
+            "from_file",
+            wraps=zipfile.ZipInfo.from_file,
+        ) as from_file:
+            parts, added = async_to_sync(download)()
+
+        self.assertEqual(added[0], 1)
+        self.assertEqual(added[-1], 3)
+        with zipfile.ZipFile(io.BytesIO(b"".join(parts))) as zipf:
+            self.assertIsNone(zipf.testzip())
+            self.assertEqual(len(zipf.namelist()), 3)
+
     @override_settings(FILENAME_FORMAT="{correspondent}/{title}")
     def test_formatted_download_originals(self) -> None:
         """
@@ -21,7 +21,9 @@ from django.core import mail
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.db import DataError
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from guardian.shortcuts import assign_perm
 from rest_framework import status
@@ -53,6 +55,7 @@ from documents.tests.factories import TagFactory
 from documents.tests.utils import ConsumeTaskMixin
 from documents.tests.utils import DirectoriesMixin
 from documents.tests.utils import read_streaming_response
+from documents.views import StatisticsView
 
 
 class TestDocumentApi(DirectoriesMixin, ConsumeTaskMixin, APITestCase):
@@ -209,6 +212,77 @@ class TestDocumentApi(DirectoriesMixin, ConsumeTaskMixin, APITestCase):
         self.assertIn("created", results[0])
         self.assertEqual(results[0]["created"], "2024-01-15")
 
+    def test_document_list_projection(self) -> None:
+        """
+        GIVEN:
+            - A document with tags, notes and long content
+        WHEN:
+            - Documents are listed with only some fields or truncated content
+        THEN:
+            - The content is truncated by the database
+            - Relations not in the response are not fetched
+        """
+        doc = Document.objects.create(
+            title="long",
+            checksum="123",
+            mime_type="application/pdf",
+            content="a" * 1000,
+        )
+        doc.tags.add(Tag.objects.create(name="t"))
+        Note.objects.create(document=doc, note="note", user=self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                "/api/documents/?fields=id,content&truncate_content=true",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["results"],
+            [{"id": doc.pk, "content": "a" * 550}],
+        )
+        sql = [query["sql"] for query in queries.captured_queries]
+        page_query = next(q for q in sql if q.startswith('SELECT "documents_document"'))
+        self.assertNotIn('"documents_document"."content",', page_query)
+        self.assertFalse(any("_prefetch_related_val" in q for q in sql))
+        self.assertFalse(any(q.startswith('SELECT "documents_note"') for q in sql))
+
+        response = self.client.get("/api/documents/?fields=id,tags,notes")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"][0]["notes"]), 1)
+        self.assertEqual(len(response.data["results"][0]["tags"]), 1)
+
+    def test_truncated_content_filters_whole_content(self) -> None:
+        """
+        GIVEN:
+            - A document with a term past the truncated content length
+        WHEN:
+            - Documents are filtered and searched for that term with truncated
+              content
+        THEN:
+            - The document matches, and its content is still truncated
+        """
+        doc = Document.objects.create(
+            title="long",
+            checksum="123",
+            mime_type="application/pdf",
+            content="a " * 500 + "needle",
+        )
+
+        for query in (
+            "content__icontains=needle",
+            "title_content=needle",
+            "search=needle",
+        ):
+            response = self.client.get(
+                f"/api/documents/?{query}&fields=id,content&truncate_content=true",
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                response.data["results"],
+                [{"id": doc.pk, "content": doc.content[:550]}],
+                query,
+            )
+
     def test_document_created_format(self) -> None:
         """
         GIVEN:
@@ -1678,6 +1752,78 @@ class TestDocumentApi(DirectoriesMixin, ConsumeTaskMixin, APITestCase):
         self.assertEqual(response.data["document_type_count"], 1)
         self.assertEqual(response.data["storage_path_count"], 1)
 
+    def test_statistics_cached(self) -> None:
+        """
+        GIVEN:
+            - Statistics have been requested once
+        WHEN:
+            - Statistics are requested again without any changes
+            - Documents and tags are changed afterwards
+        THEN:
+            - The second request is served from the cache
+            - Changes invalidate the cached statistics
+        """
+        doc = Document.objects.create(title="none1", checksum="A", content="abc")
+        tag_inbox = Tag.objects.create(name="t1", is_inbox_tag=True)
+
+        response = self.client.get("/api/statistics/")
+        self.assertEqual(response.data["documents_total"], 1)
+        self.assertEqual(response.data["documents_inbox"], 0)
+
+        with mock.patch.object(
+            StatisticsView,
+            "_compute_statistics",
+        ) as mock_compute:
+            response = self.client.get("/api/statistics/")
+            mock_compute.assert_not_called()
+        self.assertEqual(response.data["documents_total"], 1)
+
+        doc.tags.add(tag_inbox)
+        response = self.client.get("/api/statistics/")
+        self.assertEqual(response.data["documents_inbox"], 1)
+
+        Document.objects.create(title="none2", checksum="B", content="12345")
+        response = self.client.get("/api/statistics/")
+        self.assertEqual(response.data["documents_total"], 2)
+        self.assertEqual(response.data["character_count"], 8)
+
+        doc.delete()
+        response = self.client.get("/api/statistics/")
+        self.assertEqual(response.data["documents_total"], 1)
+        self.assertEqual(response.data["documents_inbox"], 0)
+
+    def test_statistics_cached_per_user(self) -> None:
+        """
+        GIVEN:
+            - Two users without global statistics permission
+        WHEN:
+            - Both request statistics and a user is granted access to a document
+        THEN:
+            - Each user gets their own statistics
+            - The permission change invalidates the cached statistics
+        """
+        u1 = User.objects.create_user("user1")
+        u2 = User.objects.create_user("user2")
+        doc = Document.objects.create(title="none1", checksum="A", owner=u1)
+
+        self.client.force_authenticate(user=u1)
+        self.assertEqual(
+            self.client.get("/api/statistics/").data["documents_total"],
+            1,
+        )
+        self.client.force_authenticate(user=u2)
+        self.assertEqual(
+            self.client.get("/api/statistics/").data["documents_total"],
+            0,
+        )
+
+        assign_perm("view_document", u2, doc)
+
+        self.assertEqual(
+            self.client.get("/api/statistics/").data["documents_total"],
+            1,
+        )
+
     def test_upload(self) -> None:
         self.consume_file_mock.return_value = celery.result.AsyncResult(
             id=str(uuid.uuid4()),
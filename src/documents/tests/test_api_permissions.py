@@ -7,6 +7,8 @@ from allauth.mfa.totp.internal import auth as totp_auth
 from django.contrib.auth.models import Group
 from django.contrib.auth.models import Permission
 from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from guardian.shortcuts import assign_perm
 from guardian.shortcuts import get_perms
 from guardian.shortcuts import get_users_with_perms
@@ -1462,3 +1464,107 @@ class TestFullPermissionsFlag(APITestCase):
 
         resp = self.client.get("/api/documents/?full_perms=garbage")
         self.assertNotIn("permissions", resp.data["results"][0])
+
+
+class TestPermissionsQueryCount(APITestCase):
+    """
+    Permissions and sharing state of a list are loaded for the whole page at
+    once, so the number of queries does not grow with the page size.
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.user = User.objects.create_user(username="user")
+        self.user.user_permissions.add(
+            *Permission.objects.filter(
+                codename__in=["view_document", "view_tag"],
+            ),
+        )
+        self.other = User.objects.create_user(username="other")
+        self.group = Group.objects.create(name="group")
+        self.user.groups.add(self.group)
+        self.client.force_authenticate(self.user)
+
+    def create_documents(self, count: int) -> None:
+        for i in range(count):
+            doc = Document.objects.create(
+                title=f"Doc {i}",
+                checksum=f"{count}-{i}",
+                owner=self.user if i % 2 else self.other,
+            )
+            assign_perm("view_document", self.user, doc)
+            assign_perm("change_document", self.group, doc)
+            tag = Tag.objects.create(name=f"Tag {count}-{i}", owner=self.other)
+            assign_perm("view_tag", self.user, tag)
+            assign_perm("change_tag", self.group, tag)
+
+    def count_queries(self, url: str, documents: int) -> int:
+        Document.objects.all().delete()
+        Tag.objects.all().delete()
+        self.create_documents(documents)
+        # Warm up caches kept between requests, e.g. the user's permissions
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], documents)
+        return len(queries)
+
+    def test_document_list(self) -> None:
+        """
+        GIVEN:
+            - Documents shared with the user and their group
+        WHEN:
+            - Pages of different sizes are listed, with and without full_perms
+        THEN:
+            - The number of queries is the same for each page size
+        """
+        for url in ("/api/documents/", "/api/documents/?full_perms=true"):
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.count_queries(url, 3),
+                    self.count_queries(url, 20),
+                )
+
+    def test_tag_list(self) -> None:
+        """
+        GIVEN:
+            - Tags shared with the user and their group
+        WHEN:
+            - Pages of different sizes are listed, with and without full_perms
+        THEN:
+            - The number of queries is the same for each page size
+        """
+        for url in ("/api/tags/", "/api/tags/?full_perms=true"):
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.count_queries(url, 3),
+                    self.count_queries(url, 20),
+                )
+
+    def test_full_perms_content(self) -> None:
+        """
+        GIVEN:
+            - A document shared with a user and a group
+        WHEN:
+            - Documents are listed with and without full_perms
+        THEN:
+            - The batched permissions and sharing state are returned
+        """
+        doc = Document.objects.create(title="Doc", checksum="1", owner=self.user)
+        assign_perm("view_document", self.other, doc)
+        assign_perm("change_document", self.group, doc)
+
+        response = self.client.get("/api/documents/?full_perms=true")
+        self.assertEqual(
+            response.data["results"][0]["permissions"],
+            {
+                "view": {"users": [self.other.pk], "groups": []},
+                "change": {"users": [], "groups": [self.group.pk]},
+            },
+        )
+
+        response = self.client.get("/api/documents/")
+        self.assertTrue(response.data["results"][0]["user_can_change"])
+        self.assertTrue(response.data["results"][0]["is_shared_by_requester"])
@@ -1773,6 +1773,53 @@ class TestDocumentSearchApi(DirectoriesMixin, APITestCase):
         # "all" must contain ALL 10 matching IDs
         self.assertCountEqual(response.data["all"], doc_ids)
 
+    def test_search_result_ids_cached_across_pages(self) -> None:
+        """
+        GIVEN:
+            - Ten documents matching a query
+        WHEN:
+            - Page 1 and then page 2 of the search are requested
+        THEN:
+            - The Tantivy query runs only once; page 2 slices the cached IDs
+            - An index write yields a fresh result set including the new document
+        """
+        backend = get_backend()
+        for i in range(10):
+            doc = Document.objects.create(
+                title=f"cached doc {i}",
+                content="cachedresults content",
+                checksum=f"CR{i}",
+                archive_serial_number=i + 1,
+            )
+            backend.add_or_update(doc)
+
+        url = "/api/documents/?query=cachedresults&ordering=archive_serial_number&page_size=3"
+        with mock.patch.object(
+            backend,
+            "search_ids",
+            wraps=backend.search_ids,
+        ) as search_ids:
+            page1 = self.client.get(f"{url}&page=1")
+            page2 = self.client.get(f"{url}&page=2")
+
+            self.assertEqual(search_ids.call_count, 1)
+            self.assertEqual(page2.data["count"], 10)
+            page1_ids = [r["id"] for r in page1.data["results"]]
+            page2_ids = [r["id"] for r in page2.data["results"]]
+            self.assertEqual(set(page1_ids) & set(page2_ids), set())
+
+            new_doc = Document.objects.create(
+                title="cached doc new",
+                content="cachedresults content",
+                checksum="CRnew",
+                archive_serial_number=100,
+            )
+            backend.add_or_update(new_doc)
+            response = self.client.get(f"{url}&page=1")
+
+            self.assertEqual(search_ids.call_count, 2)
+            self.assertEqual(response.data["count"], 11)
+
     @mock.patch("documents.bulk_edit.bulk_update_documents")
     def test_global_search(self, m) -> None:
         """
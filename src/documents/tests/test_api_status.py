@@ -308,6 +308,7 @@ class TestSystemStatus(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["tasks"]["index_status"], "OK")
         self.assertIsNotNone(response.data["tasks"]["index_last_modified"])
+        self.assertIn("commits", response.data["tasks"]["index_writer_stats"])
 
     @mock.patch("documents.search.get_backend")
     def test_system_status_index_error(self, mock_get_backend) -> None:
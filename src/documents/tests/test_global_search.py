@@ -0,0 +1,219 @@
+"""Tests for the concurrent lookups behind the global search box."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+from django.contrib.auth.models import Permission
+from django.db import connection
+
+from documents import global_search as global_search_module
+from documents.global_search import SOURCES
+from documents.global_search import _in_worker
+from documents.global_search import _run_lookups
+from documents.global_search import global_search
+from documents.tests.factories import CorrespondentFactory
+from documents.tests.factories import TagFactory
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from django.contrib.auth.models import User
+    from pytest_mock import MockerFixture
+
+
+@pytest.fixture
+def persistent_connections(mocker: MockerFixture) -> None:
+    mocker.patch.dict(connection.settings_dict, {"CONN_MAX_AGE": 60})
+
+
+@pytest.fixture
+def outside_transaction(mocker: MockerFixture, persistent_connections: None) -> None:
+    mocker.patch(
+        "documents.global_search.connection.in_atomic_block",
+        new=False,
+    )
+    mocker.patch("documents.global_search.close_old_connections")
+
+
+def thread_ids() -> dict[str, Callable[[], list[int]]]:
+    return {
+        "a": lambda: [threading.get_ident()],
+        "b": lambda: [threading.get_ident()],
+    }
+
+
+class TestRunLookups:
+    @pytest.mark.usefixtures("outside_transaction")
+    def test_concurrent(self) -> None:
+        # Each lookup only returns once the other one has started
+        barrier = threading.Barrier(2, timeout=5)
+
+        def lookup(value: int) -> list[int]:
+            barrier.wait()
+            return [value, threading.get_ident()]
+
+        results = _run_lookups(
+            {"a": lambda: lookup(1), "b": lambda: lookup(2)},
+            timeout=None,
+        )
+
+        assert results["a"][0] == 1
+        assert results["b"][0] == 2
+        assert results["a"][1] != results["b"][1]
+
+    @pytest.mark.usefixtures("outside_transaction")
+    def test_timeout(self) -> None:
+        release = threading.Event()
+
+        def slow() -> list[int]:
+            release.wait(5)
+            return [1]
+
+        try:
+            results = _run_lookups({"slow": slow, "fast": lambda: [2]}, timeout=0.05)
+        finally:
+            release.set()
+
+        assert results == {"slow": [], "fast": [2]}
+
+    def test_inside_transaction(self, mocker: MockerFixture) -> None:
+        mocker.patch(
+            "documents.global_search.connection.in_atomic_block",
+            new=True,
+        )
+        main_thread = threading.get_ident()
+
+        results = _run_lookups(thread_ids(), timeout=None)
+
+        assert results == {"a": [main_thread], "b": [main_thread]}
+
+    def test_without_persistent_connections(self, mocker: MockerFixture) -> None:
+        mocker.patch(
+            "documents.global_search.connection.in_atomic_block",
+            new=False,
+        )
+        mocker.patch.dict(
+            connection.settings_dict,
+            {"CONN_MAX_AGE": 0, "OPTIONS": {}},
+        )
+        main_thread = threading.get_ident()
+
+        results = _run_lookups(thread_ids(), timeout=None)
+
+        assert results == {"a": [main_thread], "b": [main_thread]}
+
+    def test_pooled_connections(self, mocker: MockerFixture) -> None:
+        mocker.patch(
+            "documents.global_search.connection.in_atomic_block",
+            new=False,
+        )
+        mocker.patch("documents.global_search.close_old_connections")
+        mocker.patch.dict(
+            connection.settings_dict,
+            {"CONN_MAX_AGE": 0, "OPTIONS": {"pool": True}},
+        )
+
+        results = _run_lookups(thread_ids(), timeout=None)
+
+        assert threading.get_ident() not in (results["a"][0], results["b"][0])
+
+    @pytest.mark.usefixtures("outside_transaction")
+    def test_too_many_pending(self, mocker: MockerFixture) -> None:
+        mocker.patch("documents.global_search._MAX_PENDING", 1)
+        main_thread = threading.get_ident()
+
+        results = _run_lookups(thread_ids(), timeout=None)
+
+        assert results == {"a": [main_thread], "b": [main_thread]}
+
+    @pytest.mark.usefixtures("outside_transaction")
+    def test_pending_released(self) -> None:
+        release = threading.Event()
+
+        def slow() -> list[int]:
+            release.wait(5)
+            return [1]
+
+        try:
+            _run_lookups({"slow": slow, "fast": lambda: [2]}, timeout=0.05)
+            # The slow lookup is still running after the search returned
+            assert global_search_module._pending >= 1
+        finally:
+            release.set()
+
+        deadline = time.monotonic() + 5
+        while global_search_module._pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert global_search_module._pending == 0
+
+    def test_past_deadline_not_run(self) -> None:
+        def lookup() -> list[int]:
+            pytest.fail("lookup run past its deadline")
+
+        assert _in_worker(lookup, time.monotonic() - 1) == []
+
+
+@pytest.mark.django_db
+class TestGlobalSearch:
+    def test_permitted_objects(
+        self,
+        regular_user: User,
+        django_user_model: type[User],
+    ) -> None:
+        other = django_user_model.objects.create_user("other")
+        regular_user.user_permissions.add(
+            Permission.objects.get(codename="view_tag"),
+        )
+        own = TagFactory(name="bank owned", owner=regular_user)
+        unowned = TagFactory(name="bank unowned")
+        TagFactory(name="bank other", owner=other)
+        CorrespondentFactory(name="bank correspondent")
+
+        results = global_search(regular_user, "bank", db_only=True)
+
+        assert set(results) == set(SOURCES)
+        assert {tag.pk for tag in results["tags"]} == {own.pk, unowned.pk}
+        assert results["correspondents"] == []
+        assert results["documents"] == []
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("persistent_connections")
+def test_global_search_in_threads(
+    admin_user: User,
+    mocker: MockerFixture,
+) -> None:
+    """
+    GIVEN:
+        - Persistent database connections
+        - Committed objects matching the query
+    WHEN:
+        - Searching outside of a transaction
+    THEN:
+        - The sources are looked up on the worker threads, with connections of
+          their own, and find the objects
+    """
+    TagFactory(name="bank tag")
+    CorrespondentFactory(name="bank correspondent")
+    threads: set[str] = set()
+    search_objects = global_search_module._search_objects
+
+    def record_thread(*args, **kwargs):
+        threads.add(threading.current_thread().name)
+        return search_objects(*args, **kwargs)
+
+    mocker.patch(
+        "documents.global_search._search_objects",
+        side_effect=record_thread,
+    )
+
+    results = global_search(admin_user, "bank", db_only=True)
+
+    assert [tag.name for tag in results["tags"]] == ["bank tag"]
+    assert [c.name for c in results["correspondents"]] == ["bank correspondent"]
+    assert threads
+    assert all(name.startswith("global-search") for name in threads)
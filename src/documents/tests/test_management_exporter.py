@@ -26,6 +26,7 @@ from guardian.models import GroupObjectPermission
 from guardian.models import UserObjectPermission
 from guardian.shortcuts import assign_perm
 
+from documents.export.sinks import _reflink
 from documents.management.commands import document_exporter
 from documents.models import Correspondent
 from documents.models import CustomField
@@ -44,6 +45,7 @@ from documents.models import WorkflowTrigger
 from documents.sanity_checker import check_sanity
 from documents.settings import EXPORTER_FILE_NAME
 from documents.settings import EXPORTER_SHARE_LINK_BUNDLE_NAME
+from documents.tests.utils import AuditLogRegistryMixin
 from documents.tests.utils import DirectoriesMixin
 from documents.tests.utils import FileSystemAssertsMixin
 from documents.tests.utils import SampleDirMixin
@@ -53,6 +55,7 @@ from paperless_mail.models import MailAccount
 
 @pytest.mark.management
 class TestExportImport(
+    AuditLogRegistryMixin,
     DirectoriesMixin,
     FileSystemAssertsMixin,
     SampleDirMixin,
@@ -164,6 +167,7 @@ class TestExportImport(
         split_manifest=False,
         use_folder_prefix=False,
         data_only=False,
+        incremental=False,
     ):
         args = ["document_exporter", self.target]
         if use_filename_format:
@@ -184,6 +188,8 @@ class TestExportImport(
             args += ["--use-folder-prefix"]
         if data_only:
             args += ["--data-only"]
+        if incremental:
+            args += ["--incremental"]
 
         call_command(*args, skip_checks=True)
 
@@ -482,6 +488,133 @@ class TestExportImport(
 
         self.assertIsFile(self.target / "manifest.json")
 
+    def test_update_export_incremental(self) -> None:
+        """
+        GIVEN:
+            - A previous incremental export
+        WHEN:
+            - Exporting again with checksum comparison, after one document changed
+        THEN:
+            - Only the changed document is copied
+            - No unchanged exported file is read to compare checksums
+        """
+        shutil.rmtree(Path(self.dirs.media_dir) / "documents")
+        shutil.copytree(
+            Path(__file__).parent / "samples" / "documents",
+            Path(self.dirs.media_dir) / "documents",
+        )
+
+        self._do_export(incremental=True)
+        self.assertIsFile(self.target / ".export-state.json")
+
+        Path(self.d1.source_path).touch()
+
+        with (
+            mock.patch(
+                "documents.export.sinks.copy_file_with_basic_stats",
+            ) as copy,
+            mock.patch(
+                "documents.export.sinks.compute_checksum",
+                return_value="",
+            ) as checksum,
+        ):
+            self._do_export(incremental=True, compare_checksums=True)
+            self.assertEqual(copy.call_count, 1)
+            self.assertEqual(copy.call_args.args[0], self.d1.source_path)
+            # Only the changed document and the new manifest are hashed
+            self.assertEqual(checksum.call_count, 2)
+
+    def test_import_linked_and_verified(self) -> None:
+        """
+        GIVEN:
+            - An export on the same filesystem as the media directory
+        WHEN:
+            - Importing it with reflinks, checksum verification and two threads
+        THEN:
+            - Thumbnails and archive files are reflinked where possible
+            - No file is shared with the export
+            - The copy throughput is reported
+        """
+        shutil.rmtree(Path(self.dirs.media_dir) / "documents")
+        shutil.copytree(
+            Path(__file__).parent / "samples" / "documents",
+            Path(self.dirs.media_dir) / "documents",
+        )
+        manifest = self._do_export()
+        exported = self._get_document_from_manifest(manifest, self.d1.id)
+
+        with paperless_environment():
+            Document.objects.all().delete()
+            stdout = StringIO()
+
+            with mock.patch(
+                "documents.export.sinks._reflink",
+                wraps=_reflink,
+            ) as reflink:
+                call_command(
+                    "document_importer",
+                    "--no-progress-bar",
+                    "--copy-mode",
+                    "reflink",
+                    "--verify-checksums",
+                    "--threads",
+                    "2",
+                    self.target,
+                    stdout=stdout,
+                    skip_checks=True,
+                )
+
+            doc = Document.objects.get(id=self.d1.id)
+            placed = {
+                doc.thumbnail_path: exported[document_exporter.EXPORTER_THUMBNAIL_NAME],
+                doc.archive_path: exported[document_exporter.EXPORTER_ARCHIVE_NAME],
+                doc.source_path: exported[EXPORTER_FILE_NAME],
+            }
+            for path, name in placed.items():
+                self.assertFalse(path.samefile(self.target / name))
+                self.assertEqual(
+                    path.read_bytes(),
+                    (self.target / name).read_bytes(),
+                )
+            self.assertIn(
+                mock.call(
+                    self.target / exported[document_exporter.EXPORTER_ARCHIVE_NAME],
+                    doc.archive_path,
+                ),
+                reflink.call_args_list,
+            )
+            self.assertIn("Copied 9 files", stdout.getvalue())
+
+    def test_import_checksum_mismatch(self) -> None:
+        """
+        GIVEN:
+            - An export with a damaged original
+        WHEN:
+            - Importing it with checksum verification
+        THEN:
+            - A CommandError names the damaged file
+        """
+        shutil.rmtree(Path(self.dirs.media_dir) / "documents")
+        shutil.copytree(
+            Path(__file__).parent / "samples" / "documents",
+            Path(self.dirs.media_dir) / "documents",
+        )
+        manifest = self._do_export()
+        exported = self._get_document_from_manifest(manifest, self.d2.id)
+        (self.target / exported[EXPORTER_FILE_NAME]).write_bytes(b"damaged")
+
+        with paperless_environment():
+            Document.objects.all().delete()
+
+            with self.assertRaisesMessage(CommandError, "Checksum mismatch"):
+                call_command(
+                    "document_importer",
+                    "--no-progress-bar",
+                    "--verify-checksums",
+                    self.target,
+                    skip_checks=True,
+                )
+
     def test_update_export_deleted_document(self) -> None:
         shutil.rmtree(Path(self.dirs.media_dir) / "documents")
         shutil.copytree(
@@ -1078,9 +1211,40 @@ class TestExportImport(
                         skip_checks=True,
                     )
 
+    def test_zip_with_incremental_flags_raises(self) -> None:
+        """
+        GIVEN:
+            - A request to export to a zip file
+        WHEN:
+            - --incremental or --copy-mode is also passed
+        THEN:
+            - A CommandError is raised (the flags are no-ops in zip mode)
+        """
+        for flags in (["--incremental"], ["--copy-mode", "hardlink"]):
+            with self.subTest(flags=flags):
+                with self.assertRaises(CommandError):
+                    call_command(
+                        "document_exporter",
+                        self.target,
+                        "--zip",
+                        *flags,
+                        skip_checks=True,
+                    )
+
+    def test_invalid_threads_raises(self) -> None:
+        with self.assertRaisesMessage(CommandError, "--threads must be at least 1"):
+            call_command(
+                "document_exporter",
+                self.target,
+                "--threads",
+                "0",
+                skip_checks=True,
+            )
+
 
 @pytest.mark.management
 class TestCryptExportImport(
+    AuditLogRegistryMixin,
     DirectoriesMixin,
     FileSystemAssertsMixin,
     TestCase,
@@ -15,6 +15,7 @@ from documents.management.commands.document_importer import _deserialize_record
 from documents.models import Document
 from documents.settings import EXPORTER_ARCHIVE_NAME
 from documents.settings import EXPORTER_FILE_NAME
+from documents.tests.utils import AuditLogRegistryMixin
 from documents.tests.utils import DirectoriesMixin
 from documents.tests.utils import FileSystemAssertsMixin
 from documents.tests.utils import SampleDirMixin
@@ -22,6 +23,7 @@ from documents.tests.utils import SampleDirMixin
 
 @pytest.mark.management
 class TestCommandImport(
+    AuditLogRegistryMixin,
     DirectoriesMixin,
     FileSystemAssertsMixin,
     SampleDirMixin,
@@ -164,6 +166,25 @@ class TestCommandImport(
             call_command("document_importer", Path("/tmp/notapath"), skip_checks=True)
         self.assertIn("That path doesn't exist", str(cm.exception))
 
+    def test_import_no_hardlinks(self) -> None:
+        """
+        GIVEN:
+            - Request to hard link files from the export
+        WHEN:
+            - Import is attempted
+        THEN:
+            - CommandError is raised, the library never shares files with an export
+        """
+        with self.assertRaises(CommandError) as cm:
+            call_command(
+                "document_importer",
+                Path("/tmp/notapath"),
+                "--copy-mode",
+                "hardlink",
+                skip_checks=True,
+            )
+        self.assertIn("invalid choice", str(cm.exception))
+
     def test_import_source_not_readable(self) -> None:
         """
         GIVEN:
@@ -0,0 +1,213 @@
+"""Tests for cursor pagination of the documents list."""
+
+from __future__ import annotations
+
+import datetime
+from typing import TYPE_CHECKING
+
+import pytest
+
+from documents.models import CustomField
+from documents.models import CustomFieldInstance
+from documents.models import Document
+from documents.models import Note
+from documents.tests.factories import CorrespondentFactory
+from documents.tests.factories import DocumentFactory
+
+if TYPE_CHECKING:
+    from django.contrib.auth.models import User
+    from rest_framework.test import APIClient
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def documents(admin_user: User) -> list[Document]:
+    correspondents = CorrespondentFactory.create_batch(3)
+    field = CustomField.objects.create(
+        name="number",
+        data_type=CustomField.FieldDataType.INT,
+    )
+    docs = []
+    for i in range(23):
+        doc = DocumentFactory(
+            title=f"Document {i % 5}",
+            created=datetime.date(2024, 1, 1 + i % 4),
+            correspondent=correspondents[i % 3] if i % 4 else None,
+            archive_serial_number=i if i % 3 else None,
+        )
+        if i % 2:
+            CustomFieldInstance.objects.create(
+                document=doc,
+                field=field,
+                value_int=i % 3,
+            )
+        if i % 5 == 0:
+            Note.objects.create(document=doc, note="note", user=admin_user)
+        docs.append(doc)
+    return docs
+
+
+def walk(client: APIClient, url: str) -> tuple[list[int], int]:
+    ids = []
+    count = None
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.data["previous"] is None
+        count = response.data["count"] if count is None else count
+        ids.extend(doc["id"] for doc in response.data["results"])
+        url = response.data["next"]
+    return ids, count
+
+
+class TestCursorPagination:
+    def test_default_ordering(
+        self,
+        admin_client: APIClient,
+        documents: list[Document],
+    ) -> None:
+        ids, count = walk(admin_client, "/api/documents/?pagination=cursor&page_size=4")
+
+        expected = admin_client.get("/api/documents/?page_size=100").data
+        assert ids == [doc["id"] for doc in expected["results"]]
+        assert count == expected["count"] == len(documents)
+
+    @pytest.mark.parametrize(
+        "ordering",
+        [
+            "title",
+            "-title",
+            "created",
+            "correspondent__name",
+            "-correspondent__name",
+            "archive_serial_number",
+            "-archive_serial_number",
+            "num_notes",
+            "-num_notes",
+        ],
+    )
+    def test_orderings(
+        self,
+        admin_client: APIClient,
+        documents: list[Document],
+        ordering: str,
+    ) -> None:
+        ids, _count = walk(
+            admin_client,
+            f"/api/documents/?pagination=cursor&page_size=3&ordering={ordering}",
+        )
+
+        assert sorted(ids) == sorted(doc.pk for doc in documents)
+
+    @pytest.mark.parametrize("ordering", ["custom_field_", "-custom_field_"])
+    def test_custom_field_ordering(
+        self,
+        admin_client: APIClient,
+        documents: list[Document],
+        ordering: str,
+    ) -> None:
+        field = CustomField.objects.get()
+
+        ids, _count = walk(
+            admin_client,
+            f"/api/documents/?pagination=cursor&page_size=3&ordering={ordering}{field.pk}",
+        )
+
+        assert sorted(ids) == sorted(doc.pk for doc in documents)
+
+    @pytest.mark.parametrize("ordering", ["added", "-added"])
+    @pytest.mark.parametrize("page_size", [1, 2])
+    def test_datetimes_below_milliseconds(
+        self,
+        admin_client: APIClient,
+        ordering: str,
+        page_size: int,
+    ) -> None:
+        """
+        Cursors keep the full precision of datetimes, so rows less than a
+        millisecond apart are neither skipped nor repeated.
+        """
+        added = datetime.datetime(2024, 1, 1, 12, tzinfo=datetime.UTC)
+        docs = DocumentFactory.create_batch(5)
+        for i, doc in enumerate(docs):
+            Document.objects.filter(pk=doc.pk).update(
+                added=added + datetime.timedelta(microseconds=100 * i),
+            )
+
+        ids = []
+        url = (
+            f"/api/documents/?pagination=cursor&page_size={page_size}"
+            f"&ordering={ordering}"
+        )
+        for _page in range(len(docs)):
+            response = admin_client.get(url)
+            assert response.status_code == 200
+            ids.extend(doc["id"] for doc in response.data["results"])
+            url = response.data["next"]
+            if not url:
+                break
+
+        expected = [doc.pk for doc in docs]
+        assert ids == (expected if ordering == "added" else expected[::-1])
+        assert url is None
+
+    def test_filtered(
+        self,
+        admin_client: APIClient,
+        documents: list[Document],
+    ) -> None:
+        correspondent = documents[1].correspondent
+
+        ids, count = walk(
+            admin_client,
+            f"/api/documents/?pagination=cursor&page_size=2&correspondent__id={correspondent.pk}",
+        )
+
+        expected = {doc.pk for doc in documents if doc.correspondent == correspondent}
+        assert set(ids) == expected
+        assert len(ids) == count == len(expected)
+
+    def test_count_is_cached(
+        self,
+        admin_client: APIClient,
+        documents: list[Document],
+    ) -> None:
+        response = admin_client.get("/api/documents/?pagination=cursor&page_size=5")
+        # bulk_create sends no signals, so the cached count stays in place
+        Document.objects.bulk_create(
+            [Document(title="new", checksum="new", created=datetime.date(2020, 1, 1))],
+        )
+
+        next_page = admin_client.get(response.data["next"])
+
+        assert next_page.data["count"] == len(documents)
+
+    def test_invalid_cursor(
+        self,
+        admin_client: APIClient,
+        documents: list[Document],
+    ) -> None:
+        response = admin_client.get("/api/documents/?cursor=garbage")
+
+        assert response.status_code == 404
+
+    def test_cursor_of_other_ordering(
+        self,
+        admin_client: APIClient,
+        documents: list[Document],
+    ) -> None:
+        response = admin_client.get("/api/documents/?pagination=cursor&page_size=5")
+
+        response = admin_client.get(response.data["next"] + "&ordering=title")
+
+        assert response.status_code == 404
+
+    def test_not_supported_for_search(
+        self,
+        admin_client: APIClient,
+        documents: list[Document],
+    ) -> None:
+        response = admin_client.get("/api/documents/?pagination=cursor&query=test")
+
+        assert response.status_code == 400
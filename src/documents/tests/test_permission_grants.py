@@ -0,0 +1,214 @@
+"""Tests for the materialized document permission grants."""
+
+from __future__ import annotations
+
+import pytest
+from django.contrib.auth.models import Group
+from django.contrib.auth.models import Permission
+from django.contrib.auth.models import User
+from django.core.management import CommandError
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.db import transaction
+from django.test import override_settings
+from guardian.models import UserObjectPermission
+from guardian.shortcuts import assign_perm
+from guardian.shortcuts import remove_perm
+
+from documents.models import DocumentPermissionGrant
+from documents.permissions import diff_document_permission_grants
+from documents.permissions import permitted_document_ids
+from documents.permissions import repair_document_permission_grants
+from documents.permissions import set_permissions_for_object
+from documents.tests.factories import DocumentFactory
+from documents.tests.factories import TagFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def grants() -> set[tuple[int, str, int | None, int | None]]:
+    return set(
+        DocumentPermissionGrant.objects.values_list(
+            "document_id",
+            "permission__codename",
+            "user_id",
+            "group_id",
+        ),
+    )
+
+
+class TestGrantSync:
+    def test_user_permission_is_materialized(self) -> None:
+        user = User.objects.create_user("alice")
+        doc = DocumentFactory()
+
+        assign_perm("view_document", user, doc)
+
+        assert grants() == {(doc.pk, "view_document", user.pk, None)}
+
+        remove_perm("view_document", user, doc)
+
+        assert grants() == set()
+
+    def test_group_permission_is_materialized(self) -> None:
+        group = Group.objects.create(name="staff")
+        doc = DocumentFactory()
+
+        assign_perm("change_document", group, doc)
+
+        assert grants() == {(doc.pk, "change_document", None, group.pk)}
+
+        remove_perm("change_document", group, doc)
+
+        assert grants() == set()
+
+    def test_set_permissions_for_object(self) -> None:
+        alice = User.objects.create_user("alice")
+        bob = User.objects.create_user("bob")
+        group = Group.objects.create(name="staff")
+        doc = DocumentFactory()
+
+        set_permissions_for_object(
+            {
+                "view": {"users": [alice.pk], "groups": []},
+                "change": {"users": [], "groups": [group.pk]},
+            },
+            doc,
+        )
+        set_permissions_for_object(
+            {"view": {"users": [bob.pk], "groups": [group.pk]}},
+            doc,
+        )
+
+        assert grants() == {
+            (doc.pk, "view_document", bob.pk, None),
+            (doc.pk, "view_document", None, group.pk),
+            (doc.pk, "change_document", None, group.pk),
+        }
+
+    def test_other_models_are_ignored(self) -> None:
+        user = User.objects.create_user("alice")
+
+        assign_perm("view_tag", user, TagFactory())
+
+        assert grants() == set()
+
+    def test_deleting_principal_or_document_removes_grants(self) -> None:
+        alice = User.objects.create_user("alice")
+        group = Group.objects.create(name="staff")
+        doc = DocumentFactory()
+        other = DocumentFactory()
+        assign_perm("view_document", alice, doc)
+        assign_perm("view_document", group, other)
+
+        alice.delete()
+        other.hard_delete()
+
+        assert grants() == set()
+
+    def test_duplicate_grants_are_rejected(self) -> None:
+        """
+        The unique constraints hold without conditions, so they are enforced on
+        every database, while user and group grants never collide.
+        """
+        alice = User.objects.create_user("alice")
+        group = Group.objects.create(name="staff")
+        doc = DocumentFactory()
+        permission = Permission.objects.get(codename="view_document")
+        DocumentPermissionGrant.objects.create(
+            document=doc,
+            permission=permission,
+            user=alice,
+        )
+        DocumentPermissionGrant.objects.create(
+            document=doc,
+            permission=permission,
+            group=group,
+        )
+
+        for principal in ({"user": alice}, {"group": group}):
+            with pytest.raises(IntegrityError), transaction.atomic():
+                DocumentPermissionGrant.objects.create(
+                    document=doc,
+                    permission=permission,
+                    **principal,
+                )
+
+        assert grants() == {
+            (doc.pk, "view_document", alice.pk, None),
+            (doc.pk, "view_document", None, group.pk),
+        }
+
+
+class TestPermittedDocumentIds:
+    @pytest.mark.parametrize("materialized", [True, False])
+    def test_matches_guardian(self, *, materialized: bool) -> None:
+        user = User.objects.create_user("alice")
+        group = Group.objects.create(name="staff")
+        user.groups.add(group)
+        owned = DocumentFactory(owner=user)
+        unowned = DocumentFactory()
+        via_user = DocumentFactory(owner=User.objects.create_user("bob"))
+        via_group = DocumentFactory(owner=User.objects.create_user("carol"))
+        hidden = DocumentFactory(owner=User.objects.create_user("dave"))
+        assign_perm("view_document", user, via_user)
+        assign_perm("view_document", group, via_group)
+        assign_perm("change_document", user, hidden)
+
+        with override_settings(MATERIALIZED_DOCUMENT_PERMISSIONS=materialized):
+            visible = set(permitted_document_ids(user))
+
+        assert visible == {owned.pk, unowned.pk, via_user.pk, via_group.pk}
+
+
+class TestDiffAndRepair:
+    def test_consistent(self) -> None:
+        user = User.objects.create_user("alice")
+        assign_perm("view_document", user, DocumentFactory())
+
+        assert diff_document_permission_grants().is_consistent
+
+    def test_repair_restores_missing_and_removes_stale(self) -> None:
+        user = User.objects.create_user("alice")
+        doc = DocumentFactory()
+        stale_doc = DocumentFactory()
+        assign_perm("view_document", user, doc)
+        assign_perm("view_document", user, stale_doc)
+        # Simulate changes made behind the signals' back
+        DocumentPermissionGrant.objects.filter(document=doc).delete()
+        UserObjectPermission.objects.filter(object_pk=str(stale_doc.pk)).update(
+            object_pk="0",
+        )
+
+        diff = diff_document_permission_grants()
+
+        assert {key[0] for key in diff.missing} == {doc.pk}
+        assert {key[0] for key in diff.stale} == {stale_doc.pk}
+
+        repair_document_permission_grants(diff)
+
+        assert grants() == {(doc.pk, "view_document", user.pk, None)}
+        assert diff_document_permission_grants().is_consistent
+
+
+class TestDocumentPermissionsCommand:
+    def test_check(self) -> None:
+        user = User.objects.create_user("alice")
+        assign_perm("view_document", user, DocumentFactory())
+
+        call_command("document_permissions", "check")
+
+        DocumentPermissionGrant.objects.all().delete()
+
+        with pytest.raises(CommandError, match="1 missing and 0 stale"):
+            call_command("document_permissions", "check")
+
+    def test_repair(self) -> None:
+        user = User.objects.create_user("alice")
+        doc = DocumentFactory()
+        assign_perm("view_document", user, doc)
+        DocumentPermissionGrant.objects.all().delete()
+
+        call_command("document_permissions", "repair")
+
+        assert grants() == {(doc.pk, "view_document", user.pk, None)}
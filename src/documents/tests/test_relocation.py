@@ -0,0 +1,254 @@
+from pathlib import Path
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import TestCase
+from django.test import override_settings
+from filelock import FileLock
+
+from documents import tasks
+from documents.file_handling import generate_filename
+from documents.models import Document
+from documents.models import StoragePath
+from documents.relocation import apply_relocations
+from documents.relocation import filename_templates_use_content
+from documents.relocation import plan_relocations
+from documents.tests.utils import DirectoriesMixin
+from documents.tests.utils import FileSystemAssertsMixin
+
+
+@override_settings(FILENAME_FORMAT=None)
+class TestRelocation(DirectoriesMixin, FileSystemAssertsMixin, TestCase):
+    def make_document(self, title: str, *, archive: bool = False) -> Document:
+        doc = Document.objects.create(
+            title=title,
+            checksum=title,
+            mime_type="application/pdf",
+        )
+        doc.filename = generate_filename(doc)
+        if archive:
+            doc.archive_filename = generate_filename(doc, archive_filename=True)
+        doc.save()
+        doc.source_path.write_bytes(b"original " + title.encode())
+        if archive:
+            doc.archive_path.write_bytes(b"archive " + title.encode())
+        return doc
+
+    def relocate_all(self, *, threads: int = 1) -> int:
+        plan = plan_relocations(Document.objects.order_by("pk"))
+        return apply_relocations(plan.relocations, threads=threads)
+
+    def test_relocate(self) -> None:
+        """
+        GIVEN:
+            - Documents with and without an archive version
+        WHEN:
+            - The filename format changes and the documents are relocated
+        THEN:
+            - Files are moved to their new paths and the new filenames are stored
+            - Directories left empty are removed
+        """
+        doc1 = self.make_document("first", archive=True)
+        doc2 = self.make_document("second")
+        old_source = doc1.source_path
+        old_archive = doc1.archive_path
+
+        with override_settings(FILENAME_FORMAT="{{ title }}/{{ title }}"):
+            self.assertEqual(self.relocate_all(threads=2), 2)
+        with override_settings(FILENAME_FORMAT="{{ title }}"):
+            self.assertEqual(self.relocate_all(threads=2), 2)
+
+        doc1.refresh_from_db()
+        doc2.refresh_from_db()
+        self.assertEqual(doc1.filename, "first.pdf")
+        self.assertEqual(doc1.archive_filename, "first.pdf")
+        self.assertEqual(doc2.filename, "second.pdf")
+        self.assertIsNone(doc2.archive_filename)
+        self.assertEqual(doc1.source_path.read_bytes(), b"original first")
+        self.assertEqual(doc1.archive_path.read_bytes(), b"archive first")
+        self.assertEqual(doc2.source_path.read_bytes(), b"original second")
+        self.assertIsNotFile(old_source)
+        self.assertIsNotFile(old_archive)
+        self.assertFalse((self.dirs.originals_dir / "first").exists())
+        self.assertFalse((self.dirs.archive_dir / "first").exists())
+
+    def test_unchanged(self) -> None:
+        """
+        GIVEN:
+            - A document already at the path its filename format gives
+        WHEN:
+            - Relocation is planned
+        THEN:
+            - Nothing is planned for it
+        """
+        self.make_document("doc")
+
+        plan = plan_relocations(Document.objects.all())
+
+        self.assertEqual(plan.relocations, [])
+        self.assertEqual(plan.unchanged, 1)
+
+    def test_collisions_within_plan(self) -> None:
+        """
+        GIVEN:
+            - Two documents rendering to the same new path
+        WHEN:
+            - The documents are relocated
+        THEN:
+            - The second document gets a counter appended, no file is overwritten
+        """
+        doc1 = self.make_document("same")
+        doc2 = self.make_document("same")
+
+        with override_settings(FILENAME_FORMAT="{{ title }}"):
+            self.assertEqual(self.relocate_all(threads=2), 2)
+
+        doc1.refresh_from_db()
+        doc2.refresh_from_db()
+        self.assertEqual(doc1.filename, "same.pdf")
+        self.assertEqual(doc2.filename, "same_01.pdf")
+        self.assertEqual(doc1.source_path.read_bytes(), b"original same")
+        self.assertEqual(doc2.source_path.read_bytes(), b"original same")
+
+    def test_target_exists(self) -> None:
+        """
+        GIVEN:
+            - A file not belonging to any document at the new path of a document
+        WHEN:
+            - The document is relocated
+        THEN:
+            - The document gets a counter appended and the file is left alone
+        """
+        doc = self.make_document("taken")
+        (self.dirs.originals_dir / "taken.pdf").write_bytes(b"someone else")
+
+        with override_settings(FILENAME_FORMAT="{{ title }}"):
+            self.assertEqual(self.relocate_all(), 1)
+
+        doc.refresh_from_db()
+        self.assertEqual(doc.filename, "taken_01.pdf")
+        self.assertEqual(
+            (self.dirs.originals_dir / "taken.pdf").read_bytes(),
+            b"someone else",
+        )
+
+    def test_missing_source(self) -> None:
+        """
+        GIVEN:
+            - A document whose file does not exist
+        WHEN:
+            - Relocation is planned
+        THEN:
+            - The document is counted as failed and not planned
+        """
+        doc = self.make_document("missing")
+        doc.source_path.unlink()
+
+        with override_settings(FILENAME_FORMAT="{{ title }}"):
+            plan = plan_relocations(Document.objects.all())
+
+        self.assertEqual(plan.relocations, [])
+        self.assertEqual(plan.failed, 1)
+
+    def test_changed_since_planned(self) -> None:
+        """
+        GIVEN:
+            - A planned relocation
+        WHEN:
+            - The filename of the document changes before it is applied
+        THEN:
+            - The document is skipped and its file is not moved
+        """
+        doc = self.make_document("doc")
+        with override_settings(FILENAME_FORMAT="{{ title }}"):
+            plan = plan_relocations(Document.objects.all())
+        Document.objects.filter(pk=doc.pk).update(filename="elsewhere.pdf")
+
+        self.assertEqual(apply_relocations(plan.relocations), 0)
+
+        self.assertIsFile(doc.source_path)
+        self.assertIsNotFile(self.dirs.originals_dir / "doc.pdf")
+
+    def test_database_error(self) -> None:
+        """
+        GIVEN:
+            - A planned relocation
+        WHEN:
+            - Storing the new filenames fails
+        THEN:
+            - The files are moved back and the filenames are unchanged
+        """
+        doc = self.make_document("doc", archive=True)
+        old_filename = doc.filename
+        with override_settings(FILENAME_FORMAT="{{ title }}"):
+            plan = plan_relocations(Document.objects.all())
+
+        with mock.patch(
+            "documents.relocation.Document.global_objects.bulk_update",
+            side_effect=DatabaseError,
+        ):
+            self.assertEqual(apply_relocations(plan.relocations), 0)
+
+        doc.refresh_from_db()
+        self.assertEqual(doc.filename, old_filename)
+        self.assertIsFile(doc.source_path)
+        self.assertIsFile(doc.archive_path)
+        self.assertIsNotFile(Path(self.dirs.originals_dir) / "doc.pdf")
+        self.assertIsNotFile(Path(self.dirs.archive_dir) / "doc.pdf")
+
+    def test_bulk_update_documents(self) -> None:
+        """
+        GIVEN:
+            - Documents with a storage path
+        WHEN:
+            - The storage path changes and bulk_update_documents runs for them
+        THEN:
+            - The files of all documents are moved under a single media lock
+            - The post_save handler moves no files itself
+        """
+        storage_path = StoragePath.objects.create(name="sp", path="old/{{ title }}")
+        docs = [self.make_document(f"doc{i}", archive=True) for i in range(3)]
+        Document.objects.update(storage_path=storage_path)
+        self.relocate_all()
+        StoragePath.objects.filter(pk=storage_path.pk).update(path="new/{{ title }}")
+
+        with (
+            mock.patch(
+                "documents.relocation.FileLock",
+                wraps=FileLock,
+            ) as relocation_lock,
+            mock.patch(
+                "documents.signals.handlers.FileLock",
+                wraps=FileLock,
+            ) as handler_lock,
+        ):
+            tasks.bulk_update_documents([doc.pk for doc in docs])
+
+        self.assertEqual(relocation_lock.call_count, 1)
+        handler_lock.assert_not_called()
+        for doc in docs:
+            doc.refresh_from_db()
+            self.assertEqual(doc.filename, f"new/{doc.title}.pdf")
+            self.assertEqual(doc.archive_filename, f"new/{doc.title}.pdf")
+            self.assertIsFile(doc.source_path)
+            self.assertIsFile(doc.archive_path)
+        self.assertFalse((self.dirs.originals_dir / "old").exists())
+
+    def test_filename_templates_use_content(self) -> None:
+        """
+        GIVEN:
+            - Filename format and storage paths
+        WHEN:
+            - It is checked whether they use the content of documents
+        THEN:
+            - Only templates referring to the content count
+        """
+        self.assertFalse(filename_templates_use_content())
+
+        storage_path = StoragePath.objects.create(name="sp", path="{{ title }}")
+        with override_settings(FILENAME_FORMAT="{title}"):
+            self.assertFalse(filename_templates_use_content())
+
+        storage_path.path = "{{ document.content[:10] }}"
+        storage_path.save()
+        self.assertTrue(filename_templates_use_content())
@@ -7,17 +7,22 @@ orphan detection, and the iter_wrapper contract.
 from __future__ import annotations
 
 import logging
+from datetime import timedelta
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 import pytest
+from django.utils import timezone
 
+from documents import sanity_checker
 from documents.sanity_checker import SanityCheckMessages
 from documents.sanity_checker import check_sanity
 
 if TYPE_CHECKING:
     from collections.abc import Iterable
 
+    from pytest_mock import MockerFixture
+
     from documents.models import Document
     from documents.tests.conftest import PaperlessDirs
 
@@ -230,6 +235,90 @@ class TestCheckSanityOrphans:
         assert not messages.has_warning
 
 
+@pytest.mark.django_db
+class TestCheckSanityChecksumCache:
+    def test_unchanged_files_not_hashed_again(
+        self,
+        sample_doc: Document,
+        mocker: MockerFixture,
+    ) -> None:
+        hash_file = mocker.spy(sanity_checker, "_hash_file")
+        check_sanity()
+        assert hash_file.call_count == 2
+
+        hash_file.reset_mock()
+        messages = check_sanity()
+
+        hash_file.assert_not_called()
+        assert not messages.has_error
+
+    def test_cached_checksum_still_compared(self, sample_doc: Document) -> None:
+        check_sanity()
+        sample_doc.checksum = "badhash"
+        sample_doc.save()
+
+        messages = check_sanity()
+
+        assert any(
+            "Checksum mismatch" in m["message"] and "badhash" in m["message"]
+            for m in messages[sample_doc.pk]
+        )
+
+    def test_changed_file_hashed_again(self, sample_doc: Document) -> None:
+        check_sanity()
+        with Path(sample_doc.source_path).open("ab") as f:
+            f.write(b"changed")
+
+        messages = check_sanity()
+
+        assert any("Checksum mismatch" in m["message"] for m in messages[sample_doc.pk])
+
+    def test_full_ignores_cache(
+        self,
+        sample_doc: Document,
+        mocker: MockerFixture,
+    ) -> None:
+        check_sanity()
+        hash_file = mocker.spy(sanity_checker, "_hash_file")
+
+        check_sanity(full=True)
+
+        assert hash_file.call_count == 2
+
+
+@pytest.mark.django_db
+class TestCheckSanitySince:
+    def test_only_recently_modified_checked(
+        self,
+        sample_doc: Document,
+        paperless_dirs: PaperlessDirs,
+    ) -> None:
+        Path(sample_doc.source_path).unlink()
+        since = timezone.now() + timedelta(minutes=1)
+
+        messages = check_sanity(since=since)
+
+        assert not messages.has_error
+        assert not messages.has_warning
+
+        messages = check_sanity(since=sample_doc.modified)
+
+        assert messages.has_error
+
+    def test_skipped_documents_files_not_orphaned(
+        self,
+        sample_doc: Document,
+        paperless_dirs: PaperlessDirs,
+    ) -> None:
+        (paperless_dirs.originals / "orphan.pdf").touch()
+
+        messages = check_sanity(since=timezone.now() + timedelta(minutes=1))
+
+        orphans = [m["message"] for m in messages[None]]
+        assert len(orphans) == 1
+        assert "orphan.pdf" in orphans[0]
+
+
 @pytest.mark.django_db
 class TestCheckSanityIterWrapper:
     def test_wrapper_receives_documents(self, sample_doc: Document) -> None:
@@ -0,0 +1,233 @@
+"""Tests for the in-memory selection facet index."""
+
+from __future__ import annotations
+
+from array import array
+from typing import TYPE_CHECKING
+
+import pytest
+from rest_framework.test import APIClient
+
+from documents import bulk_edit
+from documents.models import CustomField
+from documents.models import CustomFieldInstance
+from documents.selection import Selection
+from documents.selection import SelectionIndex
+from documents.selection import _facet_members
+from documents.selection import get_selection_index
+from documents.tests.factories import CorrespondentFactory
+from documents.tests.factories import DocumentFactory
+from documents.tests.factories import DocumentTypeFactory
+from documents.tests.factories import StoragePathFactory
+from documents.tests.factories import TagFactory
+
+if TYPE_CHECKING:
+    from django.contrib.auth.models import User
+    from pytest_mock import MockerFixture
+
+pytestmark = pytest.mark.django_db
+
+
+class TestSelection:
+    def test_dense_members_are_bitmaps(self) -> None:
+        members = _facet_members([1, 2, 3, 70])
+
+        assert members == (1 << 1) | (1 << 2) | (1 << 3) | (1 << 70)
+
+    def test_sparse_members_are_arrays(self) -> None:
+        members = _facet_members([100_000, 3])
+
+        assert members == array("l", [3, 100_000])
+
+    def test_count(self) -> None:
+        selection = Selection.from_ids([1, 3, 5, 100])
+
+        assert selection.count(_facet_members([1, 2, 3])) == 2
+        assert selection.count(array("l", [5, 100, 5_000])) == 2
+        assert selection.count(0) == 0
+
+
+class TestSelectionIndex:
+    def test_counts(self) -> None:
+        correspondent = CorrespondentFactory()
+        document_type = DocumentTypeFactory()
+        storage_path = StoragePathFactory()
+        tag = TagFactory()
+        field = CustomField.objects.create(
+            name="cf",
+            data_type=CustomField.FieldDataType.STRING,
+        )
+        doc1 = DocumentFactory(
+            correspondent=correspondent,
+            document_type=document_type,
+            storage_path=storage_path,
+        )
+        doc2 = DocumentFactory(correspondent=correspondent)
+        doc3 = DocumentFactory()
+        doc1.tags.add(tag)
+        doc3.tags.add(tag)
+        CustomFieldInstance.objects.create(document=doc2, field=field)
+
+        counts = SelectionIndex.build().count([doc1.pk, doc2.pk])
+
+        assert counts == {
+            "correspondents": {correspondent.pk: 2},
+            "document_types": {document_type.pk: 1},
+            "storage_paths": {storage_path.pk: 1},
+            "tags": {tag.pk: 1},
+            "custom_fields": {field.pk: 1},
+        }
+
+    def test_rebuilt_on_new_generation(self) -> None:
+        tag = TagFactory()
+        doc = DocumentFactory()
+        index = get_selection_index()
+
+        assert get_selection_index() is index
+
+        doc.tags.add(tag)
+        rebuilt = get_selection_index()
+
+        assert rebuilt is not index
+        assert rebuilt.count([doc.pk])["tags"] == {tag.pk: 1}
+
+    def test_kept_when_facets_unchanged(self) -> None:
+        """Saves that leave a document's facets alone do not rebuild the index."""
+        doc = DocumentFactory(correspondent=CorrespondentFactory())
+        field = CustomField.objects.create(
+            name="cf",
+            data_type=CustomField.FieldDataType.STRING,
+        )
+        instance = CustomFieldInstance.objects.create(document=doc, field=field)
+        index = get_selection_index()
+
+        doc.title = "renamed"
+        doc.save()
+        doc.save(update_fields=["content"])
+        instance.value_text = "value"
+        instance.save()
+
+        assert get_selection_index() is index
+
+    def test_rebuilt_on_facet_change(self) -> None:
+        doc = DocumentFactory()
+        correspondent = CorrespondentFactory()
+        index = get_selection_index()
+
+        doc.correspondent = correspondent
+        doc.save()
+        rebuilt = get_selection_index()
+
+        assert rebuilt is not index
+        assert rebuilt.count([doc.pk])["correspondents"] == {correspondent.pk: 1}
+
+    def test_rebuilt_on_facet_deletion(self) -> None:
+        correspondent = CorrespondentFactory()
+        doc = DocumentFactory(correspondent=correspondent)
+        index = get_selection_index()
+
+        correspondent.delete()
+
+        assert get_selection_index() is not index
+        assert get_selection_index().count([doc.pk])["correspondents"] == {}
+
+
+class TestSelectionDataApi:
+    @pytest.mark.parametrize("min_indexed_selection", [1, 1_000_000])
+    def test_index_matches_database(
+        self,
+        admin_user: User,
+        mocker: MockerFixture,
+        *,
+        min_indexed_selection: int,
+    ) -> None:
+        mocker.patch(
+            "documents.views.MIN_INDEXED_SELECTION",
+            min_indexed_selection,
+        )
+        correspondents = CorrespondentFactory.create_batch(2)
+        tags = TagFactory.create_batch(3)
+        field = CustomField.objects.create(
+            name="cf",
+            data_type=CustomField.FieldDataType.STRING,
+        )
+        docs = [DocumentFactory(correspondent=correspondents[i % 2]) for i in range(6)]
+        for i, doc in enumerate(docs):
+            doc.tags.add(*tags[: i % 4])
+        CustomFieldInstance.objects.create(document=docs[0], field=field)
+        client = APIClient()
+        client.force_authenticate(user=admin_user)
+
+        response = client.post(
+            "/api/documents/selection_data/",
+            {"documents": [doc.pk for doc in docs[:4]]},
+            format="json",
+        )
+
+        assert response.status_code == 200
+        assert {
+            name: sorted(counts, key=lambda item: item["id"])
+            for name, counts in response.data.items()
+        } == {
+            "selected_correspondents": [
+                {"id": correspondents[0].pk, "document_count": 2},
+                {"id": correspondents[1].pk, "document_count": 2},
+            ],
+            "selected_tags": [
+                {"id": tags[0].pk, "document_count": 3},
+                {"id": tags[1].pk, "document_count": 2},
+                {"id": tags[2].pk, "document_count": 1},
+            ],
+            "selected_document_types": [],
+            "selected_storage_paths": [],
+            "selected_custom_fields": [{"id": field.pk, "document_count": 1}],
+        }
+
+    def test_counts_after_bulk_edit(
+        self,
+        admin_user: User,
+        mocker: MockerFixture,
+    ) -> None:
+        """
+        GIVEN:
+            - A selection counted from the facet index and cached statistics
+        WHEN:
+            - Documents are bulk edited, before bulk_update_documents runs
+        THEN:
+            - The counts and statistics reflect the edit right away
+        """
+        mocker.patch("documents.views.MIN_INDEXED_SELECTION", 1)
+        mocker.patch("documents.bulk_edit.bulk_update_documents.apply_async")
+        correspondent = CorrespondentFactory()
+        inbox_tag = TagFactory(is_inbox_tag=True)
+        docs = DocumentFactory.create_batch(3)
+        client = APIClient()
+        client.force_authenticate(user=admin_user)
+
+        def counts(name: str) -> dict[int, int]:
+            response = client.post(
+                "/api/documents/selection_data/",
+                {"documents": [doc.pk for doc in docs]},
+                format="json",
+            )
+            assert response.status_code == 200
+            return {
+                item["id"]: item["document_count"]
+                for item in response.data[name]
+                if item["document_count"]
+            }
+
+        assert counts("selected_tags") == {}
+        assert client.get("/api/statistics/").data["documents_inbox"] == 0
+
+        bulk_edit.add_tag([doc.pk for doc in docs[:2]], inbox_tag.pk)
+        bulk_edit.set_correspondent([docs[0].pk], correspondent.pk)
+
+        assert counts("selected_tags") == {inbox_tag.pk: 2}
+        assert counts("selected_correspondents") == {correspondent.pk: 1}
+        assert client.get("/api/statistics/").data["documents_inbox"] == 2
+
+        bulk_edit.modify_tags([doc.pk for doc in docs], [], [inbox_tag.pk])
+
+        assert counts("selected_tags") == {}
+        assert client.get("/api/statistics/").data["documents_inbox"] == 0
@@ -343,7 +343,7 @@ class ShareLinkBundleBuildTaskTests(DirectoriesMixin, APITestCase):
 
         with (
             mock.patch(
-                "documents.tasks.OriginalsOnlyStrategy.add_document",
+                "documents.tasks.OriginalsOnlyStrategy.files",
                 side_effect=RuntimeError("zip failure"),
             ),
             mock.patch("pathlib.Path.unlink") as unlink_mock,
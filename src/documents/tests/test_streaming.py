@@ -0,0 +1,157 @@
+"""Tests for streaming document list responses."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import Permission
+from django.test import AsyncClient
+from guardian.shortcuts import assign_perm
+
+from documents.streaming import iter_batches
+from documents.tests.factories import DocumentFactory
+from documents.tests.factories import TagFactory
+from documents.tests.utils import read_streaming_response
+from documents.views import DocumentViewSet
+
+if TYPE_CHECKING:
+    from django.contrib.auth.models import User
+    from pytest_mock import MockerFixture
+    from rest_framework.test import APIClient
+
+    from documents.models import Document
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def documents(admin_user: User) -> list[Document]:
+    tag = TagFactory()
+    docs = DocumentFactory.create_batch(7, owner=admin_user)
+    for doc in docs[::2]:
+        doc.tags.add(tag)
+    return docs
+
+
+@pytest.fixture
+def small_batches(mocker: MockerFixture) -> None:
+    mocker.patch("documents.views.STREAM_CHUNK_SIZE", 3)
+
+
+def test_iter_batches() -> None:
+    assert list(iter_batches(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(iter_batches([], 3)) == []
+
+
+@pytest.mark.usefixtures("small_batches")
+class TestStreamDocuments:
+    def test_json(
+        self,
+        admin_client: APIClient,
+        documents: list[Document],
+    ) -> None:
+        expected = admin_client.get("/api/documents/?page_size=100").json()
+
+        response = admin_client.get("/api/documents/?stream=json")
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/json"
+        assert json.loads(read_streaming_response(response)) == expected["results"]
+
+    def test_ndjson(
+        self,
+        admin_client: APIClient,
+        documents: list[Document],
+    ) -> None:
+        response = admin_client.get("/api/documents/?stream=ndjson&fields=id,tags")
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/x-ndjson"
+        lines = read_streaming_response(response).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        assert sorted(rows, key=lambda row: row["id"]) == [
+            {"id": doc.pk, "tags": list(doc.tags.values_list("pk", flat=True))}
+            for doc in sorted(documents, key=lambda doc: doc.pk)
+        ]
+
+    def test_ids(
+        self,
+        admin_client: APIClient,
+        documents: list[Document],
+    ) -> None:
+        tag = documents[0].tags.get()
+
+        response = admin_client.get(f"/api/documents/?stream=ids&tags__id={tag.pk}")
+
+        assert response.status_code == 200
+        assert sorted(json.loads(read_streaming_response(response))) == sorted(
+            doc.pk for doc in documents[::2]
+        )
+
+    def test_empty(self, admin_client: APIClient) -> None:
+        response = admin_client.get("/api/documents/?stream=json")
+
+        assert json.loads(read_streaming_response(response)) == []
+
+    def test_permissions(
+        self,
+        user_client: APIClient,
+        regular_user: User,
+        documents: list[Document],
+    ) -> None:
+        regular_user.user_permissions.add(
+            Permission.objects.get(codename="view_document"),
+        )
+        assign_perm("view_document", regular_user, documents[1])
+
+        response = user_client.get("/api/documents/?stream=ndjson&fields=id")
+
+        lines = read_streaming_response(response).decode().splitlines()
+        assert [json.loads(line) for line in lines] == [{"id": documents[1].pk}]
+
+    def test_invalid_format(self, admin_client: APIClient) -> None:
+        response = admin_client.get("/api/documents/?stream=xml")
+
+        assert response.status_code == 400
+
+    def test_not_supported_for_search(self, admin_client: APIClient) -> None:
+        response = admin_client.get("/api/documents/?stream=json&query=test")
+
+        assert response.status_code == 400
+
+    def test_streamed_under_asgi(
+        self,
+        admin_user: User,
+        documents: list[Document],
+        mocker: MockerFixture,
+    ) -> None:
+        """
+        GIVEN:
+            - More documents than fit in one batch
+        WHEN:
+            - The list is streamed through the async client
+        THEN:
+            - The first chunk arrives before the later batches are serialized
+        """
+        get_serializer = mocker.spy(DocumentViewSet, "get_serializer")
+
+        async def stream() -> tuple[list[bytes], list[int]]:
+            client = AsyncClient()
+            await client.aforce_login(admin_user)
+            response = await client.get("/api/documents/?stream=ndjson&fields=id")
+            parts = []
+            serialized = []
+            async for part in response:
+                parts.append(part)
+                serialized.append(get_serializer.call_count)
+            response.close()
+            return parts, serialized
+
+        parts, serialized = async_to_sync(stream)()
+
+        rows = [json.loads(line) for line in b"".join(parts).decode().splitlines()]
+        assert sorted(row["id"] for row in rows) == sorted(doc.pk for doc in documents)
+        assert serialized == [1, 2, 3]
@@ -1,16 +1,21 @@
 from unittest import mock
 
 from django.contrib.auth.models import User
+from django.test import TestCase
 from rest_framework.test import APITestCase
 
 from documents import bulk_edit
 from documents.models import Document
 from documents.models import Tag
+from documents.models import TagClosure
 from documents.models import Workflow
 from documents.models import WorkflowAction
 from documents.models import WorkflowTrigger
 from documents.serialisers import TagSerializer
 from documents.signals.handlers import run_workflows
+from documents.tag_hierarchy import get_ancestor_ids
+from documents.tag_hierarchy import get_descendant_ids
+from documents.tag_hierarchy import rebuild_tag_closure
 from documents.tests.utils import DirectoriesMixin
 
 
@@ -262,3 +267,81 @@ class TestTagHierarchy(DirectoriesMixin, APITestCase):
             row for row in response.data["results"] if row["id"] == self.parent.pk
         )
         assert any(child["id"] == self.child.pk for child in parent_entry["children"])
+
+
+class TestTagClosure(TestCase):
+    def closure(self) -> set[tuple[int, int, int]]:
+        return set(
+            TagClosure.objects.values_list("ancestor_id", "descendant_id", "depth"),
+        )
+
+    def test_new_tags_are_added(self) -> None:
+        a = Tag.objects.create(name="A")
+        b = Tag.objects.create(name="B", tn_parent=a)
+        c = Tag.objects.create(name="C", tn_parent=b)
+
+        assert self.closure() == {
+            (a.pk, a.pk, 0),
+            (b.pk, b.pk, 0),
+            (c.pk, c.pk, 0),
+            (a.pk, b.pk, 1),
+            (b.pk, c.pk, 1),
+            (a.pk, c.pk, 2),
+        }
+        assert get_ancestor_ids([c.pk]) == {a.pk, b.pk}
+        assert get_descendant_ids([a.pk]) == {b.pk, c.pk}
+        assert get_descendant_ids([]) == set()
+
+    def test_moving_a_subtree(self) -> None:
+        a = Tag.objects.create(name="A")
+        b = Tag.objects.create(name="B", tn_parent=a)
+        c = Tag.objects.create(name="C", tn_parent=b)
+        d = Tag.objects.create(name="D")
+
+        b.tn_parent = d
+        b.save()
+
+        assert get_ancestor_ids([c.pk]) == {b.pk, d.pk}
+        assert get_descendant_ids([a.pk]) == set()
+        assert get_descendant_ids([d.pk]) == {b.pk, c.pk}
+        assert (d.pk, c.pk, 2) in self.closure()
+
+        b.tn_parent = None
+        b.save()
+
+        assert get_ancestor_ids([c.pk]) == {b.pk}
+        assert get_descendant_ids([d.pk]) == set()
+
+    def test_unrelated_changes_keep_rows(self) -> None:
+        a = Tag.objects.create(name="A")
+        b = Tag.objects.create(name="B", tn_parent=a)
+        rows = set(TagClosure.objects.values_list("pk", flat=True))
+
+        b.name = "Renamed"
+        b.save()
+
+        assert set(TagClosure.objects.values_list("pk", flat=True)) == rows
+
+    def test_deleting_removes_rows(self) -> None:
+        a = Tag.objects.create(name="A")
+        b = Tag.objects.create(name="B", tn_parent=a)
+        Tag.objects.create(name="C", tn_parent=b)
+        d = Tag.objects.create(name="D")
+
+        a.delete()
+
+        assert self.closure() == {(d.pk, d.pk, 0)}
+
+    def test_rebuild_matches_incremental(self) -> None:
+        a = Tag.objects.create(name="A")
+        b = Tag.objects.create(name="B", tn_parent=a)
+        Tag.objects.create(name="C", tn_parent=b)
+        d = Tag.objects.create(name="D")
+        b.tn_parent = d
+        b.save()
+        incremental = self.closure()
+
+        TagClosure.objects.all().delete()
+        rebuild_tag_closure()
+
+        assert self.closure() == incremental
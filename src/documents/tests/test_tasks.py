@@ -97,7 +97,7 @@ class TestSanityCheck:
     def test_sanity_check_success(self, mock_check_sanity: mock.MagicMock) -> None:
         mock_check_sanity.return_value = SanityCheckMessages()
         assert tasks.sanity_check() == "No issues detected."
-        mock_check_sanity.assert_called_once()
+        mock_check_sanity.assert_called_once_with(full=True)
 
     def test_sanity_check_error_raises(
         self,
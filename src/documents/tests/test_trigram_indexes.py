@@ -0,0 +1,50 @@
+"""
+Query plans for name and title filters on PostgreSQL, where they are backed by
+pg_trgm indexes. Other databases do not get these indexes.
+"""
+
+from __future__ import annotations
+
+import importlib
+
+import pytest
+from django.apps import apps
+from django.db import connection
+
+TRIGRAM_INDEXES = importlib.import_module(
+    "documents.migrations.0025_trigram_indexes",
+).TRIGRAM_INDEXES
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != "postgresql",
+        reason="Trigram indexes are only created on PostgreSQL",
+    ),
+]
+
+
+def _plan(queryset) -> str:
+    # The test tables are tiny, so a sequential scan would always win
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    return queryset.explain()
+
+
+@pytest.mark.parametrize(
+    ("model_name", "column", "index_name"),
+    TRIGRAM_INDEXES,
+    ids=[index_name for _, _, index_name in TRIGRAM_INDEXES],
+)
+@pytest.mark.parametrize("lookup", ["icontains", "istartswith"])
+def test_filter_uses_index(
+    model_name: str,
+    column: str,
+    index_name: str,
+    lookup: str,
+) -> None:
+    model = apps.get_model("documents", model_name)
+
+    plan = _plan(model.objects.filter(**{f"{column}__{lookup}": "bank"}))
+
+    assert index_name in plan
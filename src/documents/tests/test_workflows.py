@@ -15,7 +15,9 @@ from django.conf import settings
 from django.contrib.auth.models import Group
 from django.contrib.auth.models import User
 from django.core import mail
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from guardian.shortcuts import assign_perm
 from guardian.shortcuts import get_groups_with_perms
@@ -24,6 +26,7 @@ from httpx import ConnectError
 from httpx import HTTPError
 from httpx import HTTPStatusError
 from pytest_httpx import HTTPXMock
+from pytest_mock import MockerFixture
 from rest_framework.test import APIClient
 from rest_framework.test import APITestCase
 
@@ -31,12 +34,15 @@ from documents.file_handling import create_source_path_directory
 from documents.file_handling import generate_filename
 from documents.file_handling import generate_unique_filename
 from documents.signals.handlers import run_workflows
+from documents.workflows import webhooks
+from documents.workflows.emails import send_email_notification
 from documents.workflows.webhooks import send_webhook
 
 if TYPE_CHECKING:
     from django.db.models import QuerySet
 from pytest_django.fixtures import SettingsWrapper
 
+from documents import bulk_edit
 from documents import tasks
 from documents.data_models import ConsumableDocument
 from documents.data_models import DocumentMetadataOverrides
@@ -1456,6 +1462,237 @@ class TestWorkflows(
         self.assertFalse(matched)
         self.assertIn("storage path", reason)
 
+    def test_document_updated_query_count_independent_of_workflows(self) -> None:
+        """
+        GIVEN:
+            - Document updated workflows filtering on tags, correspondents and
+              filenames, none of which match the document
+        WHEN:
+            - Workflows are run for the document
+        THEN:
+            - The number of queries does not grow with the number of workflows
+        """
+        doc = Document.objects.create(
+            title="sample test",
+            correspondent=self.c,
+            original_filename="sample.pdf",
+        )
+        doc.tags.set([self.t1])
+
+        def add_workflows(count: int) -> None:
+            start = Workflow.objects.count()
+            for i in range(start, start + count):
+                trigger = WorkflowTrigger.objects.create(
+                    type=WorkflowTrigger.WorkflowTriggerType.DOCUMENT_UPDATED,
+                    filter_filename="*.pdf",
+                )
+                trigger.filter_has_tags.set([self.t1])
+                trigger.filter_has_not_correspondents.set([self.c])
+                workflow = Workflow.objects.create(name=f"Workflow {i}", order=i)
+                workflow.triggers.add(trigger)
+                workflow.actions.add(
+                    WorkflowAction.objects.create(assign_title="Never applied"),
+                )
+
+        def count_queries() -> int:
+            with CaptureQueriesContext(connection) as context:
+                run_workflows(
+                    WorkflowTrigger.WorkflowTriggerType.DOCUMENT_UPDATED,
+                    doc,
+                )
+            return len(context.captured_queries)
+
+        add_workflows(2)
+        few = count_queries()
+        add_workflows(10)
+
+        self.assertEqual(count_queries(), few)
+        doc.refresh_from_db()
+        self.assertEqual(doc.title, "sample test")
+
+    def test_bulk_update_documents_applies_workflows_to_all_documents(
+        self,
+    ) -> None:
+        """
+        GIVEN:
+            - Document updated workflows with assignment and removal actions
+            - Several documents, some of which match the workflows
+        WHEN:
+            - The documents are updated in bulk
+        THEN:
+            - The actions are applied to the matching documents only
+            - A workflow run and an audit log entry is recorded per document
+        """
+        from auditlog.models import LogEntry
+
+        trigger = WorkflowTrigger.objects.create(
+            type=WorkflowTrigger.WorkflowTriggerType.DOCUMENT_UPDATED,
+        )
+        trigger.filter_has_tags.set([self.t1])
+        assign = WorkflowAction.objects.create(
+            assign_title="{{correspondent}} assigned",
+            assign_correspondent=self.c2,
+            assign_owner=self.user2,
+        )
+        assign.assign_tags.set([self.t2])
+        assign.assign_view_users.set([self.user3])
+        assign.assign_custom_fields.set([self.cf1])
+        assign.assign_custom_fields_values = {str(self.cf1.pk): "value"}
+        assign.save()
+        remove = WorkflowAction.objects.create(
+            type=WorkflowAction.WorkflowActionType.REMOVAL,
+        )
+        remove.remove_tags.set([self.t3])
+        remove.remove_document_types.set([self.dt])
+        workflow = Workflow.objects.create(name="Workflow 1", order=0)
+        workflow.triggers.add(trigger)
+        workflow.actions.add(assign, remove)
+
+        matching = []
+        for i in range(3):
+            doc = Document.objects.create(
+                title=f"matching {i}",
+                document_type=self.dt,
+                checksum=f"matching{i}",
+            )
+            doc.tags.set([self.t1, self.t3])
+            matching.append(doc)
+        other = Document.objects.create(
+            title="other",
+            document_type=self.dt,
+            checksum="other",
+        )
+        other.tags.set([self.t3])
+
+        tasks.bulk_update_documents([doc.pk for doc in [*matching, other]])
+
+        for doc in matching:
+            doc.refresh_from_db()
+            self.assertEqual(doc.title, "Correspondent Name 2 assigned")
+            self.assertEqual(doc.correspondent, self.c2)
+            self.assertIsNone(doc.document_type)
+            self.assertEqual(doc.owner, self.user2)
+            self.assertCountEqual(doc.tags.all(), [self.t1, self.t2])
+            self.assertIn(self.user3, get_users_with_perms(doc))
+            self.assertEqual(
+                doc.custom_fields.get(field=self.cf1).value,
+                "value",
+            )
+            self.assertEqual(
+                WorkflowRun.objects.filter(workflow=workflow, document=doc).count(),
+                1,
+            )
+            changes = [
+                entry.changes_dict
+                for entry in LogEntry.objects.get_for_object(doc).filter(
+                    action=LogEntry.Action.UPDATE,
+                )
+            ]
+            self.assertIn(
+                {"tags": {"type": "m2m", "operation": "add", "objects": ["t2"]}},
+                changes,
+            )
+            self.assertTrue(any("correspondent" in change for change in changes))
+
+        other.refresh_from_db()
+        self.assertEqual(other.title, "other")
+        self.assertEqual(other.document_type, self.dt)
+        self.assertCountEqual(other.tags.all(), [self.t3])
+        self.assertFalse(WorkflowRun.objects.filter(document=other).exists())
+
+    def test_bulk_update_documents_query_count_independent_of_documents(
+        self,
+    ) -> None:
+        """
+        GIVEN:
+            - A document updated workflow assigning tags and a correspondent
+        WHEN:
+            - Workflows are run in bulk for few and for many documents
+        THEN:
+            - The number of queries does not grow with the number of documents
+        """
+        from documents.workflows.bulk import run_document_updated_workflows
+
+        trigger = WorkflowTrigger.objects.create(
+            type=WorkflowTrigger.WorkflowTriggerType.DOCUMENT_UPDATED,
+        )
+        action = WorkflowAction.objects.create(assign_correspondent=self.c)
+        action.assign_tags.set([self.t1])
+        workflow = Workflow.objects.create(name="Workflow 1", order=0)
+        workflow.triggers.add(trigger)
+        workflow.actions.add(action)
+
+        def count_queries(count: int) -> int:
+            start = Document.objects.count()
+            docs = [
+                Document.objects.create(title=f"doc {i}", checksum=f"doc{i}")
+                for i in range(start, start + count)
+            ]
+            with CaptureQueriesContext(connection) as context:
+                run_document_updated_workflows([doc.pk for doc in docs])
+            self.assertEqual(
+                Document.objects.filter(
+                    pk__in=[doc.pk for doc in docs],
+                    correspondent=self.c,
+                    tags=self.t1,
+                ).count(),
+                count,
+            )
+            return len(context.captured_queries)
+
+        count_queries(1)  # warm up caches, e.g. content types
+        self.assertEqual(count_queries(20), count_queries(2))
+
+    @mock.patch("documents.signals.handlers.run_workflows")
+    def test_bulk_update_documents_other_actions_per_document(
+        self,
+        mock_run_workflows: mock.Mock,
+    ) -> None:
+        """
+        GIVEN:
+            - A document updated workflow with an email action
+        WHEN:
+            - Workflows are run in bulk
+        THEN:
+            - The workflow is run document by document for the matching
+              documents only
+        """
+        from documents.workflows.bulk import run_document_updated_workflows
+
+        trigger = WorkflowTrigger.objects.create(
+            type=WorkflowTrigger.WorkflowTriggerType.DOCUMENT_UPDATED,
+            filter_filename="*.pdf",
+        )
+        email = WorkflowActionEmail.objects.create(
+            subject="Test Notification: {doc_title}",
+            body="Test message: {doc_url}",
+            to="me@example.com",
+        )
+        action = WorkflowAction.objects.create(
+            type=WorkflowAction.WorkflowActionType.EMAIL,
+            email=email,
+        )
+        workflow = Workflow.objects.create(name="Workflow 1", order=0)
+        workflow.triggers.add(trigger)
+        workflow.actions.add(action)
+        pdf = Document.objects.create(
+            title="pdf",
+            original_filename="sample.pdf",
+            checksum="pdf",
+        )
+        txt = Document.objects.create(
+            title="txt",
+            original_filename="sample.txt",
+            checksum="txt",
+        )
+
+        run_document_updated_workflows([pdf.pk, txt.pk])
+
+        mock_run_workflows.assert_called_once()
+        kwargs = mock_run_workflows.call_args.kwargs
+        self.assertEqual(kwargs["document"], pdf)
+        self.assertEqual(kwargs["workflow_to_run"], workflow)
+
     def test_document_added_custom_field_query_no_match(self) -> None:
         trigger = WorkflowTrigger.objects.create(
             type=WorkflowTrigger.WorkflowTriggerType.DOCUMENT_ADDED,
@@ -2537,6 +2774,168 @@ class TestWorkflows(
             2,
         )
 
+    def test_workflow_scheduled_checks_documents_changed_since_last_check(
+        self,
+    ) -> None:
+        """
+        GIVEN:
+            - Scheduled workflow which has been checked before
+            - A document whose date passed the threshold since
+            - A document whose date passed the threshold before the last check
+              and which has not been modified since
+        WHEN:
+            - Scheduled workflows are checked
+        THEN:
+            - Only the document that crossed the threshold is looked at
+            - Once the trigger is changed, all documents are looked at again
+        """
+        trigger = WorkflowTrigger.objects.create(
+            type=WorkflowTrigger.WorkflowTriggerType.SCHEDULED,
+            schedule_offset_days=1,
+            schedule_date_field=WorkflowTrigger.ScheduleDateField.ADDED,
+        )
+        action = WorkflowAction.objects.create(assign_owner=self.user2)
+        w = Workflow.objects.create(name="Workflow 1", order=0)
+        w.triggers.add(trigger)
+        w.actions.add(action)
+
+        now = timezone.now()
+        crossed = Document.objects.create(
+            title="crossed",
+            checksum="crossed",
+            added=now - timedelta(days=1, minutes=5),
+        )
+        passed_over = Document.objects.create(
+            title="passed over",
+            checksum="passed-over",
+            added=now - timedelta(days=10),
+        )
+        Document.objects.update(modified=now - timedelta(days=5))
+        WorkflowTrigger.objects.filter(pk=trigger.pk).update(
+            schedule_last_checked=now - timedelta(minutes=10),
+        )
+
+        tasks.check_scheduled_workflows()
+
+        crossed.refresh_from_db()
+        passed_over.refresh_from_db()
+        self.assertEqual(crossed.owner, self.user2)
+        self.assertIsNone(passed_over.owner)
+        trigger.refresh_from_db()
+        self.assertGreaterEqual(trigger.schedule_last_checked, now)
+
+        trigger.schedule_offset_days = 2
+        trigger.save()
+        self.assertIsNone(trigger.schedule_last_checked)
+
+        tasks.check_scheduled_workflows()
+
+        passed_over.refresh_from_db()
+        self.assertEqual(passed_over.owner, self.user2)
+
+    def test_workflow_scheduled_recurring_after_last_check(self) -> None:
+        """
+        GIVEN:
+            - Recurring scheduled workflow with a 1-day interval, which has been
+              checked before
+            - Unmodified document the workflow last ran for 2 days ago
+            - Unmodified document the workflow last ran for 1 hour ago
+        WHEN:
+            - Scheduled workflows are checked
+        THEN:
+            - The workflow runs again for the first document only
+        """
+        trigger = WorkflowTrigger.objects.create(
+            type=WorkflowTrigger.WorkflowTriggerType.SCHEDULED,
+            schedule_date_field=WorkflowTrigger.ScheduleDateField.CREATED,
+            schedule_is_recurring=True,
+            schedule_recurring_interval_days=1,
+        )
+        action = WorkflowAction.objects.create(assign_owner=self.user2)
+        w = Workflow.objects.create(name="Workflow 1", order=0)
+        w.triggers.add(trigger)
+        w.actions.add(action)
+
+        now = timezone.now()
+        due = Document.objects.create(
+            title="due",
+            checksum="due",
+            created=now.date() - timedelta(days=30),
+        )
+        not_due = Document.objects.create(
+            title="not due",
+            checksum="not-due",
+            created=now.date() - timedelta(days=30),
+        )
+        for doc, run_at in (
+            (due, now - timedelta(days=2)),
+            (not_due, now - timedelta(hours=1)),
+        ):
+            WorkflowRun.objects.create(
+                workflow=w,
+                document=doc,
+                type=WorkflowTrigger.WorkflowTriggerType.SCHEDULED,
+                run_at=run_at,
+            )
+        Document.objects.update(modified=now - timedelta(days=5))
+        WorkflowTrigger.objects.filter(pk=trigger.pk).update(
+            schedule_last_checked=now - timedelta(hours=1),
+        )
+
+        tasks.check_scheduled_workflows()
+
+        due.refresh_from_db()
+        not_due.refresh_from_db()
+        self.assertEqual(due.owner, self.user2)
+        self.assertIsNone(not_due.owner)
+        self.assertEqual(WorkflowRun.objects.filter(document=due).count(), 2)
+
+    def test_workflow_scheduled_checks_documents_bulk_edited_since_last_check(
+        self,
+    ) -> None:
+        """
+        GIVEN:
+            - Scheduled workflow filtering on a tag, which has been checked before
+            - A document past the threshold, which did not have the tag then
+        WHEN:
+            - The tag is added to the document with a bulk edit
+            - Scheduled workflows are checked again
+        THEN:
+            - The workflow runs for the document
+        """
+        tag = Tag.objects.create(name="scheduled")
+        trigger = WorkflowTrigger.objects.create(
+            type=WorkflowTrigger.WorkflowTriggerType.SCHEDULED,
+            schedule_offset_days=30,
+            schedule_date_field=WorkflowTrigger.ScheduleDateField.ADDED,
+        )
+        trigger.filter_has_tags.add(tag)
+        action = WorkflowAction.objects.create(assign_owner=self.user2)
+        w = Workflow.objects.create(name="Workflow 1", order=0)
+        w.triggers.add(trigger)
+        w.actions.add(action)
+
+        doc = Document.objects.create(
+            title="sample test",
+            checksum="sample",
+            added=timezone.now() - timedelta(days=60),
+        )
+
+        tasks.check_scheduled_workflows()
+        self.assertFalse(WorkflowRun.objects.filter(document=doc).exists())
+
+        with mock.patch(
+            "documents.bulk_edit.bulk_update_documents.apply_async",
+            side_effect=lambda kwargs, **_: tasks.bulk_update_documents(**kwargs),
+        ):
+            bulk_edit.add_tag([doc.pk], tag.pk)
+
+        tasks.check_scheduled_workflows()
+
+        doc.refresh_from_db()
+        self.assertEqual(doc.owner, self.user2)
+        self.assertEqual(WorkflowRun.objects.filter(document=doc).count(), 1)
+
     def test_workflow_scheduled_trigger_negative_offset_customfield(self) -> None:
         """
         GIVEN:
@@ -3360,6 +3759,7 @@ class TestWorkflows(
     @override_settings(
         PAPERLESS_EMAIL_HOST="localhost",
         EMAIL_ENABLED=True,
+        CELERY_TASK_ALWAYS_EAGER=True,
         PAPERLESS_URL="http://localhost:8000",
     )
     @mock.patch("django.core.mail.message.EmailMessage.send")
@@ -3437,6 +3837,7 @@ class TestWorkflows(
     @override_settings(
         PAPERLESS_EMAIL_HOST="localhost",
         EMAIL_ENABLED=True,
+        CELERY_TASK_ALWAYS_EAGER=True,
         PAPERLESS_URL="http://localhost:8000",
     )
     @mock.patch("httpx.post")
@@ -3491,6 +3892,7 @@ class TestWorkflows(
     @override_settings(
         PAPERLESS_EMAIL_HOST="localhost",
         EMAIL_ENABLED=True,
+        CELERY_TASK_ALWAYS_EAGER=True,
         PAPERLESS_URL="http://localhost:8000",
     )
     @mock.patch("django.core.mail.message.EmailMessage.send")
@@ -3566,6 +3968,73 @@ class TestWorkflows(
         PAPERLESS_URL="http://localhost:8000",
         EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
     )
+    @mock.patch("documents.workflows.actions.send_email_notification.apply_async")
+    def test_workflow_email_queued_with_attachment_content(
+        self,
+        mock_apply_async,
+    ) -> None:
+        """
+        GIVEN:
+            - Consumption workflow with email action including the document
+        WHEN:
+            - The workflow runs and the working copy is removed before the
+              email is sent
+        THEN:
+            - The email is queued rather than sent by the workflow
+            - The queued email still carries the document
+        """
+        trigger = WorkflowTrigger.objects.create(
+            type=WorkflowTrigger.WorkflowTriggerType.CONSUMPTION,
+        )
+        email_action = WorkflowActionEmail.objects.create(
+            subject="Test Notification: {doc_title}",
+            body="Test message: {doc_url}",
+            to="me@example.com",
+            include_document=True,
+        )
+        action = WorkflowAction.objects.create(
+            type=WorkflowAction.WorkflowActionType.EMAIL,
+            email=email_action,
+        )
+        w = Workflow.objects.create(name="Workflow 1", order=0)
+        w.triggers.add(trigger)
+        w.actions.add(action)
+
+        working_copy = Path(
+            shutil.copy(
+                self.SAMPLE_DIR / "simple.pdf",
+                self.dirs.scratch_dir / "working-copy.pdf",
+            ),
+        )
+
+        run_workflows(
+            WorkflowTrigger.WorkflowTriggerType.CONSUMPTION,
+            ConsumableDocument(
+                source=DocumentSource.ConsumeFolder,
+                original_file=working_copy,
+            ),
+            overrides=DocumentMetadataOverrides(),
+        )
+
+        self.assertEqual(len(mail.outbox), 0)
+        mock_apply_async.assert_called_once()
+        working_copy.unlink()
+
+        send_email_notification(**mock_apply_async.call_args.kwargs["kwargs"])
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(
+            mail.outbox[0].attachments[0][1],
+            (self.SAMPLE_DIR / "simple.pdf").read_bytes(),
+        )
+
+    @override_settings(
+        PAPERLESS_EMAIL_HOST="localhost",
+        EMAIL_ENABLED=True,
+        CELERY_TASK_ALWAYS_EAGER=True,
+        PAPERLESS_URL="http://localhost:8000",
+        EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    )
     def test_workflow_email_attachment_uses_storage_filename(self) -> None:
         """
         GIVEN:
@@ -3671,6 +4140,7 @@ class TestWorkflows(
 
     @override_settings(
         EMAIL_ENABLED=True,
+        CELERY_TASK_ALWAYS_EAGER=True,
         PAPERLESS_URL="http://localhost:8000",
     )
     @mock.patch("django.core.mail.message.EmailMessage.send")
@@ -3720,6 +4190,7 @@ class TestWorkflows(
     @override_settings(
         PAPERLESS_EMAIL_HOST="localhost",
         EMAIL_ENABLED=True,
+        CELERY_TASK_ALWAYS_EAGER=True,
         PAPERLESS_URL="http://localhost:8000",
     )
     @mock.patch("httpx.post")
@@ -4525,6 +4996,7 @@ class TestWorkflows(
     @override_settings(
         PAPERLESS_EMAIL_HOST="localhost",
         EMAIL_ENABLED=True,
+        CELERY_TASK_ALWAYS_EAGER=True,
         PAPERLESS_URL="http://localhost:8000",
     )
     @mock.patch("django.core.mail.message.EmailMessage.send")
@@ -4658,6 +5130,7 @@ class TestWorkflows(
     @override_settings(
         PAPERLESS_EMAIL_HOST="localhost",
         EMAIL_ENABLED=True,
+        CELERY_TASK_ALWAYS_EAGER=True,
         PAPERLESS_URL="http://localhost:8000",
     )
     @mock.patch("django.core.mail.message.EmailMessage.send")
@@ -4707,10 +5180,10 @@ class TestWorkflows(
         self.assertEqual(Document.objects.count(), 1)
         self.assertEqual(Document.deleted_objects.count(), 0)
 
-        with self.assertLogs("paperless.workflows.actions", level="ERROR") as cm:
+        with self.assertLogs("paperless.workflows.emails", level="ERROR") as cm:
             run_workflows(WorkflowTrigger.WorkflowTriggerType.DOCUMENT_UPDATED, doc)
 
-            expected_str = "Error occurred sending notification email"
+            expected_str = "Failed attempt sending notification email"
             self.assertIn(expected_str, cm.output[0])
 
         self.assertEqual(Document.objects.count(), 0)
@@ -4946,6 +5419,37 @@ class TestWebhookSend:
         )
         assert httpx_mock.get_request().headers["Content-Type"] == "application/json"
 
+    def test_send_webhook_reuses_client_per_host(
+        self,
+        httpx_mock: HTTPXMock,
+        mocker: MockerFixture,
+        resolve_to,
+    ) -> None:
+        """
+        GIVEN:
+            - Nothing
+        WHEN:
+            - send_webhook is called repeatedly for the same and another host
+        THEN:
+            - Webhooks to the same host share a client and its connections
+            - Webhooks to another host use their own client
+        """
+        resolve_to("52.207.186.75")
+        httpx_mock.add_response(content=b"ok", is_reusable=True)
+        get_client = mocker.spy(webhooks, "_get_client")
+
+        for url in (
+            "http://paperless-ngx.com/a",
+            "http://paperless-ngx.com/b",
+            "http://docs.paperless-ngx.com",
+        ):
+            send_webhook(url=url, data="Test message", headers={}, files=None)
+
+        clients = get_client.spy_return_list
+        assert clients[0] is clients[1]
+        assert clients[0] is not clients[2]
+        assert len(httpx_mock.get_requests()) == 3
+
 
 @pytest.fixture
 def resolve_to(monkeypatch: pytest.MonkeyPatch) -> Callable[[str], None]:
@@ -1,3 +1,4 @@
+import copy
 import shutil
 import tempfile
 import time
@@ -158,6 +159,37 @@ def read_streaming_response(response: StreamingHttpResponse) -> bytes:
     return content
 
 
+@contextmanager
+def restore_auditlog_registry() -> Iterator[None]:
+    """
+    The importer unregisters models from the audit log and never registers them
+    again, which lasts for the rest of the test run. Registers them again on
+    exit, as they were before.
+    """
+    from auditlog.registry import auditlog
+
+    registered = {
+        model: copy.deepcopy(config) for model, config in auditlog._registry.items()
+    }
+    try:
+        yield
+    finally:
+        for model, config in registered.items():
+            if not auditlog.contains(model):
+                auditlog.register(model, **config)
+
+
+class AuditLogRegistryMixin:
+    """
+    For tests running the importer, restores the audit log registrations after
+    each test
+    """
+
+    def setUp(self) -> None:
+        self.enterContext(restore_auditlog_registry())
+        super().setUp()
+
+
 class DirectoriesMixin:
     """
     Creates and overrides settings for all folders and paths, then ensures
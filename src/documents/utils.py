@@ -25,6 +25,28 @@ _M = TypeVar("_M", bound="Model")
 # A function that wraps an iterable — typically used to inject a progress bar.
 IterWrapper = Callable[[Iterable[_T]], Iterable[_T]]
 
+# Suffixes of formats which are compressed already. Deflating them again costs
+# time for almost no gain, so they are stored as they are in zip files.
+PRECOMPRESSED_SUFFIXES = frozenset(
+    {
+        ".pdf",
+        ".webp",
+        ".jpg",
+        ".jpeg",
+        ".png",
+        ".gif",
+        ".heic",
+        ".zip",
+        ".gz",
+        ".docx",
+        ".xlsx",
+        ".pptx",
+        ".odt",
+        ".ods",
+        ".odp",
+    },
+)
+
 
 def identity(iterable: Iterable[_T]) -> Iterable[_T]:
     """Return the iterable unchanged; the no-op default for IterWrapper."""
@@ -4,9 +4,8 @@ import os
 import platform
 import re
 import tempfile
-import zipfile
-from collections import defaultdict
 from collections import deque
+from collections.abc import Sequence
 from datetime import datetime
 from datetime import timedelta
 from http import HTTPStatus
@@ -15,7 +14,6 @@ from time import mktime
 from time import sleep
 from typing import TYPE_CHECKING
 from typing import Any
-from typing import Literal
 from typing import NamedTuple
 from unicodedata import normalize
 from urllib.parse import quote
@@ -25,9 +23,7 @@ import httpx
 import magic
 import pathvalidate
 from django.conf import settings
-from django.contrib.auth.models import Group
 from django.contrib.auth.models import User
-from django.contrib.contenttypes.models import ContentType
 from django.core.cache import cache
 from django.db import connections
 from django.db.migrations.loader import MigrationLoader
@@ -48,6 +44,7 @@ from django.db.models import Sum
 from django.db.models import When
 from django.db.models.functions import Coalesce
 from django.db.models.functions import Lower
+from django.db.models.functions import Substr
 from django.db.models.manager import Manager
 from django.http import FileResponse
 from django.http import Http404
@@ -61,6 +58,7 @@ from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.utils.decorators import method_decorator
+from django.utils.http import content_disposition_header
 from django.utils.timezone import make_aware
 from django.utils.translation import get_language
 from django.utils.translation import gettext_lazy as _
@@ -77,8 +75,6 @@ from drf_spectacular.utils import extend_schema
 from drf_spectacular.utils import extend_schema_serializer
 from drf_spectacular.utils import extend_schema_view
 from drf_spectacular.utils import inline_serializer
-from guardian.utils import get_group_obj_perms_model
-from guardian.utils import get_user_obj_perms_model
 from langdetect import detect
 from packaging import version as packaging_version
 from redis import Redis
@@ -109,13 +105,23 @@ from documents import bulk_edit
 from documents.bulk_download import ArchiveOnlyStrategy
 from documents.bulk_download import OriginalAndArchiveStrategy
 from documents.bulk_download import OriginalsOnlyStrategy
+from documents.bulk_download import stream_zip
+from documents.caching import CACHE_5_MINUTES
+from documents.caching import CACHE_50_MINUTES
 from documents.caching import get_llm_suggestion_cache
 from documents.caching import get_metadata_cache
+from documents.caching import get_search_result_ids_cache
+from documents.caching import get_search_result_ids_cache_key
+from documents.caching import get_statistics_cache
+from documents.caching import get_statistics_cache_key
+from documents.caching import get_statistics_generation
 from documents.caching import get_suggestion_cache
 from documents.caching import refresh_metadata_cache
 from documents.caching import refresh_suggestions_cache
 from documents.caching import set_llm_suggestions_cache
 from documents.caching import set_metadata_cache
+from documents.caching import set_search_result_ids_cache
+from documents.caching import set_statistics_cache
 from documents.caching import set_suggestions_cache
 from documents.classifier import load_classifier
 from documents.conditionals import metadata_etag
@@ -141,6 +147,7 @@ from documents.filters import ShareLinkBundleFilterSet
 from documents.filters import ShareLinkFilterSet
 from documents.filters import StoragePathFilterSet
 from documents.filters import TagFilterSet
+from documents.global_search import global_search
 from documents.mail import EmailAttachment
 from documents.mail import send_email
 from documents.matching import match_correspondents
@@ -163,6 +170,7 @@ from documents.models import UiSettings
 from documents.models import Workflow
 from documents.models import WorkflowAction
 from documents.models import WorkflowTrigger
+from documents.pagination import DocumentCursorPagination
 from documents.permissions import AcknowledgeTasksPermissions
 from documents.permissions import PaperlessAdminPermissions
 from documents.permissions import PaperlessNotePermissions
@@ -171,6 +179,7 @@ from documents.permissions import ViewDocumentsPermissions
 from documents.permissions import annotate_document_count_by_ids
 from documents.permissions import annotate_document_count_for_related_queryset
 from documents.permissions import get_document_count_filter_for_user
+from documents.permissions import get_object_permissions_context
 from documents.permissions import get_objects_for_user_owner_aware
 from documents.permissions import has_global_statistics_permission
 from documents.permissions import has_perms_owner_aware
@@ -181,6 +190,9 @@ from documents.permissions import set_permissions_for_object
 from documents.plugins.date_parsing import get_date_parser
 from documents.schema import generate_object_with_permissions_schema
 from documents.search import SearchHit
+from documents.selection import MIN_INDEXED_SELECTION
+from documents.selection import get_selection_index
+from documents.serialisers import TRUNCATED_CONTENT_LENGTH
 from documents.serialisers import AcknowledgeTasksViewSerializer
 from documents.serialisers import BulkDownloadSerializer
 from documents.serialisers import BulkEditObjectsSerializer
@@ -219,6 +231,14 @@ from documents.serialisers import WorkflowActionSerializer
 from documents.serialisers import WorkflowSerializer
 from documents.serialisers import WorkflowTriggerSerializer
 from documents.signals import document_updated
+from documents.streaming import STREAM_CHUNK_SIZE
+from documents.streaming import STREAM_FORMATS
+from documents.streaming import STREAM_IDS
+from documents.streaming import STREAM_NDJSON
+from documents.streaming import SyncStreamingHttpResponse
+from documents.streaming import iter_batches
+from documents.streaming import streaming_json_response
+from documents.tag_hierarchy import get_descendant_ids
 from documents.tasks import build_share_link_bundle
 from documents.tasks import consume_file
 from documents.tasks import empty_trash
@@ -226,6 +246,7 @@ from documents.tasks import llmindex_index
 from documents.tasks import sanity_check
 from documents.tasks import train_classifier
 from documents.tasks import update_document_parent_tags
+from documents.utils import QuerySetStream
 from documents.utils import get_boolean
 from documents.versioning import VersionResolutionError
 from documents.versioning import get_latest_version_for_root
@@ -249,8 +270,6 @@ from paperless_ai.matching import match_correspondents_by_name
 from paperless_ai.matching import match_document_types_by_name
 from paperless_ai.matching import match_storage_paths_by_name
 from paperless_ai.matching import match_tags_by_name
-from paperless_mail.models import MailAccount
-from paperless_mail.models import MailRule
 from paperless_mail.oauth import PaperlessMailOAuth2Manager
 from paperless_mail.serialisers import MailAccountSerializer
 from paperless_mail.serialisers import MailRuleSerializer
@@ -268,6 +287,11 @@ logger = logging.getLogger("paperless.api")
 # clauses efficiently, so this threshold mainly protects SQLite users.
 _TANTIVY_INTERSECT_THRESHOLD = 5_000
 _TANTIVY_SEARCH_PARAM_NAMES = ("text", "title_search", "query", "more_like_id")
+# Request parameters that only shape the response, not which documents match
+# or their order, so they are left out of the search result ID cache key.
+_SEARCH_RESULT_CACHE_IGNORED_PARAMS = frozenset(
+    {"page", "page_size", "fields", "truncate_content", "include_selection_data"},
+)
 
 
 def _get_tantivy_query_and_mode(params):
@@ -310,7 +334,7 @@ class SearchParams(NamedTuple):
 
 
 class SearchResultPage(NamedTuple):
-    ordered_ids: list[int]
+    ordered_ids: Sequence[int]
     hits: list[SearchHit]
     page_offset: int
 
@@ -390,42 +414,6 @@ class BulkPermissionMixin:
     Prefetch Django-Guardian permissions for a list before serialization, to avoid N+1 queries.
     """
 
-    def _get_object_perms(
-        self,
-        objects: list,
-        perm_codenames: list[str],
-        actor: Literal["users", "groups"],
-    ) -> dict[int, dict[str, list[int]]]:
-        """
-        Collect object-level permissions for either users or groups.
-        """
-        model = self.queryset.model
-        obj_perm_model = (
-            get_user_obj_perms_model(model)
-            if actor == "users"
-            else get_group_obj_perms_model(model)
-        )
-        id_field = "user_id" if actor == "users" else "group_id"
-        ctype = ContentType.objects.get_for_model(model)
-        object_pks = [obj.pk for obj in objects]
-
-        perms_qs = obj_perm_model.objects.filter(
-            content_type=ctype,
-            object_pk__in=object_pks,
-            permission__codename__in=perm_codenames,
-        ).values_list("object_pk", id_field, "permission__codename")
-
-        perms: dict[int, dict[str, list[int]]] = defaultdict(lambda: defaultdict(list))
-        for object_pk, actor_id, codename in perms_qs:
-            perms[int(object_pk)][codename].append(actor_id)
-
-        # Ensure that all objects have all codenames, even if empty
-        for pk in object_pks:
-            for codename in perm_codenames:
-                perms[pk][codename]
-
-        return perms
-
     def get_serializer_context(self):
         """
         Get all permissions of the current list of objects at once and pass them to the serializer.
@@ -449,34 +437,9 @@ class BulkPermissionMixin:
         else:
             queryset = self.filter_queryset(self.get_queryset())
 
-        model_name = self.queryset.model.__name__.lower()
-        permission_name_view = f"view_{model_name}"
-        permission_name_change = f"change_{model_name}"
-
-        user_perms = self._get_object_perms(
-            objects=queryset,
-            perm_codenames=[permission_name_view, permission_name_change],
-            actor="users",
-        )
-        group_perms = self._get_object_perms(
-            objects=queryset,
-            perm_codenames=[permission_name_view, permission_name_change],
-            actor="groups",
+        context.update(
+            get_object_permissions_context(self.queryset.model, queryset),
         )
-
-        context["users_view_perms"] = {
-            pk: user_perms[pk][permission_name_view] for pk in user_perms
-        }
-        context["users_change_perms"] = {
-            pk: user_perms[pk][permission_name_change] for pk in user_perms
-        }
-        context["groups_view_perms"] = {
-            pk: group_perms[pk][permission_name_view] for pk in group_perms
-        }
-        context["groups_change_perms"] = {
-            pk: group_perms[pk][permission_name_change] for pk in group_perms
-        }
-
         return context
 
 
@@ -612,15 +575,14 @@ class TagViewSet(PermissionsAwareDocumentCountMixin, ModelViewSet[Tag]):
         )
         queryset = queryset.order_by(*ordering)
 
-        all_tags = list(queryset)
-        descendant_pks = {pk for tag in all_tags for pk in tag.get_descendants_pks()}
+        descendant_pks = get_descendant_ids(queryset.values_list("pk", flat=True))
 
         if descendant_pks:
             user = getattr(getattr(self, "request", None), "user", None)
             children_source = list(
                 annotate_document_count_for_related_queryset(
                     Tag.objects.filter(
-                        pk__in=descendant_pks | {t.pk for t in all_tags},
+                        Q(pk__in=descendant_pks) | Q(pk__in=queryset.values("pk")),
                     ).select_related("owner"),
                     through_model=self.document_count_through,
                     related_object_field=self._get_document_count_source_field(),
@@ -628,7 +590,7 @@ class TagViewSet(PermissionsAwareDocumentCountMixin, ModelViewSet[Tag]):
                 ).order_by(*ordering),
             )
         else:
-            children_source = all_tags
+            children_source = list(queryset)
 
         children_map = {}
         for tag in children_source:
@@ -1006,6 +968,14 @@ class DocumentViewSet(
         "custom_field_",
     )
 
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator") and DocumentCursorPagination.is_requested(
+            getattr(self, "request", None),
+        ):
+            self._paginator = DocumentCursorPagination()
+        return super().paginator
+
     def _get_selection_data_for_queryset(self, queryset):
         # Resolve once instead of once per model below. `queryset` can carry an
         # arbitrarily expensive WHERE clause (user filters plus the permission
@@ -1018,6 +988,24 @@ class DocumentViewSet(
         # set before the ids can even be collected.
         document_ids = list(queryset.order_by().values_list("pk", flat=True))
 
+        if len(document_ids) >= MIN_INDEXED_SELECTION:
+            # Large selections are counted against the in-memory facet index
+            # rather than shipping the ids back to the database five times.
+            counts = get_selection_index().count(document_ids)
+            return {
+                f"selected_{name}": [
+                    {"id": pk, "document_count": counts[name].get(pk, 0)}
+                    for pk in model.objects.values_list("pk", flat=True)
+                ]
+                for name, model in (
+                    ("correspondents", Correspondent),
+                    ("tags", Tag),
+                    ("document_types", DocumentType),
+                    ("storage_paths", StoragePath),
+                    ("custom_fields", CustomField),
+                )
+            }
+
         correspondents = Correspondent.objects.annotate(
             document_count=Count(
                 "documents",
@@ -1073,12 +1061,55 @@ class DocumentViewSet(
             ],
         }
 
+    def _get_requested_fields(self) -> set[str] | None:
+        fields_param = self.request.query_params.get("fields", None)
+        return set(fields_param.split(",")) if fields_param else None
+
+    def _get_truncate_content(self) -> bool:
+        truncate_content = self.request.query_params.get("truncate_content", "False")
+        return truncate_content.lower() in ["true", "1"]
+
+    def _get_document_prefetches(
+        self,
+        fields: set[str] | None = None,
+    ) -> list[str | Prefetch]:
+        def requested(name: str) -> bool:
+            return fields is None or name in fields
+
+        prefetches: list[str | Prefetch] = []
+        if requested("versions"):
+            prefetches.append(
+                Prefetch(
+                    "versions",
+                    queryset=Document.objects.only(
+                        "id",
+                        "added",
+                        "checksum",
+                        "version_label",
+                        "root_document_id",
+                    ),
+                ),
+            )
+        if requested("tags"):
+            prefetches.append("tags")
+        if requested("custom_fields"):
+            prefetches.append(
+                Prefetch(
+                    "custom_fields",
+                    queryset=CustomFieldInstance.objects.select_related("field"),
+                ),
+            )
+        if requested("notes"):
+            prefetches.append("notes")
+        return prefetches
+
     def get_queryset(self):
         latest_version_content = Subquery(
             Document.objects.filter(root_document=OuterRef("pk"))
             .order_by("-id")
             .values("content")[:1],
         )
+        effective_content = Coalesce(latest_version_content, F("content"))
         # A correlated subquery avoids the LEFT JOIN + Count() this used to
         # be, which forced a GROUP BY aggregate over every matching document
         # before the query could even be sorted or limited.
@@ -1098,39 +1129,65 @@ class DocumentViewSet(
         # ObjectFilter.filter(). A blanket .distinct() here forces the
         # database to fully sort and dedupe every visible document before
         # it can apply LIMIT, which is disastrous at scale.
-        return (
+        queryset = (
             Document.objects.filter(root_document__isnull=True)
             .order_by("-created", "-id")
-            .annotate(effective_content=Coalesce(latest_version_content, F("content")))
             .annotate(num_notes=Coalesce(note_count, 0))
-            .select_related("correspondent", "storage_path", "document_type", "owner")
-            .prefetch_related(
-                Prefetch(
-                    "versions",
-                    queryset=Document.objects.only(
-                        "id",
-                        "added",
-                        "checksum",
-                        "version_label",
-                        "root_document_id",
-                    ),
-                ),
-                "tags",
-                Prefetch(
-                    "custom_fields",
-                    queryset=CustomFieldInstance.objects.select_related("field"),
+        )
+
+        if getattr(self, "action", None) != "list" or self.request is None:
+            return (
+                queryset.annotate(effective_content=effective_content)
+                .select_related(
+                    "correspondent",
+                    "storage_path",
+                    "document_type",
+                    "owner",
+                )
+                .prefetch_related(*self._get_document_prefetches())
+            )
+
+        # List responses only load what the requested fields need: content is
+        # read through effective_content alone, or through truncated_content
+        # if asked to truncate it, and relations not shown in the response are
+        # not fetched.
+        fields = self._get_requested_fields()
+
+        def requested(*names: str) -> bool:
+            return fields is None or not fields.isdisjoint(names)
+
+        queryset = queryset.defer("content")
+        if requested("content") and self._get_truncate_content():
+            # The filters and search still match the whole effective_content
+            queryset = queryset.alias(effective_content=effective_content).annotate(
+                truncated_content=Substr(
+                    effective_content,
+                    1,
+                    TRUNCATED_CONTENT_LENGTH,
                 ),
-                "notes",
             )
+        elif requested("content"):
+            queryset = queryset.annotate(effective_content=effective_content)
+        else:
+            # Still available to the content filters and search
+            queryset = queryset.alias(effective_content=effective_content)
+
+        if fields is None:
+            related = ["correspondent", "storage_path", "document_type", "owner"]
+        else:
+            related = []
+            # The archived file name includes the correspondent's name
+            if requested("archived_file_name"):
+                related.append("correspondent")
+            if requested("user_can_change", "is_shared_by_requester"):
+                related.append("owner")
+        return queryset.select_related(*related).prefetch_related(
+            *self._get_document_prefetches(fields),
         )
 
     def get_serializer(self, *args, **kwargs):
-        fields_param = self.request.query_params.get("fields", None)
-        fields = fields_param.split(",") if fields_param else None
-        truncate_content = self.request.query_params.get("truncate_content", "False")
-        kwargs.setdefault("context", self.get_serializer_context())
-        kwargs.setdefault("fields", fields)
-        kwargs.setdefault("truncate_content", truncate_content.lower() in ["true", "1"])
+        kwargs.setdefault("fields", self._get_requested_fields())
+        kwargs.setdefault("truncate_content", self._get_truncate_content())
         try:
             full_perms = get_boolean(
                 str(self.request.query_params.get("full_perms", "false")),
@@ -1241,7 +1298,34 @@ class DocumentViewSet(
 
         return response
 
+    def _stream_list(self, request: Request, stream_format: str):
+        if stream_format not in STREAM_FORMATS:
+            raise ValidationError({"stream": [_("Unsupported stream format.")]})
+        queryset = self.filter_queryset(self.get_queryset())
+
+        if stream_format == STREAM_IDS:
+            ids = QuerySetStream(
+                queryset.values_list("pk", flat=True),
+                chunk_size=STREAM_CHUNK_SIZE,
+            )
+            return streaming_json_response(iter_batches(ids, STREAM_CHUNK_SIZE))
+
+        def serialized_batches():
+            documents = QuerySetStream(queryset, chunk_size=STREAM_CHUNK_SIZE)
+            for batch in iter_batches(documents, STREAM_CHUNK_SIZE):
+                # Lets BulkPermissionMixin load the permissions of this batch
+                self.page = batch
+                yield self.get_serializer(batch, many=True).data
+
+        return streaming_json_response(
+            serialized_batches(),
+            ndjson=stream_format == STREAM_NDJSON,
+        )
+
     def list(self, request, *args, **kwargs):
+        if stream_format := request.query_params.get("stream"):
+            return self._stream_list(request, stream_format)
+
         if not get_boolean(
             str(request.query_params.get("include_selection_data", "false")),
         ):
@@ -2319,6 +2403,14 @@ class ChatStreamingView(GenericAPIView[Any]):
                 many=True,
                 location=OpenApiParameter.QUERY,
             ),
+            OpenApiParameter(
+                name="stream",
+                type=OpenApiTypes.STR,
+                enum=STREAM_FORMATS,
+                location=OpenApiParameter.QUERY,
+                description="Stream all matching documents unpaginated, as a "
+                "JSON array, as newline delimited JSON or as a JSON array of ids",
+            ),
         ],
         responses={
             200: DocumentSerializer(many=True, all_fields=True),
@@ -2360,6 +2452,14 @@ class UnifiedSearchViewSet(DocumentViewSet):
     def list(self, request, *args, **kwargs):
         if not self._is_search_request():
             return super().list(request)
+        if DocumentCursorPagination.is_requested(request):
+            raise ValidationError(
+                {"pagination": [_("Cursor pagination is not supported for searches.")]},
+            )
+        if "stream" in request.query_params:
+            raise ValidationError(
+                {"stream": [_("Streaming is not supported for searches.")]},
+            )
 
         from documents.search import SearchHit
         from documents.search import SearchQueryError
@@ -2433,12 +2533,12 @@ class UnifiedSearchViewSet(DocumentViewSet):
                 filtered_qs.filter(id__in=all_ids).values_list("pk", flat=True),
             )
 
-        def run_text_search(
+        def get_text_search_ids(
             backend: TantivyBackend,
             user: User | None,
             filtered_qs: QuerySet[Document],
-        ) -> SearchResultPage:
-            """Handle text/title/query search: IDs, ORM intersection, page highlights."""
+        ) -> list[int]:
+            """Handle text/title/query search: Tantivy IDs intersected with the ORM."""
             query_str, search_mode = _get_tantivy_query_and_mode(request.query_params)
 
             # "score" is not a real Tantivy sort field — it means relevance order,
@@ -2462,42 +2562,87 @@ class UnifiedSearchViewSet(DocumentViewSet):
             # ordering=score (ascending, worst-first) requires a reversal.
             if is_score_sort and not sort_reverse:
                 ordered_ids = list(reversed(ordered_ids))
+            return ordered_ids
 
-            page_offset = (page_num - 1) * page_size
-            page_ids = ordered_ids[page_offset : page_offset + page_size]
-            page_hits = backend.highlight_hits(
-                query_str,
-                page_ids,
-                search_mode=search_mode,
-                rank_start=page_offset + 1,
-            )
-            return SearchResultPage(
-                ordered_ids=ordered_ids,
-                hits=page_hits,
-                page_offset=page_offset,
-            )
-
-        def run_more_like_this(
+        def get_more_like_this_ids(
             backend: TantivyBackend,
+            more_like_doc_id: int,
             user: User | None,
             filtered_qs: QuerySet[Document],
-        ) -> SearchResultPage:
-            """Handle more_like_id search: permission check, IDs, stub hits."""
-            more_like_doc_id = _get_more_like_id(request.query_params, user)
-
+        ) -> list[int]:
+            """Handle more_like_id search: IDs and ORM intersection."""
             all_ids = backend.more_like_this_ids(more_like_doc_id, user=user)
-            ordered_ids = intersect_and_order(
+            return intersect_and_order(
                 all_ids,
                 filtered_qs,
                 use_tantivy_sort=True,
             )
 
+        def get_ordered_ids(
+            backend: TantivyBackend,
+            user: User | None,
+            filtered_qs: QuerySet[Document],
+        ) -> Sequence[int]:
+            """
+            Return the ordered result IDs, reusing a short-lived cached copy.
+
+            Paging through results, changing the page size and selecting all
+            only slice the cached ID array instead of re-running the Tantivy
+            query and the ORM intersection. The key includes the index
+            generation, so any index write yields a fresh result set.
+            """
+            # The more_like_id permission check runs before any cache lookup.
+            more_like_doc_id = (
+                _get_more_like_id(request.query_params, user)
+                if "more_like_id" in request.query_params
+                else None
+            )
+            cache_key = get_search_result_ids_cache_key(
+                request.user.pk,
+                (
+                    (name, value)
+                    for name, values in request.query_params.lists()
+                    if name not in _SEARCH_RESULT_CACHE_IGNORED_PARAMS
+                    for value in values
+                ),
+                backend.index_generation(),
+            )
+            cached_ids = get_search_result_ids_cache(cache_key)
+            if cached_ids is not None:
+                return cached_ids
+            if more_like_doc_id is not None:
+                ordered_ids = get_more_like_this_ids(
+                    backend,
+                    more_like_doc_id,
+                    user,
+                    filtered_qs,
+                )
+            else:
+                ordered_ids = get_text_search_ids(backend, user, filtered_qs)
+            return set_search_result_ids_cache(cache_key, ordered_ids) or ordered_ids
+
+        def build_page(
+            backend: TantivyBackend,
+            ordered_ids: Sequence[int],
+        ) -> SearchResultPage:
+            """Build the highlighted hits for the requested page only."""
             page_offset = (page_num - 1) * page_size
-            page_ids = ordered_ids[page_offset : page_offset + page_size]
-            page_hits = [
-                SearchHit(id=doc_id, score=0.0, rank=rank, highlights={})
-                for rank, doc_id in enumerate(page_ids, start=page_offset + 1)
-            ]
+            page_ids = list(ordered_ids[page_offset : page_offset + page_size])
+            if "more_like_id" in request.query_params:
+                page_hits = [
+                    SearchHit(id=doc_id, score=0.0, rank=rank, highlights={})
+                    for rank, doc_id in enumerate(page_ids, start=page_offset + 1)
+                ]
+            else:
+                query_str, search_mode = _get_tantivy_query_and_mode(
+                    request.query_params,
+                )
+                page_hits = backend.highlight_hits(
+                    query_str,
+                    page_ids,
+                    search_mode=search_mode,
+                    rank_start=page_offset + 1,
+                )
             return SearchResultPage(
                 ordered_ids=ordered_ids,
                 hits=page_hits,
@@ -2513,10 +2658,10 @@ class UnifiedSearchViewSet(DocumentViewSet):
             filtered_qs = self.filter_queryset(self.get_queryset())
             user = None if request.user.is_superuser else request.user
 
-            if "more_like_id" in request.query_params:
-                result = run_more_like_this(backend, user, filtered_qs)
-            else:
-                result = run_text_search(backend, user, filtered_qs)
+            result = build_page(
+                backend,
+                get_ordered_ids(backend, user, filtered_qs),
+            )
 
             rl = TantivyRelevanceList(
                 result.ordered_ids,
@@ -3510,9 +3655,6 @@ class GlobalSearchView(PassUserMixin):
     serializer_class = SearchResultSerializer
 
     def get(self, request, *args, **kwargs):
-        from documents.search import SearchMode
-        from documents.search import get_backend
-
         query = request.query_params.get("query", None)
         if query is None:
             return HttpResponseBadRequest("Query required")
@@ -3521,192 +3663,33 @@ class GlobalSearchView(PassUserMixin):
 
         db_only = request.query_params.get("db_only", False)
 
-        OBJECT_LIMIT = 3
-        docs = []
-        if request.user.has_perm("documents.view_document"):
-            all_docs = Document.objects.filter(
-                id__in=permitted_document_ids(request.user),
-            )
-            if db_only:
-                docs = all_docs.filter(title__icontains=query)[:OBJECT_LIMIT]
-            else:
-                user = None if request.user.is_superuser else request.user
-                matching_ids = get_backend().search_ids(
-                    query,
-                    user=user,
-                    search_mode=SearchMode.TEXT,
-                    limit=OBJECT_LIMIT * 3,
-                )
-                docs_by_id = all_docs.in_bulk(matching_ids)
-                docs = [
-                    docs_by_id[doc_id]
-                    for doc_id in matching_ids
-                    if doc_id in docs_by_id
-                ][:OBJECT_LIMIT]
-        saved_views = (
-            get_objects_for_user_owner_aware(
-                request.user,
-                "view_savedview",
-                SavedView,
-            ).filter(name__icontains=query)
-            if request.user.has_perm("documents.view_savedview")
-            else []
-        )
-        saved_views = saved_views[:OBJECT_LIMIT]
-        tags = (
-            get_objects_for_user_owner_aware(request.user, "view_tag", Tag).filter(
-                name__icontains=query,
-            )
-            if request.user.has_perm("documents.view_tag")
-            else []
-        )
-        tags = tags[:OBJECT_LIMIT]
-        correspondents = (
-            get_objects_for_user_owner_aware(
-                request.user,
-                "view_correspondent",
-                Correspondent,
-            ).filter(name__icontains=query)
-            if request.user.has_perm("documents.view_correspondent")
-            else []
-        )
-        correspondents = correspondents[:OBJECT_LIMIT]
-        document_types = (
-            get_objects_for_user_owner_aware(
-                request.user,
-                "view_documenttype",
-                DocumentType,
-            ).filter(name__icontains=query)
-            if request.user.has_perm("documents.view_documenttype")
-            else []
-        )
-        document_types = document_types[:OBJECT_LIMIT]
-        storage_paths = (
-            get_objects_for_user_owner_aware(
-                request.user,
-                "view_storagepath",
-                StoragePath,
-            ).filter(name__icontains=query)
-            if request.user.has_perm("documents.view_storagepath")
-            else []
-        )
-        storage_paths = storage_paths[:OBJECT_LIMIT]
-        users = (
-            User.objects.filter(username__icontains=query)
-            if request.user.has_perm("auth.view_user")
-            else []
-        )
-        users = users[:OBJECT_LIMIT]
-        groups = (
-            Group.objects.filter(name__icontains=query)
-            if request.user.has_perm("auth.view_group")
-            else []
-        )
-        groups = groups[:OBJECT_LIMIT]
-        mail_rules = (
-            get_objects_for_user_owner_aware(
-                request.user,
-                "view_mailrule",
-                MailRule,
-            ).filter(name__icontains=query)
-            if request.user.has_perm("paperless_mail.view_mailrule")
-            else []
-        )
-        mail_rules = mail_rules[:OBJECT_LIMIT]
-        mail_accounts = (
-            get_objects_for_user_owner_aware(
-                request.user,
-                "view_mailaccount",
-                MailAccount,
-            ).filter(name__icontains=query)
-            if request.user.has_perm("paperless_mail.view_mailaccount")
-            else []
-        )
-        mail_accounts = mail_accounts[:OBJECT_LIMIT]
-        workflows = (
-            Workflow.objects.filter(name__icontains=query)
-            if request.user.has_perm("documents.view_workflow")
-            else []
-        )
-        workflows = workflows[:OBJECT_LIMIT]
-        custom_fields = (
-            CustomField.objects.filter(name__icontains=query)
-            if request.user.has_perm("documents.view_customfield")
-            else []
-        )
-        custom_fields = custom_fields[:OBJECT_LIMIT]
+        results = global_search(request.user, query, db_only=bool(db_only))
 
         context = {
             "request": request,
         }
-
-        docs_serializer = DocumentSerializer(docs, many=True, context=context)
-        saved_views_serializer = SavedViewSerializer(
-            saved_views,
-            many=True,
-            context=context,
-        )
-        tags_serializer = TagSerializer(tags, many=True, context=context)
-        correspondents_serializer = CorrespondentSerializer(
-            correspondents,
-            many=True,
-            context=context,
-        )
-        document_types_serializer = DocumentTypeSerializer(
-            document_types,
-            many=True,
-            context=context,
-        )
-        storage_paths_serializer = StoragePathSerializer(
-            storage_paths,
-            many=True,
-            context=context,
-        )
-        users_serializer = UserSerializer(users, many=True, context=context)
-        groups_serializer = GroupSerializer(groups, many=True, context=context)
-        mail_rules_serializer = MailRuleSerializer(
-            mail_rules,
-            many=True,
-            context=context,
-        )
-        mail_accounts_serializer = MailAccountSerializer(
-            mail_accounts,
-            many=True,
-            context=context,
-        )
-        workflows_serializer = WorkflowSerializer(workflows, many=True, context=context)
-        custom_fields_serializer = CustomFieldSerializer(
-            custom_fields,
-            many=True,
-            context=context,
-        )
+        serializers = {
+            "documents": DocumentSerializer,
+            "saved_views": SavedViewSerializer,
+            "tags": TagSerializer,
+            "correspondents": CorrespondentSerializer,
+            "document_types": DocumentTypeSerializer,
+            "storage_paths": StoragePathSerializer,
+            "users": UserSerializer,
+            "groups": GroupSerializer,
+            "mail_rules": MailRuleSerializer,
+            "mail_accounts": MailAccountSerializer,
+            "workflows": WorkflowSerializer,
+            "custom_fields": CustomFieldSerializer,
+        }
 
         return Response(
             {
-                "total": len(docs)
-                + len(saved_views)
-                + len(tags)
-                + len(correspondents)
-                + len(document_types)
-                + len(storage_paths)
-                + len(users)
-                + len(groups)
-                + len(mail_rules)
-                + len(mail_accounts)
-                + len(workflows)
-                + len(custom_fields),
-                "documents": docs_serializer.data,
-                "saved_views": saved_views_serializer.data,
-                "tags": tags_serializer.data,
-                "correspondents": correspondents_serializer.data,
-                "document_types": document_types_serializer.data,
-                "storage_paths": storage_paths_serializer.data,
-                "users": users_serializer.data,
-                "groups": groups_serializer.data,
-                "mail_rules": mail_rules_serializer.data,
-                "mail_accounts": mail_accounts_serializer.data,
-                "workflows": workflows_serializer.data,
-                "custom_fields": custom_fields_serializer.data,
+                "total": sum(len(objects) for objects in results.values()),
+                **{
+                    key: serializers[key](objects, many=True, context=context).data
+                    for key, objects in results.items()
+                },
             },
         )
 
@@ -3726,6 +3709,33 @@ class StatisticsView(GenericAPIView[Any]):
         user = request.user if request.user is not None else None
         can_view_global_stats = has_global_statistics_permission(user) or user is None
 
+        # Statistics are cached per generation, which any change to documents,
+        # tags, other objects or permissions advances. Everyone allowed to see
+        # global statistics shares one entry; per-user entries expire sooner
+        # to bound staleness from changes such as group membership.
+        cache_key = get_statistics_cache_key(
+            None if can_view_global_stats else user.pk,
+            get_statistics_generation(),
+        )
+        statistics = get_statistics_cache(cache_key)
+        if statistics is None:
+            statistics = self._compute_statistics(
+                user,
+                can_view_global_stats=can_view_global_stats,
+            )
+            set_statistics_cache(
+                cache_key,
+                statistics,
+                timeout=CACHE_50_MINUTES if can_view_global_stats else CACHE_5_MINUTES,
+            )
+        return Response(statistics)
+
+    def _compute_statistics(
+        self,
+        user,
+        *,
+        can_view_global_stats: bool,
+    ) -> dict:
         documents = (
             Document.objects.all()
             if can_view_global_stats
@@ -3798,23 +3808,21 @@ class StatisticsView(GenericAPIView[Any]):
             "archive_serial_number__max",
         )
 
-        return Response(
-            {
-                "documents_total": documents_total,
-                "documents_inbox": documents_inbox,
-                "inbox_tag": (
-                    inbox_tag_pks[0] if inbox_tag_pks else None
-                ),  # backwards compatibility
-                "inbox_tags": (inbox_tag_pks or None),
-                "document_file_type_counts": document_file_type_counts,
-                "character_count": character_count,
-                "tag_count": len(tags),
-                "correspondent_count": correspondent_count,
-                "document_type_count": document_type_count,
-                "storage_path_count": storage_path_count,
-                "current_asn": current_asn,
-            },
-        )
+        return {
+            "documents_total": documents_total,
+            "documents_inbox": documents_inbox,
+            "inbox_tag": (
+                inbox_tag_pks[0] if inbox_tag_pks else None
+            ),  # backwards compatibility
+            "inbox_tags": (inbox_tag_pks or None),
+            "document_file_type_counts": document_file_type_counts,
+            "character_count": character_count,
+            "tag_count": len(tags),
+            "correspondent_count": correspondent_count,
+            "document_type_count": document_type_count,
+            "storage_path_count": storage_path_count,
+            "current_asn": current_asn,
+        }
 
 
 @extend_schema_view(
@@ -3864,35 +3872,16 @@ class BulkDownloadView(DocumentSelectionMixin, GenericAPIView[Any]):
         else:
             strategy_class = ArchiveOnlyStrategy
 
-        settings.SCRATCH_DIR.mkdir(parents=True, exist_ok=True)
-        fd, temp_name = tempfile.mkstemp(
-            dir=settings.SCRATCH_DIR,
-            suffix="-compressed-archive",
+        strategy = strategy_class(follow_formatting=follow_filename_format)
+        response = SyncStreamingHttpResponse(
+            stream_zip(strategy, versioned_documents, compression=compression),
+            content_type="application/zip",
         )
-        os.close(fd)
-        temp_path = Path(temp_name)
-
-        try:
-            with zipfile.ZipFile(temp_path, "w", compression) as zipf:
-                strategy = strategy_class(
-                    zipf,
-                    follow_formatting=follow_filename_format,
-                )
-                for document in versioned_documents:
-                    strategy.add_document(document)
-
-            f = temp_path.open("rb")
-            temp_path.unlink()
-        except Exception:
-            temp_path.unlink(missing_ok=True)
-            raise
-
-        return FileResponse(
-            f,
+        response["Content-Disposition"] = content_disposition_header(
             as_attachment=True,
             filename="documents.zip",
-            content_type="application/zip",
         )
+        return response
 
 
 @extend_schema_view(
@@ -4773,12 +4762,7 @@ class BulkEditObjectsView(PassUserMixin):
             if object_type == "tags":
                 editable_ids = set(user_permitted_objects.values_list("pk", flat=True))
                 all_ids = set(objs.values_list("pk", flat=True))
-                for tag in objs:
-                    all_ids.update(
-                        descendant.pk
-                        for descendant in tag.get_descendants()
-                        if descendant.pk in editable_ids
-                    )
+                all_ids.update(get_descendant_ids(all_ids) & editable_ids)
                 objs = object_class.objects.filter(pk__in=all_ids)
             objs = objs.select_related("owner")
             object_ids = list(objs.values_list("pk", flat=True))
@@ -5125,10 +5109,13 @@ class SystemStatusView(PassUserMixin):
             celery_error = "Error connecting to celery, check logs for more detail."
 
         index_error = None
+        index_writer_stats = None
         try:
             from documents.search import get_backend
+            from documents.search import get_index_writer_stats
 
             get_backend()  # triggers open/rebuild; raises on error
+            index_writer_stats = get_index_writer_stats()
             index_status = "OK"
             # Use the most-recently modified file in the index directory as a proxy
             # for last index write time (Tantivy has no single last_modified() call).
@@ -5276,6 +5263,7 @@ class SystemStatusView(PassUserMixin):
                     "index_status": index_status,
                     "index_last_modified": index_last_modified,
                     "index_error": index_error,
+                    "index_writer_stats": index_writer_stats,
                     "classifier_status": classifier_status,
                     "classifier_last_trained": classifier_last_trained,
                     "classifier_error": classifier_error,
@@ -5,11 +5,11 @@ from pathlib import Path
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.utils import timezone
+from filelock import FileLock
 
 from documents.data_models import ConsumableDocument
 from documents.data_models import DocumentMetadataOverrides
 from documents.mail import EmailAttachment
-from documents.mail import send_email
 from documents.models import Correspondent
 from documents.models import Document
 from documents.models import DocumentType
@@ -18,6 +18,7 @@ from documents.models import WorkflowTrigger
 from documents.plugins.base import StopConsumeTaskError
 from documents.signals import document_consumption_finished
 from documents.templating.workflows import parse_w_workflow_placeholders
+from documents.workflows.emails import send_email_notification
 from documents.workflows.webhooks import send_webhook
 
 logger = logging.getLogger("paperless.workflows.actions")
@@ -167,16 +168,20 @@ def execute_email_action(
                     friendly_name=friendly_name,
                 )
             if attachment:
-                attachments = [attachment]
+                # The file may be moved or removed before the email is sent
+                with FileLock(settings.MEDIA_LOCK):
+                    attachments = [attachment.read()]
 
-        n_messages = send_email(
-            subject=subject,
-            body=body,
-            to=action.email.to.split(","),
-            attachments=attachments,
+        send_email_notification.apply_async(
+            kwargs={
+                "subject": subject,
+                "body": body,
+                "to": action.email.to.split(","),
+                "attachments": attachments,
+            },
         )
         logger.debug(
-            f"Sent {n_messages} notification email(s) to {action.email.to}",
+            f"Notification email to {action.email.to} queued",
             extra={"group": logging_group},
         )
     except Exception as e:
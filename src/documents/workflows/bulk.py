@@ -0,0 +1,430 @@
+"""
+Set-based execution of document updated workflows for many documents at once.
+
+Running workflows document by document costs several queries and a save per
+document and workflow. Here, each workflow instead narrows the documents down
+in SQL, confirms the remaining candidates in memory and applies its assignment
+and removal actions to all matching documents together. Workflows with any
+other action (email, webhook, password removal, move to trash) still run
+document by document.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+from typing import Final
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+from guardian.shortcuts import remove_perm
+
+from documents.matching import WorkflowTriggerEvaluator
+from documents.matching import prefilter_documents_by_workflowtrigger
+from documents.models import CustomFieldInstance
+from documents.models import Document
+from documents.models import MatchingModel
+from documents.models import Tag
+from documents.models import WorkflowAction
+from documents.models import WorkflowRun
+from documents.models import WorkflowTrigger
+from documents.permissions import set_permissions_for_object
+from documents.tag_hierarchy import get_ancestor_ids
+from documents.tag_hierarchy import get_descendant_ids
+from documents.workflows.mutations import render_assigned_title
+from documents.workflows.utils import get_workflows_for_trigger
+
+if TYPE_CHECKING:
+    import uuid
+    from collections.abc import Iterable
+
+    from documents.models import Workflow
+
+logger = logging.getLogger("paperless.workflows.bulk")
+
+# The fields run_workflows saves after applying the actions of a workflow
+_DOCUMENT_FIELDS: Final[tuple[str, ...]] = (
+    "title",
+    "correspondent",
+    "document_type",
+    "storage_path",
+    "owner",
+)
+
+_SET_BASED_ACTIONS: Final[frozenset[int]] = frozenset(
+    {
+        WorkflowAction.WorkflowActionType.ASSIGNMENT,
+        WorkflowAction.WorkflowActionType.REMOVAL,
+    },
+)
+
+
+def run_document_updated_workflows(
+    document_ids: Iterable[int],
+    logging_group: uuid.UUID | None = None,
+) -> None:
+    """
+    Run all enabled document updated workflows for the given documents, with
+    the same outcome as running them document by document.
+    """
+    from documents.signals.handlers import run_workflows
+
+    trigger_type = WorkflowTrigger.WorkflowTriggerType.DOCUMENT_UPDATED
+    document_ids = set(document_ids)
+    evaluator = WorkflowTriggerEvaluator(trigger_type)
+
+    for workflow in get_workflows_for_trigger(trigger_type):
+        # Workflows run in order, so each one sees the changes of the previous
+        matched_ids = _matching_document_ids(evaluator, workflow, document_ids)
+        if not matched_ids:
+            continue
+
+        actions = list(workflow.actions.all())
+        if any(action.type not in _SET_BASED_ACTIONS for action in actions):
+            for document in Document.objects.filter(pk__in=matched_ids):
+                run_workflows(
+                    trigger_type=trigger_type,
+                    document=document,
+                    workflow_to_run=workflow,
+                    logging_group=logging_group,
+                )
+            continue
+
+        logger.info(
+            f"Applying {workflow} to {len(matched_ids)} documents",
+            extra={"group": logging_group},
+        )
+        with _AuditLog(matched_ids) as audit:
+            for action in actions:
+                if action.type == WorkflowAction.WorkflowActionType.ASSIGNMENT:
+                    _apply_assignment(action, matched_ids, audit, logging_group)
+                else:
+                    _apply_removal(action, matched_ids, audit)
+            # run_workflows saves every matched document, changed or not
+            Document.objects.filter(pk__in=matched_ids).update(
+                modified=timezone.now(),
+            )
+
+        WorkflowRun.objects.bulk_create(
+            WorkflowRun(workflow=workflow, type=trigger_type, document_id=pk)
+            for pk in sorted(matched_ids)
+        )
+
+
+def _matching_document_ids(
+    evaluator: WorkflowTriggerEvaluator,
+    workflow: Workflow,
+    document_ids: set[int],
+) -> set[int]:
+    matched: set[int] = set()
+    for trigger in evaluator.get_triggers(workflow):
+        candidates = prefilter_documents_by_workflowtrigger(
+            Document.objects.filter(
+                pk__in=document_ids - matched,
+                root_document__isnull=True,
+            ),
+            trigger.trigger,
+        ).prefetch_related("tags")
+        if trigger.trigger.matching_algorithm == MatchingModel.MATCH_NONE:
+            candidates = candidates.defer("content")
+
+        documents = list(candidates)
+        # The custom field query, if any, is part of the prefilter
+        candidate_ids = {document.pk for document in documents}
+        for document in documents:
+            trigger_matched, reason = trigger.matches(
+                document,
+                list(document.tags.all()),
+                custom_field_matches=candidate_ids,
+            )
+            if trigger_matched:
+                matched.add(document.pk)
+            else:
+                logger.debug(reason)
+    return matched
+
+
+class _AuditLog:
+    """
+    Collects the audit log entries for the changes of one workflow to many
+    documents, as saving each document would have written them, and writes
+    them with a single insert.
+    """
+
+    def __init__(self, document_ids: set[int]) -> None:
+        from auditlog.registry import auditlog
+
+        self.document_ids = document_ids
+        # Like saving, log nothing while documents are not registered, e.g. while
+        # the importer runs
+        self.enabled = settings.AUDIT_LOG_ENABLED and auditlog.contains(Document)
+        self._entries: list = []
+        self._before: dict[int, Document] = {}
+
+    def _snapshot(self) -> dict[int, Document]:
+        return (
+            Document.objects.filter(pk__in=self.document_ids)
+            .select_related("correspondent")
+            .only("pk", "created", *_DOCUMENT_FIELDS)
+            .in_bulk()
+        )
+
+    def __enter__(self) -> _AuditLog:
+        if self.enabled:
+            self._before = self._snapshot()
+        return self
+
+    def log_tags(
+        self,
+        operation: str,
+        tag_ids_by_document: dict[int, set[int]],
+    ) -> None:
+        if not self.enabled:
+            return
+        tags = Tag.objects.in_bulk(set().union(*tag_ids_by_document.values()))
+        for document_id, tag_ids in tag_ids_by_document.items():
+            if tag_ids and document_id in self._before:
+                self._entries.append(
+                    (
+                        self._before[document_id],
+                        {
+                            "tags": {
+                                "type": "m2m",
+                                "operation": operation,
+                                "objects": [str(tags[pk]) for pk in tag_ids],
+                            },
+                        },
+                    ),
+                )
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if not self.enabled or exc_type is not None:
+            return
+
+        from auditlog.cid import get_cid
+        from auditlog.diff import model_instance_diff
+        from auditlog.models import LogEntry
+
+        after = self._snapshot()
+        for pk, old in self._before.items():
+            if pk in after and (
+                changes := model_instance_diff(
+                    old,
+                    after[pk],
+                    fields_to_check=_DOCUMENT_FIELDS,
+                    use_json_for_changes=settings.AUDITLOG_STORE_JSON_CHANGES,
+                )
+            ):
+                self._entries.append((after[pk], changes))
+
+        content_type = ContentType.objects.get_for_model(Document)
+        cid = get_cid()
+        LogEntry.objects.bulk_create(
+            LogEntry(
+                content_type=content_type,
+                object_pk=str(document.pk),
+                object_id=document.pk,
+                object_repr=str(document),
+                action=LogEntry.Action.UPDATE,
+                changes=changes,
+                cid=cid,
+            )
+            for document, changes in self._entries
+        )
+
+
+def _add_tags(document_ids: set[int], tag_ids: set[int], audit: _AuditLog) -> None:
+    DocumentTagRelationship = Document.tags.through
+    existing = set(
+        DocumentTagRelationship.objects.filter(
+            document_id__in=document_ids,
+            tag_id__in=tag_ids,
+        ).values_list("document_id", "tag_id"),
+    )
+    added = {
+        document_id: {
+            tag_id for tag_id in tag_ids if (document_id, tag_id) not in existing
+        }
+        for document_id in document_ids
+    }
+    DocumentTagRelationship.objects.bulk_create(
+        DocumentTagRelationship(document_id=document_id, tag_id=tag_id)
+        for document_id, new_tag_ids in added.items()
+        for tag_id in new_tag_ids
+    )
+    audit.log_tags("add", added)
+
+
+def _remove_tags(
+    document_ids: set[int],
+    tag_ids: set[int] | None,
+    audit: _AuditLog,
+) -> None:
+    """Remove the given tags, or all tags if ``tag_ids`` is None."""
+    relationships = Document.tags.through.objects.filter(
+        document_id__in=document_ids,
+    )
+    if tag_ids is not None:
+        relationships = relationships.filter(tag_id__in=tag_ids)
+
+    removed: dict[int, set[int]] = {}
+    for document_id, tag_id in relationships.values_list("document_id", "tag_id"):
+        removed.setdefault(document_id, set()).add(tag_id)
+    relationships.delete()
+    audit.log_tags("delete", removed)
+
+
+def _apply_assignment(
+    action: WorkflowAction,
+    document_ids: set[int],
+    audit: _AuditLog,
+    logging_group: uuid.UUID | None,
+) -> None:
+    """
+    Set-based counterpart of ``apply_assignment_to_document``.
+
+    action: WorkflowAction, annotated with 'has_assign_*' boolean fields
+    """
+    documents = Document.objects.filter(pk__in=document_ids)
+
+    if action.has_assign_tags:
+        tag_ids = {tag.pk for tag in action.assign_tags.all()}
+        _add_tags(document_ids, tag_ids | get_ancestor_ids(tag_ids), audit)
+
+    updates = {
+        f"{field}_id": getattr(action, f"assign_{field}_id")
+        for field in ("correspondent", "document_type", "storage_path", "owner")
+        if getattr(action, f"assign_{field}_id") is not None
+    }
+    if updates:
+        documents.update(**updates)
+
+    if action.assign_title:
+        # Rendered per document, after the fields it may refer to are assigned
+        titled = []
+        for document in documents.select_related(
+            "correspondent",
+            "document_type",
+            "owner",
+        ).defer("content"):
+            title = render_assigned_title(action, document, logging_group)
+            if title:
+                # limit title to 128 characters
+                document.title = title[:128]
+                titled.append(document)
+        Document.objects.bulk_update(titled, ["title"], batch_size=500)
+
+    if any(
+        [
+            action.has_assign_view_users,
+            action.has_assign_view_groups,
+            action.has_assign_change_users,
+            action.has_assign_change_groups,
+        ],
+    ):
+        permissions = {
+            "view": {
+                "users": [user.pk for user in action.assign_view_users.all()],
+                "groups": [group.pk for group in action.assign_view_groups.all()],
+            },
+            "change": {
+                "users": [user.pk for user in action.assign_change_users.all()],
+                "groups": [group.pk for group in action.assign_change_groups.all()],
+            },
+        }
+        # Per document, so guardian's signals keep the permission grants in sync
+        for document in documents.only("pk"):
+            set_permissions_for_object(
+                permissions=permissions,
+                object=document,
+                merge=True,
+            )
+
+    if action.has_assign_custom_fields:
+        for field in action.assign_custom_fields.all():
+            value_field_name = CustomFieldInstance.get_value_field_name(
+                data_type=field.data_type,
+            )
+            value = action.assign_custom_fields_values.get(str(field.pk), None)
+            instances = CustomFieldInstance.objects.filter(
+                field=field,
+                document_id__in=document_ids,
+            )
+            with_field = set(instances.values_list("document_id", flat=True))
+            if value is not None:
+                instances.update(**{value_field_name: value})
+            CustomFieldInstance.objects.bulk_create(
+                CustomFieldInstance(
+                    field=field,
+                    document_id=document_id,
+                    **{value_field_name: value},
+                )
+                for document_id in sorted(document_ids - with_field)
+            )
+
+
+def _apply_removal(
+    action: WorkflowAction,
+    document_ids: set[int],
+    audit: _AuditLog,
+) -> None:
+    """
+    Set-based counterpart of ``apply_removal_to_document``.
+
+    action: WorkflowAction, annotated with 'has_remove_*' boolean fields
+    """
+    documents = Document.objects.filter(pk__in=document_ids)
+
+    if action.remove_all_tags:
+        _remove_tags(document_ids, None, audit)
+    else:
+        tag_ids = {tag.pk for tag in action.remove_tags.all()}
+        if tag_ids:
+            _remove_tags(document_ids, tag_ids | get_descendant_ids(tag_ids), audit)
+
+    for field in ("correspondent", "document_type", "storage_path", "owner"):
+        # e.g. remove_all_correspondents and remove_correspondents
+        remove_all = getattr(action, f"remove_all_{field}s")
+        remove = getattr(action, f"remove_{field}s")
+        if remove_all:
+            documents.filter(**{f"{field}__isnull": False}).update(**{field: None})
+        elif removed_ids := [obj.pk for obj in remove.all()]:
+            documents.filter(**{f"{field}__in": removed_ids}).update(**{field: None})
+
+    if action.remove_all_permissions:
+        permissions = {
+            "view": {"users": [], "groups": []},
+            "change": {"users": [], "groups": []},
+        }
+        for document in documents.only("pk"):
+            set_permissions_for_object(
+                permissions=permissions,
+                object=document,
+                merge=False,
+            )
+
+    if any(
+        [
+            action.has_remove_view_users,
+            action.has_remove_view_groups,
+            action.has_remove_change_users,
+            action.has_remove_change_groups,
+        ],
+    ):
+        for user in action.remove_view_users.all():
+            remove_perm("view_document", user, documents)
+        for user in action.remove_change_users.all():
+            remove_perm("change_document", user, documents)
+        for group in action.remove_view_groups.all():
+            remove_perm("view_document", group, documents)
+        for group in action.remove_change_groups.all():
+            remove_perm("change_document", group, documents)
+
+    if action.remove_all_custom_fields:
+        CustomFieldInstance.objects.filter(document_id__in=document_ids).hard_delete()
+    elif action.has_remove_custom_fields:
+        CustomFieldInstance.objects.filter(
+            field__in=action.remove_custom_fields.all(),
+            document_id__in=document_ids,
+        ).hard_delete()
@@ -0,0 +1,41 @@
+import logging
+import smtplib
+import time
+
+from celery import shared_task
+
+from documents.mail import EmailAttachment
+from documents.mail import send_email
+
+logger = logging.getLogger("paperless.workflows.emails")
+
+
+@shared_task(
+    retry_backoff=True,
+    autoretry_for=(smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError),
+    max_retries=3,
+)
+def send_email_notification(
+    subject: str,
+    body: str,
+    to: list[str],
+    attachments: list[EmailAttachment],
+) -> int:
+    try:
+        start = time.monotonic()
+        n_messages = send_email(
+            subject=subject,
+            body=body,
+            to=to,
+            attachments=attachments,
+        )
+        logger.info(
+            f"Sent {n_messages} notification email(s) to {', '.join(to)} "
+            f"in {time.monotonic() - start:.2f}s",
+        )
+        return n_messages
+    except Exception as e:
+        logger.error(
+            f"Failed attempt sending notification email to {', '.join(to)}: {e}",
+        )
+        raise e
@@ -13,6 +13,37 @@ from documents.templating.workflows import parse_w_workflow_placeholders
 logger = logging.getLogger("paperless.workflows.mutations")
 
 
+def render_assigned_title(
+    action: WorkflowAction,
+    document: Document,
+    logging_group,
+) -> str | None:
+    """
+    Render the title template of an assignment action for a Document, or
+    return None if it cannot be rendered.
+    """
+    try:
+        return parse_w_workflow_placeholders(
+            action.assign_title,
+            document.correspondent.name if document.correspondent else "",
+            document.document_type.name if document.document_type else "",
+            document.owner.username if document.owner else "",
+            timezone.localtime(document.added),
+            document.original_filename or "",
+            document.filename or "",
+            document.created,
+            "",  # dont pass the title to avoid recursion
+            "",  # no urls in titles
+            document.pk,
+        )
+    except Exception:  # pragma: no cover
+        logger.exception(
+            f"Error occurred parsing title assignment '{action.assign_title}', falling back to original",
+            extra={"group": logging_group},
+        )
+        return None
+
+
 def apply_assignment_to_document(
     action: WorkflowAction,
     document: Document,
@@ -43,27 +74,9 @@ def apply_assignment_to_document(
         document.owner = action.assign_owner
 
     if action.assign_title:
-        try:
-            title = parse_w_workflow_placeholders(
-                action.assign_title,
-                document.correspondent.name if document.correspondent else "",
-                document.document_type.name if document.document_type else "",
-                document.owner.username if document.owner else "",
-                timezone.localtime(document.added),
-                document.original_filename or "",
-                document.filename or "",
-                document.created,
-                "",  # dont pass the title to avoid recursion
-                "",  # no urls in titles
-                document.pk,
-            )
-            if title:
-                document.title = title
-        except Exception:  # pragma: no cover
-            logger.exception(
-                f"Error occurred parsing title assignment '{action.assign_title}', falling back to original",
-                extra={"group": logging_group},
-            )
+        title = render_assigned_title(action, document, logging_group)
+        if title:
+            document.title = title
 
     if any(
         [
@@ -4,6 +4,7 @@ from django.db.models import Exists
 from django.db.models import OuterRef
 from django.db.models import Prefetch
 
+from documents.matching import get_workflow_triggers_queryset
 from documents.models import Workflow
 from documents.models import WorkflowAction
 from documents.models import WorkflowTrigger
@@ -106,13 +107,14 @@ def get_workflows_for_trigger(
         "actions",
         queryset=annotated_actions.order_by("order", "pk"),
     )
+    trigger_prefetch = Prefetch("triggers", queryset=get_workflow_triggers_queryset())
 
     if workflow_to_run is not None:
         return (
             Workflow.objects.filter(pk=workflow_to_run.pk)
             .prefetch_related(
                 action_prefetch,
-                "triggers",
+                trigger_prefetch,
             )
             .distinct()
         )
@@ -121,7 +123,7 @@ def get_workflows_for_trigger(
         Workflow.objects.filter(enabled=True, triggers__type=trigger_type)
         .prefetch_related(
             action_prefetch,
-            "triggers",
+            trigger_prefetch,
         )
         .order_by("order")
         .distinct()
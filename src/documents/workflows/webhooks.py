@@ -1,4 +1,6 @@
 import logging
+import threading
+import time
 
 import httpx
 from celery import shared_task
@@ -9,10 +11,35 @@ from paperless.network import validate_outbound_http_url
 
 logger = logging.getLogger("paperless.workflows.webhooks")
 
+# Clients are kept per worker process and destination host, so webhooks to
+# the same host reuse its connections. Connections are made to the pinned IP,
+# so sharing a client between hosts could reuse a TLS connection set up for
+# another hostname.
+_clients: dict[tuple[str, bool], httpx.Client] = {}
+_clients_lock = threading.Lock()
+
+
+def _get_client(host: str, *, allow_internal: bool) -> httpx.Client:
+    with _clients_lock:
+        key = (host, allow_internal)
+        if key not in _clients:
+            _clients[key] = httpx.Client(
+                transport=PinnedHostHTTPTransport(
+                    allow_internal=allow_internal,
+                    limits=httpx.Limits(
+                        max_connections=5,
+                        max_keepalive_connections=2,
+                    ),
+                ),
+                timeout=5.0,
+                follow_redirects=False,
+            )
+        return _clients[key]
+
 
 @shared_task(
     retry_backoff=True,
-    autoretry_for=(httpx.HTTPStatusError,),
+    autoretry_for=(httpx.HTTPStatusError, httpx.TimeoutException),
     max_retries=3,
     throws=(httpx.HTTPError,),
 )
@@ -36,7 +63,8 @@ def send_webhook(
         logger.warning("Webhook blocked: %s", e)
         raise
 
-    transport = PinnedHostHTTPTransport(
+    client = _get_client(
+        httpx.URL(url).host,
         allow_internal=settings.WEBHOOKS_ALLOW_INTERNAL_REQUESTS,
     )
 
@@ -55,21 +83,15 @@ def send_webhook(
         else:
             post_args["content"] = data
 
-        with httpx.Client(
-            transport=transport,
-            timeout=5.0,
-            follow_redirects=False,
-        ) as client:
-            client.post(
-                **post_args,
-            ).raise_for_status()
-            logger.info(
-                f"Webhook sent to {url}",
-            )
+        start = time.monotonic()
+        client.post(
+            **post_args,
+        ).raise_for_status()
+        logger.info(
+            f"Webhook sent to {url} in {time.monotonic() - start:.2f}s",
+        )
     except Exception as e:
         logger.error(
             f"Failed attempt sending webhook to {url}: {e}",
         )
         raise e
-    finally:
-        transport.close()
@@ -87,15 +87,34 @@ EMPTY_TRASH_DIR = (
 # threads.
 MEDIA_LOCK = MEDIA_ROOT / "media.lock"
 INDEX_DIR = DATA_DIR / "index"
+# Seconds a single-document index write waits before competing for the index
+# lock, so bursts of saves from any worker are committed together.
+SEARCH_INDEX_COALESCE_WINDOW: Final[float] = get_float_from_env(
+    "PAPERLESS_SEARCH_INDEX_COALESCE_WINDOW",
+    0.0,
+)
 
 ADVANCED_FUZZY_SEARCH_THRESHOLD: float | None = get_float_from_env(
     "PAPERLESS_ADVANCED_FUZZY_SEARCH_THRESHOLD",
 )
 
+# Seconds the global search box waits for any one of its sources before
+# responding without it; 0 waits for every source.
+GLOBAL_SEARCH_TIMEOUT: Final[float] = get_float_from_env(
+    "PAPERLESS_GLOBAL_SEARCH_TIMEOUT",
+    2.0,
+)
+
 MODEL_FILE = get_path_from_env(
     "PAPERLESS_MODEL_FILE",
     DATA_DIR / "classification_model.pickle",
 )
+# Checksums of media files by path, size and modification time, so the
+# sanity checker does not hash unchanged files again. Must be a SQLite file.
+SANITY_CHECKER_CACHE = get_path_from_env(
+    "PAPERLESS_SANITY_CHECKER_CACHE",
+    DATA_DIR / "sanity_checker_cache.db",
+)
 LLM_INDEX_DIR = DATA_DIR / "llm_index"
 LLM_INDEX_LOCK = LLM_INDEX_DIR / "index.lock"
 # Cross-process read/write lock guarding the LLM index compaction/migration
@@ -317,6 +336,13 @@ AUTHENTICATION_BACKENDS = [
     "allauth.account.auth_backends.AuthenticationBackend",
 ]
 
+# Resolve document object permissions from the denormalized
+# DocumentPermissionGrant table instead of guardian's text-keyed tables.
+MATERIALIZED_DOCUMENT_PERMISSIONS: Final[bool] = get_bool_from_env(
+    "PAPERLESS_MATERIALIZED_DOCUMENT_PERMISSIONS",
+    "no",
+)
+
 ACCOUNT_LOGOUT_ON_GET = True
 ACCOUNT_DEFAULT_HTTP_PROTOCOL = os.getenv(
     "PAPERLESS_ACCOUNT_DEFAULT_HTTP_PROTOCOL",